@@ -0,0 +1,38 @@
+"""Add graph checkpoints for LangGraph thread state
+
+Revision ID: 7c1e2d9a4b53
+Revises: 3bbb0cae9464
+Create Date: 2026-10-18 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e2d9a4b53'
+down_revision: Union[str, Sequence[str], None] = '3bbb0cae9464'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('graph_checkpoints',
+    sa.Column('thread_id', sa.String(length=255), nullable=False),
+    sa.Column('seq', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('is_keyframe', sa.Boolean(), nullable=False),
+    sa.Column('channel_values', sa.JSON(), nullable=False),
+    sa.Column('channel_versions', sa.JSON(), nullable=False),
+    sa.Column('versions_seen', sa.JSON(), nullable=False),
+    sa.Column('ts', sa.String(length=64), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('thread_id', 'seq')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('graph_checkpoints')
@@ -4,15 +4,23 @@ Agent Graph V2 - Unified Alex Agent
 Simplified graph with single Alex agent that synthesizes all expertise.
 """
 
+import asyncio
 import logging
 import json
-from typing import Dict, Any
+from typing import Any, AsyncIterator, Dict, List, Optional
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
-from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 
 from app.agents.graph_state import AgentState
 from app.agents.alex import AlexAgent
+from app.agents.checkpointer import graph_checkpointer
+from app.agents.keywords import keyword_engine
+from app.agents.streaming import EscalationTagFilter
 from app.memory.causal_memory import causal_memory
+from app.memory.embeddings import embedding_service
+from app.memory.write_behind import interaction_writer
 
 
 logger = logging.getLogger(__name__)
@@ -21,9 +29,15 @@ logger = logging.getLogger(__name__)
 class AgentGraphV2:
     """Simplified LangGraph with unified Alex agent."""
     
-    def __init__(self):
-        """Initialize agent graph with Alex."""
+    def __init__(self, checkpointer: Optional[BaseCheckpointSaver] = graph_checkpointer):
+        """
+        Initialize agent graph with Alex.
+        
+        Args:
+            checkpointer: Saver persisting state per thread (None = stateless turns)
+        """
         self.alex = AlexAgent()
+        self.checkpointer = checkpointer
         
         # Build the graph
         self.graph = self._build_graph()
@@ -47,46 +61,68 @@ class AgentGraphV2:
         # Alex always goes to END
         workflow.add_edge("alex", END)
         
-        # Compile graph
-        return workflow.compile()
+        # Compile graph; the checkpointer restores state saved for the thread
+        return workflow.compile(checkpointer=self.checkpointer)
     
-    def _alex_node(self, state: AgentState) -> AgentState:
+    async def _alex_node(self, state: AgentState, config: RunnableConfig) -> AgentState:
         """
         Alex (Unified Agent) node.
         
+        Async, so LLM calls and retry backoff don't tie up a worker thread
+        per in-flight chat. If the config carries an on_token callback the
+        response is streamed through it.
+        
         Args:
             state: Current agent state
+            config: Runnable config (configurable.thread_id, optional configurable.on_token)
             
         Returns:
             Updated state
         """
-        return self.alex.process(state)
+        on_token = config.get("configurable", {}).get("on_token")
+        if on_token is None:
+            return await self.alex.aprocess(state)
+        
+        async for chunk in self.alex.astream(state):
+            on_token(chunk)
+        return state
     
-    async def process_message(
+    def _config(self, thread_id: str, **configurable: Any) -> RunnableConfig:
+        """Graph config for a conversation thread."""
+        return {"configurable": {"thread_id": thread_id, **configurable}}
+    
+    async def _build_initial_state(
         self,
         user_id: str,
         organization_id: str,
         conversation_id: str,
         message: str,
-    ) -> Dict[str, Any]:
+        history: Optional[List[BaseMessage]] = None,
+    ) -> AgentState:
         """
-        Process a user message through the agent graph.
+        Build the graph input, enriched with similar past interactions.
         
         Args:
             user_id: User ID
             organization_id: Organization ID
             conversation_id: Conversation ID
             message: User message
+            history: Earlier turns (e.g. from the context window manager)
             
         Returns:
-            Response dictionary with agent and response
+            Initial agent state
         """
-        logger.info(f"Processing message for user {user_id} in conversation {conversation_id}")
+        # Encode off the event loop; concurrent chats share one encode() call,
+        # and the cached embedding is reused when the interaction is stored
+        embedding = await embedding_service.aencode(message)
         
         # Retrieve similar past interactions from causal memory
-        similar_interactions = causal_memory.get_similar_interactions(
+        similar_interactions = await asyncio.to_thread(
+            causal_memory.get_similar_interactions,
             user_message=message,
-            limit=3
+            limit=3,
+            organization_id=organization_id,
+            embedding=embedding,
         )
         
         # Enrich message with context from memory
@@ -97,42 +133,51 @@ class AgentGraphV2:
                 context_from_memory += f"- {interaction['user_message']} → {interaction['agent_response'][:100]}...\n"
             enriched_message = f"{message}\n\n{context_from_memory}"
         
-        messages = [HumanMessage(content=enriched_message)]
+        messages = list(history or []) + [HumanMessage(content=enriched_message)]
         
-        initial_state: AgentState = {
+        # PERSISTED_STATE_KEYS are left out so values restored by the
+        # checkpointer survive into this turn
+        return {
             "messages": messages,
+            "user_message": message,
             "current_agent": "alex",
             "user_id": user_id,
             "organization_id": organization_id,
             "conversation_id": conversation_id,
-            "patient_id": None,
-            "appointment_id": None,
-            "invoice_id": None,
             "intent": None,
             "next_agent": None,
             "tool_results": {},
             "errors": [],
-            "rate_limit_counters": {},
             "requires_human": False,
             "escalation_level": None,
         }
+    
+    async def _finish(
+        self,
+        organization_id: str,
+        conversation_id: str,
+        message: str,
+        response_text: str,
+        final_state: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Classify the outcome, queue the causal memory write and build the result.
         
-        # Run graph
-        final_state = await self.graph.ainvoke(initial_state)
-        
-        # Extract response
-        last_message = final_state["messages"][-1]
-        response_text = last_message.content
-        
+        Args:
+            organization_id: Organization ID
+            conversation_id: Conversation ID
+            message: User message
+            response_text: Response with escalation tags removed
+            final_state: State after Alex ran
+            
+        Returns:
+            Response dictionary with agent and response
+        """
         # Get escalation level from state (set by Alex agent)
         escalation_level = final_state.get("escalation_level")
         
-        # Clean up escalation tags from response if present
-        for tag in ["[ESCALATE: EMERGENCY]", "[ESCALATE: DOCTOR_REQUIRED]", "[ESCALATE: ROUTINE]"]:
-            response_text = response_text.replace(tag, "").strip()
-        
-        # Determine intent from message content
-        intent = self._classify_intent(message)
+        # Intent found by Alex's keyword scan (classified here if Alex failed before it)
+        intent = final_state.get("intent") or self._classify_intent(message, organization_id)
         
         # Determine outcome
         outcome = "success"
@@ -149,7 +194,8 @@ class AgentGraphV2:
             "requires_human": final_state.get("requires_human", False),
         }
         
-        causal_memory.store_interaction(
+        # Written in the background so the reply isn't held up by Neo4j
+        await interaction_writer.submit(
             user_message=message,
             agent_response=response_text,
             agent_name="alex",
@@ -159,8 +205,6 @@ class AgentGraphV2:
             metadata=metadata
         )
         
-        logger.info(f"Response generated by Alex for user {user_id}")
-        
         return {
             "agent": "alex",
             "response": response_text,
@@ -170,26 +214,123 @@ class AgentGraphV2:
             "outcome": outcome,
         }
     
-    def _classify_intent(self, message: str) -> str:
+    async def process_message(
+        self,
+        user_id: str,
+        organization_id: str,
+        conversation_id: str,
+        message: str,
+        history: Optional[List[BaseMessage]] = None,
+        thread_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Process a user message through the agent graph.
+        
+        Args:
+            user_id: User ID
+            organization_id: Organization ID
+            conversation_id: Conversation ID
+            message: User message
+            history: Earlier turns of the conversation, oldest first
+            thread_id: Checkpoint thread (Conversation.langgraph_thread_id),
+                defaults to conversation_id
+            
+        Returns:
+            Response dictionary with agent and response
+        """
+        logger.info(f"Processing message for user {user_id} in conversation {conversation_id}")
+        
+        initial_state = await self._build_initial_state(user_id, organization_id, conversation_id, message, history)
+        
+        # Run graph
+        final_state = await self.graph.ainvoke(initial_state, self._config(thread_id or conversation_id))
+        
+        # Extract response
+        last_message = final_state["messages"][-1]
+        response_text = last_message.content
+        
+        # Clean up escalation tags from response if present
+        for tag in ["[ESCALATE: EMERGENCY]", "[ESCALATE: DOCTOR_REQUIRED]", "[ESCALATE: ROUTINE]"]:
+            response_text = response_text.replace(tag, "").strip()
+        
+        result = await self._finish(organization_id, conversation_id, message, response_text, final_state)
+        
+        logger.info(f"Response generated by Alex for user {user_id}")
+        
+        return result
+    
+    async def stream_message(
+        self,
+        user_id: str,
+        organization_id: str,
+        conversation_id: str,
+        message: str,
+        history: Optional[List[BaseMessage]] = None,
+        thread_id: Optional[str] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a user message, yielding Alex's response as it is generated.
+        
+        Runs the same graph as process_message; the Alex node forwards
+        tokens through an on_token callback in the config.
+        
+        Args:
+            user_id: User ID
+            organization_id: Organization ID
+            conversation_id: Conversation ID
+            message: User message
+            history: Earlier turns of the conversation, oldest first
+            thread_id: Checkpoint thread (Conversation.langgraph_thread_id),
+                defaults to conversation_id
+            
+        Yields:
+            {"type": "token", "content": ...} events with escalation tags
+            removed, then one {"type": "done", ...} event with the
+            process_message() result fields
+        """
+        logger.info(f"Streaming message for user {user_id} in conversation {conversation_id}")
+        
+        initial_state = await self._build_initial_state(user_id, organization_id, conversation_id, message, history)
+        tag_filter = EscalationTagFilter()
+        
+        tokens: asyncio.Queue = asyncio.Queue()
+        config = self._config(thread_id or conversation_id, on_token=tokens.put_nowait)
+        run = asyncio.create_task(self.graph.ainvoke(initial_state, config))
+        run.add_done_callback(lambda _: tokens.put_nowait(None))
+        
+        try:
+            while (chunk := await tokens.get()) is not None:
+                visible = tag_filter.feed(chunk)
+                if visible:
+                    yield {"type": "token", "content": visible}
+            
+            final_state = await run
+        finally:
+            # Client went away mid-stream
+            run.cancel()
+        
+        visible = tag_filter.flush()
+        if visible:
+            yield {"type": "token", "content": visible}
+        
+        result = await self._finish(organization_id, conversation_id, message, tag_filter.text, final_state)
+        
+        logger.info(f"Response streamed by Alex for user {user_id}")
+        
+        yield {"type": "done", **result}
+    
+    def _classify_intent(self, message: str, organization_id: Optional[str] = None) -> str:
         """
         Classify user intent from message.
         
         Args:
             message: User message
+            organization_id: Organization whose keywords apply
             
         Returns:
             Intent classification
         """
-        message_lower = message.lower()
-        
-        if any(word in message_lower for word in ["pain", "hurt", "ache", "swelling", "bleeding", "כאב"]):
-            return "medical_question"
-        elif any(word in message_lower for word in ["invoice", "bill", "payment", "cost", "price", "חשבונית"]):
-            return "billing_inquiry"
-        elif any(word in message_lower for word in ["appointment", "schedule", "book", "available", "תור"]):
-            return "appointment_scheduling"
-        else:
-            return "general_inquiry"
+        return keyword_engine.scan(message, organization_id).intent
 
 
 # Create singleton instance
@@ -5,45 +5,51 @@ Alex is the single point of contact for patients, with access to all
 clinic systems and expertise, while maintaining strict medical safety boundaries.
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+import re
+from typing import AbstractSet, Dict, Any, AsyncIterator, List, Optional
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, AIMessage, SystemMessage
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 
 from app.core.config import settings
 from app.agents.error_handler import (
     handle_agent_errors,
+    record_agent_error,
     retry_handler,
-    rate_limiter,
     RateLimitError,
 )
+from app.agents.keywords import DEFAULT_KEYWORDS, keyword_engine
+from app.agents.response_cache import response_cache
+from app.core.rate_limiter import RateLimitResult, estimate_tokens, rate_limiter
 from app.agents.tools.agent_tools import (
+    aget_patient_invoices_tool,
+    aidentify_patient,
     get_available_slots_tool,
     create_appointment_tool,
     get_patient_invoices_tool,
     get_invoice_details_tool,
+    identify_patient,
     search_patient_tool,
 )
+from app.integrations.patient_index import normalize_phone
 
 logger = logging.getLogger(__name__)
 
+# Phone-number-like runs in a message ("052-148-1915", "+972 52 148 1915")
+_PHONE = re.compile(r"\+?\d[\d\s-]{7,17}\d")
+
 
 class AlexAgent:
     """Alex - Unified AI Dental Assistant with medical safety boundaries."""
     
     # Medical escalation keywords - CRITICAL FOR LIABILITY PROTECTION
-    EMERGENCY_KEYWORDS = [
-        "severe pain", "can't breathe", "facial swelling", "high fever",
-        "severe bleeding", "trauma", "injury", "accident", "emergency",
-        "חירום", "דימום חזק", "נפיחות בפנים", "חום גבוה"
-    ]
+    # (matched by the keyword engine, see app/agents/keywords.py)
+    EMERGENCY_KEYWORDS = DEFAULT_KEYWORDS["escalation"]["EMERGENCY"]
+    DOCTOR_REQUIRED_KEYWORDS = DEFAULT_KEYWORDS["escalation"]["DOCTOR_REQUIRED"]
     
-    DOCTOR_REQUIRED_KEYWORDS = [
-        "diagnose", "diagnosis", "prescription", "medication", "drug",
-        "antibiotic", "painkiller", "treatment plan", "medical advice",
-        "should i take", "what medication", "is this normal",
-        "אבחנה", "תרופה", "מרשם", "תרופות", "אנטיביוטיקה"
-    ]
+    # Tool result for patient-specific requests before the patient is known
+    PATIENT_NOT_IDENTIFIED = "Patient not identified yet - ask for the phone number on file first."
     
     SYSTEM_PROMPT = """You are Alex, a friendly and professional AI assistant at a dental clinic.
 
@@ -412,42 +418,371 @@ makes sure patients get the right help at the right time! 😊
         """
         Process user message with medical safety checks.
         
+        Blocking variant; the agent graph uses aprocess().
+        
+        Args:
+            state: Current agent state
+            
+        Returns:
+            Updated state with Alex's response
+        """
+        user_id = state.get("user_id", "unknown")
+        self._check_rate_limit(state, user_id)
+        
+        messages = state.get("messages", [])
+        # As written; messages[-1] may carry memory context about other patients
+        user_message = state.get("user_message") or (messages[-1].content if messages else "")
+        
+        # CRITICAL: Check for medical escalation needs
+        keywords = keyword_engine.scan(user_message, state.get("organization_id"))
+        escalation_level = keywords.escalation_level
+        state["intent"] = keywords.intent
+        
+        tool_results = self._run_tools(keywords.tool_triggers, user_id, state, user_message)
+        conversation = self._build_conversation(messages, tool_results, escalation_level)
+        
+        cacheable = self._cacheable(escalation_level)
+        if cacheable:
+            cached = response_cache.lookup(
+                user_message, state.get("organization_id"), tool_results, self._history(messages)
+            )
+            if cached is not None:
+                return self._answer_from_cache(state, messages, conversation, cached)
+        
+        # Generate response with retry logic
+        logger.info(f"Alex processing message for user {user_id} (escalation: {escalation_level or 'none'})")
+        response = retry_handler.execute(self.llm.invoke, conversation)
+        rate_limiter.charge_tokens(state.get("organization_id"), self._llm_tokens(conversation, response.content))
+        
+        if cacheable and self._safe_to_cache(response.content):
+            response_cache.store(
+                user_message, state.get("organization_id"), tool_results, response.content, self._history(messages)
+            )
+        
+        return self._update_state(state, messages, response, escalation_level)
+    
+    @handle_agent_errors
+    async def aprocess(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Process user message with medical safety checks, without blocking the event loop.
+        
+        Tool calls run in a worker thread, the LLM call uses ainvoke() and
+        retries back off with asyncio.sleep.
+        
         Args:
             state: Current agent state
             
         Returns:
             Updated state with Alex's response
         """
-        # Check rate limit
         user_id = state.get("user_id", "unknown")
-        if not rate_limiter.check_rate_limit(state, user_id):
-            retry_after = rate_limiter.get_retry_after(state, user_id)
-            raise RateLimitError(f"Rate limit exceeded. Try again in {retry_after:.1f} seconds.")
+        await self._acheck_rate_limit(state, user_id)
         
         messages = state.get("messages", [])
-        last_message = messages[-1].content if messages else ""
+        # As written; messages[-1] may carry memory context about other patients
+        user_message = state.get("user_message") or (messages[-1].content if messages else "")
         
         # CRITICAL: Check for medical escalation needs
-        escalation_level = self._check_escalation(last_message)
+        keywords = keyword_engine.scan(user_message, state.get("organization_id"))
+        escalation_level = keywords.escalation_level
+        state["intent"] = keywords.intent
+        
+        tool_results = await self._arun_tools(keywords.tool_triggers, user_id, state, user_message)
+        conversation = self._build_conversation(messages, tool_results, escalation_level)
+        
+        cacheable = self._cacheable(escalation_level)
+        if cacheable:
+            cached = await response_cache.alookup(
+                user_message, state.get("organization_id"), tool_results, self._history(messages)
+            )
+            if cached is not None:
+                return self._answer_from_cache(state, messages, conversation, cached)
+        
+        # Generate response with retry logic
+        logger.info(f"Alex processing message for user {user_id} (escalation: {escalation_level or 'none'})")
+        response = await retry_handler.aexecute(self.llm.ainvoke, conversation)
+        await rate_limiter.acharge_tokens(
+            state.get("organization_id"), self._llm_tokens(conversation, response.content)
+        )
+        
+        if cacheable and self._safe_to_cache(response.content):
+            await response_cache.astore(
+                user_message, state.get("organization_id"), tool_results, response.content, self._history(messages)
+            )
+        
+        return self._update_state(state, messages, response, escalation_level)
+    
+    async def astream(self, state: Dict[str, Any]) -> AsyncIterator[str]:
+        """
+        Process user message like aprocess(), yielding the response as it is generated.
+        
+        Escalation tags are part of the yielded text; callers filter them
+        (see EscalationTagFilter). When the stream ends, the state has been
+        updated exactly as aprocess() would.
+        
+        Args:
+            state: Current agent state
+            
+        Yields:
+            Response text chunks
+        """
+        user_id = state.get("user_id", "unknown")
+        chunks: List[str] = []
+        
+        try:
+            await self._acheck_rate_limit(state, user_id)
+            
+            messages = state.get("messages", [])
+            # As written; messages[-1] may carry memory context about other patients
+            user_message = state.get("user_message") or (messages[-1].content if messages else "")
+            
+            # CRITICAL: Check for medical escalation needs
+            keywords = keyword_engine.scan(user_message, state.get("organization_id"))
+            escalation_level = keywords.escalation_level
+            state["intent"] = keywords.intent
+            
+            tool_results = await self._arun_tools(keywords.tool_triggers, user_id, state, user_message)
+            conversation = self._build_conversation(messages, tool_results, escalation_level)
+            
+            cacheable = self._cacheable(escalation_level)
+            cached = None
+            if cacheable:
+                cached = await response_cache.alookup(
+                    user_message, state.get("organization_id"), tool_results, self._history(messages)
+                )
+            
+            if cached is not None:
+                yield cached
+            else:
+                logger.info(f"Alex streaming response for user {user_id} (escalation: {escalation_level or 'none'})")
+                async for chunk in retry_handler.astream(self.llm.astream, conversation):
+                    if chunk.content:
+                        chunks.append(chunk.content)
+                        yield chunk.content
+        except Exception as e:
+            record_agent_error(state, e)
+            apology = state["messages"][-1].content
+            yield f"\n\n{apology}" if chunks else apology
+            return
+        
+        if cached is not None:
+            self._answer_from_cache(state, messages, conversation, cached)
+            return
+        
+        response_text = "".join(chunks)
+        await rate_limiter.acharge_tokens(
+            state.get("organization_id"), self._llm_tokens(conversation, response_text)
+        )
+        if cacheable and self._safe_to_cache(response_text):
+            await response_cache.astore(
+                user_message, state.get("organization_id"), tool_results, response_text, self._history(messages)
+            )
+        self._update_state(state, messages, AIMessage(content=response_text), escalation_level)
+    
+    def _check_rate_limit(self, state: Dict[str, Any], user_id: str):
+        """Raise RateLimitError if the user, organization or global limit is exceeded."""
+        self._raise_if_limited(rate_limiter.check(user_id, state.get("organization_id")))
+    
+    async def _acheck_rate_limit(self, state: Dict[str, Any], user_id: str):
+        """Async variant of _check_rate_limit()."""
+        self._raise_if_limited(await rate_limiter.acheck(user_id, state.get("organization_id")))
+    
+    @staticmethod
+    def _raise_if_limited(result: RateLimitResult):
+        if not result.allowed:
+            raise RateLimitError(
+                f"Rate limit exceeded ({result.limited_by}). Try again in {result.retry_after:.1f} seconds."
+            )
+    
+    @staticmethod
+    def _cacheable(escalation_level: Optional[str]) -> bool:
+        """Only messages without an escalation may be answered from (or stored in) the response cache."""
+        if not response_cache.enabled:
+            return False
+        if escalation_level:
+            response_cache.record_bypass()
+            return False
+        return True
+    
+    @staticmethod
+    def _history(messages: List[BaseMessage]) -> List[str]:
+        """
+        Conversation before this turn (summary included), part of the response cache key.
         
-        # Check if user is asking about specific topics that need tools
+        A follow-up like "yes" means something else in every conversation,
+        so its answer is only reused after the exact same turns.
+        """
+        return [f"{message.type}: {message.content}" for message in messages[:-1]]
+    
+    @staticmethod
+    def _safe_to_cache(response_text: str) -> bool:
+        """Responses in which the LLM asked for escalation are never reused."""
+        return "[ESCALATE" not in response_text
+    
+    def _answer_from_cache(
+        self,
+        state: Dict[str, Any],
+        messages: List[BaseMessage],
+        conversation: List[BaseMessage],
+        cached: str,
+    ) -> Dict[str, Any]:
+        """Update the state with a cached response instead of an LLM call."""
+        logger.info(f"Alex answered user {state.get('user_id', 'unknown')} from the response cache")
+        response_cache.record_saved_tokens(self._llm_tokens(conversation, cached))
+        return self._update_state(state, messages, AIMessage(content=cached), None)
+    
+    @staticmethod
+    def _llm_tokens(conversation: List[BaseMessage], response_text: str) -> int:
+        """Estimated LLM tokens of one call, charged to the spend limits."""
+        return estimate_tokens([message.content for message in conversation] + [response_text])
+    
+    def _identify_patient(self, state: Dict[str, Any], user_message: str) -> Optional[str]:
+        """
+        Look up the patient whose phone number the message gives (blocking).
+        
+        The patient ID is kept in the state, which the checkpointer
+        persists, so later turns of the conversation know who is asking.
+        
+        Args:
+            state: Current agent state (patient_id is set on a match)
+            user_message: Message as the user wrote it
+            
+        Returns:
+            Tool result announcing the identified patient, or None
+        """
+        for candidate in _PHONE.findall(user_message):
+            if normalize_phone(candidate) is None:
+                continue
+            patient = identify_patient(candidate)
+            if patient:
+                return self._patient_identified(state, patient)
+        return None
+    
+    async def _aidentify_patient(self, state: Dict[str, Any], user_message: str) -> Optional[str]:
+        """Async variant of _identify_patient(), using the organization's own Odoo database if it has one."""
+        for candidate in _PHONE.findall(user_message):
+            if normalize_phone(candidate) is None:
+                continue
+            patient = await aidentify_patient(candidate, state.get("organization_id"))
+            if patient:
+                return self._patient_identified(state, patient)
+        return None
+    
+    @staticmethod
+    def _patient_identified(state: Dict[str, Any], patient: Dict[str, Any]) -> str:
+        state["patient_id"] = str(patient["id"])
+        logger.info(f"Alex identified patient {patient['id']} for user {state.get('user_id', 'unknown')}")
+        return f"🪪 *Patient identified:* {patient['name']}"
+    
+    def _run_tools(
+        self,
+        tool_triggers: AbstractSet[str],
+        user_id: str,
+        state: Dict[str, Any],
+        user_message: str,
+    ) -> List[str]:
+        """
+        Call the tools the message asks for (blocking).
+        
+        Args:
+            tool_triggers: Tool triggers found by the keyword engine
+            user_id: User ID
+            state: Current agent state (patient_id is read and may be set)
+            user_message: Message as the user wrote it
+            
+        Returns:
+            Tool results to add to the conversation
+        """
         tool_results = []
         
+        identified = self._identify_patient(state, user_message)
+        if identified:
+            tool_results.append(identified)
+        
         # Scheduling inquiry
-        if any(word in last_message.lower() for word in ["available", "availability", "when", "schedule", "book", "appointment", "פנוי", "תור"]):
+        if "scheduling" in tool_triggers:
             logger.info(f"Alex detected scheduling inquiry for user {user_id}")
             slots_result = get_available_slots_tool(days_ahead=7)
             tool_results.append(f"📅 *Checking calendar...*\n\n{slots_result}")
         
         # Billing inquiry
-        if any(word in last_message.lower() for word in ["invoice", "bill", "payment", "owe", "balance", "חשבונית", "תשלום"]):
+        if "billing" in tool_triggers:
+            logger.info(f"Alex detected billing inquiry for user {user_id}")
+            if "own_invoices" in tool_triggers:
+                patient_id = state.get("patient_id")
+                if patient_id:
+                    invoice_result = get_patient_invoices_tool(patient_id=int(patient_id))
+                else:
+                    invoice_result = self.PATIENT_NOT_IDENTIFIED
+                tool_results.append(f"💰 *Checking your account...*\n\n{invoice_result}")
+        
+        return tool_results
+    
+    async def _arun_tools(
+        self,
+        tool_triggers: AbstractSet[str],
+        user_id: str,
+        state: Dict[str, Any],
+        user_message: str,
+    ) -> List[str]:
+        """
+        Call the tools the message asks for, without blocking the event loop.
+        
+        Patient lookups go to the organization's own Odoo database when it
+        has one (resolved through the Odoo client registry); everything
+        else runs in a worker thread like _run_tools().
+        
+        Args:
+            tool_triggers: Tool triggers found by the keyword engine
+            user_id: User ID
+            state: Current agent state (patient_id is read and may be set)
+            user_message: Message as the user wrote it
+            
+        Returns:
+            Tool results to add to the conversation
+        """
+        tool_results = []
+        
+        identified = await self._aidentify_patient(state, user_message)
+        if identified:
+            tool_results.append(identified)
+        
+        # Scheduling inquiry
+        if "scheduling" in tool_triggers:
+            logger.info(f"Alex detected scheduling inquiry for user {user_id}")
+            slots_result = await asyncio.to_thread(get_available_slots_tool, 7)
+            tool_results.append(f"📅 *Checking calendar...*\n\n{slots_result}")
+        
+        # Billing inquiry
+        if "billing" in tool_triggers:
             logger.info(f"Alex detected billing inquiry for user {user_id}")
-            if "my invoice" in last_message.lower() or "my bill" in last_message.lower():
-                # Demo patient for testing
-                invoice_result = get_patient_invoices_tool("John Doe")
+            if "own_invoices" in tool_triggers:
+                patient_id = state.get("patient_id")
+                if patient_id:
+                    invoice_result = await aget_patient_invoices_tool(int(patient_id), state.get("organization_id"))
+                else:
+                    invoice_result = self.PATIENT_NOT_IDENTIFIED
                 tool_results.append(f"💰 *Checking your account...*\n\n{invoice_result}")
         
-        # Build conversation
+        return tool_results
+    
+    def _build_conversation(
+        self,
+        messages: List[BaseMessage],
+        tool_results: List[str],
+        escalation_level: Optional[str],
+    ) -> List[BaseMessage]:
+        """
+        Build the LLM prompt: system prompt, tool results, escalation instruction, history.
+        
+        Args:
+            messages: Conversation messages
+            tool_results: Results from _run_tools()
+            escalation_level: Escalation level or None
+            
+        Returns:
+            Messages to send to the LLM
+        """
         conversation = [SystemMessage(content=self.SYSTEM_PROMPT)]
         
         # Add tool results if available
@@ -466,16 +801,21 @@ Include [ESCALATE: {escalation_level}] at the end of your response.
             conversation.append(escalation_instruction)
         
         conversation.extend(messages)
-        
-        # Generate response with retry logic
-        logger.info(f"Alex processing message for user {user_id} (escalation: {escalation_level or 'none'})")
-        response = retry_handler.execute(self.llm.invoke, conversation)
-        
+        return conversation
+    
+    def _update_state(
+        self,
+        state: Dict[str, Any],
+        messages: List[BaseMessage],
+        response: BaseMessage,
+        escalation_level: Optional[str],
+    ) -> Dict[str, Any]:
+        """Add Alex's response to the state and flag escalations."""
         # Check if escalation tag is present
         requires_human = "[ESCALATE:" in response.content
         
         if requires_human:
-            logger.warning(f"Alex escalating to doctor for user {user_id}: {escalation_level}")
+            logger.warning(f"Alex escalating to doctor for user {state.get('user_id', 'unknown')}: {escalation_level}")
         
         # Update state
         state["messages"] = messages + [response]
@@ -485,38 +825,15 @@ Include [ESCALATE: {escalation_level}] at the end of your response.
         
         return state
     
-    def _check_escalation(self, message: str) -> Optional[str]:
+    def _check_escalation(self, message: str, organization_id: Optional[str] = None) -> Optional[str]:
         """
         Check if message requires medical escalation.
         
         Args:
             message: User message
+            organization_id: Organization whose keywords apply
             
         Returns:
             Escalation level or None
         """
-        message_lower = message.lower()
-        
-        # Check for emergency keywords
-        for keyword in self.EMERGENCY_KEYWORDS:
-            if keyword in message_lower:
-                return "EMERGENCY"
-        
-        # Check for doctor-required keywords
-        for keyword in self.DOCTOR_REQUIRED_KEYWORDS:
-            if keyword in message_lower:
-                return "DOCTOR_REQUIRED"
-        
-        # Check for pain level
-        if "pain" in message_lower:
-            # Try to extract pain level (1-10)
-            import re
-            pain_match = re.search(r'(\d+)\s*/\s*10|pain.*?(\d+)', message_lower)
-            if pain_match:
-                pain_level = int(pain_match.group(1) or pain_match.group(2))
-                if pain_level >= 8:
-                    return "EMERGENCY"
-                elif pain_level >= 5:
-                    return "DOCTOR_REQUIRED"
-        
-        return None
+        return keyword_engine.scan(message, organization_id).escalation_level
@@ -0,0 +1,194 @@
+"""
+Postgres Checkpointer for the Agent Graph
+
+Persists LangGraph state per conversation thread (Conversation.langgraph_thread_id):
+- Each put() stores a delta: only the channels whose version changed
+- Every keyframe_interval checkpoints a keyframe with all channel values
+  is written and the rows before it are deleted (compaction)
+- get() loads the latest keyframe and its deltas in one indexed query,
+  so resuming a long conversation never replays it
+- Only the state channels listed in `channels` are persisted (all if None).
+  AgentGraphV2 leaves out "messages": message history lives in the
+  messages table and is fed in per turn by the context window manager,
+  and LangGraph's per-run internal channels need not survive the run
+"""
+
+import logging
+from collections import defaultdict
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from langchain_core.load import dumpd, load
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.utils import ConfigurableFieldSpec
+from langgraph.checkpoint.base import BaseCheckpointSaver, Checkpoint
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.agents.graph_state import PERSISTED_STATE_KEYS
+from app.core.database import SessionLocal
+from app.models.checkpoint import GraphCheckpoint
+
+
+logger = logging.getLogger(__name__)
+
+
+def _seen_dict():
+    return defaultdict(int)
+
+
+class PostgresCheckpointSaver(BaseCheckpointSaver):
+    """LangGraph checkpoint saver storing keyframes + deltas in graph_checkpoints."""
+
+    session_factory: Callable[[], Session]
+    keyframe_interval: int = 20
+    channels: Optional[Tuple[str, ...]] = None  # Channels whose values are persisted (None = all)
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    @property
+    def config_specs(self) -> list[ConfigurableFieldSpec]:
+        return [
+            ConfigurableFieldSpec(
+                id="thread_id",
+                annotation=str,
+                name="Thread ID",
+                description=None,
+                default="",
+                is_shared=True,
+            ),
+        ]
+
+    @staticmethod
+    def _thread_id(config: RunnableConfig) -> str:
+        return config["configurable"]["thread_id"]
+
+    @staticmethod
+    def _latest_rows_query(thread_id: str):
+        """Latest keyframe and every delta after it, oldest first (one statement)."""
+        last_keyframe = (
+            select(func.max(GraphCheckpoint.seq))
+            .where(GraphCheckpoint.thread_id == thread_id, GraphCheckpoint.is_keyframe.is_(True))
+            .scalar_subquery()
+        )
+        return (
+            select(GraphCheckpoint)
+            .where(GraphCheckpoint.thread_id == thread_id, GraphCheckpoint.seq >= last_keyframe)
+            .order_by(GraphCheckpoint.seq)
+        )
+
+    def get(self, config: RunnableConfig) -> Optional[Checkpoint]:
+        """
+        Load the latest checkpoint of a thread.
+
+        Args:
+            config: Runnable config with configurable.thread_id
+
+        Returns:
+            Checkpoint, or None for a new thread (or if loading fails)
+        """
+        thread_id = self._thread_id(config)
+        try:
+            with self.session_factory() as db:
+                rows = db.execute(self._latest_rows_query(thread_id)).scalars().all()
+        except Exception as e:
+            logger.error(f"Failed to load checkpoint for thread {thread_id}: {e}")
+            return None
+
+        if not rows:
+            return None
+
+        channel_values: Dict[str, Any] = {}
+        for row in rows:
+            channel_values.update(row.channel_values)
+        latest = rows[-1]
+
+        versions_seen = defaultdict(_seen_dict)
+        for node, seen in latest.versions_seen.items():
+            versions_seen[node].update(seen)
+
+        return Checkpoint(
+            v=1,
+            ts=latest.ts,
+            channel_values=load(channel_values),
+            channel_versions=defaultdict(int, latest.channel_versions),
+            versions_seen=versions_seen,
+        )
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint) -> None:
+        """
+        Store a checkpoint as a delta (or keyframe) and compact old rows.
+
+        Args:
+            config: Runnable config with configurable.thread_id
+            checkpoint: Checkpoint to store
+        """
+        thread_id = self._thread_id(config)
+        try:
+            self._put(thread_id, checkpoint)
+        except IntegrityError:
+            # Concurrent put on the same thread took our seq, retry on top of it
+            try:
+                self._put(thread_id, checkpoint)
+            except Exception as e:
+                logger.error(f"Failed to store checkpoint for thread {thread_id}: {e}")
+        except Exception as e:
+            logger.error(f"Failed to store checkpoint for thread {thread_id}: {e}")
+
+    def _put(self, thread_id: str, checkpoint: Checkpoint):
+        channel_values = {
+            channel: value
+            for channel, value in checkpoint["channel_values"].items()
+            if self.channels is None or channel in self.channels
+        }
+        # Versions of all channels are kept so restored graphs schedule correctly
+        channel_versions = dict(checkpoint["channel_versions"])
+
+        with self.session_factory() as db:
+            previous = db.execute(
+                select(GraphCheckpoint)
+                .where(GraphCheckpoint.thread_id == thread_id)
+                .order_by(GraphCheckpoint.seq.desc())
+                .limit(1)
+            ).scalar_one_or_none()
+
+            if previous is None:
+                seq, is_keyframe = 0, True
+            else:
+                seq = previous.seq + 1
+                is_keyframe = seq % self.keyframe_interval == 0
+
+            if not is_keyframe:
+                # Only channels whose version moved since the previous checkpoint
+                channel_values = {
+                    channel: value
+                    for channel, value in channel_values.items()
+                    if previous.channel_versions.get(channel) != channel_versions.get(channel)
+                }
+
+            db.add(GraphCheckpoint(
+                thread_id=thread_id,
+                seq=seq,
+                is_keyframe=is_keyframe,
+                channel_values=dumpd(channel_values),
+                channel_versions=channel_versions,
+                versions_seen={node: dict(seen) for node, seen in checkpoint["versions_seen"].items()},
+                ts=checkpoint["ts"],
+            ))
+
+            if is_keyframe and seq > 0:
+                # Compaction: the new keyframe supersedes everything before it
+                db.execute(
+                    delete(GraphCheckpoint)
+                    .where(GraphCheckpoint.thread_id == thread_id, GraphCheckpoint.seq < seq)
+                )
+
+            db.commit()
+
+
+# Global checkpointer for the agent graph
+graph_checkpointer = PostgresCheckpointSaver(
+    session_factory=SessionLocal,
+    channels=PERSISTED_STATE_KEYS,
+)
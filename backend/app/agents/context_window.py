@@ -0,0 +1,356 @@
+"""
+Conversation Context Window
+
+Gives Alex the earlier turns of a conversation within a fixed token budget:
+- Recent Message rows are loaded and the newest ones that fit the budget
+  are sent verbatim
+- Older turns are folded into a rolling summary (Conversation.summary).
+  The summary is updated incrementally - previous summary + the turns that
+  aged out since - every N turns, never recomputed from the full history
+- Summary bookkeeping lives under "context_window" in Conversation.langgraph_state
+- Tokens saved versus sending the full history are logged and exported
+  to Prometheus for every request
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from prometheus_client import Counter, Histogram
+from sqlalchemy.orm import Session
+
+from app.models.conversation import Conversation
+from app.models.message import Message, MessageRole
+
+
+logger = logging.getLogger(__name__)
+
+
+CONTEXT_TOKENS = Histogram(
+    "conversation_context_tokens",
+    "History tokens (summary + recent turns) sent to the LLM per request",
+    buckets=(0, 100, 250, 500, 1000, 2000, 4000, 8000),
+)
+TOKENS_SAVED = Counter(
+    "conversation_context_tokens_saved_total",
+    "History tokens left out of prompts by summarization and trimming",
+)
+SUMMARY_UPDATES = Counter(
+    "conversation_summary_updates_total",
+    "Rolling conversation summary updates",
+    ["result"],  # updated, failed
+)
+
+STATE_KEY = "context_window"
+
+
+@dataclass
+class ContextWindow:
+    """History to prepend to the current message, with token accounting."""
+
+    messages: List[BaseMessage]
+    history_tokens: int  # Tokens of the summary and turns actually sent
+    full_history_tokens: int  # Tokens the whole history would take verbatim
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.full_history_tokens - self.history_tokens, 0)
+
+
+class ConversationContextManager:
+    """Fits conversation history to a token budget using a rolling summary."""
+
+    SUMMARY_PROMPT = """You maintain a running summary of a conversation between a patient and Alex, \
+the AI assistant of a dental clinic.
+
+Update the summary with the new messages below. Keep facts that matter for the rest of the \
+conversation: who the patient is, their concerns and symptoms, appointments or invoices \
+discussed, escalations to the doctor, and open questions. Drop small talk. Write at most \
+150 words, in the language of the conversation.
+
+Current summary:
+{summary}
+
+New messages:
+{messages}
+
+Updated summary:"""
+
+    def __init__(
+        self,
+        llm: Any = None,
+        max_history_tokens: int = 2000,
+        keep_recent_messages: int = 8,
+        summarize_every_turns: int = 5,
+        max_loaded_messages: int = 100,
+        token_counter: Optional[Callable[[str], int]] = None,
+        model: str = "gpt-4.1-mini",
+    ):
+        """
+        Initialize context manager.
+
+        Args:
+            llm: Chat model used for summaries (created on first use if None)
+            max_history_tokens: Token budget for summary + recent turns
+            keep_recent_messages: Newest messages never folded into the summary
+            summarize_every_turns: Turns (user + assistant) that must age out
+                of the recent window before the summary is updated
+            max_loaded_messages: Upper bound on unsummarized rows loaded per request,
+                and on rows folded per summary LLM call
+            token_counter: Function counting tokens of a text (tiktoken by default)
+            model: Model whose tokenizer is used by the default token counter
+        """
+        self._llm = llm
+        self.max_history_tokens = max_history_tokens
+        self.keep_recent_messages = keep_recent_messages
+        self.summarize_every_turns = summarize_every_turns
+        self.max_loaded_messages = max_loaded_messages
+        self.model = model
+        self._token_counter = token_counter
+        self._updating: Set[str] = set()
+
+    @property
+    def llm(self):
+        """Chat model for summaries, created on first use."""
+        if self._llm is None:
+            from langchain_openai import ChatOpenAI
+            from app.core.config import settings
+
+            self._llm = ChatOpenAI(model=self.model, temperature=0, api_key=settings.OPENAI_API_KEY)
+        return self._llm
+
+    def count_tokens(self, text: str) -> int:
+        """Number of tokens in a text."""
+        if self._token_counter is None:
+            import tiktoken
+
+            try:
+                encoding = tiktoken.encoding_for_model(self.model)
+            except KeyError:
+                encoding = tiktoken.get_encoding("cl100k_base")
+            self._token_counter = lambda value: len(encoding.encode(value))
+        return self._token_counter(text)
+
+    # Loading
+
+    @staticmethod
+    def _summary_state(conversation: Conversation) -> Dict[str, Any]:
+        state = (conversation.langgraph_state or {}).get(STATE_KEY) or {}
+        return {
+            "summarized_until": state.get("summarized_until"),
+            "summarized_messages": state.get("summarized_messages", 0),
+            "summarized_tokens": state.get("summarized_tokens", 0),
+        }
+
+    def _unsummarized(self, db: Session, conversation: Conversation):
+        """Query for the messages newer than the summary."""
+        state = self._summary_state(conversation)
+        query = db.query(Message).filter(
+            Message.conversation_id == conversation.id,
+            Message.role != MessageRole.SYSTEM,
+        )
+        if state["summarized_until"]:
+            query = query.filter(Message.created_at > datetime.fromisoformat(state["summarized_until"]))
+        return query
+
+    def _load_unsummarized(self, db: Session, conversation: Conversation) -> List[Message]:
+        """Newest messages not in the summary, oldest first (at most max_loaded_messages)."""
+        newest = (
+            self._unsummarized(db, conversation)
+            .order_by(Message.created_at.desc())
+            .limit(self.max_loaded_messages)
+            .all()
+        )
+        return list(reversed(newest))
+
+    def _load_oldest_unsummarized(self, db: Session, conversation: Conversation) -> List[Message]:
+        """
+        Oldest messages not in the summary, oldest first.
+
+        Loads one page to fold plus the recent window, so when the whole
+        backlog fits the recent window is held back exactly; otherwise the
+        page is folded and the rest waits for the next one.
+        """
+        return (
+            self._unsummarized(db, conversation)
+            .order_by(Message.created_at.asc())
+            .limit(self.max_loaded_messages + self.keep_recent_messages)
+            .all()
+        )
+
+    # Fitting
+
+    @staticmethod
+    def _to_langchain(message: Message) -> BaseMessage:
+        if message.role == MessageRole.ASSISTANT:
+            return AIMessage(content=message.content)
+        return HumanMessage(content=message.content)
+
+    def fit(
+        self,
+        summary: Optional[str],
+        history: List[Message],
+        summarized_tokens: int = 0,
+    ) -> ContextWindow:
+        """
+        Select what fits the budget: the summary, then the newest turns.
+
+        Args:
+            summary: Rolling summary of the older turns
+            history: Unsummarized messages, oldest first
+            summarized_tokens: Tokens of the messages folded into the summary
+
+        Returns:
+            Context window (summary first, then turns oldest to newest)
+        """
+        budget = self.max_history_tokens
+        selected: List[BaseMessage] = []
+        used = 0
+
+        if summary:
+            summary_message = SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")
+            used = self.count_tokens(summary_message.content)
+
+        history_tokens = [self.count_tokens(message.content) for message in history]
+        for message, tokens in zip(reversed(history), reversed(history_tokens)):
+            if used + tokens > budget:
+                break
+            selected.append(self._to_langchain(message))
+            used += tokens
+        selected.reverse()
+
+        if summary:
+            selected.insert(0, summary_message)
+
+        return ContextWindow(
+            messages=selected,
+            history_tokens=used,
+            full_history_tokens=summarized_tokens + sum(history_tokens),
+        )
+
+    def build(self, db: Session, conversation: Conversation) -> ContextWindow:
+        """
+        Load the conversation history and fit it to the budget.
+
+        Call before the current user message is saved, so it is not part
+        of the history.
+
+        Args:
+            db: Database session
+            conversation: Conversation
+
+        Returns:
+            Context window
+        """
+        state = self._summary_state(conversation)
+        window = self.fit(
+            conversation.summary,
+            self._load_unsummarized(db, conversation),
+            state["summarized_tokens"],
+        )
+
+        CONTEXT_TOKENS.observe(window.history_tokens)
+        TOKENS_SAVED.inc(window.tokens_saved)
+        logger.info(
+            f"Context for conversation {conversation.id}: {window.history_tokens} history tokens, "
+            f"{window.tokens_saved} saved ({window.full_history_tokens} in full)"
+        )
+        return window
+
+    # Summarization
+
+    def _format_messages(self, messages: List[Message]) -> str:
+        return "\n".join(
+            f"{'Alex' if message.role == MessageRole.ASSISTANT else 'Patient'}: {message.content}"
+            for message in messages
+        )
+
+    def _messages_to_fold(self, history: List[Message]) -> List[Message]:
+        """The messages that aged out of the recent window, once there are enough of them."""
+        aged_out = history[:max(len(history) - self.keep_recent_messages, 0)]
+        if len(aged_out) < 2 * self.summarize_every_turns:
+            return []
+        return aged_out
+
+    async def aupdate_summary(self, conversation_id: Any, session_factory: Callable[[], Session]) -> bool:
+        """
+        Fold turns that aged out of the recent window into the rolling summary.
+
+        Does nothing until summarize_every_turns turns have aged out, so the
+        summary LLM call happens once every N turns. A backlog longer than
+        max_loaded_messages is folded oldest first, one page per call. Meant to run after the
+        response has been sent (e.g. as a FastAPI background task).
+
+        Args:
+            conversation_id: Conversation ID
+            session_factory: Creates a database session (e.g. SessionLocal)
+
+        Returns:
+            True if the summary was updated
+        """
+        key = str(conversation_id)
+        if key in self._updating:
+            return False
+        self._updating.add(key)
+
+        try:
+            def load():
+                with session_factory() as db:
+                    conversation = db.get(Conversation, conversation_id)
+                    if conversation is None:
+                        return None, [], {}
+                    history = self._load_oldest_unsummarized(db, conversation)
+                    state = self._summary_state(conversation)
+                    # Detach what we need before the session closes
+                    return conversation.summary, self._messages_to_fold(history), state
+
+            updated = False
+            # A long backlog is folded oldest first, one page per LLM call
+            while True:
+                summary, to_fold, state = await asyncio.to_thread(load)
+                if not to_fold:
+                    return updated
+
+                response = await self.llm.ainvoke(self.SUMMARY_PROMPT.format(
+                    summary=summary or "(none yet)",
+                    messages=self._format_messages(to_fold),
+                ))
+                new_state = {
+                    "summarized_until": to_fold[-1].created_at.isoformat(),
+                    "summarized_messages": state["summarized_messages"] + len(to_fold),
+                    "summarized_tokens": state["summarized_tokens"]
+                    + sum(self.count_tokens(message.content) for message in to_fold),
+                }
+
+                def save() -> bool:
+                    with session_factory() as db:
+                        conversation = db.get(Conversation, conversation_id)
+                        # Another worker may have folded the same turns meanwhile
+                        if conversation is None or self._summary_state(conversation) != state:
+                            return False
+                        conversation.summary = response.content.strip()
+                        conversation.langgraph_state = {
+                            **(conversation.langgraph_state or {}),
+                            STATE_KEY: new_state,
+                        }
+                        db.commit()
+                        return True
+
+                if not await asyncio.to_thread(save):
+                    return updated
+                updated = True
+                SUMMARY_UPDATES.labels(result="updated").inc()
+                logger.info(f"Folded {len(to_fold)} messages into the summary of conversation {key}")
+        except Exception as e:
+            SUMMARY_UPDATES.labels(result="failed").inc()
+            logger.error(f"Failed to update summary of conversation {key}: {e}", exc_info=True)
+            return False
+        finally:
+            self._updating.discard(key)
+
+
+# Global conversation context manager
+context_manager = ConversationContextManager()
@@ -5,9 +5,11 @@ This module provides error handling, retry logic, and rate limiting
 for the agent system as per Work Plan V14.1, Epic 2.
 """
 
+import asyncio
+import random
 import time
 import logging
-from typing import Dict, Any, Callable, Optional
+from typing import Dict, Any, AsyncIterator, Awaitable, Callable, Optional
 from functools import wraps
 from langchain_core.messages import AIMessage
 
@@ -30,7 +32,7 @@ class LLMError(AgentError):
 
 
 class RetryHandler:
-    """Handles retry logic with exponential backoff."""
+    """Handles retry logic with exponential backoff and jitter."""
     
     def __init__(
         self,
@@ -38,6 +40,7 @@ class RetryHandler:
         initial_delay: float = 1.0,
         max_delay: float = 10.0,
         exponential_base: float = 2.0,
+        jitter: float = 0.5,
     ):
         """
         Initialize retry handler.
@@ -47,11 +50,22 @@ class RetryHandler:
             initial_delay: Initial delay in seconds
             max_delay: Maximum delay in seconds
             exponential_base: Base for exponential backoff
+            jitter: Fraction of each delay that is randomized (0 = fixed delays),
+                so clients that failed together don't all retry together
         """
         self.max_retries = max_retries
         self.initial_delay = initial_delay
         self.max_delay = max_delay
         self.exponential_base = exponential_base
+        self.jitter = jitter
+    
+    def _get_delay(self, attempt: int) -> float:
+        """Backoff delay before retrying after the given (0-based) attempt."""
+        delay = min(
+            self.initial_delay * (self.exponential_base ** attempt),
+            self.max_delay
+        )
+        return delay * (1 - self.jitter * random.random())
     
     def execute(self, func: Callable, *args, **kwargs) -> Any:
         """
@@ -78,10 +92,7 @@ class RetryHandler:
                 
                 if attempt < self.max_retries - 1:
                     # Calculate delay with exponential backoff
-                    delay = min(
-                        self.initial_delay * (self.exponential_base ** attempt),
-                        self.max_delay
-                    )
+                    delay = self._get_delay(attempt)
                     
                     logger.warning(
                         f"Attempt {attempt + 1}/{self.max_retries} failed: {str(e)}. "
@@ -96,157 +107,167 @@ class RetryHandler:
         
         # All retries failed
         raise LLMError(f"Failed after {self.max_retries} attempts: {str(last_exception)}")
-
-
-class RateLimiter:
-    """Token bucket rate limiter."""
     
-    def __init__(
-        self,
-        tokens_per_minute: int = 60,
-        burst_size: int = 10,
-    ):
+    async def aexecute(self, func: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
         """
-        Initialize rate limiter.
+        Await coroutine function with retry logic.
         
-        Args:
-            tokens_per_minute: Number of tokens to add per minute
-            burst_size: Maximum burst size (bucket capacity)
-        """
-        self.tokens_per_minute = tokens_per_minute
-        self.burst_size = burst_size
-        self.refill_rate = tokens_per_minute / 60.0  # tokens per second
-    
-    def check_rate_limit(self, state: Dict[str, Any], user_id: str) -> bool:
-        """
-        Check if request is within rate limit.
+        Backoff uses asyncio.sleep, so other requests keep being served
+        while this one waits to retry.
         
         Args:
-            state: Agent state
-            user_id: User ID
+            func: Coroutine function to execute
+            *args: Positional arguments
+            **kwargs: Keyword arguments
             
         Returns:
-            True if within limit, False otherwise
+            Function result
+            
+        Raises:
+            LLMError: If all retries fail
         """
-        rate_limit_counters = state.get("rate_limit_counters", {})
-        
-        if user_id not in rate_limit_counters:
-            # Initialize counter
-            rate_limit_counters[user_id] = {
-                "tokens": self.burst_size,
-                "last_update": time.time(),
-            }
-            state["rate_limit_counters"] = rate_limit_counters
-            return True
-        
-        counter = rate_limit_counters[user_id]
-        current_time = time.time()
-        time_passed = current_time - counter["last_update"]
+        last_exception = None
         
-        # Refill tokens
-        tokens_to_add = time_passed * self.refill_rate
-        counter["tokens"] = min(
-            counter["tokens"] + tokens_to_add,
-            self.burst_size
-        )
-        counter["last_update"] = current_time
+        for attempt in range(self.max_retries):
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                last_exception = e
+                
+                if attempt < self.max_retries - 1:
+                    delay = self._get_delay(attempt)
+                    
+                    logger.warning(
+                        f"Attempt {attempt + 1}/{self.max_retries} failed: {str(e)}. "
+                        f"Retrying in {delay:.2f}s..."
+                    )
+                    
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(
+                        f"All {self.max_retries} attempts failed. Last error: {str(e)}"
+                    )
         
-        # Check if we have tokens
-        if counter["tokens"] >= 1.0:
-            counter["tokens"] -= 1.0
-            return True
-        else:
-            return False
+        # All retries failed
+        raise LLMError(f"Failed after {self.max_retries} attempts: {str(last_exception)}")
     
-    def get_retry_after(self, state: Dict[str, Any], user_id: str) -> float:
+    async def astream(self, func: Callable[..., AsyncIterator[Any]], *args, **kwargs) -> AsyncIterator[Any]:
         """
-        Get seconds until next token is available.
+        Iterate an async stream with retry logic.
+        
+        A failed attempt is retried only if it has not yielded anything yet;
+        once chunks have been forwarded the error is raised as LLMError.
         
         Args:
-            state: Agent state
-            user_id: User ID
+            func: Function returning an async iterator (e.g. llm.astream)
+            *args: Positional arguments
+            **kwargs: Keyword arguments
             
-        Returns:
-            Seconds until next token
+        Yields:
+            Stream chunks
+            
+        Raises:
+            LLMError: If all retries fail or the stream breaks mid-way
         """
-        rate_limit_counters = state.get("rate_limit_counters", {})
-        
-        if user_id not in rate_limit_counters:
-            return 0.0
+        last_exception = None
         
-        counter = rate_limit_counters[user_id]
-        tokens_needed = 1.0 - counter["tokens"]
+        for attempt in range(self.max_retries):
+            started = False
+            try:
+                async for chunk in func(*args, **kwargs):
+                    started = True
+                    yield chunk
+                return
+            except Exception as e:
+                if started:
+                    logger.error(f"Stream failed after partial output: {str(e)}")
+                    raise LLMError(f"Stream interrupted: {str(e)}") from e
+                
+                last_exception = e
+                
+                if attempt < self.max_retries - 1:
+                    delay = self._get_delay(attempt)
+                    
+                    logger.warning(
+                        f"Attempt {attempt + 1}/{self.max_retries} failed: {str(e)}. "
+                        f"Retrying in {delay:.2f}s..."
+                    )
+                    
+                    await asyncio.sleep(delay)
+                else:
+                    logger.error(
+                        f"All {self.max_retries} attempts failed. Last error: {str(e)}"
+                    )
         
-        if tokens_needed <= 0:
-            return 0.0
+        # All retries failed
+        raise LLMError(f"Failed after {self.max_retries} attempts: {str(last_exception)}")
+
+
+def record_agent_error(state: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+    """
+    Add an apology message and an error entry to the state.
+    
+    Args:
+        state: Agent state
+        error: Exception raised by the agent
         
-        return tokens_needed / self.refill_rate
+    Returns:
+        Updated state
+    """
+    if isinstance(error, RateLimitError):
+        # Rate limit exceeded
+        logger.warning(f"Rate limit exceeded: {str(error)}")
+        error_type = "rate_limit"
+        content = "I apologize, but you've reached the rate limit. Please try again in a moment."
+    elif isinstance(error, LLMError):
+        # LLM call failed after retries
+        logger.error(f"LLM error: {str(error)}")
+        error_type = "llm_error"
+        content = "I apologize, but I'm having trouble processing your request right now. Please try again later."
+    else:
+        # Unexpected error
+        logger.error(f"Unexpected error in agent: {str(error)}", exc_info=error)
+        error_type = "unexpected_error"
+        content = "I apologize, but an unexpected error occurred. Our team has been notified."
+    
+    state["messages"] = state.get("messages", []) + [AIMessage(content=content)]
+    state["errors"] = state.get("errors", []) + [{
+        "type": error_type,
+        "message": str(error),
+        "timestamp": time.time(),
+    }]
+    
+    return state
 
 
 def handle_agent_errors(func: Callable) -> Callable:
     """
     Decorator to handle agent errors gracefully.
     
+    Works for both sync and async (coroutine) process functions.
+    
     Args:
         func: Agent process function
         
     Returns:
         Wrapped function with error handling
     """
+    if asyncio.iscoroutinefunction(func):
+        @wraps(func)
+        async def async_wrapper(self, state: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                return await func(self, state)
+            except Exception as e:
+                return record_agent_error(state, e)
+        
+        return async_wrapper
+    
     @wraps(func)
     def wrapper(self, state: Dict[str, Any]) -> Dict[str, Any]:
         try:
             return func(self, state)
-        except RateLimitError as e:
-            # Rate limit exceeded
-            logger.warning(f"Rate limit exceeded: {str(e)}")
-            
-            error_message = AIMessage(
-                content="I apologize, but you've reached the rate limit. Please try again in a moment."
-            )
-            
-            state["messages"] = state.get("messages", []) + [error_message]
-            state["errors"] = state.get("errors", []) + [{
-                "type": "rate_limit",
-                "message": str(e),
-                "timestamp": time.time(),
-            }]
-            
-            return state
-            
-        except LLMError as e:
-            # LLM call failed after retries
-            logger.error(f"LLM error: {str(e)}")
-            
-            error_message = AIMessage(
-                content="I apologize, but I'm having trouble processing your request right now. Please try again later."
-            )
-            
-            state["messages"] = state.get("messages", []) + [error_message]
-            state["errors"] = state.get("errors", []) + [{
-                "type": "llm_error",
-                "message": str(e),
-                "timestamp": time.time(),
-            }]
-            
-            return state
-            
         except Exception as e:
-            # Unexpected error
-            logger.error(f"Unexpected error in agent: {str(e)}", exc_info=True)
-            
-            error_message = AIMessage(
-                content="I apologize, but an unexpected error occurred. Our team has been notified."
-            )
-            
-            state["messages"] = state.get("messages", []) + [error_message]
-            state["errors"] = state.get("errors", []) + [{
-                "type": "unexpected_error",
-                "message": str(e),
-                "timestamp": time.time(),
-            }]
-            
-            return state
+            return record_agent_error(state, e)
     
     return wrapper
 
@@ -257,10 +278,5 @@ retry_handler = RetryHandler(
     initial_delay=1.0,
     max_delay=10.0,
     exponential_base=2.0,
-)
-
-# Global rate limiter instance
-rate_limiter = RateLimiter(
-    tokens_per_minute=60,  # 60 requests per minute
-    burst_size=10,  # Allow bursts of 10 requests
+    jitter=0.5,
 )
@@ -19,6 +19,10 @@ class AgentState(TypedDict):
     # Conversation messages
     messages: Annotated[List[BaseMessage], add]
     
+    # This turn's message as the user wrote it (messages[-1] may carry
+    # memory context appended by the graph)
+    user_message: str
+    
     # Current agent handling the conversation
     current_agent: str
     
@@ -44,11 +48,16 @@ class AgentState(TypedDict):
     # Error tracking
     errors: List[Dict[str, Any]]
     
-    # Rate limiting counters
-    rate_limit_counters: Dict[str, int]
-    
     # Final response flag
     requires_human: bool
     
     # Escalation level for medical safety
     escalation_level: Optional[str]
+
+
+# State kept across turns by the checkpointer (per langgraph_thread_id).
+# Everything else is per-turn input; messages come from the context window.
+# Alex sets patient_id once the patient gives their phone number.
+PERSISTED_STATE_KEYS = (
+    "patient_id",
+)
@@ -0,0 +1,275 @@
+"""
+Keyword Engine
+
+One compiled multi-pattern matcher for all keyword rules on a user message:
+- Escalation level (EMERGENCY / DOCTOR_REQUIRED, plus the pain-level rule)
+- Intent (medical, billing, scheduling, general)
+- Tool triggers (calendar lookup, billing lookup, own invoices)
+- Causal memory patterns
+All keywords (Hebrew and English) are compiled into one Aho–Corasick
+automaton, so a message is lower-cased once and scanned once, however
+many keywords there are. Organizations can add their own keywords;
+their automaton is compiled once when configured.
+"""
+
+import json
+import logging
+import re
+import threading
+from collections import deque
+from dataclasses import dataclass, replace
+from typing import Dict, FrozenSet, List, Mapping, Optional, Sequence, Tuple
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# group -> label -> keywords. Labels are listed in priority order: the first
+# matching escalation level or intent wins. Keywords match anywhere in the
+# lower-cased message (substring semantics).
+DEFAULT_KEYWORDS: Dict[str, Dict[str, List[str]]] = {
+    # Medical escalation - CRITICAL FOR LIABILITY PROTECTION
+    "escalation": {
+        "EMERGENCY": [
+            "severe pain", "can't breathe", "facial swelling", "high fever",
+            "severe bleeding", "trauma", "injury", "accident", "emergency",
+            "חירום", "דימום חזק", "נפיחות בפנים", "חום גבוה",
+        ],
+        "DOCTOR_REQUIRED": [
+            "diagnose", "diagnosis", "prescription", "medication", "drug",
+            "antibiotic", "painkiller", "treatment plan", "medical advice",
+            "should i take", "what medication", "is this normal",
+            "אבחנה", "תרופה", "מרשם", "תרופות", "אנטיביוטיקה",
+        ],
+    },
+    "intent": {
+        "medical_question": ["pain", "hurt", "ache", "swelling", "bleeding", "כאב"],
+        "billing_inquiry": ["invoice", "bill", "payment", "cost", "price", "חשבונית"],
+        "appointment_scheduling": ["appointment", "schedule", "book", "available", "תור"],
+    },
+    "tool": {
+        "scheduling": [
+            "available", "availability", "when", "schedule", "book", "appointment", "פנוי", "תור",
+        ],
+        "billing": ["invoice", "bill", "payment", "owe", "balance", "חשבונית", "תשלום"],
+        "own_invoices": ["my invoice", "my bill"],
+    },
+    "pattern": {
+        "appointment_scheduling": ["appointment", "schedule", "book", "תור"],
+        "medical_question": ["pain", "hurt", "tooth", "dental", "כאב"],
+        "billing_inquiry": ["payment", "invoice", "bill", "cost", "תשלום"],
+    },
+    # Cheap pre-check before running the pain-level regex
+    "signal": {
+        "pain": ["pain"],
+    },
+}
+
+GROUPS = tuple(DEFAULT_KEYWORDS)
+
+PAIN_LEVEL = re.compile(r"(\d+)\s*/\s*10|pain.*?(\d+)")
+
+
+@dataclass(frozen=True)
+class KeywordMatch:
+    """Everything the keyword rules found in one message."""
+
+    escalation_level: Optional[str]
+    intent: str
+    tool_triggers: FrozenSet[str]
+    patterns: Tuple[str, ...]
+
+
+class KeywordMatcher:
+    """Aho–Corasick automaton over a keyword configuration."""
+
+    def __init__(self, keywords: Mapping[str, Mapping[str, Sequence[str]]]):
+        """
+        Compile the automaton.
+
+        Args:
+            keywords: group -> label -> keywords (see DEFAULT_KEYWORDS)
+        """
+        self.labels: Dict[str, Tuple[str, ...]] = {
+            group: tuple(keywords.get(group, {})) for group in GROUPS
+        }
+
+        # One bit per (group, label)
+        self._bits: Dict[Tuple[str, str], int] = {}
+        for group in GROUPS:
+            for label in self.labels[group]:
+                self._bits[(group, label)] = 1 << len(self._bits)
+
+        goto: List[Dict[str, int]] = [{}]
+        output: List[int] = [0]
+        for group in GROUPS:
+            for label, words in keywords.get(group, {}).items():
+                for word in words:
+                    state = 0
+                    for char in word.lower():
+                        if char not in goto[state]:
+                            goto.append({})
+                            output.append(0)
+                            goto[state][char] = len(goto) - 1
+                        state = goto[state][char]
+                    output[state] |= self._bits[(group, label)]
+
+        # Breadth-first: failure links, inherited outputs, and a full
+        # transition table so scanning never follows failure links.
+        # Transitions back to the root are left out (dict.get default).
+        fail = [0] * len(goto)
+        self._delta: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            output[state] |= output[fail[state]]
+            transitions = dict(self._delta[fail[state]])
+            for char, child in goto[state].items():
+                fail[child] = self._delta[fail[state]].get(char, 0)
+                transitions[char] = child
+                queue.append(child)
+            self._delta[state] = transitions
+        self._output = output
+
+        self._pain_bit = self._bits.get(("signal", "pain"), 0)
+        self._decoded: Dict[int, KeywordMatch] = {}
+
+    def match_bits(self, text: str) -> int:
+        """Bitmask of every (group, label) with a keyword in the text."""
+        delta, output = self._delta, self._output
+        state = 0
+        found = 0
+        for char in text.lower():
+            state = delta[state].get(char, 0)
+            found |= output[state]
+        return found
+
+    def _labels(self, found: int, group: str) -> List[str]:
+        return [label for label in self.labels[group] if found & self._bits[(group, label)]]
+
+    def _decode(self, found: int) -> KeywordMatch:
+        """Keyword rules applied to a match bitmask (before the pain-level rule)."""
+        escalations = self._labels(found, "escalation")
+        intents = self._labels(found, "intent")
+        return KeywordMatch(
+            escalation_level=escalations[0] if escalations else None,
+            intent=intents[0] if intents else "general_inquiry",
+            tool_triggers=frozenset(self._labels(found, "tool")),
+            patterns=tuple(self._labels(found, "pattern")),
+        )
+
+    def scan(self, text: str) -> KeywordMatch:
+        """
+        Apply every keyword rule to a message in one pass.
+
+        Args:
+            text: User message
+
+        Returns:
+            Escalation level, intent, tool triggers and patterns
+        """
+        found = self.match_bits(text)
+
+        # Few distinct keyword combinations occur, so decoded results are shared
+        match = self._decoded.get(found)
+        if match is None:
+            match = self._decode(found)
+            if len(self._decoded) < 4096:
+                self._decoded[found] = match
+
+        if match.escalation_level is None and found & self._pain_bit:
+            pain_level = _pain_escalation(text.lower())
+            if pain_level is not None:
+                match = replace(match, escalation_level=pain_level)
+        return match
+
+
+def _pain_escalation(message_lower: str) -> Optional[str]:
+    """Escalation for a reported pain level (1-10)."""
+    pain_match = PAIN_LEVEL.search(message_lower)
+    if pain_match:
+        pain_level = int(pain_match.group(1) or pain_match.group(2))
+        if pain_level >= 8:
+            return "EMERGENCY"
+        elif pain_level >= 5:
+            return "DOCTOR_REQUIRED"
+    return None
+
+
+def merge_keywords(
+    base: Mapping[str, Mapping[str, Sequence[str]]],
+    extra: Mapping[str, Mapping[str, Sequence[str]]],
+) -> Dict[str, Dict[str, List[str]]]:
+    """Keyword configuration with `extra` keywords added (new labels go last)."""
+    unknown = set(extra) - set(GROUPS)
+    if unknown:
+        raise ValueError(f"Unknown keyword groups: {sorted(unknown)}")
+
+    merged = {group: {label: list(words) for label, words in labels.items()} for group, labels in base.items()}
+    for group, labels in extra.items():
+        for label, words in labels.items():
+            merged.setdefault(group, {}).setdefault(label, []).extend(words)
+    return merged
+
+
+class KeywordEngine:
+    """Default matcher plus per-organization matchers with extra keywords."""
+
+    def __init__(self, keywords: Mapping[str, Mapping[str, Sequence[str]]] = DEFAULT_KEYWORDS):
+        """
+        Initialize engine.
+
+        Args:
+            keywords: Keyword configuration used by every organization
+        """
+        self.keywords = keywords
+        self.default = KeywordMatcher(keywords)
+        self._organizations: Dict[str, KeywordMatcher] = {}
+        self._lock = threading.Lock()
+
+    def configure_organization(
+        self,
+        organization_id: str,
+        extra_keywords: Mapping[str, Mapping[str, Sequence[str]]],
+    ):
+        """
+        Compile a matcher with an organization's own keywords added to the defaults.
+
+        Args:
+            organization_id: Organization ID
+            extra_keywords: group -> label -> keywords to add
+        """
+        matcher = KeywordMatcher(merge_keywords(self.keywords, extra_keywords))
+        with self._lock:
+            self._organizations[str(organization_id)] = matcher
+
+    def load_file(self, path: str):
+        """
+        Configure organizations from a JSON file: {organization_id: {group: {label: [keywords]}}}.
+
+        Args:
+            path: Path of the JSON file
+        """
+        with open(path, encoding="utf-8") as f:
+            config = json.load(f)
+        for organization_id, extra_keywords in config.items():
+            self.configure_organization(organization_id, extra_keywords)
+        logger.info(f"Loaded keyword overrides for {len(config)} organizations from {path}")
+
+    def matcher(self, organization_id: Optional[str] = None) -> KeywordMatcher:
+        """Matcher for an organization (the default one if it has no overrides)."""
+        if organization_id is None:
+            return self.default
+        return self._organizations.get(str(organization_id), self.default)
+
+    def scan(self, text: str, organization_id: Optional[str] = None) -> KeywordMatch:
+        """Apply every keyword rule of the organization to a message in one pass."""
+        return self.matcher(organization_id).scan(text)
+
+
+# Global keyword engine, compiled at import (start-up)
+keyword_engine = KeywordEngine()
+if settings.KEYWORD_OVERRIDES_FILE:
+    keyword_engine.load_file(settings.KEYWORD_OVERRIDES_FILE)
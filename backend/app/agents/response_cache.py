@@ -0,0 +1,322 @@
+"""
+Semantic Response Cache
+
+Answers repeated FAQ-style questions ("what are your hours?") without an LLM call:
+- Keyed on the message embedding, the organization, the tool results
+  the answer was generated from (a new calendar state is a different key)
+  and the conversation so far (history and summary), so a follow-up such
+  as "yes" is only answered from the cache in an identical conversation
+- A cached answer is reused only above a cosine similarity threshold
+  and within its TTL
+- One index partition per organization; the context key is kept on the
+  entry and the search is restricted to entries of the same context
+- Each organization keeps at most max_entries_per_org answers, and at
+  most max_organizations organizations are cached (LRU eviction of both)
+- Callers bypass the cache for medical escalations (see AlexAgent)
+- Prometheus counters for hits/misses/bypasses, tokens and cost saved
+"""
+
+import hashlib
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from prometheus_client import Counter
+
+from app.core.config import settings
+from app.memory.embeddings import embedding_service
+from app.memory.vector_index import VectorIndex
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_REQUESTS = Counter(
+    "response_cache_requests_total",
+    "Semantic response cache lookups",
+    ["result"],  # hit, miss, bypass
+)
+TOKENS_SAVED = Counter(
+    "response_cache_tokens_saved_total",
+    "Estimated LLM tokens not spent thanks to cache hits",
+)
+COST_SAVED = Counter(
+    "response_cache_cost_saved_usd_total",
+    "Estimated LLM cost not spent thanks to cache hits (USD)",
+)
+
+
+@dataclass
+class CachedResponse:
+    """A cached LLM answer."""
+
+    response: str
+    organization_id: str
+    context: str  # _context_key() of the tool results and conversation
+    created_at: float
+
+
+def _context_key(tool_results: Sequence[str], history: Sequence[str]) -> str:
+    """Stable key for the tool results and conversation an answer was generated from."""
+    digest = hashlib.blake2b(digest_size=8)
+    for result in tool_results:
+        digest.update(result.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(b"\1")
+    for turn in history:
+        digest.update(turn.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class SemanticResponseCache:
+    """Embedding-similarity cache of LLM responses, partitioned per organization."""
+
+    def __init__(
+        self,
+        embedder=embedding_service,
+        similarity_threshold: float = 0.92,
+        ttl_seconds: float = 3600,
+        max_entries_per_org: int = 1000,
+        max_organizations: int = 200,
+        cost_per_1k_tokens: float = 0.0,
+        enabled: bool = True,
+    ):
+        """
+        Initialize response cache.
+
+        Args:
+            embedder: Object with encode() and aencode() (EmbeddingService)
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Seconds a cached answer stays valid
+            max_entries_per_org: Cached answers kept per organization
+            max_organizations: Organizations with cached answers (each holds an index partition)
+            cost_per_1k_tokens: USD per 1k LLM tokens, for the cost-saved metric
+            enabled: Whether lookups and stores are performed
+        """
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_org = max_entries_per_org
+        self.max_organizations = max_organizations
+        self.cost_per_1k_tokens = cost_per_1k_tokens
+        self.enabled = enabled
+
+        self._index = VectorIndex(backend=settings.VECTOR_INDEX_BACKEND)
+        self._entries: Dict[str, CachedResponse] = {}
+        # LRU order of organizations, and of the entries of each organization
+        self._org_entries: "OrderedDict[str, OrderedDict[str, None]]" = OrderedDict()
+        self._context_entries: Dict[Tuple[str, str], Set[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0
+        self.tokens_saved = 0
+
+    # Lookup
+
+    def lookup(
+        self,
+        message: str,
+        organization_id: Optional[str],
+        tool_results: Sequence[str] = (),
+        history: Sequence[str] = (),
+    ) -> Optional[str]:
+        """
+        Find a cached answer to a similar question (blocking).
+
+        Args:
+            message: User message as written (without memory context)
+            organization_id: Organization ID
+            tool_results: Tool results the answer would be generated from
+            history: Earlier turns of the conversation, summary included
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        try:
+            embedding = self.embedder.encode(message)
+        except Exception as e:
+            logger.warning(f"Response cache lookup skipped, embedding failed: {e}")
+            return None
+        return self._lookup(embedding, organization_id, tool_results, history)
+
+    async def alookup(
+        self,
+        message: str,
+        organization_id: Optional[str],
+        tool_results: Sequence[str] = (),
+        history: Sequence[str] = (),
+    ) -> Optional[str]:
+        """Async variant of lookup() (micro-batched embedding)."""
+        try:
+            embedding = await self.embedder.aencode(message)
+        except Exception as e:
+            logger.warning(f"Response cache lookup skipped, embedding failed: {e}")
+            return None
+        return self._lookup(embedding, organization_id, tool_results, history)
+
+    def _lookup(
+        self,
+        embedding: np.ndarray,
+        organization_id: Optional[str],
+        tool_results: Sequence[str],
+        history: Sequence[str],
+    ) -> Optional[str]:
+        organization_key = str(organization_id)
+        context = _context_key(tool_results, history)
+
+        with self._lock:
+            candidates = self._context_entries.get((organization_key, context))
+            results = self._index.search(
+                embedding,
+                k=1,
+                organization_id=organization_key,
+                since=time.time() - self.ttl_seconds,
+                threshold=self.similarity_threshold,
+                include_ids=candidates,
+            ) if candidates else []
+            entry = self._entries.get(results[0][0]) if results else None
+            if entry is None:
+                self.misses += 1
+                CACHE_REQUESTS.labels(result="miss").inc()
+                return None
+
+            self._org_entries.move_to_end(organization_key)
+            self._org_entries[organization_key].move_to_end(results[0][0])
+            self.hits += 1
+        CACHE_REQUESTS.labels(result="hit").inc()
+        logger.debug(f"Response cache hit (similarity {results[0][1]:.3f})")
+        return entry.response
+
+    # Store
+
+    def store(
+        self,
+        message: str,
+        organization_id: Optional[str],
+        tool_results: Sequence[str],
+        response: str,
+        history: Sequence[str] = (),
+    ):
+        """
+        Cache an answer (blocking).
+
+        Args:
+            message: User message as written (without memory context)
+            organization_id: Organization ID
+            tool_results: Tool results the answer was generated from
+            response: LLM response
+            history: Earlier turns of the conversation, summary included
+        """
+        try:
+            embedding = self.embedder.encode(message)
+        except Exception as e:
+            logger.warning(f"Response not cached, embedding failed: {e}")
+            return
+        self._store(embedding, organization_id, tool_results, response, history)
+
+    async def astore(
+        self,
+        message: str,
+        organization_id: Optional[str],
+        tool_results: Sequence[str],
+        response: str,
+        history: Sequence[str] = (),
+    ):
+        """Async variant of store()."""
+        try:
+            embedding = await self.embedder.aencode(message)
+        except Exception as e:
+            logger.warning(f"Response not cached, embedding failed: {e}")
+            return
+        self._store(embedding, organization_id, tool_results, response, history)
+
+    def _store(
+        self,
+        embedding: np.ndarray,
+        organization_id: Optional[str],
+        tool_results: Sequence[str],
+        response: str,
+        history: Sequence[str],
+    ):
+        entry_id = uuid.uuid4().hex
+        now = time.time()
+        organization_key = str(organization_id)
+        context = _context_key(tool_results, history)
+
+        with self._lock:
+            self._index.add(entry_id, embedding, organization_key, now)
+            self._entries[entry_id] = CachedResponse(response, organization_key, context, now)
+            self._context_entries.setdefault((organization_key, context), set()).add(entry_id)
+            lru = self._org_entries.setdefault(organization_key, OrderedDict())
+            self._org_entries.move_to_end(organization_key)
+            lru[entry_id] = None
+
+            while len(lru) > self.max_entries_per_org:
+                evicted_id, _ = lru.popitem(last=False)
+                self._evict(evicted_id)
+
+            while len(self._org_entries) > self.max_organizations:
+                _, evicted = self._org_entries.popitem(last=False)
+                for evicted_id in evicted:
+                    self._evict(evicted_id)
+
+    def _evict(self, entry_id: str):
+        """Drop an entry from the index and the context lookup (caller holds the lock)."""
+        entry = self._entries.pop(entry_id, None)
+        if entry is not None:
+            key = (entry.organization_id, entry.context)
+            self._context_entries[key].discard(entry_id)
+            if not self._context_entries[key]:
+                del self._context_entries[key]
+        self._index.remove(entry_id)
+
+    def invalidate(self, organization_id: Optional[str]):
+        """Drop every cached answer of an organization (e.g. after clinic info changes)."""
+        with self._lock:
+            for entry_id in self._org_entries.pop(str(organization_id), {}):
+                self._evict(entry_id)
+
+    # Metrics
+
+    def record_bypass(self):
+        """Count a request that was not allowed to use the cache."""
+        self.bypassed += 1
+        CACHE_REQUESTS.labels(result="bypass").inc()
+
+    def record_saved_tokens(self, tokens: int):
+        """Count the LLM tokens a cache hit avoided."""
+        self.tokens_saved += tokens
+        TOKENS_SAVED.inc(tokens)
+        COST_SAVED.inc(tokens / 1000 * self.cost_per_1k_tokens)
+
+    def stats(self) -> Dict[str, float]:
+        """Hit rate, sizes and savings since start-up."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tokens_saved": self.tokens_saved,
+            "cost_saved": self.tokens_saved / 1000 * self.cost_per_1k_tokens,
+        }
+
+
+# Global response cache instance
+response_cache = SemanticResponseCache(
+    similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    max_entries_per_org=settings.RESPONSE_CACHE_MAX_ENTRIES_PER_ORG,
+    max_organizations=settings.RESPONSE_CACHE_MAX_ORGANIZATIONS,
+    cost_per_1k_tokens=settings.LLM_COST_PER_1K_TOKENS,
+    enabled=settings.RESPONSE_CACHE_ENABLED,
+)
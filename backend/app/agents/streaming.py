@@ -0,0 +1,110 @@
+"""
+Streaming Helpers for Agent Responses
+
+Alex ends escalated responses with a tag such as "[ESCALATE: EMERGENCY]"
+that must never reach the patient. When the response is streamed token by
+token, a tag can be split across chunks, so EscalationTagFilter holds back
+just enough text to decide whether a "[" starts a tag.
+"""
+
+from typing import List
+
+
+ESCALATION_TAG_PREFIX = "[ESCALATE:"
+MAX_TAG_LENGTH = 40  # Longer bracketed text is not treated as a tag
+
+
+class EscalationTagFilter:
+    """
+    Incrementally removes [ESCALATE: ...] tags from streamed text.
+
+    The concatenated output equals the full response with its tags removed
+    and surrounding whitespace stripped, the same result as the non-streaming
+    cleanup in AgentGraphV2.
+    """
+
+    def __init__(self):
+        """Initialize filter."""
+        self.levels: List[str] = []
+        self._buffer = ""
+        self._pending_whitespace = ""
+        self._started = False
+        self._output: List[str] = []
+
+    @property
+    def text(self) -> str:
+        """Everything emitted so far."""
+        return "".join(self._output)
+
+    def feed(self, chunk: str) -> str:
+        """
+        Add a chunk of streamed text.
+
+        Args:
+            chunk: Next piece of the response
+
+        Returns:
+            Text that is safe to forward now (may be empty)
+        """
+        self._buffer += chunk
+        visible = []
+
+        while self._buffer:
+            start = self._buffer.find("[")
+            if start == -1:
+                visible.append(self._buffer)
+                self._buffer = ""
+                break
+
+            visible.append(self._buffer[:start])
+            self._buffer = self._buffer[start:]
+
+            if len(self._buffer) < len(ESCALATION_TAG_PREFIX):
+                if ESCALATION_TAG_PREFIX.startswith(self._buffer):
+                    break  # Could still become a tag, wait for more text
+            elif self._buffer.startswith(ESCALATION_TAG_PREFIX):
+                end = self._buffer.find("]")
+                if end != -1:
+                    self.levels.append(self._buffer[len(ESCALATION_TAG_PREFIX):end].strip())
+                    self._buffer = self._buffer[end + 1:]
+                    continue
+                if len(self._buffer) < MAX_TAG_LENGTH:
+                    break  # Tag not closed yet
+
+            # Not a tag, forward the bracket as text
+            visible.append(self._buffer[0])
+            self._buffer = self._buffer[1:]
+
+        return self._emit("".join(visible))
+
+    def flush(self) -> str:
+        """
+        End of stream: release any held-back text that did not become a tag.
+
+        Trailing whitespace is dropped.
+
+        Returns:
+            Remaining text to forward
+        """
+        remaining, self._buffer = self._buffer, ""
+        visible = self._emit(remaining.rstrip())
+        self._pending_whitespace = ""
+        return visible
+
+    def _emit(self, text: str) -> str:
+        """Strip leading whitespace of the response and hold back trailing whitespace."""
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+
+        stripped = text.rstrip()
+        if not stripped:
+            self._pending_whitespace += text
+            return ""
+
+        visible = self._pending_whitespace + stripped
+        self._pending_whitespace = text[len(stripped):]
+        self._output.append(visible)
+        return visible
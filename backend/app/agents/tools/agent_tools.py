@@ -5,13 +5,43 @@ This module provides tools that agents can use to interact with Odoo
 and other external systems.
 """
 
-from typing import Optional
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional
 from datetime import datetime, timedelta
 
+from app.core.config import settings
 from app.integrations.mock_odoo_realistic import realistic_mock_odoo
+from app.integrations.odoo_async import AsyncOdooClient
+from app.integrations.odoo_cache import CachedOdooClient, odoo_read_cache
+from app.integrations.odoo_registry import odoo_client_registry
+from app.integrations.patient_index import normalize_phone
 
-# Use realistic mock Odoo client with 1500+ patients
-mock_odoo = realistic_mock_odoo
+logger = logging.getLogger(__name__)
+
+# Use realistic mock Odoo client with 1500+ patients, behind the read cache
+mock_odoo = CachedOdooClient(realistic_mock_odoo, odoo_read_cache, tenant=settings.ODOO_DB)
+
+
+async def organization_odoo(organization_id: Optional[str]) -> Optional[AsyncOdooClient]:
+    """
+    The organization's own Odoo client, from the client registry.
+    
+    Args:
+        organization_id: Organization ID
+        
+    Returns:
+        Client of the organization's Odoo database, or None if it has none
+        (the clinic-wide dataset, mock_odoo, is used then)
+    """
+    if organization_id is None:
+        return None
+    try:
+        client = await odoo_client_registry.get(organization_id)
+    except Exception as e:
+        logger.warning(f"Odoo client of organization {organization_id} unavailable: {e}")
+        return None
+    return None if client is odoo_client_registry.default_client else client
 
 
 def search_patient_tool(name: Optional[str] = None, phone: Optional[str] = None) -> str:
@@ -28,6 +58,13 @@ def search_patient_tool(name: Optional[str] = None, phone: Optional[str] = None)
     try:
         patient_ids = mock_odoo.search_patients(name=name, phone=phone)
         
+        if not patient_ids and name:
+            # Misspelled or reordered name - offer the closest match for confirmation
+            similar_ids = mock_odoo.search_patients(name=name, fuzzy=True)
+            if similar_ids:
+                patient = mock_odoo.get_patient(similar_ids[0])
+                return f"No exact match for name='{name}'. Closest patient: {patient['name']}, Phone: {patient.get('phone', 'N/A')}, ID: {patient['id']} - please confirm with the patient"
+        
         if not patient_ids:
             return f"No patient found with name='{name}' or phone='{phone}'"
         
@@ -41,6 +78,56 @@ def search_patient_tool(name: Optional[str] = None, phone: Optional[str] = None)
         return f"Error searching patient: {str(e)}"
 
 
+def identify_patient(phone: str) -> Optional[Dict[str, Any]]:
+    """
+    Patient on file with a phone number.
+    
+    Args:
+        phone: Phone number as typed by the patient
+        
+    Returns:
+        Patient record, or None if no patient has this number
+    """
+    try:
+        e164 = normalize_phone(phone)
+        # The search also matches partial numbers; only the exact one identifies a patient
+        for patient_id in mock_odoo.search_patients(phone=phone) if e164 else []:
+            patient = mock_odoo.get_patient(patient_id)
+            if patient and normalize_phone(patient.get("phone") or "") == e164:
+                return patient
+        return None
+    except Exception:
+        return None
+
+
+async def aidentify_patient(phone: str, organization_id: Optional[str]) -> Optional[Dict[str, Any]]:
+    """
+    Async variant of identify_patient(), reading the organization's own Odoo database if it has one.
+    
+    Args:
+        phone: Phone number as typed by the patient
+        organization_id: Organization ID
+        
+    Returns:
+        Patient record, or None if no patient has this number
+    """
+    client = await organization_odoo(organization_id)
+    if client is None:
+        return await asyncio.to_thread(identify_patient, phone)
+    
+    e164 = normalize_phone(phone)
+    if not e164:
+        return None
+    try:
+        for patient in await client.find_patients(phone=phone):
+            if normalize_phone(patient.get("phone") or "") == e164:
+                return patient
+        return None
+    except Exception as e:
+        logger.warning(f"Patient lookup in organization {organization_id}'s Odoo failed: {e}")
+        return None
+
+
 def get_available_slots_tool(days_ahead: int = 7) -> str:
     """
     Get available appointment slots for the next N days.
@@ -58,12 +145,13 @@ def get_available_slots_tool(days_ahead: int = 7) -> str:
         slots = mock_odoo.get_available_slots(date_from, date_to)
         
         if not slots:
-            return "No available slots found in the next 7 days."
+            return f"No available slots found in the next {days_ahead} days."
         
         # Format slots for display
         slot_strings = []
         for slot in slots[:10]:  # Show first 10 slots
-            slot_strings.append(slot.strftime("%A, %B %d at %I:%M %p"))
+            slot_time = datetime.fromisoformat(slot["datetime"])
+            slot_strings.append(slot_time.strftime("%A, %B %d at %I:%M %p"))
         
         return "Available appointment slots:\n" + "\n".join(f"- {s}" for s in slot_strings)
     except Exception as e:
@@ -75,6 +163,7 @@ def create_appointment_tool(
     patient_phone: str,
     appointment_date: str,
     notes: Optional[str] = None,
+    treatment_type: str = "Consultation",
 ) -> str:
     """
     Create a new appointment for a patient.
@@ -84,6 +173,7 @@ def create_appointment_tool(
         patient_phone: Patient phone number
         appointment_date: Date and time in format "YYYY-MM-DD HH:MM"
         notes: Optional notes about the appointment
+        treatment_type: Treatment to book (e.g. "Cleaning", "Filling")
         
     Returns:
         Confirmation message with appointment details
@@ -109,15 +199,23 @@ def create_appointment_tool(
         
         # Create appointment
         appointment_id = mock_odoo.create_appointment(
-            patient_id=patient_id,
-            date=appt_datetime,
-            notes=notes,
+            patient_id,
+            appt_datetime.strftime("%Y-%m-%d"),
+            appt_datetime.strftime("%H:%M"),
+            treatment_type,
+            notes=notes or "",
         )
+        if appointment_id is None:
+            return (
+                f"Sorry, {appt_datetime.strftime('%A, %B %d at %I:%M %p')} is already booked. "
+                f"Please choose another time."
+            )
         
         return (
             f"✅ Appointment created successfully!\n"
             f"Appointment ID: {appointment_id}\n"
             f"Patient: {patient_name}\n"
+            f"Treatment: {treatment_type}\n"
             f"Date & Time: {appt_datetime.strftime('%A, %B %d, %Y at %I:%M %p')}\n"
             f"Phone: {patient_phone}\n"
             f"Please arrive 10 minutes early for check-in."
@@ -126,25 +224,36 @@ def create_appointment_tool(
         return f"Error creating appointment: {str(e)}"
 
 
-def get_patient_invoices_tool(patient_name: str, patient_phone: Optional[str] = None) -> str:
+def get_patient_invoices_tool(
+    patient_name: Optional[str] = None,
+    patient_phone: Optional[str] = None,
+    patient_id: Optional[int] = None,
+) -> str:
     """
     Get invoices for a patient.
     
     Args:
         patient_name: Patient name
         patient_phone: Patient phone (optional)
+        patient_id: Patient ID, if already identified (skips the search)
         
     Returns:
         String with invoice information
     """
     try:
-        # Search for patient
-        patient_ids = mock_odoo.search_patients(name=patient_name, phone=patient_phone)
-        
-        if not patient_ids:
-            return f"No patient found with name '{patient_name}'"
-        
-        patient_id = patient_ids[0]
+        if patient_id is None:
+            # Search for patient
+            patient_ids = mock_odoo.search_patients(name=patient_name, phone=patient_phone)
+            
+            if not patient_ids:
+                return f"No patient found with name '{patient_name}'"
+            
+            patient_id = patient_ids[0]
+        elif patient_name is None:
+            patient = mock_odoo.get_patient(patient_id)
+            if not patient:
+                return f"No patient found with ID {patient_id}"
+            patient_name = patient['name']
         
         # Get invoices
         invoices = mock_odoo.get_patient_invoices(patient_id)
@@ -152,21 +261,53 @@ def get_patient_invoices_tool(patient_name: str, patient_phone: Optional[str] =
         if not invoices:
             return f"No invoices found for {patient_name}"
         
-        # Format invoices
-        invoice_strings = []
-        for inv in invoices:
-            status = inv.get('state', 'unknown')
-            amount = inv.get('amount_total', 0)
-            date = inv.get('date', 'N/A')
-            invoice_strings.append(
-                f"Invoice #{inv['id']}: ₪{amount:.2f} - {status} (Date: {date})"
-            )
+        return _format_invoices(patient_name, invoices)
+    except Exception as e:
+        return f"Error retrieving invoices: {str(e)}"
+
+
+async def aget_patient_invoices_tool(patient_id: int, organization_id: Optional[str]) -> str:
+    """
+    Get an identified patient's invoices, from the organization's own Odoo database if it has one.
+    
+    Args:
+        patient_id: Patient ID (in the organization's database)
+        organization_id: Organization ID
         
-        return f"Invoices for {patient_name}:\n" + "\n".join(f"- {s}" for s in invoice_strings)
+    Returns:
+        String with invoice information
+    """
+    client = await organization_odoo(organization_id)
+    if client is None:
+        return await asyncio.to_thread(get_patient_invoices_tool, patient_id=patient_id)
+    
+    try:
+        patient, invoices = await asyncio.gather(
+            client.get_patient(patient_id), client.get_patient_invoices(patient_id)
+        )
+        if not patient:
+            return f"No patient found with ID {patient_id}"
+        if not invoices:
+            return f"No invoices found for {patient['name']}"
+        return _format_invoices(patient['name'], invoices)
     except Exception as e:
         return f"Error retrieving invoices: {str(e)}"
 
 
+def _format_invoices(patient_name: str, invoices: List[Dict[str, Any]]) -> str:
+    """Invoice list for the LLM (mock records and Odoo account.move summaries)."""
+    invoice_strings = []
+    for inv in invoices:
+        status = inv.get('state', 'unknown')
+        amount = inv.get('amount_total', 0)
+        date = inv.get('date') or inv.get('invoice_date') or 'N/A'
+        invoice_strings.append(
+            f"Invoice #{inv['id']}: ₪{amount:.2f} - {status} (Date: {date})"
+        )
+    
+    return f"Invoices for {patient_name}:\n" + "\n".join(f"- {s}" for s in invoice_strings)
+
+
 def get_invoice_details_tool(invoice_id: int) -> str:
     """
     Get detailed information about an invoice.
@@ -22,17 +22,14 @@ def search_patient(name: Optional[str] = None, phone: Optional[str] = None) -> s
         String with patient information or "not found" message
     """
     try:
-        patient_ids = odoo_client.search_patients(name=name, phone=phone)
+        patients = odoo_client.find_patients(name=name, phone=phone, limit=1)
         
-        if not patient_ids:
+        if not patients:
             return f"No patient found with name='{name}' or phone='{phone}'"
         
-        # Get details of first matching patient
-        patient = odoo_client.get_patient(patient_ids[0])
-        if patient:
-            return f"Found patient: {patient['name']}, Phone: {patient.get('phone', 'N/A')}, Email: {patient.get('email', 'N/A')}"
-        else:
-            return "Patient found but could not retrieve details"
+        # Details of first matching patient
+        patient = patients[0]
+        return f"Found patient: {patient['name']}, Phone: {patient.get('phone', 'N/A')}, Email: {patient.get('email', 'N/A')}"
     except Exception as e:
         return f"Error searching patient: {str(e)}"
 
@@ -135,20 +132,16 @@ def get_patient_appointments(patient_name: str, patient_phone: Optional[str] = N
         
         patient_id = patient_ids[0]
         
-        # Get appointments
-        appointment_ids = odoo_client.search_appointments(patient_id=patient_id)
+        # Get appointments with their details (first 5)
+        appts = odoo_client.get_patient_appointments(patient_id, limit=5)
         
-        if not appointment_ids:
+        if not appts:
             return f"No appointments found for {patient_name}"
         
-        # Get appointment details
-        appointments = []
-        for appt_id in appointment_ids[:5]:  # Show first 5
-            appt = odoo_client.get_appointment(appt_id)
-            if appt:
-                appointments.append(
-                    f"- {appt['appointment_date']} ({appt['state']})"
-                )
+        appointments = [
+            f"- {appt['appointment_date']} ({appt['state']})"
+            for appt in appts
+        ]
         
         return f"Appointments for {patient_name}:\n" + "\n".join(appointments)
     except Exception as e:
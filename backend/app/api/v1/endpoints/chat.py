@@ -2,11 +2,16 @@
 Chat API endpoints for AI agent conversations.
 """
 
+import asyncio
+import json
+import logging
 from uuid import uuid4
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.orm import Session
 
-from app.core.database import get_db
+from app.core.database import SessionLocal, get_db
 from app.api.dependencies import get_current_user, get_current_organization_id
 from app.models.user import User
 from app.models.conversation import Conversation, ConversationStatus, ConversationChannel
@@ -20,6 +25,9 @@ from app.schemas.conversation import (
     MessageResponse,
 )
 from app.agents.agent_graph import AgentGraphV2
+from app.agents.context_window import ContextWindow, context_manager
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/chat", tags=["Chat"])
 
@@ -27,17 +35,8 @@ router = APIRouter(prefix="/chat", tags=["Chat"])
 agent_graph = AgentGraphV2()
 
 
-@router.post("/", response_model=ChatResponse)
-async def chat(
-    request: ChatRequest,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-):
-    """
-    Send a message to Alex AI agent and get a response.
-    
-    If conversation_id is not provided, a new conversation will be created.
-    """
+def _get_or_create_conversation(request: ChatRequest, current_user: User, db: Session) -> Conversation:
+    """Load the requested conversation, or create a new web chat conversation."""
     # Ensure user has an organization
     if not current_user.organization_id:
         raise HTTPException(
@@ -70,15 +69,64 @@ async def chat(
         db.commit()
         db.refresh(conversation)
     
-    # Save user message to database
+    return conversation
+
+
+def _load_history(conversation: Conversation, db: Session) -> ContextWindow:
+    """Earlier turns fitted to the token budget (empty if loading fails)."""
+    try:
+        return context_manager.build(db, conversation)
+    except Exception as e:
+        logger.warning(f"Could not load history of conversation {conversation.id}: {e}")
+        return ContextWindow(messages=[], history_tokens=0, full_history_tokens=0)
+
+
+def _save_user_message(db: Session, conversation: Conversation, content: str):
+    """Save the patient's message to the database."""
     user_message = Message(
         conversation_id=conversation.id,
-        organization_id=current_user.organization_id,
+        organization_id=conversation.organization_id,
         role=MessageRole.USER,
-        content=request.message,
+        content=content,
     )
     db.add(user_message)
     db.commit()
+
+
+def _save_ai_message(db: Session, conversation_id, organization_id, content: str) -> Message:
+    """Save Alex's response to the database."""
+    ai_message = Message(
+        conversation_id=conversation_id,
+        organization_id=organization_id,
+        role=MessageRole.ASSISTANT,
+        content=content,
+        agent_name="alex",
+    )
+    db.add(ai_message)
+    db.commit()
+    db.refresh(ai_message)
+    return ai_message
+
+
+def _requires_human(result: dict) -> bool:
+    return result.get("escalation_level") in ["EMERGENCY", "DOCTOR_REQUIRED"]
+
+
+@router.post("/", response_model=ChatResponse)
+async def chat(
+    request: ChatRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Send a message to Alex AI agent and get a response.
+    
+    If conversation_id is not provided, a new conversation will be created.
+    """
+    conversation = _get_or_create_conversation(request, current_user, db)
+    context = _load_history(conversation, db)
+    _save_user_message(db, conversation, request.message)
     
     # Process message with Alex agent graph
     try:
@@ -87,26 +135,21 @@ async def chat(
             organization_id=str(current_user.organization_id),
             conversation_id=str(conversation.id),
             message=request.message,
+            history=context.messages,
+            thread_id=conversation.langgraph_thread_id,
         )
         
-        # Save AI response to database
-        ai_message = Message(
-            conversation_id=conversation.id,
-            organization_id=current_user.organization_id,
-            role=MessageRole.ASSISTANT,
-            content=result["response"],
-            agent_name="alex",
-        )
-        db.add(ai_message)
-        db.commit()
-        db.refresh(ai_message)
+        ai_message = _save_ai_message(db, conversation.id, current_user.organization_id, result["response"])
+        
+        # Fold older turns into the rolling summary after responding
+        background_tasks.add_task(context_manager.aupdate_summary, conversation.id, SessionLocal)
         
         return ChatResponse(
             conversation_id=conversation.id,
             message_id=ai_message.id,
             response=result["response"],
             agent="alex",
-            requires_human=result.get("escalation_level") in ["EMERGENCY", "DOCTOR_REQUIRED"],
+            requires_human=_requires_human(result),
         )
     except Exception as e:
         raise HTTPException(
@@ -115,6 +158,79 @@ async def chat(
         )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+):
+    """
+    Send a message to Alex AI agent and stream the response (Server-Sent Events).
+    
+    Events:
+    - token: {"content": "..."} - next piece of the response, escalation tags removed
+    - done: ChatResponse - sent once the response has been saved
+    - error: {"detail": "..."}
+    """
+    conversation = _get_or_create_conversation(request, current_user, db)
+    context = _load_history(conversation, db)
+    _save_user_message(db, conversation, request.message)
+    conversation_id = conversation.id
+    thread_id = conversation.langgraph_thread_id
+    organization_id = current_user.organization_id
+    user_id = str(current_user.id)
+    
+    async def event_stream():
+        result = None
+        try:
+            async for event in agent_graph.stream_message(
+                user_id=user_id,
+                organization_id=str(organization_id),
+                conversation_id=str(conversation_id),
+                message=request.message,
+                history=context.messages,
+                thread_id=thread_id,
+            ):
+                if event["type"] == "token":
+                    yield _sse("token", {"content": event["content"]})
+                else:
+                    result = event
+            
+            # The request's session is closed once streaming starts, so the
+            # response is saved with a session of its own
+            def save() -> Message:
+                with SessionLocal() as stream_db:
+                    return _save_ai_message(stream_db, conversation_id, organization_id, result["response"])
+            
+            ai_message = await asyncio.to_thread(save)
+        except Exception as e:
+            logger.error(f"Error streaming message: {e}", exc_info=True)
+            yield _sse("error", {"detail": f"Error processing message: {str(e)}"})
+            return
+        
+        response = ChatResponse(
+            conversation_id=conversation_id,
+            message_id=ai_message.id,
+            response=result["response"],
+            agent="alex",
+            requires_human=_requires_human(result),
+        )
+        yield _sse("done", response.model_dump(mode="json"))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Fold older turns into the rolling summary after the stream ends
+        background=BackgroundTask(context_manager.aupdate_summary, conversation_id, SessionLocal),
+    )
+
+
 @router.get("/conversations", response_model=list[ConversationResponse])
 async def list_conversations(
     current_user: User = Depends(get_current_user),
@@ -7,7 +7,7 @@ Provides clinic statistics and analytics for the dashboard.
 import logging
 from typing import Dict, Any
 from fastapi import APIRouter, HTTPException
-from datetime import datetime, timedelta
+from datetime import datetime
 
 from app.integrations.mock_odoo_realistic import realistic_mock_odoo
 
@@ -65,41 +65,10 @@ async def get_patient_statistics() -> Dict[str, Any]:
         Dictionary with patient statistics
     """
     try:
-        # Get all patients
-        patients = realistic_mock_odoo.patients
-        
-        # Calculate statistics
-        total_patients = len(patients)
-        
-        # Patients with outstanding balance
-        patients_with_balance = len([p for p in patients if p["outstanding_balance"] > 0])
-        
-        # New patients (registered in last 30 days)
-        thirty_days_ago = (datetime.now() - timedelta(days=30)).strftime("%Y-%m-%d")
-        new_patients = len([
-            p for p in patients 
-            if p["registration_date"] >= thirty_days_ago
-        ])
-        
-        # Active patients (visited in last 90 days)
-        ninety_days_ago = (datetime.now() - timedelta(days=90)).strftime("%Y-%m-%d")
-        active_patients = len([
-            p for p in patients 
-            if p["last_visit"] and p["last_visit"] >= ninety_days_ago
-        ])
-        
-        # Insurance distribution
-        insurance_dist = {}
-        for patient in patients:
-            provider = patient.get("insurance_provider", "None")
-            insurance_dist[provider] = insurance_dist.get(provider, 0) + 1
+        stats = realistic_mock_odoo.statistics().patient_statistics()
         
         return {
-            "total_patients": total_patients,
-            "new_patients_30d": new_patients,
-            "active_patients_90d": active_patients,
-            "patients_with_outstanding_balance": patients_with_balance,
-            "insurance_distribution": insurance_dist,
+            **stats,
             "generated_at": datetime.now().isoformat(),
         }
     
@@ -117,36 +86,10 @@ async def get_appointment_statistics() -> Dict[str, Any]:
         Dictionary with appointment statistics
     """
     try:
-        appointments = realistic_mock_odoo.appointments
-        
-        # Status distribution
-        status_dist = {}
-        for appt in appointments:
-            status = appt["status"]
-            status_dist[status] = status_dist.get(status, 0) + 1
-        
-        # Upcoming appointments (next 7 days)
-        today = datetime.now().strftime("%Y-%m-%d")
-        seven_days = (datetime.now() + timedelta(days=7)).strftime("%Y-%m-%d")
-        upcoming = len([
-            a for a in appointments
-            if a["status"] == "scheduled" and today <= a["date"] <= seven_days
-        ])
-        
-        # Treatment type distribution
-        treatment_dist = {}
-        for appt in appointments:
-            treatment = appt["treatment_type"]
-            treatment_dist[treatment] = treatment_dist.get(treatment, 0) + 1
-        
-        # Sort by popularity
-        treatment_dist = dict(sorted(treatment_dist.items(), key=lambda x: x[1], reverse=True))
+        stats = realistic_mock_odoo.statistics().appointment_statistics()
         
         return {
-            "total_appointments": len(appointments),
-            "status_distribution": status_dist,
-            "upcoming_appointments_7d": upcoming,
-            "treatment_type_distribution": treatment_dist,
+            **stats,
             "generated_at": datetime.now().isoformat(),
         }
     
@@ -164,42 +107,10 @@ async def get_revenue_statistics() -> Dict[str, Any]:
         Dictionary with revenue statistics
     """
     try:
-        invoices = realistic_mock_odoo.invoices
-        
-        # Total revenue
-        total_revenue = sum(inv["total_amount"] for inv in invoices)
-        
-        # Outstanding balance
-        outstanding = sum(inv["outstanding_amount"] for inv in invoices)
-        
-        # Paid vs unpaid
-        paid_amount = sum(inv["paid_amount"] for inv in invoices)
-        
-        # Revenue by treatment type
-        revenue_by_treatment = {}
-        for inv in invoices:
-            treatment = inv["treatment"]
-            revenue_by_treatment[treatment] = revenue_by_treatment.get(treatment, 0) + inv["total_amount"]
-        
-        # Sort by revenue
-        revenue_by_treatment = dict(sorted(revenue_by_treatment.items(), key=lambda x: x[1], reverse=True))
-        
-        # Monthly revenue (last 12 months)
-        monthly_revenue = {}
-        for inv in invoices:
-            month = inv["issue_date"][:7]  # YYYY-MM
-            monthly_revenue[month] = monthly_revenue.get(month, 0) + inv["total_amount"]
-        
-        # Sort by month
-        monthly_revenue = dict(sorted(monthly_revenue.items()))
+        stats = realistic_mock_odoo.statistics().revenue_statistics()
         
         return {
-            "total_revenue": total_revenue,
-            "paid_amount": paid_amount,
-            "outstanding_balance": outstanding,
-            "collection_rate": round(paid_amount / total_revenue * 100, 1) if total_revenue > 0 else 0,
-            "revenue_by_treatment": revenue_by_treatment,
-            "monthly_revenue": monthly_revenue,
+            **stats,
             "generated_at": datetime.now().isoformat(),
         }
     
@@ -220,14 +131,7 @@ async def get_top_patients(limit: int = 10) -> Dict[str, Any]:
         List of top patients
     """
     try:
-        # Calculate revenue per patient
-        patient_revenue = {}
-        for inv in realistic_mock_odoo.invoices:
-            patient_id = inv["patient_id"]
-            patient_revenue[patient_id] = patient_revenue.get(patient_id, 0) + inv["total_amount"]
-        
-        # Sort by revenue
-        top_patients = sorted(patient_revenue.items(), key=lambda x: x[1], reverse=True)[:limit]
+        top_patients = realistic_mock_odoo.statistics().top_patients(limit)
         
         # Get patient details
         result = []
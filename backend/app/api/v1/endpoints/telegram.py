@@ -2,14 +2,20 @@
 Telegram Bot Webhook Endpoint
 
 Handles incoming messages from Telegram and routes them to Alex agent.
+Updates are handed to a TelegramDispatcher: processed in order per chat,
+by a bounded pool of workers, once per update_id. In polling mode
+(TELEGRAM_INGESTION_MODE=polling) telegram_poller fetches them with
+getUpdates instead and feeds the same dispatcher.
 """
 
 import logging
 from typing import Dict, Any
-from fastapi import APIRouter, Request, HTTPException, BackgroundTasks
+from fastapi import APIRouter, Request, HTTPException
 from uuid import uuid4
 
 from app.integrations.telegram_client import telegram_client
+from app.integrations.telegram_dispatcher import TelegramDispatcher
+from app.integrations.telegram_polling import TelegramPoller
 from app.agents.agent_graph import agent_graph_v2
 from app.core.config import settings
 
@@ -23,40 +29,68 @@ conversation_store: Dict[int, str] = {}
 
 
 @router.post("/webhook")
-async def telegram_webhook(request: Request, background_tasks: BackgroundTasks):
+async def telegram_webhook(request: Request):
     """
     Receive updates from Telegram webhook.
     
     Args:
         request: FastAPI request object
-        background_tasks: FastAPI background tasks
         
     Returns:
-        Success response
+        Success response (503 when the dispatcher is full, so Telegram retries later)
     """
     try:
         # Parse webhook payload
         update = await request.json()
         logger.info(f"Received Telegram update: {update.get('update_id')}")
         
-        # Extract message
-        message = update.get("message")
-        callback_query = update.get("callback_query")
-        
-        if message:
-            # Handle regular message
-            background_tasks.add_task(handle_message, message)
-        elif callback_query:
-            # Handle button callback
-            background_tasks.add_task(handle_callback, callback_query)
+        if not await telegram_dispatcher.submit(update):
+            raise HTTPException(status_code=503, detail="Too many pending updates")
         
         return {"ok": True}
     
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error processing Telegram webhook: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def handle_update(update: Dict[str, Any]):
+    """
+    Handle one Telegram update (called by the dispatcher).
+    
+    Args:
+        update: Telegram Update object
+    """
+    # Extract message
+    message = update.get("message")
+    callback_query = update.get("callback_query")
+    
+    if message:
+        # Handle regular message
+        await handle_message(message)
+    elif callback_query:
+        # Handle button callback
+        await handle_callback(callback_query)
+
+
+# Per-chat ordered processing of webhook updates
+telegram_dispatcher = TelegramDispatcher(
+    handle_update=handle_update,
+    max_workers=settings.TELEGRAM_MAX_CONCURRENT_UPDATES,
+    max_pending=settings.TELEGRAM_MAX_PENDING_UPDATES,
+)
+
+# getUpdates ingestion (started at startup in polling mode)
+telegram_poller = TelegramPoller(
+    client=telegram_client,
+    submit=telegram_dispatcher.submit,
+    poll_timeout=settings.TELEGRAM_POLL_TIMEOUT,
+    batch_size=settings.TELEGRAM_POLL_BATCH_SIZE,
+)
+
+
 async def handle_message(message: Dict[str, Any]):
     """
     Handle incoming Telegram message.
@@ -97,7 +131,7 @@ async def handle_message(message: Dict[str, Any]):
         # Route to Alex agent
         response = await agent_graph_v2.process_message(
             user_id=str(user_id),
-            organization_id="telegram",  # Default org for Telegram users
+            organization_id=settings.TELEGRAM_ORGANIZATION_ID,
             conversation_id=conversation_id,
             message=text,
         )
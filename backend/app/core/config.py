@@ -25,6 +25,7 @@ class Settings(BaseSettings):
     LOG_LEVEL: str = Field(default="INFO")
     APP_HOST: str = Field(default="0.0.0.0")
     APP_PORT: int = Field(default=8000)
+    WARM_UP_ON_STARTUP: bool = Field(default=True)  # Load models/connections before serving
 
     # Security
     SECRET_KEY: str = Field(...)
@@ -39,23 +40,70 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: RedisDsn = Field(...)
 
+    # Rate limiting (shared through Redis; 0 disables a limit)
+    RATE_LIMIT_USER_PER_MINUTE: int = Field(default=20)
+    RATE_LIMIT_USER_BURST: int = Field(default=5)
+    RATE_LIMIT_ORG_PER_MINUTE: int = Field(default=300)
+    RATE_LIMIT_GLOBAL_PER_MINUTE: int = Field(default=3000)
+    LLM_TOKENS_PER_HOUR_ORG: int = Field(default=500000)
+    LLM_TOKENS_PER_HOUR_GLOBAL: int = Field(default=5000000)
+
     # Neo4j
     NEO4J_URI: str = Field(...)
     NEO4J_USER: str = Field(...)
     NEO4J_PASSWORD: str = Field(...)
 
+    # Causal Memory
+    VECTOR_INDEX_BACKEND: str = Field(default="auto")  # auto, hnsw, brute_force
+    VECTOR_INDEX_WINDOW_DAYS: int = Field(default=30)  # Older interactions are not loaded into the index
+    VECTOR_INDEX_MAX_PER_ORG: int = Field(default=20000)  # Newest interactions per organization loaded at start-up
+
     # Odoo
     ODOO_URL: str = Field(...)
     ODOO_DB: str = Field(...)
     ODOO_USERNAME: str = Field(...)
     ODOO_PASSWORD: str = Field(...)
+    ODOO_PROTOCOL: str = Field(default="xmlrpc")  # xmlrpc, jsonrpc (async client)
+    ODOO_MAX_CONNECTIONS: int = Field(default=20)  # HTTP connections per Odoo database
+    ODOO_MAX_CONCURRENT_CALLS: int = Field(default=8)  # Calls in flight per Odoo database
+    ODOO_TIMEOUT_SECONDS: float = Field(default=30.0)
+    ODOO_MAX_TENANT_CLIENTS: int = Field(default=200)  # Organizations with an Odoo client per process
+    ODOO_IDLE_SESSION_SECONDS: float = Field(default=300.0)  # Close a database's connections after this idle time
+    ODOO_REAP_INTERVAL_SECONDS: float = Field(default=60.0)
+    
+    # Odoo read cache (in-process LRU + Redis), TTLs per model
+    ODOO_CACHE_ENABLED: bool = Field(default=True)
+    ODOO_CACHE_L1_MAX_ENTRIES: int = Field(default=10000)
+    ODOO_CACHE_L1_TTL_SECONDS: float = Field(default=15.0)  # Bounds staleness after another worker's write
+    ODOO_CACHE_PATIENT_TTL_SECONDS: int = Field(default=600)
+    ODOO_CACHE_APPOINTMENT_TTL_SECONDS: int = Field(default=60)
+    ODOO_CACHE_INVOICE_TTL_SECONDS: int = Field(default=300)
+    ODOO_CACHE_TREATMENT_TTL_SECONDS: int = Field(default=3600)
 
     # LLM
     OPENAI_API_KEY: str = Field(...)
     ANTHROPIC_API_KEY: str = Field(default="")
+    LLM_COST_PER_1K_TOKENS: float = Field(default=0.0006)  # Blended USD price, for cost metrics
+
+    # Semantic response cache (repeated FAQ-style questions)
+    RESPONSE_CACHE_ENABLED: bool = Field(default=True)
+    RESPONSE_CACHE_SIMILARITY_THRESHOLD: float = Field(default=0.92)
+    RESPONSE_CACHE_TTL_SECONDS: int = Field(default=3600)
+    RESPONSE_CACHE_MAX_ENTRIES_PER_ORG: int = Field(default=1000)
+    RESPONSE_CACHE_MAX_ORGANIZATIONS: int = Field(default=200)  # Each cached org holds an index partition
+
+    # Keyword rules: JSON file with per-organization extra keywords (see app/agents/keywords.py)
+    KEYWORD_OVERRIDES_FILE: str = Field(default="")
 
     # Telegram Bot
     TELEGRAM_BOT_TOKEN: str = Field(...)
+    TELEGRAM_ORGANIZATION_ID: str = Field(default="telegram")  # Organization the bot's chats belong to
+    TELEGRAM_MAX_CONCURRENT_UPDATES: int = Field(default=8)  # Updates (chats) handled at once
+    TELEGRAM_MAX_PENDING_UPDATES: int = Field(default=1000)  # Queued updates before the webhook answers 503
+    TELEGRAM_API_URL: str = Field(default="https://api.telegram.org")
+    TELEGRAM_INGESTION_MODE: str = Field(default="webhook")  # "webhook" or "polling" (getUpdates, one worker)
+    TELEGRAM_POLL_TIMEOUT: int = Field(default=30)  # Long-polling wait per getUpdates call, seconds
+    TELEGRAM_POLL_BATCH_SIZE: int = Field(default=100)  # Updates per getUpdates call (Telegram allows 1-100)
 
     # CORS
     CORS_ORIGINS: str = Field(
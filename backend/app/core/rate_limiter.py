@@ -0,0 +1,317 @@
+"""
+Distributed Rate Limiter
+
+GCRA (generic cell rate algorithm) limits shared by all workers through Redis:
+- One Lua script checks or charges several limits atomically
+  (per user, per organization, global), one round trip per check
+- Request limits are checked before each LLM call; LLM token spend is
+  charged after the call and blocks further requests once a budget is used up
+- While Redis is unreachable the same algorithm runs in-process, per worker
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import redis
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS: limit keys
+# ARGV: mode ("check" or "charge"), then per key: emission interval (ms), tolerance (ms), cost
+# "check" rejects without writing anything if any limit would be exceeded;
+# "charge" always records the cost (used for spend that already happened)
+GCRA_SCRIPT = """
+local now_parts = redis.call('TIME')
+local now = now_parts[1] * 1000 + now_parts[2] / 1000
+local mode = ARGV[1]
+local new_tats = {}
+
+for i, key in ipairs(KEYS) do
+    local base = 2 + (i - 1) * 3
+    local interval = tonumber(ARGV[base])
+    local tolerance = tonumber(ARGV[base + 1])
+    local cost = tonumber(ARGV[base + 2])
+
+    local tat = tonumber(redis.call('GET', key)) or now
+    if tat < now then
+        tat = now
+    end
+    local new_tat = tat + interval * cost
+
+    if mode == 'check' and new_tat - tolerance > now then
+        return {0, i, tostring(new_tat - tolerance - now)}
+    end
+    new_tats[i] = new_tat
+end
+
+for i, key in ipairs(KEYS) do
+    if new_tats[i] > now then
+        redis.call('SET', key, tostring(new_tats[i]), 'PX', math.ceil(new_tats[i] - now))
+    end
+end
+return {1, 0, '0'}
+"""
+
+
+@dataclass(frozen=True)
+class Limit:
+    """`rate` units per `period` seconds, allowing bursts of up to `burst` units."""
+
+    rate: float
+    period: float
+    burst: float
+
+    @property
+    def emission_interval_ms(self) -> float:
+        return self.period * 1000 / self.rate
+
+    @property
+    def tolerance_ms(self) -> float:
+        return self.emission_interval_ms * self.burst
+
+
+@dataclass
+class RateLimitResult:
+    """Outcome of a rate limit check."""
+
+    allowed: bool
+    retry_after: float = 0.0  # Seconds
+    limited_by: Optional[str] = None  # Name of the limit that was hit
+
+
+# (limit name, redis key, limit, cost)
+_Entry = Tuple[str, str, Limit, float]
+
+
+class _LocalGCRA:
+    """In-process GCRA with the same semantics as GCRA_SCRIPT."""
+
+    def __init__(self):
+        self._tats: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def apply(self, mode: str, entries: List[_Entry]) -> RateLimitResult:
+        now = time.monotonic() * 1000
+        with self._lock:
+            new_tats = []
+            for name, key, limit, cost in entries:
+                tat = max(self._tats.get(key, now), now)
+                new_tat = tat + limit.emission_interval_ms * cost
+                if mode == "check" and new_tat - limit.tolerance_ms > now:
+                    return RateLimitResult(False, (new_tat - limit.tolerance_ms - now) / 1000, name)
+                new_tats.append(new_tat)
+
+            for (_, key, _, _), new_tat in zip(entries, new_tats):
+                if new_tat > now:
+                    self._tats[key] = new_tat
+
+            # Drop keys whose budget is fully restored
+            if len(self._tats) > 10000:
+                self._tats = {key: tat for key, tat in self._tats.items() if tat > now}
+        return RateLimitResult(True)
+
+
+class DistributedRateLimiter:
+    """Redis-backed GCRA limiter for requests and LLM token spend."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        user_limit: Optional[Limit] = None,
+        organization_limit: Optional[Limit] = None,
+        global_limit: Optional[Limit] = None,
+        organization_token_limit: Optional[Limit] = None,
+        global_token_limit: Optional[Limit] = None,
+        key_prefix: str = "ratelimit",
+        redis_retry_interval: float = 30.0,
+    ):
+        """
+        Initialize rate limiter.
+
+        Args:
+            redis_url: Redis URL (None = in-process only)
+            user_limit: Requests per user
+            organization_limit: Requests per organization
+            global_limit: Requests across all organizations
+            organization_token_limit: LLM tokens per organization
+            global_token_limit: LLM tokens across all organizations
+            key_prefix: Prefix of the Redis keys
+            redis_retry_interval: Seconds to stay on the in-process fallback after a Redis error
+        """
+        self.redis_url = redis_url
+        self.user_limit = user_limit
+        self.organization_limit = organization_limit
+        self.global_limit = global_limit
+        self.organization_token_limit = organization_token_limit
+        self.global_token_limit = global_token_limit
+        self.key_prefix = key_prefix
+        self.redis_retry_interval = redis_retry_interval
+
+        self._local = _LocalGCRA()
+        self._redis_down_until = 0.0
+        self._client: Optional[redis.Redis] = None
+        self._script = None
+        self._async_clients: Dict[asyncio.AbstractEventLoop, Tuple[aioredis.Redis, object]] = {}
+
+    # Entries
+
+    def _request_entries(self, user_id: str, organization_id: Optional[str]) -> List[_Entry]:
+        """Limits checked before an LLM call; token budgets are checked at zero cost."""
+        candidates = [
+            ("user", f"user:{user_id}", self.user_limit, 1),
+            ("organization", f"org:{organization_id}", self.organization_limit if organization_id else None, 1),
+            ("global", "global", self.global_limit, 1),
+            ("organization_tokens", f"tokens:org:{organization_id}",
+             self.organization_token_limit if organization_id else None, 0),
+            ("global_tokens", "tokens:global", self.global_token_limit, 0),
+        ]
+        return [
+            (name, f"{self.key_prefix}:{key}", limit, cost)
+            for name, key, limit, cost in candidates
+            if limit is not None
+        ]
+
+    def _spend_entries(self, organization_id: Optional[str], tokens: int) -> List[_Entry]:
+        candidates = [
+            ("organization_tokens", f"tokens:org:{organization_id}",
+             self.organization_token_limit if organization_id else None),
+            ("global_tokens", "tokens:global", self.global_token_limit),
+        ]
+        return [
+            (name, f"{self.key_prefix}:{key}", limit, tokens)
+            for name, key, limit in candidates
+            if limit is not None
+        ]
+
+    @staticmethod
+    def _script_args(mode: str, entries: List[_Entry]) -> Tuple[List[str], List[object]]:
+        keys = [key for _, key, _, _ in entries]
+        args: List[object] = [mode]
+        for _, _, limit, cost in entries:
+            args.extend([limit.emission_interval_ms, limit.tolerance_ms, cost])
+        return keys, args
+
+    @staticmethod
+    def _parse(entries: List[_Entry], reply) -> RateLimitResult:
+        allowed, position, retry_ms = reply
+        if allowed:
+            return RateLimitResult(True)
+        return RateLimitResult(False, float(retry_ms) / 1000, entries[int(position) - 1][0])
+
+    # Redis
+
+    def _redis_available(self) -> bool:
+        return self.redis_url is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, error: Exception):
+        self._redis_down_until = time.monotonic() + self.redis_retry_interval
+        logger.warning(
+            f"Rate limiter Redis unavailable ({error}), using in-process limits "
+            f"for {self.redis_retry_interval:.0f}s"
+        )
+
+    def _sync_script(self):
+        if self._script is None:
+            self._client = redis.Redis.from_url(
+                self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+            self._script = self._client.register_script(GCRA_SCRIPT)
+        return self._script
+
+    def _async_script(self):
+        loop = asyncio.get_running_loop()
+        if loop not in self._async_clients:
+            client = aioredis.Redis.from_url(
+                self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+            self._async_clients[loop] = (client, client.register_script(GCRA_SCRIPT))
+        return self._async_clients[loop][1]
+
+    def _apply(self, mode: str, entries: List[_Entry]) -> RateLimitResult:
+        if not entries:
+            return RateLimitResult(True)
+        if self._redis_available():
+            try:
+                keys, args = self._script_args(mode, entries)
+                return self._parse(entries, self._sync_script()(keys=keys, args=args))
+            except redis.RedisError as e:
+                self._redis_failed(e)
+        return self._local.apply(mode, entries)
+
+    async def _aapply(self, mode: str, entries: List[_Entry]) -> RateLimitResult:
+        if not entries:
+            return RateLimitResult(True)
+        if self._redis_available():
+            try:
+                keys, args = self._script_args(mode, entries)
+                return self._parse(entries, await self._async_script()(keys=keys, args=args))
+            except redis.RedisError as e:
+                self._redis_failed(e)
+        return self._local.apply(mode, entries)
+
+    # Public API
+
+    def check(self, user_id: str, organization_id: Optional[str] = None) -> RateLimitResult:
+        """
+        Count one request against the user, organization and global limits.
+
+        Nothing is counted if any limit (including a spent token budget) is exceeded.
+
+        Args:
+            user_id: User ID
+            organization_id: Organization ID
+
+        Returns:
+            Whether the request may proceed, and if not, when to retry
+        """
+        return self._apply("check", self._request_entries(user_id, organization_id))
+
+    async def acheck(self, user_id: str, organization_id: Optional[str] = None) -> RateLimitResult:
+        """Async variant of check()."""
+        return await self._aapply("check", self._request_entries(user_id, organization_id))
+
+    def charge_tokens(self, organization_id: Optional[str], tokens: int):
+        """
+        Record LLM tokens spent by an organization.
+
+        Args:
+            organization_id: Organization ID
+            tokens: Tokens used by the LLM call
+        """
+        self._apply("charge", self._spend_entries(organization_id, tokens))
+
+    async def acharge_tokens(self, organization_id: Optional[str], tokens: int):
+        """Async variant of charge_tokens()."""
+        await self._aapply("charge", self._spend_entries(organization_id, tokens))
+
+
+def estimate_tokens(texts: Iterable[str]) -> int:
+    """Rough LLM token count (about 4 characters per token) for spend accounting."""
+    return sum(len(text) for text in texts) // 4 + 1
+
+
+def _limit(per_period: int, period: float, burst: Optional[int] = None) -> Optional[Limit]:
+    """Limit from a setting; 0 disables it."""
+    if per_period <= 0:
+        return None
+    return Limit(rate=per_period, period=period, burst=burst or per_period)
+
+
+# Global rate limiter instance
+rate_limiter = DistributedRateLimiter(
+    redis_url=str(settings.REDIS_URL),
+    user_limit=_limit(settings.RATE_LIMIT_USER_PER_MINUTE, 60, settings.RATE_LIMIT_USER_BURST),
+    organization_limit=_limit(settings.RATE_LIMIT_ORG_PER_MINUTE, 60),
+    global_limit=_limit(settings.RATE_LIMIT_GLOBAL_PER_MINUTE, 60),
+    organization_token_limit=_limit(settings.LLM_TOKENS_PER_HOUR_ORG, 3600),
+    global_token_limit=_limit(settings.LLM_TOKENS_PER_HOUR_GLOBAL, 3600),
+)
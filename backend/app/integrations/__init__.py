@@ -3,5 +3,14 @@ External integrations package.
 """
 
 from app.integrations.odoo_client import odoo_client, OdooClient
+from app.integrations.odoo_async import async_odoo_client, AsyncOdooClient
+from app.integrations.odoo_registry import odoo_client_registry, OdooClientRegistry
 
-__all__ = ["odoo_client", "OdooClient"]
+__all__ = [
+    "odoo_client",
+    "OdooClient",
+    "async_odoo_client",
+    "AsyncOdooClient",
+    "odoo_client_registry",
+    "OdooClientRegistry",
+]
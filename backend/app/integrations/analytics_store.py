@@ -0,0 +1,247 @@
+"""
+Columnar Analytics Store
+
+Dashboard statistics over patients, appointments and invoices, computed
+on NumPy columns instead of lists of dicts:
+- One array per field; dates as days since 1970-01-01 (int32, missing
+  dates sort before every real date)
+- Status, treatment and insurance provider dictionary-encoded: integer
+  codes plus the list of distinct values, in first-seen order
+- Group-bys are bincounts over the codes, date-range counts are masks
+  over the day columns, top-k uses argpartition
+A store is a read-only snapshot; build a new one when the data changes.
+Aggregates that do not depend on the current date are computed once
+per snapshot.
+"""
+
+from datetime import date, datetime
+from functools import cached_property
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.integrations.mock_snapshot import field_values
+
+
+EPOCH = date(1970, 1, 1)
+MISSING_DAY = np.iinfo(np.int32).min
+
+
+def to_day(value) -> int:
+    """Days since 1970-01-01 of a date, datetime or "YYYY-MM-DD" string."""
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return (value - EPOCH).days
+
+
+def day_column(values: Sequence[Optional[str]]) -> np.ndarray:
+    """Parse ISO dates (None for missing) into days since 1970-01-01."""
+    days = np.array(values, dtype="datetime64[D]")
+    return np.where(np.isnat(days), MISSING_DAY, days.view(np.int64)).astype(np.int32)
+
+
+class Categorical:
+    """Dictionary-encoded column: codes into a list of distinct values."""
+
+    def __init__(self, values: Iterable[Any]):
+        self.index: Dict[Any, int] = {}
+        codes = [self.index.setdefault(value, len(self.index)) for value in values]
+        self.codes = np.array(codes, dtype=np.intp)  # bincount's native index type
+        self.categories: List[Any] = list(self.index)
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def code(self, value: Any) -> int:
+        """Code of a value (-1 if it never occurs)."""
+        return self.index.get(value, -1)
+
+    def count(self, value: Any, mask: Optional[np.ndarray] = None) -> int:
+        """Rows equal to value (within mask, if given)."""
+        matches = self.codes == self.code(value)
+        if mask is not None:
+            matches &= mask
+        return int(np.count_nonzero(matches))
+
+    def group_count(self) -> Dict[Any, int]:
+        """Rows per value, in first-seen order."""
+        counts = np.bincount(self.codes, minlength=len(self.categories))
+        return {value: int(n) for value, n in zip(self.categories, counts)}
+
+    def group_sum(self, weights: np.ndarray) -> Dict[Any, float]:
+        """Sum of weights per value, in first-seen order."""
+        sums = np.bincount(self.codes, weights=weights, minlength=len(self.categories))
+        return {value: float(total) for value, total in zip(self.categories, sums)}
+
+
+def _money(value: float) -> float:
+    return round(float(value), 2)
+
+
+def _by_value_desc(groups: Dict[Any, float]) -> Dict[Any, float]:
+    return dict(sorted(groups.items(), key=lambda item: item[1], reverse=True))
+
+
+class AnalyticsStore:
+    """Columnar snapshot of the clinic's patients, appointments and invoices."""
+
+    def __init__(
+        self,
+        patients: Sequence[Dict[str, Any]],
+        appointments: Sequence[Dict[str, Any]],
+        invoices: Sequence[Dict[str, Any]],
+    ):
+        """
+        Build the columns.
+
+        Args:
+            patients: Patient records (registration_date, last_visit, insurance_provider, outstanding_balance)
+            appointments: Appointment records (date, status, treatment_type)
+            invoices: Invoice records (patient_id, issue_date, treatment, status and amounts)
+
+        Snapshot tables are read a column at a time (see mock_snapshot.field_values).
+        """
+        # Patients
+        self.patient_count = len(patients)
+        self.patient_registered = day_column(field_values(patients, "registration_date"))
+        self.patient_last_visit = day_column(field_values(patients, "last_visit"))
+        self.patient_outstanding = np.array([v or 0 for v in field_values(patients, "outstanding_balance")], dtype=np.float64)
+        self.patient_insurance = Categorical(str(v) for v in field_values(patients, "insurance_provider"))
+
+        # Appointments
+        self.appointment_count = len(appointments)
+        self.appointment_day = day_column(field_values(appointments, "date"))
+        self.appointment_status = Categorical(field_values(appointments, "status"))
+        self.appointment_treatment = Categorical(field_values(appointments, "treatment_type"))
+
+        # Invoices
+        self.invoice_count = len(invoices)
+        self.invoice_patient_ids, patient_codes = np.unique(
+            np.array(field_values(invoices, "patient_id"), dtype=np.int64), return_inverse=True
+        )  # Distinct patient IDs (sorted), and each invoice's index into them
+        self.invoice_patient = patient_codes.astype(np.intp)
+        issue_days = np.array(field_values(invoices, "issue_date"), dtype="datetime64[D]")
+        months = issue_days.astype("datetime64[M]")
+        self.invoice_month_codes, self.invoice_months = self._encode_months(months)
+        self.invoice_status = Categorical(field_values(invoices, "status"))
+        self.invoice_treatment = Categorical(field_values(invoices, "treatment"))
+        self.invoice_total = np.array(field_values(invoices, "total_amount"), dtype=np.float64)
+        self.invoice_paid = np.array(field_values(invoices, "paid_amount"), dtype=np.float64)
+        self.invoice_outstanding = np.array(field_values(invoices, "outstanding_amount"), dtype=np.float64)
+
+    @staticmethod
+    def _encode_months(months: np.ndarray) -> Tuple[np.ndarray, List[str]]:
+        distinct, codes = np.unique(months, return_inverse=True)
+        return codes.astype(np.intp), [str(month) for month in distinct]  # "YYYY-MM", sorted
+
+    @classmethod
+    def from_client(cls, client) -> "AnalyticsStore":
+        """Snapshot of a RealisticMockOdooClient's data."""
+        return cls(client.patients, client.appointments, client.invoices)
+
+    # Aggregates independent of the current date (computed once per snapshot)
+
+    @cached_property
+    def _overview(self) -> Dict[str, Any]:
+        return {
+            "total_patients": self.patient_count,
+            "total_appointments": self.appointment_count,
+            "completed_appointments": self.appointment_status.count("completed"),
+            "scheduled_appointments": self.appointment_status.count("scheduled"),
+            "total_revenue": _money(self.invoice_total.sum()),
+            "outstanding_balance": _money(self.invoice_outstanding.sum()),
+            "total_invoices": self.invoice_count,
+            "paid_invoices": self.invoice_status.count("paid"),
+            "unpaid_invoices": self.invoice_status.count("unpaid"),
+        }
+
+    @cached_property
+    def _revenue(self) -> Dict[str, Any]:
+        total_revenue = self._overview["total_revenue"]
+        paid_amount = _money(self.invoice_paid.sum())
+        by_treatment = self.invoice_treatment.group_sum(self.invoice_total)
+        by_month = np.bincount(self.invoice_month_codes, weights=self.invoice_total, minlength=len(self.invoice_months))
+        return {
+            "total_revenue": total_revenue,
+            "paid_amount": paid_amount,
+            "outstanding_balance": self._overview["outstanding_balance"],
+            "collection_rate": round(paid_amount / total_revenue * 100, 1) if total_revenue > 0 else 0,
+            "revenue_by_treatment": {t: _money(v) for t, v in _by_value_desc(by_treatment).items()},
+            "monthly_revenue": {month: _money(v) for month, v in zip(self.invoice_months, by_month)},
+        }
+
+    @cached_property
+    def patient_revenue(self) -> np.ndarray:
+        """Invoiced total per entry of invoice_patient_ids."""
+        return np.bincount(self.invoice_patient, weights=self.invoice_total, minlength=len(self.invoice_patient_ids))
+
+    @cached_property
+    def _appointment_groups(self) -> Dict[str, Any]:
+        return {
+            "status_distribution": self.appointment_status.group_count(),
+            "treatment_type_distribution": _by_value_desc(self.appointment_treatment.group_count()),
+        }
+
+    @cached_property
+    def _patient_groups(self) -> Dict[str, Any]:
+        return {
+            "patients_with_outstanding_balance": int(np.count_nonzero(self.patient_outstanding > 0)),
+            "insurance_distribution": self.patient_insurance.group_count(),
+        }
+
+    # Dashboard queries
+
+    def overview(self) -> Dict[str, Any]:
+        """Totals and status counts (RealisticMockOdooClient.get_statistics)."""
+        return dict(self._overview)
+
+    def patient_statistics(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """New, active and owing patients, and patients per insurance provider."""
+        today_day = to_day(today or date.today())
+        return {
+            "total_patients": self.patient_count,
+            "new_patients_30d": int(np.count_nonzero(self.patient_registered >= today_day - 30)),
+            "active_patients_90d": int(np.count_nonzero(self.patient_last_visit >= today_day - 90)),
+            **self._patient_groups,
+        }
+
+    def appointment_statistics(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """Appointments per status and treatment, and scheduled appointments in the next 7 days."""
+        today_day = to_day(today or date.today())
+        next_week = (self.appointment_day >= today_day) & (self.appointment_day <= today_day + 7)
+        groups = self._appointment_groups
+        return {
+            "total_appointments": self.appointment_count,
+            "status_distribution": groups["status_distribution"],
+            "upcoming_appointments_7d": self.appointment_status.count("scheduled", next_week),
+            "treatment_type_distribution": groups["treatment_type_distribution"],
+        }
+
+    def revenue_statistics(self) -> Dict[str, Any]:
+        """Revenue totals, revenue per treatment (highest first) and per month."""
+        return dict(self._revenue)
+
+    def top_patients(self, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Patients with the highest invoiced total.
+
+        Args:
+            limit: Number of patients
+
+        Returns:
+            (patient ID, revenue) pairs, highest first (ties by patient ID)
+        """
+        if limit <= 0 or not self.invoice_count:
+            return []
+        patient_ids = self.invoice_patient_ids
+        revenue = self.patient_revenue
+        if limit < len(revenue):
+            candidates = np.argpartition(-revenue, limit - 1)[:limit]
+            # Include every patient tied with the last place, then order exactly
+            candidates = np.flatnonzero(revenue >= revenue[candidates].min())
+        else:
+            candidates = np.arange(len(revenue))
+        order = candidates[np.lexsort((patient_ids[candidates], -revenue[candidates]))][:limit]
+        return [(int(patient_ids[i]), _money(revenue[i])) for i in order]
@@ -0,0 +1,234 @@
+"""
+Appointment Availability Index
+
+Booked time per (day, dentist) kept as a bitmap with one bit per minute:
+- Appointments block [start, start + duration_minutes), so overlaps are
+  detected for any start time and length, not only exact slot matches
+- Adding or cancelling an appointment only touches its own day
+- Free slot starts for a whole day come from a handful of big-integer
+  operations, so a week of availability costs the same however many
+  appointments the clinic has on record
+"""
+
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+
+# Appointment statuses that occupy the dentist's time
+BLOCKING_STATUSES = frozenset({"scheduled"})
+
+
+@dataclass(frozen=True)
+class ClinicHours:
+    """Opening hours and slot grid."""
+
+    open_minute: int = 8 * 60
+    close_minute: int = 18 * 60
+    slot_minutes: int = 30
+    workdays: FrozenSet[int] = frozenset({0, 1, 2, 3, 4})  # date.weekday(), Monday = 0
+
+    def slot_starts(self, duration_minutes: int) -> int:
+        """Bitmap of the slot start minutes at which an appointment fits before closing."""
+        starts = 0
+        for minute in range(self.open_minute, self.close_minute - duration_minutes + 1, self.slot_minutes):
+            starts |= 1 << minute
+        return starts
+
+
+def _minute_mask(start_minute: int, duration_minutes: int) -> int:
+    """Bitmap of [start_minute, start_minute + duration_minutes), clipped to the day."""
+    end_minute = min(start_minute + duration_minutes, 24 * 60)
+    if end_minute <= start_minute:
+        return 0
+    return ((1 << (end_minute - start_minute)) - 1) << start_minute
+
+
+def _start_minute(time: str) -> int:
+    """Minute of the day of an "HH:MM" (or "HH:MM:SS") time."""
+    hour, minute = map(int, time.split(":")[:2])
+    return hour * 60 + minute
+
+
+def _busy_within(booked: int, duration_minutes: int) -> int:
+    """Bitmap of start minutes s for which [s, s + duration_minutes) hits a booked minute."""
+    # OR of booked >> k for k in [0, duration), with O(log duration) shifts
+    busy = booked
+    span = 1
+    while span * 2 <= duration_minutes:
+        busy |= busy >> span
+        span *= 2
+    if duration_minutes > span:
+        busy |= busy >> (duration_minutes - span)
+    return busy
+
+
+def _bits(mask: int) -> Iterator[int]:
+    """Positions of the set bits, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class AvailabilityIndex:
+    """Per-day, per-dentist bitmaps of booked minutes."""
+
+    def __init__(self, dentists: Sequence[str], hours: ClinicHours = ClinicHours()):
+        """
+        Initialize availability index.
+
+        Args:
+            dentists: Dentists whose calendars are tracked
+            hours: Clinic hours and slot grid
+        """
+        self.dentists = list(dentists)
+        self.hours = hours
+        self._booked: Dict[Tuple[date, str], int] = {}
+        self._masks_by_day: Dict[Tuple[date, str], Dict[int, int]] = {}
+        self._key_by_id: Dict[int, Tuple[date, str]] = {}
+        self._slot_starts: Dict[int, int] = {}
+
+    def add(self, appointment: Dict[str, Any]):
+        """
+        Book an appointment's time (ignored unless its status blocks the calendar).
+
+        Args:
+            appointment: Appointment with id, date, time, duration_minutes, dentist and status
+        """
+        if appointment.get("status") not in BLOCKING_STATUSES:
+            return
+        self.remove(appointment["id"])
+
+        dentist = appointment["dentist"]
+        if dentist not in self.dentists:
+            self.dentists.append(dentist)
+
+        mask = _minute_mask(_start_minute(appointment["time"]), int(appointment.get("duration_minutes", 60)))
+        key = (date.fromisoformat(appointment["date"]), dentist)
+
+        self._masks_by_day.setdefault(key, {})[appointment["id"]] = mask
+        self._booked[key] = self._booked.get(key, 0) | mask
+        self._key_by_id[appointment["id"]] = key
+
+    def remove(self, appointment_id: int) -> bool:
+        """
+        Free an appointment's time.
+
+        Args:
+            appointment_id: Appointment ID
+
+        Returns:
+            True if the appointment was booked in the index
+        """
+        key = self._key_by_id.pop(appointment_id, None)
+        if key is None:
+            return False
+
+        masks = self._masks_by_day[key]
+        del masks[appointment_id]
+        # Rebuild from the day's other appointments - they may overlap the removed one
+        booked = 0
+        for mask in masks.values():
+            booked |= mask
+        if booked:
+            self._booked[key] = booked
+        else:
+            del self._booked[key]
+            del self._masks_by_day[key]
+        return True
+
+    def free_dentists(
+        self,
+        day: date,
+        time: str,
+        duration_minutes: int,
+        dentist: Optional[str] = None,
+    ) -> List[str]:
+        """
+        Dentists with nothing booked in [time, time + duration_minutes) on a day.
+
+        Args:
+            day: Day of the appointment
+            time: Start time ("HH:MM")
+            duration_minutes: Length of the appointment
+            dentist: Only check this dentist (all dentists when None)
+
+        Returns:
+            Free dentists, in index order
+        """
+        mask = _minute_mask(_start_minute(time), duration_minutes)
+        dentists = [dentist] if dentist is not None else self.dentists
+        return [name for name in dentists if not self._booked.get((day, name), 0) & mask]
+
+    def _starts(self, duration_minutes: int) -> int:
+        starts = self._slot_starts.get(duration_minutes)
+        if starts is None:
+            starts = self._slot_starts[duration_minutes] = self.hours.slot_starts(duration_minutes)
+        return starts
+
+    @staticmethod
+    def _first_minute(day: date, not_before: datetime) -> int:
+        """First minute of `day` at or after not_before."""
+        if day < not_before.date():
+            return 24 * 60
+        minute = not_before.hour * 60 + not_before.minute
+        return minute + 1 if not_before.second or not_before.microsecond else minute
+
+    def free_slots(
+        self,
+        date_from: date,
+        date_to: date,
+        duration_minutes: int = 30,
+        dentist: Optional[str] = None,
+        not_before: Optional[datetime] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Slots in which at least one dentist is free for the whole duration.
+
+        Args:
+            date_from: First day (inclusive)
+            date_to: Last day (inclusive)
+            duration_minutes: Length of the appointment to fit
+            dentist: Only this dentist's calendar (all dentists when None)
+            not_before: Leave out slots starting before this time
+            limit: Maximum number of slots
+
+        Returns:
+            Slots in chronological order with date, time, datetime and free dentists
+        """
+        dentists = [dentist] if dentist is not None else self.dentists
+        starts = self._starts(duration_minutes)
+        slots: List[Dict[str, Any]] = []
+
+        day = date_from
+        while day <= date_to and (limit is None or len(slots) < limit):
+            if day.weekday() in self.hours.workdays:
+                day_starts = starts
+                if not_before is not None and day <= not_before.date():
+                    day_starts &= ~((1 << self._first_minute(day, not_before)) - 1)
+
+                free_by_dentist = {
+                    name: day_starts & ~_busy_within(self._booked.get((day, name), 0), duration_minutes)
+                    for name in dentists
+                }
+                any_free = 0
+                for free in free_by_dentist.values():
+                    any_free |= free
+
+                day_iso = day.isoformat()
+                for minute in _bits(any_free):
+                    slot_time = f"{minute // 60:02d}:{minute % 60:02d}"
+                    slots.append({
+                        "date": day_iso,
+                        "time": slot_time,
+                        "datetime": f"{day_iso}T{slot_time}:00",
+                        "available": True,
+                        "dentists": [name for name, free in free_by_dentist.items() if free >> minute & 1],
+                    })
+                    if limit is not None and len(slots) >= limit:
+                        break
+            day += timedelta(days=1)
+
+        return slots
@@ -2,38 +2,122 @@
 Realistic Mock Odoo Service with 1500+ Patients
 
 This provides the same interface as the real Odoo client but with realistic mock data.
-Loads data from JSON files generated by generate_mock_data.py
+Loads data from JSON files generated by generate_mock_data.py, or from a
+memory-mapped binary snapshot of them (data/snapshot, written by
+scripts/build_mock_snapshot.py) when one is present and up to date.
+Patients, appointments and invoices are kept as compact slot records
+(mock_records) that still read like the dicts they replaced.
 """
 
 import json
+import logging
 import os
-from typing import List, Dict, Any, Optional
-from datetime import datetime, timedelta
+import threading
+from time import monotonic
+from typing import Callable, List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
 from pathlib import Path
 
+from app.integrations.analytics_store import AnalyticsStore
+from app.integrations.availability import AvailabilityIndex
+from app.integrations.mock_records import Appointment, Invoice, Patient, to_ordinal
+from app.integrations.mock_snapshot import (
+    META_FILE, field_values, group_by, index_by, open_snapshot, project,
+)
+from app.integrations.patient_index import PatientSearchIndex
+from app.integrations.statistics_aggregates import StatisticsAggregates
+
+
+logger = logging.getLogger(__name__)
+
 
 class RealisticMockOdooClient:
     """Mock Odoo client with realistic data from JSON files."""
     
-    def __init__(self):
-        """Initialize mock client and load data from JSON files."""
+    # Data attributes populated by _ensure_loaded() on first access
+    _LAZY_ATTRIBUTES = frozenset({
+        "patients", "appointments", "invoices", "treatment_records",
+        "patients_by_id", "appointments_by_patient", "appointments_by_id",
+        "invoices_by_patient", "invoices_by_id", "records_by_patient",
+        "availability", "patient_search",
+    })
+    
+    # Fixture file of each table
+    _DATA_FILES = {
+        "patients": "mock_patients.json",
+        "appointments": "mock_appointments.json",
+        "invoices": "mock_invoices.json",
+        "treatment_records": "mock_treatment_records.json",
+    }
+    
+    # Record type of each table (treatment records stay dicts)
+    _RECORD_TYPES = {"patients": Patient, "appointments": Appointment, "invoices": Invoice}
+    
+    def __init__(self, statistics_check_interval: float = 300.0):
+        """
+        Initialize mock client. Data is loaded from the snapshot or JSON files on first use.
+        
+        Args:
+            statistics_check_interval: Seconds between full rebuilds that verify the statistics aggregates
+        """
         self.data_dir = Path(__file__).parent.parent.parent / "data"
+        self._loaded = False
+        self._load_lock = threading.Lock()
+        self._write_lock = threading.RLock()
         
-        # Load data from JSON files
-        self.patients = self._load_json("mock_patients.json")
-        self.appointments = self._load_json("mock_appointments.json")
-        self.invoices = self._load_json("mock_invoices.json")
-        self.treatment_records = self._load_json("mock_treatment_records.json")
+        # Columnar snapshot, rebuilt after writes
+        self._data_version = 0
+        self._analytics: Optional[AnalyticsStore] = None
+        self._analytics_version = -1
+        self._analytics_lock = threading.Lock()
         
-        # Create indexes for faster lookups
-        self._create_indexes()
+        # Dashboard aggregates, updated by writes and checked against a full rebuild
+        self._statistics: Optional[StatisticsAggregates] = None
+        self.statistics_check_interval = statistics_check_interval
+        self._last_statistics_check = 0.0
+        self._statistics_check_lock = threading.Lock()
+    
+    def __getattr__(self, name: str):
+        """Load the JSON data the first time one of the data attributes is read."""
+        if name in self._LAZY_ATTRIBUTES and not self.__dict__.get("_loaded", True):
+            self._ensure_loaded()
+            return self.__dict__[name]
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+    
+    def _ensure_loaded(self):
+        """Load data from the snapshot or JSON files and build indexes (once)."""
+        with self._load_lock:
+            if self._loaded:
+                return
+            
+            snapshot = self._load_snapshot()
+            if snapshot is not None:
+                source = "snapshot"
+                for table in self._DATA_FILES:
+                    setattr(self, table, snapshot.get(table, []))
+            else:
+                source = "JSON"
+                for table, filename in self._DATA_FILES.items():
+                    records = self._load_json(filename)
+                    record_type = self._RECORD_TYPES.get(table)
+                    if record_type is not None:
+                        records = [record_type.from_dict(record) for record in records]
+                    setattr(self, table, records)
+            
+            # Create indexes for faster lookups
+            self._create_indexes()
+            self._loaded = True
         
-        print(f"✅ Loaded realistic mock data:")
+        print(f"✅ Loaded realistic mock data ({source}):")
         print(f"   - {len(self.patients)} patients")
         print(f"   - {len(self.appointments)} appointments")
         print(f"   - {len(self.invoices)} invoices")
         print(f"   - {len(self.treatment_records)} treatment records")
     
+    def warm_up(self):
+        """Load the mock data now instead of on the first request."""
+        self._ensure_loaded()
+    
     def _load_json(self, filename: str) -> List[Dict[str, Any]]:
         """Load data from JSON file."""
         filepath = self.data_dir / filename
@@ -44,40 +128,49 @@ class RealisticMockOdooClient:
         with open(filepath, 'r', encoding='utf-8') as f:
             return json.load(f)
     
+    def _load_snapshot(self):
+        """Map data/snapshot, unless it is missing or older than a JSON file."""
+        snapshot_dir = self.data_dir / "snapshot"
+        meta = snapshot_dir / META_FILE
+        if not meta.exists():
+            return None
+        
+        written = meta.stat().st_mtime
+        for filename in self._DATA_FILES.values():
+            filepath = self.data_dir / filename
+            if filepath.exists() and filepath.stat().st_mtime > written:
+                logger.warning(f"Mock snapshot is older than {filename}, loading the JSON files")
+                return None
+        record_types = {table: record_type.from_dict for table, record_type in self._RECORD_TYPES.items()}
+        return open_snapshot(snapshot_dir, record_types)
+    
     def _create_indexes(self):
-        """Create indexes for faster lookups."""
+        """Create indexes for faster lookups (key arrays instead of dicts for snapshot tables)."""
         # Patient index by ID
-        self.patients_by_id = {p["id"]: p for p in self.patients}
+        self.patients_by_id = index_by(self.patients)
         
-        # Appointments by patient ID
-        self.appointments_by_patient = {}
-        for appt in self.appointments:
-            patient_id = appt["patient_id"]
-            if patient_id not in self.appointments_by_patient:
-                self.appointments_by_patient[patient_id] = []
-            self.appointments_by_patient[patient_id].append(appt)
+        # Patient search by name and phone
+        self.patient_search = PatientSearchIndex()
+        for patient in project(self.patients, ("id", "name", "phone")):
+            self.patient_search.add(patient)
         
-        # Appointments by ID
-        self.appointments_by_id = {a["id"]: a for a in self.appointments}
+        # Appointments by patient ID, and by ID
+        self.appointments_by_patient = group_by(self.appointments, "patient_id")
+        self.appointments_by_id = index_by(self.appointments)
         
-        # Invoices by patient ID
-        self.invoices_by_patient = {}
-        for inv in self.invoices:
-            patient_id = inv["patient_id"]
-            if patient_id not in self.invoices_by_patient:
-                self.invoices_by_patient[patient_id] = []
-            self.invoices_by_patient[patient_id].append(inv)
+        # Booked time per day and dentist
+        dentists = sorted(set(field_values(self.appointments, "dentist"))) or ["Dr. Smith"]
+        self.availability = AvailabilityIndex(dentists)
+        fields = ("id", "date", "time", "duration_minutes", "dentist", "status")
+        for appt in project(self.appointments, fields):
+            self.availability.add(appt)
         
-        # Invoices by ID
-        self.invoices_by_id = {i["id"]: i for i in self.invoices}
+        # Invoices by patient ID, and by ID
+        self.invoices_by_patient = group_by(self.invoices, "patient_id")
+        self.invoices_by_id = index_by(self.invoices)
         
         # Treatment records by patient ID
-        self.records_by_patient = {}
-        for record in self.treatment_records:
-            patient_id = record["patient_id"]
-            if patient_id not in self.records_by_patient:
-                self.records_by_patient[patient_id] = []
-            self.records_by_patient[patient_id].append(record)
+        self.records_by_patient = group_by(self.treatment_records, "patient_id")
     
     def authenticate(self) -> bool:
         """Mock authentication - always succeeds."""
@@ -85,46 +178,49 @@ class RealisticMockOdooClient:
     
     # Patient Management
     
-    def search_patients(self, name: Optional[str] = None, phone: Optional[str] = None) -> List[int]:
-        """Search for patients by name or phone."""
-        results = []
-        
-        for patient in self.patients:
-            if name and name.lower() in patient["name"].lower():
-                results.append(patient["id"])
-            elif phone and phone in patient["phone"]:
-                results.append(patient["id"])
+    def search_patients(self, name: Optional[str] = None, phone: Optional[str] = None,
+                        fuzzy: bool = False) -> List[int]:
+        """
+        Search for patients by name or phone.
         
+        Args:
+            name: Part of the patient's name (Hebrew or English)
+            phone: Phone number in any common format, or part of one
+            fuzzy: If nothing matches exactly, return the closest names instead
+            
+        Returns:
+            List of patient IDs
+        """
+        results = self.patient_search.search(name=name, phone=phone)
+        if not results and fuzzy and name:
+            results = [patient_id for patient_id, _ in self.patient_search.fuzzy_search(name)]
         return results
     
-    def get_patient(self, patient_id: int) -> Optional[Dict[str, Any]]:
+    def get_patient(self, patient_id: int) -> Optional[Patient]:
         """Get patient details by ID."""
         return self.patients_by_id.get(patient_id)
     
     def create_patient(self, name: str, email: Optional[str] = None, 
                       phone: Optional[str] = None) -> int:
         """Create a new patient."""
-        patient_id = len(self.patients) + 1
-        patient = {
-            "id": patient_id,
-            "name": name,
-            "email": email,
-            "phone": phone,
-            "birth_date": None,
-            "registration_date": datetime.now().strftime("%Y-%m-%d"),
-            "address": None,
-            "insurance_provider": None,
-            "insurance_number": None,
-            "emergency_contact": None,
-            "allergies": "None",
-            "medical_conditions": "None",
-            "last_visit": None,
-            "total_visits": 0,
-            "outstanding_balance": 0,
-        }
-        self.patients.append(patient)
-        self.patients_by_id[patient_id] = patient
-        return patient_id
+        with self._write_lock:
+            patient_id = len(self.patients) + 1
+            patient = Patient(
+                id=patient_id,
+                name=name,
+                email=email,
+                phone=phone,
+                registration_date=datetime.now().strftime("%Y-%m-%d"),
+                allergies="None",
+                medical_conditions="None",
+                total_visits=0,
+                outstanding_balance=0,
+            )
+            self.patients.append(patient)
+            self.patients_by_id[patient_id] = patient
+            self.patient_search.add(patient)
+            self._changed(lambda statistics: statistics.patient_added(patient))
+            return patient_id
     
     # Appointment Management
     
@@ -141,23 +237,27 @@ class RealisticMockOdooClient:
         else:
             appointments = self.appointments
         
+        # Compare day ordinals, not ISO strings
+        first_day = to_ordinal(date_from) if date_from else None
+        last_day = to_ordinal(date_to) if date_to else None
+        
         results = []
         for appt in appointments:
             # Filter by date range
-            if date_from and appt["date"] < date_from:
+            if first_day is not None and appt.date < first_day:
                 continue
-            if date_to and appt["date"] > date_to:
+            if last_day is not None and appt.date > last_day:
                 continue
             
             # Filter by status
-            if status and appt["status"] != status:
+            if status and appt.status != status:
                 continue
             
-            results.append(appt["id"])
+            results.append(appt.id)
         
         return results
     
-    def get_appointment(self, appointment_id: int) -> Optional[Dict[str, Any]]:
+    def get_appointment(self, appointment_id: int) -> Optional[Appointment]:
         """Get appointment details by ID."""
         return self.appointments_by_id.get(appointment_id)
     
@@ -168,80 +268,110 @@ class RealisticMockOdooClient:
         time: str,
         treatment_type: str,
         duration_minutes: int = 60,
-    ) -> int:
-        """Create a new appointment."""
-        appointment_id = len(self.appointments) + 1
-        patient = self.patients_by_id.get(patient_id)
-        
-        appointment = {
-            "id": appointment_id,
-            "patient_id": patient_id,
-            "patient_name": patient["name"] if patient else "Unknown",
-            "date": date,
-            "time": time,
-            "datetime": f"{date}T{time}:00",
-            "treatment_type": treatment_type,
-            "duration_minutes": duration_minutes,
-            "dentist": "Dr. Smith",
-            "status": "scheduled",
-            "notes": "",
-            "created_at": datetime.now().isoformat(),
-        }
-        
-        self.appointments.append(appointment)
-        self.appointments_by_id[appointment_id] = appointment
+        dentist: Optional[str] = None,
+        notes: str = "",
+    ) -> Optional[int]:
+        """
+        Create a new appointment.
         
-        if patient_id not in self.appointments_by_patient:
-            self.appointments_by_patient[patient_id] = []
-        self.appointments_by_patient[patient_id].append(appointment)
-        
-        return appointment_id
+        Args:
+            patient_id: Patient ID
+            date: Day ("YYYY-MM-DD")
+            time: Start time ("HH:MM")
+            treatment_type: Treatment
+            duration_minutes: Length of the appointment
+            dentist: Dentist to book (the first free one when None)
+            notes: Free-text notes about the appointment
+            
+        Returns:
+            New appointment ID, or None if the time overlaps a booking of
+            the requested dentist (of every dentist when None)
+        """
+        with self._write_lock:
+            free = self.availability.free_dentists(self._as_date(date), time, duration_minutes, dentist)
+            if not free:
+                logger.info(f"Appointment not created, {date} {time} is booked for {dentist or 'every dentist'}")
+                return None
+            dentist = free[0]
+            
+            appointment_id = len(self.appointments) + 1
+            patient = self.patients_by_id.get(patient_id)
+            
+            appointment = Appointment(
+                id=appointment_id,
+                patient_id=patient_id,
+                patient_name=patient["name"] if patient else "Unknown",
+                date=date,
+                time=time,
+                datetime=f"{date}T{time}:00",
+                treatment_type=treatment_type,
+                duration_minutes=duration_minutes,
+                dentist=dentist,
+                status="scheduled",
+                notes=notes,
+                created_at=datetime.now().isoformat(),
+            )
+            
+            self.appointments.append(appointment)
+            self.appointments_by_id[appointment_id] = appointment
+            self.availability.add(appointment)
+            
+            if patient_id not in self.appointments_by_patient:
+                self.appointments_by_patient[patient_id] = []
+            self.appointments_by_patient[patient_id].append(appointment)
+            self._changed(lambda statistics: statistics.appointment_added(appointment))
+            
+            return appointment_id
     
     def cancel_appointment(self, appointment_id: int) -> bool:
         """Cancel an appointment."""
-        appointment = self.appointments_by_id.get(appointment_id)
-        if appointment:
-            appointment["status"] = "cancelled"
-            return True
-        return False
+        with self._write_lock:
+            appointment = self.appointments_by_id.get(appointment_id)
+            if appointment:
+                old_status = appointment["status"]
+                appointment["status"] = "cancelled"
+                self.availability.remove(appointment_id)
+                self._changed(lambda statistics: statistics.appointment_status_changed(appointment, old_status))
+                return True
+            return False
     
     def get_available_slots(
         self,
-        date_from: str,
-        date_to: str,
+        date_from,
+        date_to,
+        duration_minutes: int = 30,
+        dentist: Optional[str] = None,
     ) -> List[Dict[str, Any]]:
-        """Get available appointment slots."""
-        # Generate available slots (simplified)
-        slots = []
-        current_date = datetime.strptime(date_from, "%Y-%m-%d")
-        end_date = datetime.strptime(date_to, "%Y-%m-%d")
+        """
+        Get available appointment slots.
         
-        while current_date <= end_date:
-            # Skip weekends
-            if current_date.weekday() < 5:  # Monday-Friday
-                # Generate slots from 8 AM to 6 PM
-                for hour in range(8, 18):
-                    for minute in [0, 30]:
-                        slot_time = current_date.replace(hour=hour, minute=minute)
-                        
-                        # Check if slot is already booked
-                        is_booked = any(
-                            appt["datetime"] == slot_time.isoformat()
-                            for appt in self.appointments
-                            if appt["status"] == "scheduled"
-                        )
-                        
-                        if not is_booked:
-                            slots.append({
-                                "date": current_date.strftime("%Y-%m-%d"),
-                                "time": slot_time.strftime("%H:%M"),
-                                "datetime": slot_time.isoformat(),
-                                "available": True,
-                            })
+        Args:
+            date_from: First day ("YYYY-MM-DD"), or a datetime to leave out earlier slots
+            date_to: Last day ("YYYY-MM-DD", date or datetime), inclusive
+            duration_minutes: Length of the appointment to fit
+            dentist: Only this dentist's calendar (any dentist when None)
             
-            current_date += timedelta(days=1)
-        
-        return slots[:50]  # Return first 50 available slots
+        Returns:
+            First 50 free slots, with the dentists free in each
+        """
+        not_before = date_from if isinstance(date_from, datetime) else None
+        return self.availability.free_slots(
+            self._as_date(date_from),
+            self._as_date(date_to),
+            duration_minutes=duration_minutes,
+            dentist=dentist,
+            not_before=not_before,
+            limit=50,
+        )
+    
+    @staticmethod
+    def _as_date(value) -> date:
+        """Day of a "YYYY-MM-DD" string, date or datetime."""
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        return datetime.strptime(value, "%Y-%m-%d").date()
     
     # Invoice Management
     
@@ -258,16 +388,20 @@ class RealisticMockOdooClient:
         
         results = []
         for inv in invoices:
-            if status and inv["status"] != status:
+            if status and inv.status != status:
                 continue
-            results.append(inv["id"])
+            results.append(inv.id)
         
         return results
     
-    def get_invoice(self, invoice_id: int) -> Optional[Dict[str, Any]]:
+    def get_invoice(self, invoice_id: int) -> Optional[Invoice]:
         """Get invoice details by ID."""
         return self.invoices_by_id.get(invoice_id)
     
+    def get_patient_invoices(self, patient_id: int) -> List[Invoice]:
+        """Get all invoices of a patient."""
+        return self.invoices_by_patient.get(patient_id, [])
+    
     def create_invoice(
         self,
         patient_id: int,
@@ -276,38 +410,40 @@ class RealisticMockOdooClient:
         amount: float,
     ) -> int:
         """Create a new invoice."""
-        invoice_id = len(self.invoices) + 1
-        patient = self.patients_by_id.get(patient_id)
-        
-        issue_date = datetime.now()
-        due_date = issue_date + timedelta(days=30)
-        
-        invoice = {
-            "id": invoice_id,
-            "patient_id": patient_id,
-            "patient_name": patient["name"] if patient else "Unknown",
-            "appointment_id": appointment_id,
-            "issue_date": issue_date.strftime("%Y-%m-%d"),
-            "due_date": due_date.strftime("%Y-%m-%d"),
-            "treatment": treatment,
-            "total_amount": amount,
-            "insurance_amount": 0,
-            "patient_amount": amount,
-            "paid_amount": 0,
-            "outstanding_amount": amount,
-            "status": "unpaid",
-            "payment_method": None,
-            "invoice_number": f"INV-{issue_date.year}-{invoice_id:05d}",
-        }
-        
-        self.invoices.append(invoice)
-        self.invoices_by_id[invoice_id] = invoice
-        
-        if patient_id not in self.invoices_by_patient:
-            self.invoices_by_patient[patient_id] = []
-        self.invoices_by_patient[patient_id].append(invoice)
-        
-        return invoice_id
+        with self._write_lock:
+            invoice_id = len(self.invoices) + 1
+            patient = self.patients_by_id.get(patient_id)
+            
+            issue_date = datetime.now()
+            due_date = issue_date + timedelta(days=30)
+            
+            invoice = Invoice(
+                id=invoice_id,
+                patient_id=patient_id,
+                patient_name=patient["name"] if patient else "Unknown",
+                appointment_id=appointment_id,
+                issue_date=issue_date.strftime("%Y-%m-%d"),
+                due_date=due_date.strftime("%Y-%m-%d"),
+                treatment=treatment,
+                total_amount=amount,
+                insurance_amount=0,
+                patient_amount=amount,
+                paid_amount=0,
+                outstanding_amount=amount,
+                status="unpaid",
+                payment_method=None,
+                invoice_number=f"INV-{issue_date.year}-{invoice_id:05d}",
+            )
+            
+            self.invoices.append(invoice)
+            self.invoices_by_id[invoice_id] = invoice
+            
+            if patient_id not in self.invoices_by_patient:
+                self.invoices_by_patient[patient_id] = []
+            self.invoices_by_patient[patient_id].append(invoice)
+            self._changed(lambda statistics: statistics.invoice_added(invoice))
+            
+            return invoice_id
     
     # Treatment Records
     
@@ -317,22 +453,64 @@ class RealisticMockOdooClient:
     
     # Statistics
     
+    def analytics(self) -> AnalyticsStore:
+        """Columnar snapshot of patients, appointments and invoices (rebuilt after writes)."""
+        store, version = self._analytics, self._data_version
+        if store is not None and self._analytics_version == version:
+            return store
+        with self._analytics_lock:
+            if self._analytics is None or self._analytics_version != self._data_version:
+                version = self._data_version
+                self._analytics = AnalyticsStore.from_client(self)
+                self._analytics_version = version
+            return self._analytics
+    
+    def _changed(self, update: Callable[[StatisticsAggregates], None]):
+        """Record a write (called with the write lock held)."""
+        self._data_version += 1
+        if self._statistics is not None:
+            update(self._statistics)
+    
+    def statistics(self) -> StatisticsAggregates:
+        """Dashboard aggregates, built on first use and then kept up to date by writes."""
+        if self._statistics is None:
+            with self._write_lock:
+                if self._statistics is None:
+                    self._statistics = StatisticsAggregates.from_store(self.analytics())
+                    self._last_statistics_check = monotonic()
+        elif monotonic() - self._last_statistics_check >= self.statistics_check_interval:
+            self._last_statistics_check = monotonic()
+            threading.Thread(target=self.check_statistics, name="statistics-check", daemon=True).start()
+        return self._statistics
+    
+    def check_statistics(self) -> List[str]:
+        """
+        Rebuild the aggregates from the records and replace the maintained ones if they drifted.
+        
+        Returns:
+            Names of the statistics that differed (empty when consistent, or when
+            writes during the rebuild made the comparison meaningless)
+        """
+        if not self._statistics_check_lock.acquire(blocking=False):
+            return []
+        try:
+            version = self._data_version
+            rebuilt = StatisticsAggregates.from_store(AnalyticsStore.from_client(self))
+            with self._write_lock:
+                self._last_statistics_check = monotonic()
+                if self._data_version != version or self._statistics is None:
+                    return []
+                differences = rebuilt.differences(self._statistics)
+                if differences:
+                    logger.warning(f"Statistics aggregates drifted ({', '.join(differences)}), replaced by a full rebuild")
+                    self._statistics = rebuilt
+                return differences
+        finally:
+            self._statistics_check_lock.release()
+    
     def get_statistics(self) -> Dict[str, Any]:
         """Get clinic statistics."""
-        total_revenue = sum(inv["total_amount"] for inv in self.invoices)
-        outstanding_balance = sum(inv["outstanding_amount"] for inv in self.invoices)
-        
-        return {
-            "total_patients": len(self.patients),
-            "total_appointments": len(self.appointments),
-            "completed_appointments": len([a for a in self.appointments if a["status"] == "completed"]),
-            "scheduled_appointments": len([a for a in self.appointments if a["status"] == "scheduled"]),
-            "total_revenue": total_revenue,
-            "outstanding_balance": outstanding_balance,
-            "total_invoices": len(self.invoices),
-            "paid_invoices": len([i for i in self.invoices if i["status"] == "paid"]),
-            "unpaid_invoices": len([i for i in self.invoices if i["status"] == "unpaid"]),
-        }
+        return self.statistics().overview()
 
 
 # Create singleton instance
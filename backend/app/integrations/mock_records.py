@@ -0,0 +1,283 @@
+"""
+Compact Mock Records
+
+Typed records for the realistic mock's patients, appointments and
+invoices, instead of one dict (15 keys and a hash table) per record:
+- __slots__ classes: no per-record dict
+- Appointment and invoice status, and treatment, as enum members;
+  values outside the enums are kept as interned strings
+- Dates as day ordinals (date.toordinal()), one int object per day, so
+  date ranges compare integers: appointment.date >= to_ordinal("2025-03-01")
+- Repeated text (dentist, insurance provider, patient name on
+  appointments and invoices, ...) interned, one string per value;
+  amounts shared the same way (JSON parsing makes a new number object
+  per occurrence); E.164 phone numbers stored as integers
+- A dict view for existing callers: record["date"], get(), items(),
+  dict(record), to_dict() and == with dicts see the same keys and
+  values as the old dicts (ISO dates, plain status strings);
+  record["status"] = "cancelled" writes through
+- Records are mappings, not dicts: json.dumps() needs to_dict() or a
+  default= hook (as in odoo_cache); FastAPI's jsonable_encoder converts
+  them as it is
+Attributes hold the compact values (record.date is an ordinal,
+record.status an enum member).
+"""
+
+import re
+import sys
+from collections.abc import Mapping, MutableMapping
+from datetime import date, datetime
+from enum import Enum
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+
+class AppointmentStatus(str, Enum):
+    SCHEDULED = "scheduled"
+    COMPLETED = "completed"
+    CANCELLED = "cancelled"
+    NO_SHOW = "no-show"
+
+
+class InvoiceStatus(str, Enum):
+    PAID = "paid"
+    PARTIAL = "partial"
+    UNPAID = "unpaid"
+
+
+class Treatment(str, Enum):
+    CLEANING = "Cleaning"
+    FILLING = "Filling"
+    ROOT_CANAL = "Root Canal"
+    CROWN = "Crown"
+    EXTRACTION = "Extraction"
+    WHITENING = "Whitening"
+    IMPLANT = "Implant"
+    BRACES_CONSULTATION = "Braces Consultation"
+    X_RAY = "X-Ray"
+    EMERGENCY_VISIT = "Emergency Visit"
+
+
+# Field codecs: (encode for storage, decode for the dict view)
+
+_days: Dict[int, int] = {}
+
+
+@lru_cache(maxsize=None)
+def _iso_of(ordinal: int) -> str:
+    return date.fromordinal(ordinal).isoformat()
+
+
+def to_ordinal(value) -> Optional[int]:
+    """Day ordinal of a "YYYY-MM-DD" string, date or datetime (None stays None); equal days share one int."""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, datetime):
+        value = value.date()
+    elif isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    ordinal = value.toordinal()
+    return _days.setdefault(ordinal, ordinal)
+
+
+def _iso(ordinal: Optional[int]) -> Optional[str]:
+    return None if ordinal is None else _iso_of(ordinal)
+
+
+def _text(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+_numbers: Dict[Tuple[type, Any], Any] = {}
+MAX_SHARED_NUMBERS = 100_000
+
+
+def _number(value):
+    if type(value) not in (int, float):
+        return value
+    key = (type(value), value)  # Keeps 100 and 100.0 apart
+    shared = _numbers.get(key)
+    if shared is None:
+        if len(_numbers) >= MAX_SHARED_NUMBERS:
+            return value
+        shared = _numbers.setdefault(key, value)
+    return shared
+
+
+def _enum(enum: type) -> Tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+    members = enum._value2member_map_
+
+    def encode(value):
+        return members.get(value) or _text(value)
+
+    def decode(value):
+        return value.value if isinstance(value, enum) else value
+
+    return encode, decode
+
+
+_E164 = re.compile(r"\+[1-9]\d{6,14}")
+
+
+def _phone_number(value):
+    return int(value[1:]) if isinstance(value, str) and _E164.fullmatch(value) else value
+
+
+def _phone_text(value):
+    return f"+{value}" if isinstance(value, int) else value
+
+
+_DAY = (to_ordinal, _iso)
+_TEXT = (_text, None)
+_NUMBER = (_number, None)
+_PHONE = (_phone_number, _phone_text)
+
+
+class MockRecord(MutableMapping):
+    """Slots record with a dict view (see the module docstring)."""
+
+    __slots__ = ("_extra",)
+
+    FIELDS: Tuple[str, ...] = ()
+    CODECS: Dict[str, Tuple[Callable[[Any], Any], Optional[Callable[[Any], Any]]]] = {}
+    _FIELD_SET: frozenset = frozenset()
+    _ENCODE: Dict[str, Callable[[Any], Any]] = {}
+    _DECODE: Dict[str, Callable[[Any], Any]] = {}
+    _SETTERS: Tuple[Tuple[str, Callable[[Any, Any], None], Optional[Callable[[Any], Any]]], ...] = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._FIELD_SET = frozenset(cls.FIELDS)
+        cls._ENCODE = {field: codec[0] for field, codec in cls.CODECS.items()}
+        cls._DECODE = {field: codec[1] for field, codec in cls.CODECS.items() if codec[1] is not None}
+        # (field, slot setter, encoder) per field, for building records without per-key dispatch
+        cls._SETTERS = tuple((field, getattr(cls, field).__set__, cls._ENCODE.get(field)) for field in cls.FIELDS)
+
+    def __init__(self, **values: Any):
+        self._assign(values)
+
+    @classmethod
+    def from_dict(cls, data: Mapping) -> "MockRecord":
+        """Record of a dict (missing fields are None, unknown keys are kept)."""
+        record = cls.__new__(cls)
+        record._assign(data)
+        return record
+
+    def _assign(self, data: Mapping):
+        get = data.get
+        present = 0
+        for field, set_slot, encode in self._SETTERS:
+            value = get(field)
+            if value is not None:
+                present += 1
+                if encode is not None:
+                    value = encode(value)
+            set_slot(self, value)
+        self._extra = None
+        if len(data) > present:  # Keys other than the fields (or fields set to None)
+            extra = {key: value for key, value in data.items() if key not in self._FIELD_SET}
+            self._extra = extra or None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict copy, as the record used to be stored."""
+        return dict(self.items())
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._FIELD_SET:
+            value = getattr(self, key)
+            decode = self._DECODE.get(key)
+            return value if decode is None else decode(value)
+        if self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any):
+        if key in self._FIELD_SET:
+            encode = self._ENCODE.get(key)
+            setattr(self, key, value if encode is None else encode(value))
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str):
+        if key in self._FIELD_SET:
+            raise TypeError(f"{type(self).__name__} fields cannot be removed")
+        if self._extra is None or key not in self._extra:
+            raise KeyError(key)
+        del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.FIELDS
+        if self._extra:
+            yield from list(self._extra)
+
+    def __len__(self) -> int:
+        return len(self.FIELDS) + (len(self._extra) if self._extra else 0)
+
+    def __contains__(self, key) -> bool:
+        return key in self._FIELD_SET or (self._extra is not None and key in self._extra)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class Patient(MockRecord):
+    FIELDS = (
+        "id", "name", "email", "phone", "birth_date", "registration_date", "address",
+        "insurance_provider", "insurance_number", "emergency_contact", "allergies",
+        "medical_conditions", "last_visit", "total_visits", "outstanding_balance",
+    )
+    __slots__ = FIELDS
+    CODECS = {
+        "name": _TEXT,  # Shared with patient_name on the patient's appointments and invoices
+        "phone": _PHONE,
+        "birth_date": _DAY,
+        "registration_date": _DAY,
+        "last_visit": _DAY,
+        "insurance_provider": _TEXT,
+        "emergency_contact": _PHONE,
+        "allergies": _TEXT,
+        "medical_conditions": _TEXT,
+        "total_visits": _NUMBER,
+        "outstanding_balance": _NUMBER,
+    }
+
+
+class Appointment(MockRecord):
+    FIELDS = (
+        "id", "patient_id", "patient_name", "date", "time", "datetime", "treatment_type",
+        "duration_minutes", "dentist", "status", "notes", "created_at",
+    )
+    __slots__ = FIELDS
+    CODECS = {
+        "patient_name": _TEXT,
+        "date": _DAY,
+        "time": _TEXT,
+        "treatment_type": _enum(Treatment),
+        "dentist": _TEXT,
+        "status": _enum(AppointmentStatus),
+        "notes": _TEXT,
+    }
+
+
+class Invoice(MockRecord):
+    FIELDS = (
+        "id", "patient_id", "patient_name", "appointment_id", "issue_date", "due_date",
+        "treatment", "total_amount", "insurance_amount", "patient_amount", "paid_amount",
+        "outstanding_amount", "status", "payment_method", "invoice_number",
+    )
+    __slots__ = FIELDS
+    CODECS = {
+        "patient_name": _TEXT,
+        "issue_date": _DAY,
+        "due_date": _DAY,
+        "treatment": _enum(Treatment),
+        "total_amount": _NUMBER,
+        "insurance_amount": _NUMBER,
+        "patient_amount": _NUMBER,
+        "paid_amount": _NUMBER,
+        "outstanding_amount": _NUMBER,
+        "status": _enum(InvoiceStatus),
+        "payment_method": _TEXT,
+    }
@@ -0,0 +1,535 @@
+"""
+Binary Snapshot of the Mock Dataset
+
+A compact, memory-mapped alternative to the mock_*.json fixtures:
+- One directory per snapshot: meta.json (tables, row counts, field
+  kinds, category values) plus one .npy file per array
+- Struct of arrays: integers, floats and booleans as NumPy columns;
+  repetitive strings (statuses, treatments, dates, dentists) as codes
+  into a category list; other strings as one UTF-8 byte pool plus
+  offsets; a null mask where a field has missing values
+- Opened with np.load(mmap_mode="r"): nothing is parsed up front, and
+  the read-only pages are shared by every process that maps the same
+  files (uvicorn/gunicorn workers share one copy in the page cache)
+- SnapshotTable is a sequence of records, decoded into a dict (or a
+  record type, e.g. mock_records.Patient) on first access by position
+  and kept, so in-place changes (a cancelled appointment) stick;
+  iteration decodes rows it has not kept on the fly
+- RecordIndex and GroupIndex replace the {id: record} and
+  {patient_id: [records]} dicts with sorted key arrays
+- merge_snapshots() concatenates snapshots array by array (the shards
+  written by scripts/generate_mock_data.py)
+index_by(), group_by() and field_values() work on both plain lists and
+snapshot tables, so callers need not care which one they hold.
+"""
+
+import json
+from collections.abc import Mapping, Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+META_FILE = "meta.json"
+
+# Strings with at most one distinct value per this many rows are stored as categories
+CATEGORY_RATIO = 2
+
+
+# Writing
+
+def _kind(values: List[Any]) -> str:
+    """Storage kind of a field from its (non-missing) values."""
+    types = {type(value) for value in values if value is not None}
+    if not types:
+        return "null"
+    if types == {bool}:
+        return "bool"
+    if types == {int}:
+        return "int"
+    if types <= {int, float}:
+        return "float"
+    if types == {str}:
+        distinct = len(set(values))
+        return "category" if distinct * CATEGORY_RATIO <= len(values) and distinct <= 65536 else "str"
+    return "json"
+
+
+def _int_dtype(low: int, high: int):
+    return np.int32 if np.iinfo(np.int32).min <= low and high <= np.iinfo(np.int32).max else np.int64
+
+
+def _encode_field(values: List[Any]) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Meta entry and arrays ("", "offsets", "nulls") of one field."""
+    kind = _kind(values)
+    meta: Dict[str, Any] = {"kind": kind}
+    arrays: Dict[str, np.ndarray] = {}
+    if kind == "null":
+        return meta, arrays
+
+    if kind == "category":
+        index: Dict[Any, int] = {}
+        codes = [index.setdefault(value, len(index)) for value in values]
+        meta["categories"] = list(index)  # May include None
+        dtype = np.uint8 if len(index) <= 256 else np.uint16
+        arrays[""] = np.array(codes, dtype=dtype)
+        return meta, arrays
+
+    nulls = np.array([value is None for value in values], dtype=bool)
+    if nulls.any():
+        arrays["nulls"] = nulls
+
+    if kind == "int":
+        present = [value for value in values if value is not None]
+        column = [0 if value is None else value for value in values]
+        arrays[""] = np.array(column, dtype=_int_dtype(min(present), max(present)))
+    elif kind == "float":
+        arrays[""] = np.array([0.0 if value is None else value for value in values], dtype=np.float64)
+    elif kind == "bool":
+        arrays[""] = np.array([bool(value) for value in values], dtype=bool)
+    else:  # str, json
+        encode = (lambda v: v) if kind == "str" else json.dumps
+        encoded = [b"" if value is None else encode(value).encode("utf-8") for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(item) for item in encoded], out=offsets[1:])
+        arrays[""] = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+        arrays["offsets"] = offsets
+    return meta, arrays
+
+
+def _array_path(directory: Path, table: str, field: str, part: str = "") -> Path:
+    suffix = f".{part}" if part else ""
+    return directory / f"{table}.{field}{suffix}.npy"
+
+
+def write_snapshot(directory: Union[str, Path], tables: Dict[str, Sequence]) -> Path:
+    """
+    Write tables of records as a snapshot.
+
+    Args:
+        directory: Snapshot directory (created if needed; existing arrays are overwritten)
+        tables: Table name -> records (dicts; a missing key counts as None)
+
+    Returns:
+        The snapshot directory
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    meta: Dict[str, Any] = {"format": FORMAT_VERSION, "tables": {}}
+
+    for table, records in tables.items():
+        fields: Dict[str, Any] = {}  # Every key, in first-seen order
+        for record in records:
+            for field in record:
+                fields.setdefault(field, None)
+
+        for field in fields:
+            field_meta, arrays = _encode_field([record.get(field) for record in records])
+            for part, array in arrays.items():
+                np.save(_array_path(directory, table, field, part), array)
+            fields[field] = field_meta
+        meta["tables"][table] = {"rows": len(records), "fields": fields}
+
+    # Written last: a snapshot without meta.json is incomplete and never opened
+    (directory / META_FILE).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    return directory
+
+
+def _save_chunks(path: Path, dtype, length: int, chunks: Iterable[np.ndarray]):
+    """Write arrays back to back into one .npy file through a memory map (no merged copy in memory)."""
+    out = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=(length,))
+    position = 0
+    for chunk in chunks:
+        out[position:position + len(chunk)] = chunk
+        position += len(chunk)
+    out.flush()
+
+
+def _merge_field(
+    directory: Path, table: str, field: str, parts: List[Tuple[Optional["_Column"], int]],
+) -> Dict[str, Any]:
+    """Write one field of the merged table; parts are (column, or None if missing, rows) per snapshot."""
+    parts = [(column, rows) for column, rows in parts if rows]
+    kinds = {column.kind if column is not None else "null" for column, _ in parts}
+    if not parts or kinds == {"null"}:
+        return {"kind": "null"}
+    path = lambda part="": _array_path(directory, table, field, part)
+    total = sum(rows for _, rows in parts)
+
+    if len(kinds) == 1:  # Stored the same way everywhere: copy the arrays over
+        kind = kinds.pop()
+        columns = [column for column, _ in parts]
+        if kind == "category":
+            index: Dict[Any, int] = {}
+            lookups = [
+                np.array([index.setdefault(value, len(index)) for value in column.categories], dtype=np.int64)
+                for column in columns
+            ]
+            if len(index) <= 65536:
+                dtype = np.uint8 if len(index) <= 256 else np.uint16
+                _save_chunks(path(), dtype, total, (lookup[column.data] for lookup, column in zip(lookups, columns)))
+                return {"kind": kind, "categories": list(index)}
+        else:
+            if kind in ("str", "json"):
+                def offsets():
+                    base = 0
+                    yield np.zeros(1, dtype=np.int64)
+                    for column in columns:
+                        yield column.offsets[1:] + base
+                        base += int(column.offsets[-1])
+                _save_chunks(path(), np.uint8, sum(len(column.data) for column in columns), (column.data for column in columns))
+                _save_chunks(path("offsets"), np.int64, total + 1, offsets())
+            else:
+                dtype = np.result_type(*[column.data.dtype for column in columns])  # int32 + int64 -> int64
+                _save_chunks(path(), dtype, total, (column.data for column in columns))
+            if any(column.nulls is not None for column in columns):
+                _save_chunks(path("nulls"), bool, total, (
+                    column.nulls if column.nulls is not None else np.zeros(rows, dtype=bool)
+                    for column, rows in parts
+                ))
+            return {"kind": kind}
+
+    # Stored differently (int here, float there; a category that outgrew uint16): re-encode the values
+    values: List[Any] = []
+    for column, rows in parts:
+        values.extend(column.values(rows) if column is not None else [None] * rows)
+    meta, arrays = _encode_field(values)
+    for part, array in arrays.items():
+        np.save(path(part), array)
+    return meta
+
+
+def merge_snapshots(directory: Union[str, Path], sources: Sequence[Union[str, Path]]) -> Path:
+    """
+    Concatenate snapshots table by table (e.g. the shards of a generated dataset).
+
+    Mapped arrays are copied source by source into mapped output files,
+    so no merged column is held in memory; what is held is every
+    source's category lists (a few MB per 10k generated patients), and
+    the values of a field stored differently by different sources,
+    which has to be re-encoded.
+
+    Args:
+        directory: Merged snapshot directory (must not be one of the sources)
+        sources: Snapshot directories, in row order
+
+    Returns:
+        The merged snapshot directory
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    snapshots = [open_snapshot(source) for source in sources]
+    meta: Dict[str, Any] = {"format": FORMAT_VERSION, "tables": {}}
+
+    for table in dict.fromkeys(name for snapshot in snapshots for name in snapshot):
+        parts = [snapshot[table] for snapshot in snapshots if table in snapshot]
+        fields: Dict[str, Any] = dict.fromkeys(field for part in parts for field in part.columns)
+        for field in fields:
+            fields[field] = _merge_field(directory, table, field, [(part.columns.get(field), part.base_rows) for part in parts])
+        meta["tables"][table] = {"rows": sum(part.base_rows for part in parts), "fields": fields}
+
+    (directory / META_FILE).write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+    return directory
+
+
+# Reading
+
+class _Column:
+    """One memory-mapped field."""
+
+    __slots__ = ("kind", "data", "offsets", "nulls", "categories")
+
+    def __init__(self, directory: Path, table: str, field: str, meta: Dict[str, Any]):
+        self.kind = meta["kind"]
+        self.categories = meta.get("categories")
+        # Plain ndarray views of the maps: np.memmap's indexing is several times slower
+        load = lambda part="": np.load(_array_path(directory, table, field, part), mmap_mode="r").view(np.ndarray)
+        self.data = load() if self.kind != "null" else None
+        self.offsets = load("offsets") if self.kind in ("str", "json") else None
+        nulls = _array_path(directory, table, field, "nulls")
+        self.nulls = load("nulls") if nulls.exists() else None
+
+    def value(self, row: int) -> Any:
+        """Decoded value of one row."""
+        kind = self.kind
+        if kind == "category":
+            return self.categories[self.data[row]]
+        if kind == "null" or (self.nulls is not None and self.nulls[row]):
+            return None
+        if kind in ("str", "json"):
+            text = self.data[self.offsets[row]:self.offsets[row + 1]].tobytes().decode("utf-8")
+            return text if kind == "str" else json.loads(text)
+        return self.data[row].item()
+
+    def values(self, rows: int) -> List[Any]:
+        """Decoded values of all rows."""
+        kind = self.kind
+        if kind == "null":
+            return [None] * rows
+        if kind == "category":
+            categories = self.categories
+            return [categories[code] for code in self.data.tolist()]
+        if kind in ("str", "json"):
+            pool = self.data.tobytes()
+            bounds = self.offsets.tolist()
+            values = [pool[bounds[i]:bounds[i + 1]].decode("utf-8") for i in range(rows)]
+            if kind == "json":
+                values = [json.loads(value) if value else None for value in values]  # b"" marks a null
+        else:
+            values = self.data.tolist()
+        if self.nulls is not None:
+            values = [None if null else value for value, null in zip(values, self.nulls.tolist())]
+        return values
+
+
+class SnapshotTable(Sequence):
+    """
+    Records of one snapshot table, decoded on access.
+
+    Rows read by position are decoded once and kept (changes to them
+    persist); appended records live in memory after the mapped rows.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rows: int,
+        columns: Dict[str, _Column],
+        record_type: Optional[Callable[[Dict[str, Any]], Any]] = None,
+    ):
+        self.name = name
+        self.base_rows = rows
+        self.columns = columns
+        self.record_type = record_type  # Builds records from decoded dicts (dicts when None)
+        self._rows: Dict[int, Dict[str, Any]] = {}  # Decoded rows, by position
+        self._appended: List[Dict[str, Any]] = []
+
+    def __len__(self) -> int:
+        return self.base_rows + len(self._appended)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError(f"{self.name} row {position} out of range")
+        if position >= self.base_rows:
+            return self._appended[position - self.base_rows]
+        row = self._rows.get(position)
+        if row is None:
+            # setdefault: concurrent readers of the same row keep the same dict
+            row = self._rows.setdefault(position, self._decode(position))
+        return row
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        kept = self._rows
+        for position in range(self.base_rows):
+            row = kept.get(position)
+            yield row if row is not None else self._decode(position)
+        yield from list(self._appended)
+
+    def _decode(self, position: int):
+        row = {field: column.value(position) for field, column in self.columns.items()}
+        return row if self.record_type is None else self.record_type(row)
+
+    def append(self, record: Dict[str, Any]):
+        """Add a record (kept in memory; the snapshot files are read-only)."""
+        self._appended.append(record)
+
+    def values(self, field: str) -> List[Any]:
+        """One field of every record (vectorized decode, including kept and appended rows)."""
+        column = self.columns.get(field)
+        values = column.values(self.base_rows) if column is not None else [None] * self.base_rows
+        for position, row in list(self._rows.items()):
+            values[position] = row.get(field)
+        values.extend(record.get(field) for record in self._appended)
+        return values
+
+    def key_array(self, field: str) -> np.ndarray:
+        """Integer field of the mapped rows as an array (for the indexes)."""
+        column = self.columns.get(field)
+        if column is None or self.base_rows == 0:
+            return np.zeros(0, dtype=np.int64)
+        if column.kind != "int" or column.nulls is not None:
+            raise TypeError(f"{self.name}.{field} is not an integer field without missing values")
+        return column.data
+
+
+def open_snapshot(
+    directory: Union[str, Path],
+    record_types: Optional[Dict[str, Callable[[Dict[str, Any]], Any]]] = None,
+) -> Dict[str, SnapshotTable]:
+    """
+    Map a snapshot's tables.
+
+    Args:
+        directory: Snapshot directory written by write_snapshot
+        record_types: Table name -> record factory (e.g. Patient.from_dict); other tables give dicts
+
+    Returns:
+        Table name -> SnapshotTable
+    """
+    record_types = record_types or {}
+    directory = Path(directory)
+    meta = json.loads((directory / META_FILE).read_text(encoding="utf-8"))
+    if meta.get("format") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported snapshot format {meta.get('format')!r} in {directory}")
+    return {
+        table: SnapshotTable(
+            table,
+            info["rows"],
+            {field: _Column(directory, table, field, spec) for field, spec in info["fields"].items()},
+            record_types.get(table),
+        )
+        for table, info in meta["tables"].items()
+    }
+
+
+# Indexes over snapshot tables
+
+class _SortedKeys:
+    """Positions of a table's rows in the order of an integer field."""
+
+    def __init__(self, keys: np.ndarray):
+        if len(keys) < 2 or bool(np.all(keys[1:] >= keys[:-1])):
+            self.order: Optional[np.ndarray] = None  # Already sorted (the usual case)
+            self.keys = keys
+        else:
+            self.order = np.argsort(keys, kind="stable")
+            self.keys = keys[self.order]
+        info = np.iinfo(keys.dtype)
+        self._low, self._high = info.min, info.max
+        # Unique consecutive keys (IDs 1..n): a key's position is key - first
+        self._first = int(self.keys[0]) if len(keys) else 0
+        self._dense = len(keys) > 0 and int(self.keys[-1]) - self._first == len(keys) - 1 and (
+            len(keys) < 2 or bool(np.all(np.diff(self.keys) == 1))
+        )
+
+    def span(self, key: Any) -> Tuple[int, int]:
+        """Sorted positions [start, end) holding key."""
+        if not isinstance(key, (int, np.integer)) or isinstance(key, bool) or not self._low <= key <= self._high:
+            return 0, 0
+        if self._dense:
+            position = int(key) - self._first
+            return (position, position + 1) if 0 <= position < len(self.keys) else (0, 0)
+        key = self.keys.dtype.type(key)  # A Python int would make searchsorted copy the keys as int64
+        start = int(self.keys.searchsorted(key, side="left"))
+        end = int(self.keys.searchsorted(key, side="right"))
+        return start, end
+
+    def row(self, sorted_position: int) -> int:
+        return int(sorted_position if self.order is None else self.order[sorted_position])
+
+
+class RecordIndex(Mapping):
+    """{key: record} over a snapshot table, for a unique integer field."""
+
+    def __init__(self, table: SnapshotTable, field: str = "id"):
+        self.table = table
+        self._sorted = _SortedKeys(table.key_array(field))
+        self._added: Dict[Any, Dict[str, Any]] = {}
+        self._new_keys = 0
+
+    def _mapped(self, key) -> bool:
+        start, end = self._sorted.span(key)
+        return start != end
+
+    def __getitem__(self, key):
+        record = self._added.get(key)
+        if record is not None:
+            return record
+        start, end = self._sorted.span(key)
+        if start == end:
+            raise KeyError(key)
+        return self.table[self._sorted.row(start)]
+
+    def __setitem__(self, key, record: Dict[str, Any]):
+        if key not in self._added and not self._mapped(key):
+            self._new_keys += 1
+        self._added[key] = record
+
+    def __contains__(self, key) -> bool:
+        return key in self._added or self._mapped(key)
+
+    def __iter__(self):
+        seen = set(self._added)
+        yield from self._added
+        for key in self._sorted.keys.tolist():
+            if key not in seen:
+                yield key
+
+    def __len__(self) -> int:
+        return len(self._sorted.keys) + self._new_keys
+
+
+class GroupIndex(Mapping):
+    """{key: [records]} over a snapshot table, for an integer field; lists are built per key on first use."""
+
+    def __init__(self, table: SnapshotTable, field: str):
+        self.table = table
+        self._sorted = _SortedKeys(table.key_array(field))
+        self._groups: Dict[Any, List[Dict[str, Any]]] = {}
+
+    def __getitem__(self, key) -> List[Dict[str, Any]]:
+        group = self._groups.get(key)
+        if group is None:
+            start, end = self._sorted.span(key)
+            if start == end:
+                raise KeyError(key)
+            rows = [self.table[self._sorted.row(i)] for i in range(start, end)]
+            group = self._groups.setdefault(key, rows)
+        return group
+
+    def __setitem__(self, key, records: List[Dict[str, Any]]):
+        self._groups[key] = records
+
+    def __contains__(self, key) -> bool:
+        if key in self._groups:
+            return True
+        start, end = self._sorted.span(key)
+        return start != end
+
+    def __iter__(self):
+        keys = dict.fromkeys(np.unique(self._sorted.keys).tolist())
+        keys.update(dict.fromkeys(self._groups))
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+# Helpers for lists and snapshot tables alike
+
+def field_values(records: Sequence, field: str) -> List[Any]:
+    """One field of every record (None where missing)."""
+    if isinstance(records, SnapshotTable):
+        return records.values(field)
+    return [record.get(field) for record in records]
+
+
+def project(records: Sequence, fields: Tuple[str, ...]) -> Iterable[Dict[str, Any]]:
+    """Records limited to some fields (the records themselves for lists)."""
+    if not isinstance(records, SnapshotTable):
+        return records
+    columns = [records.values(field) for field in fields]
+    return (dict(zip(fields, row)) for row in zip(*columns))
+
+
+def index_by(records: Sequence, field: str = "id") -> Mapping:
+    """{record[field]: record}; a RecordIndex for snapshot tables."""
+    if isinstance(records, SnapshotTable) and not records._appended:
+        return RecordIndex(records, field)
+    return {record[field]: record for record in records}
+
+
+def group_by(records: Sequence, field: str) -> Mapping:
+    """{record[field]: [records]} in record order; a GroupIndex for snapshot tables."""
+    if isinstance(records, SnapshotTable) and not records._appended:
+        return GroupIndex(records, field)
+    groups: Dict[Any, List[Dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record[field], []).append(record)
+    return groups
@@ -0,0 +1,498 @@
+"""
+Async Odoo Client
+
+Non-blocking access to Odoo for the async agent path:
+- One pooled HTTP session (keep-alive, bounded connections) per Odoo
+  server and database, shared by every client of that database
+- Login once per session: the uid is cached and concurrent first calls
+  wait for a single authenticate round trip
+- A per-database cap on calls in flight, so one clinic's burst cannot
+  take every connection or overload its Odoo server
+- XML-RPC (/xmlrpc/2/...) or JSON-RPC (/jsonrpc) transport
+- Batched reads: search_read with field lists, read_many, and a loader
+  that merges single-record reads issued in the same event-loop tick
+  into one call per model
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import time
+import xmlrpc.client
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+
+from app.core.config import settings
+from app.integrations.odoo_client import (
+    APPOINTMENT_FIELDS,
+    INVOICE_FIELDS,
+    PATIENT_FIELDS,
+    appointment_domain,
+    appointment_values,
+    invoice_domain,
+    order_by_ids,
+    patient_domain,
+    patient_values,
+    search_read_options,
+)
+
+
+logger = logging.getLogger(__name__)
+
+
+class OdooError(Exception):
+    """Raised when an Odoo call fails (server error, transport error or bad login)."""
+    pass
+
+
+class OdooAuthenticationError(OdooError):
+    """Raised when Odoo rejects the login."""
+    pass
+
+
+class XmlRpcProtocol:
+    """Odoo's XML-RPC endpoints: /xmlrpc/2/common and /xmlrpc/2/object."""
+
+    name = "xmlrpc"
+    headers = {"Content-Type": "text/xml"}
+
+    def encode(self, service: str, method: str, args: Sequence[Any]) -> Tuple[str, bytes]:
+        body = xmlrpc.client.dumps(tuple(args), methodname=method, allow_none=True)
+        return f"/xmlrpc/2/{service}", body.encode("utf-8")
+
+    def decode(self, body: bytes) -> Any:
+        try:
+            params, _ = xmlrpc.client.loads(body, use_builtin_types=True)
+        except xmlrpc.client.Fault as e:
+            raise OdooError(e.faultString) from None
+        return params[0]
+
+
+class JsonRpcProtocol:
+    """Odoo's JSON-RPC endpoint: /jsonrpc with service, method and args."""
+
+    name = "jsonrpc"
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self):
+        self._ids = itertools.count(1)
+
+    def encode(self, service: str, method: str, args: Sequence[Any]) -> Tuple[str, bytes]:
+        body = {
+            "jsonrpc": "2.0",
+            "method": "call",
+            "params": {"service": service, "method": method, "args": list(args)},
+            "id": next(self._ids),
+        }
+        return "/jsonrpc", json.dumps(body).encode("utf-8")
+
+    def decode(self, body: bytes) -> Any:
+        response = json.loads(body)
+        error = response.get("error")
+        if error:
+            data = error.get("data") or {}
+            raise OdooError(data.get("message") or error.get("message", "Odoo JSON-RPC error"))
+        return response.get("result")
+
+
+PROTOCOLS = {"xmlrpc": XmlRpcProtocol, "jsonrpc": JsonRpcProtocol}
+
+
+class OdooSession:
+    """Pooled HTTP connections, login cache and call cap for one Odoo database."""
+
+    def __init__(self, url: str, db: str, max_connections: int, max_concurrent_calls: int, timeout: float):
+        """
+        Initialize session.
+
+        Args:
+            url: Odoo server URL
+            db: Odoo database name
+            max_connections: Maximum open HTTP connections
+            max_concurrent_calls: Maximum calls in flight
+            timeout: Per-call timeout in seconds
+        """
+        self.url = url
+        self.db = db
+        self.http = httpx.AsyncClient(
+            base_url=url,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=60.0,
+            ),
+            timeout=timeout,
+        )
+        self.calls = asyncio.Semaphore(max_concurrent_calls)
+        self.uids: Dict[str, int] = {}
+        self.auth_lock = asyncio.Lock()
+        self.in_flight = 0
+        self.last_used = time.monotonic()
+
+    async def post(self, path: str, body: bytes, headers: Dict[str, str]) -> bytes:
+        """POST one RPC call, waiting for a free call slot first."""
+        async with self.calls:
+            self.in_flight += 1
+            try:
+                response = await self.http.post(path, content=body, headers=headers)
+                response.raise_for_status()
+                return response.content
+            except httpx.HTTPError as e:
+                raise OdooError(f"Odoo request to {self.url}{path} failed: {e}") from e
+            finally:
+                self.in_flight -= 1
+                self.last_used = time.monotonic()
+
+    async def aclose(self):
+        await self.http.aclose()
+
+
+class OdooConnectionPool:
+    """Shared Odoo sessions, one per (event loop, server URL, database)."""
+
+    def __init__(
+        self,
+        max_connections: int = settings.ODOO_MAX_CONNECTIONS,
+        max_concurrent_calls: int = settings.ODOO_MAX_CONCURRENT_CALLS,
+        timeout: float = settings.ODOO_TIMEOUT_SECONDS,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            max_connections: HTTP connections per database
+            max_concurrent_calls: Calls in flight per database
+            timeout: Per-call timeout in seconds
+        """
+        self.max_connections = max_connections
+        self.max_concurrent_calls = max_concurrent_calls
+        self.timeout = timeout
+        # HTTP connections and asyncio primitives belong to the loop that created them
+        self._sessions: Dict[Tuple[asyncio.AbstractEventLoop, str, str], OdooSession] = {}
+
+    def session(self, url: str, db: str) -> OdooSession:
+        """The session for a database on the running event loop (created on first use)."""
+        loop = asyncio.get_running_loop()
+        key = (loop, url.rstrip("/"), db)
+        session = self._sessions.get(key)
+        if session is None:
+            self._sessions = {k: s for k, s in self._sessions.items() if not k[0].is_closed()}
+            session = self._sessions[key] = OdooSession(
+                key[1], db, self.max_connections, self.max_concurrent_calls, self.timeout
+            )
+        return session
+
+    def sessions(self) -> List[OdooSession]:
+        """Sessions on the running event loop."""
+        loop = asyncio.get_running_loop()
+        return [session for (session_loop, _, _), session in self._sessions.items() if session_loop is loop]
+
+    async def close_session(self, url: str, db: str):
+        """Close a database's session on the running event loop."""
+        session = self._sessions.pop((asyncio.get_running_loop(), url.rstrip("/"), db), None)
+        if session is not None:
+            await session.aclose()
+
+    async def aclose(self):
+        """Close every session on the running event loop."""
+        for session in self.sessions():
+            await self.close_session(session.url, session.db)
+
+
+class OdooDataLoader:
+    """Merges single-record reads made in the same event-loop tick into one read_many per model."""
+
+    def __init__(self, client: "AsyncOdooClient", max_batch_size: int = 200):
+        """
+        Initialize loader.
+
+        Args:
+            client: Client used for the batched reads
+            max_batch_size: Maximum IDs per call
+        """
+        self.client = client
+        self.max_batch_size = max_batch_size
+        # (model, fields) -> record ID -> futures waiting for it
+        self._pending: Dict[Tuple[str, Tuple[str, ...]], Dict[int, List[asyncio.Future]]] = {}
+        self._tasks = set()  # Strong references to batches in flight
+
+    async def load(self, model: str, record_id: int, fields: Sequence[str]) -> Optional[Dict[str, Any]]:
+        """
+        Read one record; reads queued in the same tick share one call.
+
+        Args:
+            model: Odoo model name
+            record_id: Record ID
+            fields: Fields to return
+
+        Returns:
+            Record dictionary, or None if it does not exist
+        """
+        key = (model, tuple(fields))
+        batch = self._pending.get(key)
+        if batch is None:
+            batch = self._pending[key] = {}
+            # Runs after every task that is ready in this tick has queued its read
+            asyncio.get_running_loop().call_soon(self._dispatch, key)
+        future = asyncio.get_running_loop().create_future()
+        batch.setdefault(record_id, []).append(future)
+        return await future
+
+    def _dispatch(self, key: Tuple[str, Tuple[str, ...]]):
+        batch = self._pending.pop(key)
+        ids = list(batch)
+        for start in range(0, len(ids), self.max_batch_size):
+            chunk = {record_id: batch[record_id] for record_id in ids[start:start + self.max_batch_size]}
+            task = asyncio.ensure_future(self._fetch(key, chunk))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _fetch(self, key: Tuple[str, Tuple[str, ...]], batch: Dict[int, List[asyncio.Future]]):
+        model, fields = key
+        try:
+            records = await self.client.read_many(model, list(batch), list(fields))
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+        by_id = {record['id']: record for record in records}
+        for record_id, futures in batch.items():
+            for future in futures:
+                if not future.done():
+                    future.set_result(by_id.get(record_id))
+
+
+class AsyncOdooClient:
+    """Async client for the Odoo external API (same methods as OdooClient)."""
+
+    def __init__(
+        self,
+        url: str,
+        db: str,
+        username: str,
+        password: str,
+        protocol: str = "xmlrpc",
+        pool: Optional[OdooConnectionPool] = None,
+    ):
+        """
+        Initialize client. No connection is made until the first call.
+
+        Args:
+            url: Odoo server URL
+            db: Odoo database name
+            username: Login
+            password: Password or API key
+            protocol: "xmlrpc" or "jsonrpc"
+            pool: Connection pool (the shared one by default)
+        """
+        if protocol not in PROTOCOLS:
+            raise ValueError(f"Unknown Odoo protocol {protocol!r} (use one of {sorted(PROTOCOLS)})")
+        self.url = url
+        self.db = db
+        self.username = username
+        self.password = password
+        self.protocol = PROTOCOLS[protocol]()
+        self.pool = pool or odoo_connection_pool
+        self.loader = OdooDataLoader(self)
+
+    @property
+    def session(self) -> OdooSession:
+        return self.pool.session(self.url, self.db)
+
+    async def call(self, service: str, method: str, *args) -> Any:
+        """
+        Make one RPC call.
+
+        Args:
+            service: "common" or "object"
+            method: Service method (e.g. "authenticate", "execute_kw")
+            *args: Method arguments
+
+        Returns:
+            Result from Odoo
+        """
+        path, body = self.protocol.encode(service, method, args)
+        response = await self.session.post(path, body, self.protocol.headers)
+        return self.protocol.decode(response)
+
+    async def authenticate(self) -> int:
+        """
+        Log in (once per session; concurrent callers share one round trip).
+
+        Returns:
+            Odoo user ID
+        """
+        session = self.session
+        uid = session.uids.get(self.username)
+        if uid:
+            return uid
+        async with session.auth_lock:
+            uid = session.uids.get(self.username)
+            if not uid:
+                uid = await self.call("common", "authenticate", self.db, self.username, self.password, {})
+                if not uid:
+                    raise OdooAuthenticationError(f"Odoo login failed for {self.username!r} on {self.db!r}")
+                session.uids[self.username] = uid
+                logger.info(f"Authenticated with Odoo {self.url} db={self.db} as uid {uid}")
+        return uid
+
+    async def execute_kw(
+        self,
+        model: str,
+        method: str,
+        args: Sequence[Any],
+        kwargs: Optional[Dict[str, Any]] = None,
+    ) -> Any:
+        """
+        Execute a method on an Odoo model.
+
+        Args:
+            model: Odoo model name (e.g., 'res.partner')
+            method: Method to execute (e.g., 'search', 'read')
+            args: Positional arguments for the method
+            kwargs: Keyword arguments for the method
+
+        Returns:
+            Result from Odoo
+        """
+        uid = await self.authenticate()
+        return await self.call(
+            "object", "execute_kw", self.db, uid, self.password, model, method, list(args), kwargs or {}
+        )
+
+    # Batched reads
+
+    async def search_read(
+        self,
+        model: str,
+        domain: List[Any],
+        fields: Optional[List[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        order: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search and read matching records in one call.
+
+        Args:
+            model: Odoo model name
+            domain: Search domain
+            fields: Fields to return (all fields when None)
+            offset: Number of records to skip
+            limit: Maximum number of records
+            order: Sort order (e.g. 'appointment_date desc')
+
+        Returns:
+            List of record dictionaries (with 'id')
+        """
+        return await self.execute_kw(
+            model, 'search_read', [domain], search_read_options(fields, offset, limit, order)
+        )
+
+    async def read_many(self, model: str, ids: List[int], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Read several records in one call.
+
+        Args:
+            model: Odoo model name
+            ids: Record IDs
+            fields: Fields to return (all fields when None)
+
+        Returns:
+            Records in the order of `ids`; deleted or inaccessible IDs are left out
+        """
+        if not ids:
+            return []
+        records = await self.search_read(model, [('id', 'in', list(ids))], fields)
+        return order_by_ids(records, list(ids))
+
+    # Patient Management
+
+    async def find_patients(
+        self,
+        name: Optional[str] = None,
+        phone: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """Search for patients by name or phone, with their details, in one call."""
+        return await self.search_read('res.partner', patient_domain(name, phone), PATIENT_FIELDS, limit=limit)
+
+    async def search_patients(self, name: Optional[str] = None, phone: Optional[str] = None) -> List[int]:
+        """Search for patients by name or phone (IDs)."""
+        return await self.execute_kw('res.partner', 'search', [patient_domain(name, phone)])
+
+    async def get_patient(self, patient_id: int) -> Optional[Dict[str, Any]]:
+        """Get patient details by ID (batched with concurrent lookups)."""
+        return await self.loader.load('res.partner', patient_id, PATIENT_FIELDS)
+
+    async def create_patient(self, name: str, email: Optional[str] = None, phone: Optional[str] = None) -> int:
+        """Create a new patient (returns its ID)."""
+        return await self.execute_kw('res.partner', 'create', [patient_values(name, email, phone)])
+
+    # Appointment Management
+
+    async def search_appointments(
+        self,
+        patient_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        state: Optional[str] = None,
+    ) -> List[int]:
+        """Search for appointments (IDs)."""
+        domain = appointment_domain(patient_id, date_from, date_to, state)
+        return await self.execute_kw('dental.appointment', 'search', [domain])
+
+    async def get_appointment(self, appointment_id: int) -> Optional[Dict[str, Any]]:
+        """Get appointment details by ID (batched with concurrent lookups)."""
+        return await self.loader.load('dental.appointment', appointment_id, APPOINTMENT_FIELDS)
+
+    async def get_patient_appointments(self, patient_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get a patient's appointments with their details in one call, earliest first."""
+        return await self.search_read(
+            'dental.appointment', appointment_domain(patient_id=patient_id), APPOINTMENT_FIELDS,
+            limit=limit, order='appointment_date asc',
+        )
+
+    async def create_appointment(
+        self,
+        patient_id: int,
+        appointment_date: datetime,
+        duration: float = 1.0,
+        notes: Optional[str] = None,
+    ) -> int:
+        """Create a new appointment (returns its ID)."""
+        values = appointment_values(patient_id, appointment_date, duration, notes)
+        return await self.execute_kw('dental.appointment', 'create', [values])
+
+    async def update_appointment(self, appointment_id: int, **kwargs) -> bool:
+        """Update an existing appointment."""
+        return await self.execute_kw('dental.appointment', 'write', [[appointment_id], kwargs])
+
+    async def cancel_appointment(self, appointment_id: int) -> bool:
+        """Cancel an appointment."""
+        return await self.update_appointment(appointment_id, state='cancelled')
+
+    # Invoices
+
+    async def get_patient_invoices(self, patient_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Get a patient's invoice summaries in one call, newest first."""
+        return await self.search_read(
+            'account.move', invoice_domain(patient_id), INVOICE_FIELDS,
+            limit=limit, order='invoice_date desc',
+        )
+
+
+# Global connection pool and client for the configured Odoo database
+odoo_connection_pool = OdooConnectionPool()
+async_odoo_client = AsyncOdooClient(
+    settings.ODOO_URL,
+    settings.ODOO_DB,
+    settings.ODOO_USERNAME,
+    settings.ODOO_PASSWORD,
+    protocol=settings.ODOO_PROTOCOL,
+)
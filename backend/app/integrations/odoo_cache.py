@@ -0,0 +1,481 @@
+"""
+Odoo Read-Through Cache
+
+Caches rarely-changing Odoo reads (patient profiles, invoices, treatment
+history) per tenant, in two levels:
+- L1: in-process LRU with a short TTL, so another worker's write is seen
+  within seconds
+- L2: Redis shared by all workers, with a TTL per Odoo model
+- Stampede protection: one load per key at a time in each process, and a
+  short Redis lock so other workers wait for that load instead of
+  repeating it; TTLs are jittered so entries cached together do not
+  expire together
+- Writes through CachedOdooClient invalidate the records and per-patient
+  lists they change
+- Hit ratio and age of served entries (staleness) per model, in
+  Prometheus and stats()
+While Redis is unreachable only L1 is used.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import redis
+from prometheus_client import Counter, Histogram
+
+from app.core.config import settings
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_REQUESTS = Counter(
+    "odoo_cache_requests_total",
+    "Odoo read cache lookups",
+    ["model", "result"],  # l1_hit, l2_hit, miss
+)
+CACHE_HIT_AGE = Histogram(
+    "odoo_cache_hit_age_seconds",
+    "Age of cached Odoo data when served (staleness)",
+    ["model"],
+    buckets=(0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600),
+)
+CACHE_INVALIDATIONS = Counter(
+    "odoo_cache_invalidations_total",
+    "Odoo read cache keys invalidated by writes",
+    ["model"],
+)
+
+def _json_default(value: Any) -> Any:
+    """Encode dict-like records (e.g. the mock's slot records) as objects, anything else as text."""
+    if isinstance(value, Mapping):
+        return dict(value)
+    return str(value)
+
+
+# TTL (seconds) of cached reads per Odoo model
+MODEL_TTLS: Dict[str, int] = {
+    "res.partner": settings.ODOO_CACHE_PATIENT_TTL_SECONDS,
+    "dental.appointment": settings.ODOO_CACHE_APPOINTMENT_TTL_SECONDS,
+    "account.move": settings.ODOO_CACHE_INVOICE_TTL_SECONDS,
+    "dental.treatment": settings.ODOO_CACHE_TREATMENT_TTL_SECONDS,
+}
+
+
+@dataclass
+class _ModelStats:
+    l1_hits: int = 0
+    l2_hits: int = 0
+    misses: int = 0
+    hit_age_total: float = 0.0
+    hit_age_max: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        hits = self.l1_hits + self.l2_hits
+        requests = hits + self.misses
+        return {
+            "requests": requests,
+            "l1_hits": self.l1_hits,
+            "l2_hits": self.l2_hits,
+            "misses": self.misses,
+            "hit_ratio": hits / requests if requests else 0.0,
+            "mean_hit_age_seconds": self.hit_age_total / hits if hits else 0.0,
+            "max_hit_age_seconds": self.hit_age_max,
+        }
+
+
+class OdooReadCache:
+    """Two-level (in-process LRU + Redis) cache of Odoo reads, scoped by tenant."""
+
+    def __init__(
+        self,
+        redis_url: Optional[str],
+        model_ttls: Optional[Dict[str, int]] = None,
+        default_ttl: int = 300,
+        l1_max_entries: int = 10000,
+        l1_ttl_seconds: float = 15.0,
+        lock_timeout: float = 2.0,
+        key_prefix: str = "odoo_cache",
+        redis_retry_interval: float = 30.0,
+        enabled: bool = True,
+    ):
+        """
+        Initialize cache.
+
+        Args:
+            redis_url: Redis URL for the shared level (None = in-process only)
+            model_ttls: TTL in seconds per Odoo model
+            default_ttl: TTL for models not in model_ttls
+            l1_max_entries: In-process entries kept (least recently used dropped first)
+            l1_ttl_seconds: Maximum time an entry stays in-process
+            lock_timeout: Longest wait for another worker's load of the same key
+            key_prefix: Prefix of the Redis keys
+            redis_retry_interval: Seconds to stay on L1 only after a Redis error
+            enabled: When False every read goes to Odoo
+        """
+        self.redis_url = redis_url
+        self.model_ttls = dict(MODEL_TTLS if model_ttls is None else model_ttls)
+        self.default_ttl = default_ttl
+        self.l1_max_entries = l1_max_entries
+        self.l1_ttl_seconds = l1_ttl_seconds
+        self.lock_timeout = lock_timeout
+        self.key_prefix = key_prefix
+        self.redis_retry_interval = redis_retry_interval
+        self.enabled = enabled
+
+        # key -> (value, stored_at, l1 expiry)
+        self._l1: "OrderedDict[str, Tuple[Any, float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._loading: Dict[str, threading.Lock] = {}
+        self._stats: Dict[str, _ModelStats] = {}
+
+        self._client: Optional[redis.Redis] = None
+        self._redis_down_until = 0.0
+
+    # Keys
+
+    def key(self, tenant: str, model: str, key: str) -> str:
+        return f"{self.key_prefix}:{tenant}:{model}:{key}"
+
+    def ttl(self, model: str) -> int:
+        return self.model_ttls.get(model, self.default_ttl)
+
+    # Redis
+
+    def _redis(self) -> Optional[redis.Redis]:
+        if self.redis_url is None or time.monotonic() < self._redis_down_until:
+            return None
+        if self._client is None:
+            self._client = redis.Redis.from_url(
+                self.redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+        return self._client
+
+    def _redis_failed(self, error: Exception):
+        self._redis_down_until = time.monotonic() + self.redis_retry_interval
+        logger.warning(
+            f"Odoo cache Redis unavailable ({error}), using in-process cache only "
+            f"for {self.redis_retry_interval:.0f}s"
+        )
+
+    def _l2_get(self, full_key: str) -> Optional[Tuple[Any, float]]:
+        client = self._redis()
+        if client is None:
+            return None
+        try:
+            raw = client.get(full_key)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        return entry["v"], entry["t"]
+
+    def _l2_set(self, full_key: str, value: Any, stored_at: float, ttl: int):
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.set(full_key, json.dumps({"v": value, "t": stored_at}, default=_json_default), ex=ttl)
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    def _l2_lock(self, full_key: str) -> bool:
+        """Take the cross-worker load lock (True also when Redis is unavailable)."""
+        client = self._redis()
+        if client is None:
+            return True
+        try:
+            return bool(client.set(f"{full_key}:lock", "1", nx=True, px=int(self.lock_timeout * 1000)))
+        except redis.RedisError as e:
+            self._redis_failed(e)
+            return True
+
+    def _l2_unlock(self, full_key: str):
+        client = self._redis()
+        if client is None:
+            return
+        try:
+            client.delete(f"{full_key}:lock")
+        except redis.RedisError as e:
+            self._redis_failed(e)
+
+    # L1
+
+    def _l1_get(self, full_key: str, now: float) -> Optional[Tuple[Any, float]]:
+        with self._lock:
+            entry = self._l1.get(full_key)
+            if entry is None:
+                return None
+            if entry[2] <= now:
+                del self._l1[full_key]
+                return None
+            self._l1.move_to_end(full_key)
+            return entry[0], entry[1]
+
+    def _l1_set(self, full_key: str, value: Any, stored_at: float, ttl: float):
+        """Keep for l1_ttl_seconds from now, but not past the entry's own expiry."""
+        expires_at = min(time.time() + self.l1_ttl_seconds, stored_at + ttl)
+        with self._lock:
+            self._l1[full_key] = (value, stored_at, expires_at)
+            self._l1.move_to_end(full_key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    # Stats
+
+    def _record(self, model: str, result: str, age: float = 0.0):
+        CACHE_REQUESTS.labels(model=model, result=result).inc()
+        with self._lock:
+            stats = self._stats.setdefault(model, _ModelStats())
+            if result == "miss":
+                stats.misses += 1
+                return
+            if result == "l1_hit":
+                stats.l1_hits += 1
+            else:
+                stats.l2_hits += 1
+            stats.hit_age_total += age
+            stats.hit_age_max = max(stats.hit_age_max, age)
+        CACHE_HIT_AGE.labels(model=model).observe(age)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Hit ratio and staleness of served entries per model."""
+        with self._lock:
+            return {model: stats.to_dict() for model, stats in self._stats.items()}
+
+    # Reads
+
+    def _cached(self, model: str, full_key: str) -> Optional[Tuple[Any, float]]:
+        """(value, stored_at) from L1 or L2 (refilling L1), recording the hit; None on a miss."""
+        now = time.time()
+        entry = self._l1_get(full_key, now)
+        if entry is not None:
+            self._record(model, "l1_hit", now - entry[1])
+            return entry
+        entry = self._l2_get(full_key)
+        if entry is not None:
+            self._l1_set(full_key, entry[0], entry[1], self.ttl(model))
+            self._record(model, "l2_hit", now - entry[1])
+            return entry
+        return None
+
+    def get_or_load(self, tenant: str, model: str, key: str, loader: Callable[[], Any]) -> Any:
+        """
+        Cached value, loading and caching it on a miss (misses are not cached).
+
+        Args:
+            tenant: Tenant (organization or Odoo database) the data belongs to
+            model: Odoo model, selects the TTL
+            key: Key of the read within the model (e.g. "patient:42")
+            loader: Reads the value from Odoo
+
+        Returns:
+            The value
+        """
+        if not self.enabled:
+            return loader()
+
+        full_key = self.key(tenant, model, key)
+        entry = self._cached(model, full_key)
+        if entry is not None:
+            return entry[0]
+
+        # One load per key in this process; the others wait for it and read L1
+        with self._lock:
+            key_lock = self._loading.setdefault(full_key, threading.Lock())
+        with key_lock:
+            try:
+                entry = self._cached(model, full_key)
+                if entry is not None:
+                    return entry[0]
+                return self._load(model, full_key, loader)
+            finally:
+                with self._lock:
+                    if self._loading.get(full_key) is key_lock:
+                        del self._loading[full_key]
+
+    def _load(self, model: str, full_key: str, loader: Callable[[], Any]) -> Any:
+        # Another worker is loading this key: wait briefly for its result
+        locked = self._l2_lock(full_key)
+        if not locked:
+            deadline = time.monotonic() + self.lock_timeout
+            while time.monotonic() < deadline:
+                time.sleep(0.02)
+                entry = self._cached(model, full_key)
+                if entry is not None:
+                    return entry[0]
+
+        self._record(model, "miss")
+        try:
+            value = loader()
+            if value is not None:
+                stored_at = time.time()
+                ttl = self.ttl(model)
+                ttl = max(1, int(ttl * random.uniform(0.9, 1.0)))  # Jitter: spread expiries
+                self._l1_set(full_key, value, stored_at, ttl)
+                self._l2_set(full_key, value, stored_at, ttl)
+            return value
+        finally:
+            if locked:
+                self._l2_unlock(full_key)
+
+    # Invalidation
+
+    def invalidate(self, tenant: str, model: str, keys: Iterable[str]):
+        """
+        Drop cached reads (after a write).
+
+        Args:
+            tenant: Tenant the data belongs to
+            model: Odoo model of the keys
+            keys: Keys within the model
+        """
+        full_keys = [self.key(tenant, model, key) for key in keys]
+        if not full_keys:
+            return
+        with self._lock:
+            for full_key in full_keys:
+                self._l1.pop(full_key, None)
+        CACHE_INVALIDATIONS.labels(model=model).inc(len(full_keys))
+
+        client = self._redis()
+        if client is not None:
+            try:
+                client.delete(*full_keys)
+            except redis.RedisError as e:
+                self._redis_failed(e)
+
+    def clear(self):
+        """Drop the in-process level and the stats."""
+        with self._lock:
+            self._l1.clear()
+            self._stats.clear()
+
+
+# Cached client methods: method -> (Odoo model, key prefix)
+CACHED_READS: Dict[str, Tuple[str, str]] = {
+    "get_patient": ("res.partner", "patient"),
+    "get_appointment": ("dental.appointment", "appointment"),
+    "get_patient_appointments": ("dental.appointment", "patient_appointments"),
+    "get_invoice": ("account.move", "invoice"),
+    "get_patient_invoices": ("account.move", "patient_invoices"),
+    "get_treatment_history": ("dental.treatment", "treatment_history"),
+}
+
+
+def _patient_of(appointment: Optional[Dict[str, Any]]) -> Optional[int]:
+    """Patient ID of an appointment from the mock (patient_id) or Odoo (partner_id)."""
+    if not appointment:
+        return None
+    patient = appointment.get("patient_id", appointment.get("partner_id"))
+    if isinstance(patient, (list, tuple)):  # Odoo many2one: [id, name]
+        patient = patient[0]
+    return patient or None
+
+
+class CachedOdooClient:
+    """
+    Odoo client (real or mock) with read-through caching of by-ID reads.
+
+    Reads listed in CACHED_READS called with just an ID are cached; other
+    calls go straight to the client. Write methods invalidate what they change.
+    """
+
+    def __init__(self, client: Any, cache: "OdooReadCache", tenant: str):
+        """
+        Initialize cached client.
+
+        Args:
+            client: OdooClient, RealisticMockOdooClient or compatible
+            cache: Read cache
+            tenant: Tenant the client's data belongs to
+        """
+        self.client = client
+        self.cache = cache
+        self.tenant = str(tenant)
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self.client, name)
+        if name not in CACHED_READS or not callable(attribute):
+            return attribute
+        model, prefix = CACHED_READS[name]
+
+        def cached_read(record_id, *args, **kwargs):
+            if args or kwargs:
+                return attribute(record_id, *args, **kwargs)
+            return self.cache.get_or_load(
+                self.tenant, model, f"{prefix}:{record_id}", lambda: attribute(record_id)
+            )
+
+        return cached_read
+
+    def _invalidate_patient(self, patient_id: Optional[int], *prefixes: str):
+        if patient_id is None:
+            return
+        by_model: Dict[str, List[str]] = {}
+        for model, prefix in CACHED_READS.values():
+            if prefix in prefixes:
+                by_model.setdefault(model, []).append(f"{prefix}:{patient_id}")
+        for model, keys in by_model.items():
+            self.cache.invalidate(self.tenant, model, keys)
+
+    # Writes
+
+    def create_patient(self, *args, **kwargs) -> int:
+        patient_id = self.client.create_patient(*args, **kwargs)
+        self._invalidate_patient(
+            patient_id, "patient", "patient_appointments", "patient_invoices", "treatment_history"
+        )
+        return patient_id
+
+    def create_appointment(self, patient_id: int, *args, **kwargs) -> Optional[int]:
+        appointment_id = self.client.create_appointment(patient_id, *args, **kwargs)
+        if appointment_id is None:
+            return None  # Time already booked, nothing written
+        self.cache.invalidate(self.tenant, "dental.appointment", [
+            f"appointment:{appointment_id}", f"patient_appointments:{patient_id}",
+        ])
+        return appointment_id
+
+    def _appointment_written(self, appointment_id: int, patient_id: Optional[int]):
+        keys = [f"appointment:{appointment_id}"]
+        if patient_id is not None:
+            keys.append(f"patient_appointments:{patient_id}")
+        self.cache.invalidate(self.tenant, "dental.appointment", keys)
+
+    def update_appointment(self, appointment_id: int, **kwargs) -> bool:
+        patient_id = _patient_of(self.get_appointment(appointment_id))
+        result = self.client.update_appointment(appointment_id, **kwargs)
+        self._appointment_written(appointment_id, patient_id)
+        return result
+
+    def cancel_appointment(self, appointment_id: int) -> bool:
+        patient_id = _patient_of(self.get_appointment(appointment_id))
+        result = self.client.cancel_appointment(appointment_id)
+        self._appointment_written(appointment_id, patient_id)
+        return result
+
+    def create_invoice(self, patient_id: int, *args, **kwargs) -> int:
+        invoice_id = self.client.create_invoice(patient_id, *args, **kwargs)
+        self.cache.invalidate(self.tenant, "account.move", [
+            f"invoice:{invoice_id}", f"patient_invoices:{patient_id}",
+        ])
+        return invoice_id
+
+
+# Global Odoo read cache instance
+odoo_read_cache = OdooReadCache(
+    redis_url=str(settings.REDIS_URL),
+    l1_max_entries=settings.ODOO_CACHE_L1_MAX_ENTRIES,
+    l1_ttl_seconds=settings.ODOO_CACHE_L1_TTL_SECONDS,
+    enabled=settings.ODOO_CACHE_ENABLED,
+)
@@ -2,17 +2,120 @@
 Odoo XML-RPC Client for dental clinic ERP integration.
 
 This client provides methods to interact with Odoo Dental module.
+The domains and field lists are shared with the async client (odoo_async.py).
 """
 
+import threading
 import xmlrpc.client
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
 from app.core.config import settings
+from app.integrations.patient_index import phone_variants
+
+
+PATIENT_FIELDS = ['name', 'email', 'phone', 'mobile', 'street', 'city']
+APPOINTMENT_FIELDS = ['partner_id', 'appointment_date', 'duration', 'state', 'notes']
+INVOICE_FIELDS = ['name', 'invoice_date', 'amount_total', 'amount_residual', 'payment_state', 'state']
+
+ODOO_DATETIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def patient_domain(name: Optional[str] = None, phone: Optional[str] = None) -> List[Any]:
+    """Search domain for patients matching the name or the phone."""
+    domain = []
+    if name:
+        domain.append(('name', 'ilike', name))
+    if phone:
+        # Phones are stored as typed; match the usual formats of the number
+        domain.append(('phone', 'in', phone_variants(phone)))
+    if len(domain) == 2:
+        domain.insert(0, '|')
+    return domain
+
+
+def patient_values(name: str, email: Optional[str] = None, phone: Optional[str] = None) -> Dict[str, Any]:
+    """Field values for a new patient."""
+    patient_data = {
+        'name': name,
+        'customer_rank': 1,  # Mark as customer
+    }
+    if email:
+        patient_data['email'] = email
+    if phone:
+        patient_data['phone'] = phone
+    return patient_data
+
+
+def appointment_domain(
+    patient_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    state: Optional[str] = None,
+) -> List[Any]:
+    """Search domain for appointments."""
+    domain = []
+    if patient_id:
+        domain.append(('partner_id', '=', patient_id))
+    if date_from:
+        domain.append(('appointment_date', '>=', date_from.strftime(ODOO_DATETIME_FORMAT)))
+    if date_to:
+        domain.append(('appointment_date', '<=', date_to.strftime(ODOO_DATETIME_FORMAT)))
+    if state:
+        domain.append(('state', '=', state))
+    return domain
+
+
+def appointment_values(
+    patient_id: int,
+    appointment_date: datetime,
+    duration: float = 1.0,
+    notes: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Field values for a new appointment."""
+    appointment_data = {
+        'partner_id': patient_id,
+        'appointment_date': appointment_date.strftime(ODOO_DATETIME_FORMAT),
+        'duration': duration,
+        'state': 'draft',
+    }
+    if notes:
+        appointment_data['notes'] = notes
+    return appointment_data
+
+
+def invoice_domain(patient_id: int) -> List[Any]:
+    """Search domain for a patient's customer invoices."""
+    return [('partner_id', '=', patient_id), ('move_type', '=', 'out_invoice')]
+
+
+def search_read_options(
+    fields: Optional[List[str]] = None,
+    offset: int = 0,
+    limit: Optional[int] = None,
+    order: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Keyword arguments for search_read (unset options left out)."""
+    options: Dict[str, Any] = {}
+    if fields is not None:
+        options['fields'] = fields
+    if offset:
+        options['offset'] = offset
+    if limit is not None:
+        options['limit'] = limit
+    if order:
+        options['order'] = order
+    return options
+
+
+def order_by_ids(records: List[Dict[str, Any]], ids: List[int]) -> List[Dict[str, Any]]:
+    """Records in the order of `ids` (IDs without a record are left out)."""
+    by_id = {record['id']: record for record in records}
+    return [by_id[record_id] for record_id in ids if record_id in by_id]
 
 
 class OdooClient:
-    """Client for Odoo XML-RPC API."""
+    """Client for Odoo XML-RPC API (blocking; one connection per thread)."""
     
     def __init__(self):
         """Initialize Odoo client with connection details."""
@@ -21,13 +124,27 @@ class OdooClient:
         self.username = settings.ODOO_USERNAME
         self.password = settings.ODOO_PASSWORD
         
-        # XML-RPC endpoints
-        self.common = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/common")
-        self.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object")
+        # ServerProxy is not thread-safe, so each thread gets its own
+        self._local = threading.local()
+        self._auth_lock = threading.Lock()
         
         # Authenticate and get UID
         self.uid = None
     
+    @property
+    def common(self) -> xmlrpc.client.ServerProxy:
+        """XML-RPC endpoint for login, for the calling thread."""
+        if not hasattr(self._local, "common"):
+            self._local.common = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/common")
+        return self._local.common
+    
+    @property
+    def models(self) -> xmlrpc.client.ServerProxy:
+        """XML-RPC endpoint for model methods, for the calling thread."""
+        if not hasattr(self._local, "models"):
+            self._local.models = xmlrpc.client.ServerProxy(f"{self.url}/xmlrpc/2/object")
+        return self._local.models
+    
     def authenticate(self) -> bool:
         """
         Authenticate with Odoo and get user ID.
@@ -36,9 +153,10 @@ class OdooClient:
             True if authentication successful, False otherwise
         """
         try:
-            self.uid = self.common.authenticate(
+            uid = self.common.authenticate(
                 self.db, self.username, self.password, {}
             )
+            self.uid = uid or None
             return self.uid is not None
         except Exception as e:
             print(f"Odoo authentication failed: {e}")
@@ -58,31 +176,95 @@ class OdooClient:
             Result from Odoo
         """
         if not self.uid:
-            self.authenticate()
+            with self._auth_lock:
+                if not self.uid:
+                    self.authenticate()
         
         return self.models.execute_kw(
             self.db, self.uid, self.password,
             model, method, args, kwargs
         )
     
+    # Batched reads
+    
+    def search_read(
+        self,
+        model: str,
+        domain: List[Any],
+        fields: Optional[List[str]] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        order: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search and read matching records in one call.
+        
+        Args:
+            model: Odoo model name
+            domain: Search domain
+            fields: Fields to return (all fields when None)
+            offset: Number of records to skip
+            limit: Maximum number of records
+            order: Sort order (e.g. 'appointment_date desc')
+            
+        Returns:
+            List of record dictionaries (with 'id')
+        """
+        return self._execute(
+            model, 'search_read', domain, **search_read_options(fields, offset, limit, order)
+        )
+    
+    def read_many(self, model: str, ids: List[int], fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        Read several records in one call.
+        
+        Args:
+            model: Odoo model name
+            ids: Record IDs
+            fields: Fields to return (all fields when None)
+            
+        Returns:
+            Records in the order of `ids`; deleted or inaccessible IDs are left out
+        """
+        if not ids:
+            return []
+        # search_read skips missing IDs, where read would fail the whole call
+        records = self.search_read(model, [('id', 'in', list(ids))], fields)
+        return order_by_ids(records, list(ids))
+    
     # Patient Management
     
+    def find_patients(
+        self,
+        name: Optional[str] = None,
+        phone: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Search for patients by name or phone and read their details in one call.
+        
+        Args:
+            name: Patient name (partial match)
+            phone: Patient phone number (E.164 or national format)
+            limit: Maximum number of patients
+            
+        Returns:
+            List of patient data dictionaries
+        """
+        return self.search_read('res.partner', patient_domain(name, phone), PATIENT_FIELDS, limit=limit)
+    
     def search_patients(self, name: Optional[str] = None, phone: Optional[str] = None) -> List[int]:
         """
         Search for patients by name or phone.
         
         Args:
             name: Patient name (partial match)
-            phone: Patient phone number
+            phone: Patient phone number (E.164 or national format)
             
         Returns:
             List of patient IDs
         """
-        domain = []
-        if name:
-            domain.append(('name', 'ilike', name))
-        if phone:
-            domain.append(('phone', '=', phone))
+        domain = patient_domain(name, phone)
         
         return self._execute('res.partner', 'search', domain)
     
@@ -99,7 +281,7 @@ class OdooClient:
         results = self._execute(
             'res.partner', 'read',
             [patient_id],
-            {'fields': ['name', 'email', 'phone', 'mobile', 'street', 'city']}
+            fields=PATIENT_FIELDS,
         )
         return results[0] if results else None
     
@@ -116,14 +298,7 @@ class OdooClient:
         Returns:
             New patient ID
         """
-        patient_data = {
-            'name': name,
-            'customer_rank': 1,  # Mark as customer
-        }
-        if email:
-            patient_data['email'] = email
-        if phone:
-            patient_data['phone'] = phone
+        patient_data = patient_values(name, email, phone)
         
         return self._execute('res.partner', 'create', patient_data)
     
@@ -148,15 +323,7 @@ class OdooClient:
         Returns:
             List of appointment IDs
         """
-        domain = []
-        if patient_id:
-            domain.append(('partner_id', '=', patient_id))
-        if date_from:
-            domain.append(('appointment_date', '>=', date_from.strftime('%Y-%m-%d %H:%M:%S')))
-        if date_to:
-            domain.append(('appointment_date', '<=', date_to.strftime('%Y-%m-%d %H:%M:%S')))
-        if state:
-            domain.append(('state', '=', state))
+        domain = appointment_domain(patient_id, date_from, date_to, state)
         
         # Note: This assumes dental.appointment model exists in Odoo Dental
         return self._execute('dental.appointment', 'search', domain)
@@ -174,10 +341,26 @@ class OdooClient:
         results = self._execute(
             'dental.appointment', 'read',
             [appointment_id],
-            {'fields': ['partner_id', 'appointment_date', 'duration', 'state', 'notes']}
+            fields=APPOINTMENT_FIELDS,
         )
         return results[0] if results else None
     
+    def get_patient_appointments(self, patient_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get a patient's appointments with their details in one call.
+        
+        Args:
+            patient_id: Patient ID
+            limit: Maximum number of appointments
+            
+        Returns:
+            Appointment data dictionaries, earliest first
+        """
+        return self.search_read(
+            'dental.appointment', appointment_domain(patient_id=patient_id), APPOINTMENT_FIELDS,
+            limit=limit, order='appointment_date asc',
+        )
+    
     def create_appointment(
         self,
         patient_id: int,
@@ -197,14 +380,7 @@ class OdooClient:
         Returns:
             New appointment ID
         """
-        appointment_data = {
-            'partner_id': patient_id,
-            'appointment_date': appointment_date.strftime('%Y-%m-%d %H:%M:%S'),
-            'duration': duration,
-            'state': 'draft',
-        }
-        if notes:
-            appointment_data['notes'] = notes
+        appointment_data = appointment_values(patient_id, appointment_date, duration, notes)
         
         return self._execute('dental.appointment', 'create', appointment_data)
     
@@ -233,6 +409,24 @@ class OdooClient:
         """
         return self.update_appointment(appointment_id, state='cancelled')
     
+    # Invoices
+    
+    def get_patient_invoices(self, patient_id: int, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Get a patient's invoice summaries in one call.
+        
+        Args:
+            patient_id: Patient ID
+            limit: Maximum number of invoices
+            
+        Returns:
+            Invoice data dictionaries, newest first
+        """
+        return self.search_read(
+            'account.move', invoice_domain(patient_id), INVOICE_FIELDS,
+            limit=limit, order='invoice_date desc',
+        )
+    
     # Available time slots
     
     def get_available_slots(
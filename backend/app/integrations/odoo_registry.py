@@ -0,0 +1,272 @@
+"""
+Odoo Client Registry
+
+One pooled AsyncOdooClient per organization, so a single backend process
+can serve many clinics:
+- Clients are created on first use from the organization's odoo_db_name
+  and odoo_api_key; organizations without their own Odoo database (and
+  unknown IDs) share the default client built from settings
+- Concurrent first requests for an organization share one database lookup
+- At most max_clients organizations are kept; the least recently used
+  one without calls in flight is evicted and its connections are closed
+- A background reaper closes connections that have been idle for
+  idle_seconds; the client reconnects (and logs in again) on its next call
+Alex's patient lookups resolve their client here (organization_odoo in
+agent_tools); the app closes the registry at shutdown.
+"""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from prometheus_client import Counter, Gauge
+
+from app.core.config import settings
+from app.integrations.odoo_async import AsyncOdooClient, OdooConnectionPool, async_odoo_client, odoo_connection_pool
+
+
+logger = logging.getLogger(__name__)
+
+
+TENANT_CLIENTS = Gauge(
+    "odoo_tenant_clients",
+    "Organizations with their own Odoo client in this process",
+)
+SESSIONS_CLOSED = Counter(
+    "odoo_tenant_sessions_closed_total",
+    "Odoo connection sessions closed by the client registry",
+    ["reason"],  # evicted, idle
+)
+
+
+@dataclass(frozen=True)
+class OdooTenant:
+    """Where an organization's Odoo data lives."""
+
+    db: str
+    username: str
+    password: str
+
+
+def load_organization_tenant(organization_id: str) -> Optional[OdooTenant]:
+    """
+    Look up an organization's Odoo database (blocking).
+
+    Args:
+        organization_id: Organization UUID
+
+    Returns:
+        OdooTenant, or None if the organization does not exist or has no Odoo database
+    """
+    try:
+        org_uuid = uuid.UUID(str(organization_id))
+    except ValueError:
+        return None
+
+    from app.core.database import SessionLocal
+    from app.models.organization import Organization
+
+    db = SessionLocal()
+    try:
+        organization = db.query(Organization).filter(Organization.id == org_uuid).first()
+        if organization is None or not organization.odoo_db_name:
+            return None
+        return OdooTenant(
+            db=organization.odoo_db_name,
+            username=settings.ODOO_USERNAME,
+            password=organization.odoo_api_key or settings.ODOO_PASSWORD,
+        )
+    finally:
+        db.close()
+
+
+class OdooClientRegistry:
+    """Lazily created, bounded set of per-organization Odoo clients."""
+
+    def __init__(
+        self,
+        resolve: Callable[[str], Optional[OdooTenant]] = load_organization_tenant,
+        default_client: Optional[AsyncOdooClient] = None,
+        pool: Optional[OdooConnectionPool] = None,
+        url: str = settings.ODOO_URL,
+        protocol: str = settings.ODOO_PROTOCOL,
+        max_clients: int = settings.ODOO_MAX_TENANT_CLIENTS,
+        idle_seconds: float = settings.ODOO_IDLE_SESSION_SECONDS,
+        reap_interval: float = settings.ODOO_REAP_INTERVAL_SECONDS,
+    ):
+        """
+        Initialize registry.
+
+        Args:
+            resolve: Blocking lookup of an organization's Odoo database (run in a thread)
+            default_client: Client for organizations without their own database
+            pool: Connection pool shared by the clients
+            url: Odoo server URL hosting the organizations' databases
+            protocol: "xmlrpc" or "jsonrpc"
+            max_clients: Maximum organizations kept
+            idle_seconds: Close a database's connections after this long without calls
+            reap_interval: Seconds between idle-connection checks
+        """
+        self.resolve = resolve
+        self.pool = pool or odoo_connection_pool
+        self.default_client = default_client or async_odoo_client
+        self.url = url
+        self.protocol = protocol
+        self.max_clients = max_clients
+        self.idle_seconds = idle_seconds
+        self.reap_interval = reap_interval
+
+        # organization ID -> client, least recently used first (default client included)
+        self._clients: "OrderedDict[str, AsyncOdooClient]" = OrderedDict()
+        self._resolving: Dict[str, asyncio.Future] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def _own_clients(self) -> int:
+        return len({id(client) for client in self._clients.values() if client is not self.default_client})
+
+    async def get(self, organization_id: str) -> AsyncOdooClient:
+        """
+        The Odoo client for an organization (created on first use).
+
+        Args:
+            organization_id: Organization ID
+
+        Returns:
+            The organization's client, or the default client
+        """
+        self._ensure_reaper()
+        organization_id = str(organization_id)
+        client = self._clients.get(organization_id)
+        if client is not None:
+            self._clients.move_to_end(organization_id)
+            return client
+
+        pending = self._resolving.get(organization_id)
+        if pending is not None:
+            return await asyncio.shield(pending)
+
+        pending = self._resolving[organization_id] = asyncio.get_running_loop().create_future()
+        try:
+            tenant = await asyncio.to_thread(self.resolve, organization_id)
+            client = self._create(tenant)
+            self._clients[organization_id] = client
+            await self._evict()
+            pending.set_result(client)
+            return client
+        except Exception as e:
+            pending.set_exception(e)
+            pending.exception()  # Retrieved here if nobody else was waiting
+            raise
+        finally:
+            del self._resolving[organization_id]
+            TENANT_CLIENTS.set(self._own_clients())
+
+    def _create(self, tenant: Optional[OdooTenant]) -> AsyncOdooClient:
+        if tenant is None or tenant.db == self.default_client.db:
+            return self.default_client
+        # Another organization may already use this database (e.g. after a re-import)
+        for client in self._clients.values():
+            if client.db == tenant.db and client.username == tenant.username:
+                return client
+        return AsyncOdooClient(
+            self.url, tenant.db, tenant.username, tenant.password, protocol=self.protocol, pool=self.pool
+        )
+
+    def _busy(self, client: AsyncOdooClient) -> bool:
+        session = self._session_of(client)
+        return session is not None and session.in_flight > 0
+
+    def _session_of(self, client: AsyncOdooClient):
+        for session in self.pool.sessions():
+            if session.url == client.url.rstrip("/") and session.db == client.db:
+                return session
+        return None
+
+    async def _evict(self):
+        """Drop least recently used organizations (skipping clients with calls in flight) until under the bound."""
+        excess = len(self._clients) - self.max_clients
+        for organization_id, client in list(self._clients.items()):
+            if excess <= 0:
+                return
+            if client is not self.default_client and self._busy(client):
+                continue
+            del self._clients[organization_id]
+            excess -= 1
+            if client is not self.default_client and all(other is not client for other in self._clients.values()):
+                await self._close(client, "evicted")
+        if excess > 0:
+            logger.warning(f"{len(self._clients)} organizations have busy Odoo clients, above the limit of {self.max_clients}")
+
+    async def _close(self, client: AsyncOdooClient, reason: str):
+        if self._session_of(client) is None:
+            return
+        await self.pool.close_session(client.url, client.db)
+        SESSIONS_CLOSED.labels(reason=reason).inc()
+        logger.info(f"Closed Odoo connections to db={client.db} ({reason})")
+
+    async def reap_idle(self) -> int:
+        """
+        Close connections of databases with no calls for idle_seconds.
+
+        Returns:
+            Number of sessions closed
+        """
+        cutoff = time.monotonic() - self.idle_seconds
+        closed = 0
+        for session in self.pool.sessions():
+            if session.in_flight == 0 and session.last_used < cutoff:
+                await self.pool.close_session(session.url, session.db)
+                SESSIONS_CLOSED.labels(reason="idle").inc()
+                closed += 1
+        if closed:
+            logger.info(f"Closed {closed} idle Odoo sessions")
+        return closed
+
+    def invalidate(self, organization_id: str):
+        """Forget an organization's client, e.g. after its Odoo settings change."""
+        self._clients.pop(str(organization_id), None)
+        TENANT_CLIENTS.set(self._own_clients())
+
+    def _ensure_reaper(self):
+        """Start the reaper on the running event loop (restarting it if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._reaper is not None and not self._reaper.done() and self._reaper.get_loop() is loop:
+            return
+        self._reaper = loop.create_task(self._reap_forever(), name="odoo-session-reaper")
+
+    async def _reap_forever(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self.reap_idle()
+            except Exception as e:
+                logger.error(f"Reaping idle Odoo sessions failed: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        """Client and session counts."""
+        return {
+            "organizations": len(self._clients),
+            "clients": self._own_clients(),
+            "sessions": len(self.pool.sessions()),
+        }
+
+    async def aclose(self):
+        """Stop the reaper and close every connection on the running event loop."""
+        if self._reaper is not None and self._reaper.get_loop() is asyncio.get_running_loop():
+            self._reaper.cancel()
+            try:
+                await self._reaper
+            except asyncio.CancelledError:
+                pass
+        self._reaper = None
+        self._clients.clear()
+        TENANT_CLIENTS.set(0)
+        await self.pool.aclose()
+
+
+# Global Odoo client registry instance
+odoo_client_registry = OdooClientRegistry()
@@ -0,0 +1,274 @@
+"""
+Patient Search Index
+
+In-memory lookup structures for patient search by name or phone:
+- Phones normalized to E.164 (+972...), so "052-148-1915", "0521481915"
+  and "+972521481915" find the same patient with one dict lookup
+- Name trigrams narrow a substring query down to a few candidates before
+  the exact check, instead of scanning every patient
+- Sorted name tokens answer one- and two-letter queries as word prefixes
+- Trigram similarity ranks near misses ("Tamar Amr", "כהנ") for fuzzy search
+Hebrew and English names are folded the same way on both sides: case,
+niqqud and final letters (ך/ם/ן/ף/ץ) are ignored. Adding a patient only
+touches that patient's entries.
+"""
+
+import bisect
+import re
+from array import array
+from collections import Counter
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+
+DEFAULT_COUNTRY_CODE = "972"  # Israel
+
+_NIQQUD = re.compile("[\u0591-\u05C7]")
+_FINAL_LETTERS = str.maketrans("ךםןףץ", "כמנפצ")
+_TOKEN = re.compile(r"\w+")
+_NON_DIGITS = re.compile(r"\D")
+
+
+def fold(text: str) -> str:
+    """Case-, niqqud- and final-letter-insensitive form of a name."""
+    return _NIQQUD.sub("", text).casefold().translate(_FINAL_LETTERS)
+
+
+def normalize_phone(phone: str, country_code: str = DEFAULT_COUNTRY_CODE) -> Optional[str]:
+    """
+    Normalize a phone number to E.164.
+
+    Args:
+        phone: Phone number as typed ("052-148-1915", "+972 52 148 1915", "00972...")
+        country_code: Country code assumed for national numbers (leading 0)
+
+    Returns:
+        E.164 number, or None if the input is not a complete number
+    """
+    digits = _NON_DIGITS.sub("", phone)
+    stripped = phone.lstrip()
+    if stripped.startswith("+"):
+        number = digits
+    elif digits.startswith("00"):
+        number = digits[2:]
+    elif digits.startswith("0"):
+        number = country_code + digits[1:]
+    elif digits.startswith(country_code) and len(digits) >= len(country_code) + 8:
+        number = digits
+    else:
+        return None
+    # E.164 allows up to 15 digits; anything much shorter is a fragment
+    if not 10 <= len(number) <= 15:
+        return None
+    return "+" + number
+
+
+def phone_variants(phone: str, country_code: str = DEFAULT_COUNTRY_CODE) -> List[str]:
+    """
+    Common ways the same number is stored (for exact-match search on a server).
+
+    Args:
+        phone: Phone number as typed
+        country_code: Country code assumed for national numbers
+
+    Returns:
+        The input plus its E.164 and national forms ("+972521481915", "0521481915", "052-1481915")
+    """
+    variants = [phone.strip()]
+    e164 = normalize_phone(phone, country_code)
+    if e164:
+        variants.append(e164)
+        if e164[1:].startswith(country_code):
+            national = "0" + e164[1 + len(country_code):]
+            variants += [national, f"{national[:3]}-{national[3:]}"]
+    return list(dict.fromkeys(variants))
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _post(postings: Dict[str, array], keys: Iterable[str], seq: int):
+    """Append an entry number to the posting list of each key."""
+    for key in keys:
+        entries = postings.get(key)
+        if entries is None:
+            entries = postings[key] = array("i")
+        entries.append(seq)
+
+
+class PatientSearchIndex:
+    """Name and phone lookup structures over a set of patients."""
+
+    def __init__(self, country_code: str = DEFAULT_COUNTRY_CODE):
+        """
+        Initialize patient search index.
+
+        Args:
+            country_code: Country code assumed for national phone numbers
+        """
+        self.country_code = country_code
+
+        # Patients are numbered in insertion order; None marks a removed entry
+        self._ids: List[Optional[int]] = []
+        self._names: List[str] = []
+        self._phone_digits: List[str] = []
+        self._seq_by_id: Dict[int, int] = {}
+
+        self._by_phone: Dict[str, List[int]] = {}
+        self._name_trigrams: Dict[str, array] = {}
+        self._name_trigram_counts = array("i")
+        self._phone_trigrams: Dict[str, array] = {}
+        self._by_token: Dict[str, array] = {}
+        self._sorted_tokens: Optional[List[str]] = None  # Built on first prefix query
+
+    def __len__(self) -> int:
+        return len(self._seq_by_id)
+
+    def add(self, patient: Dict[str, Any]):
+        """
+        Index a patient (replacing an earlier entry with the same ID).
+
+        Args:
+            patient: Patient with id, name and phone
+        """
+        self.remove(patient["id"])
+
+        seq = len(self._ids)
+        name = fold(patient.get("name") or "")
+        phone = patient.get("phone") or ""
+        self._ids.append(patient["id"])
+        self._names.append(name)
+        self._seq_by_id[patient["id"]] = seq
+
+        # Padded so that word starts and ends have trigrams of their own
+        name_trigrams = _trigrams(f" {name} ")
+        _post(self._name_trigrams, name_trigrams, seq)
+        self._name_trigram_counts.append(len(name_trigrams))
+
+        for token in set(_TOKEN.findall(name)):
+            postings = self._by_token.get(token)
+            if postings is None:
+                postings = self._by_token[token] = array("i")
+                if self._sorted_tokens is not None:
+                    bisect.insort(self._sorted_tokens, token)
+            postings.append(seq)
+
+        e164 = normalize_phone(phone, self.country_code) if phone else None
+        digits = e164[1:] if e164 else _NON_DIGITS.sub("", phone)
+        self._phone_digits.append(digits)
+        if e164:
+            self._by_phone.setdefault(e164, []).append(seq)
+        _post(self._phone_trigrams, _trigrams(digits), seq)
+
+    def remove(self, patient_id: int) -> bool:
+        """
+        Drop a patient from search results.
+
+        Args:
+            patient_id: Patient ID
+
+        Returns:
+            True if the patient was indexed
+        """
+        seq = self._seq_by_id.pop(patient_id, None)
+        if seq is None:
+            return False
+        # Posting lists keep the stale entry; lookups skip it
+        self._ids[seq] = None
+        return True
+
+    def _substring(self, query: str, texts: List[str], trigrams: Dict[str, array]) -> Iterable[int]:
+        """Entries whose text contains the query, checked against the rarest query trigram's entries."""
+        query_trigrams = _trigrams(query)
+        if not query_trigrams:
+            return (seq for seq, text in enumerate(texts) if query in text)
+        postings = min((trigrams.get(t, ()) for t in query_trigrams), key=len)
+        return (seq for seq in postings if query in texts[seq])
+
+    def _token_prefix(self, prefix: str) -> Iterable[int]:
+        """Entries with a name word starting with the prefix."""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._by_token)
+        tokens = self._sorted_tokens
+        matches = []
+        i = bisect.bisect_left(tokens, prefix)
+        while i < len(tokens) and tokens[i].startswith(prefix):
+            matches.append(self._by_token[tokens[i]])
+            i += 1
+        return chain.from_iterable(matches)
+
+    def match_name(self, name: str) -> Set[int]:
+        """Entry numbers for a name query (substring, or word prefix under three letters)."""
+        query = fold(name)
+        if len(query) < 3:
+            return set(self._token_prefix(query))
+        return set(self._substring(query, self._names, self._name_trigrams))
+
+    def match_phone(self, phone: str) -> Set[int]:
+        """Entry numbers for a phone query (complete number, else a run of its digits)."""
+        e164 = normalize_phone(phone, self.country_code)
+        if e164 and e164 in self._by_phone:
+            return set(self._by_phone[e164])
+        digits = _NON_DIGITS.sub("", phone)
+        if not digits:
+            return set()
+        # Not a number on file: search a run of digits, e.g. a truncated number
+        # ("+9725041500", "07381679"). Numbers are stored as E.164 digits, so a
+        # leading national 0 is also tried as the country code.
+        runs = {digits}
+        if e164:
+            runs.add(e164[1:])
+        elif digits.startswith("0") and not digits.startswith("00"):
+            runs.add(self.country_code + digits[1:])
+        found: Set[int] = set()
+        for run in runs:
+            found.update(self._substring(run, self._phone_digits, self._phone_trigrams))
+        return found
+
+    def search(self, name: Optional[str] = None, phone: Optional[str] = None) -> List[int]:
+        """
+        Patients matching the name or the phone.
+
+        Args:
+            name: Part of the patient's name
+            phone: Phone number in any common format, or part of one
+
+        Returns:
+            Patient IDs in the order they were added
+        """
+        found: Set[int] = set()
+        if name:
+            found |= self.match_name(name)
+        if phone:
+            found |= self.match_phone(phone)
+        ids = self._ids
+        return [ids[seq] for seq in sorted(found) if ids[seq] is not None]
+
+    def fuzzy_search(self, name: str, limit: int = 5, min_similarity: float = 0.3) -> List[Tuple[int, float]]:
+        """
+        Patients whose name shares the most trigrams with the query.
+
+        Args:
+            name: Name as typed, possibly misspelled or in another word order
+            limit: Maximum number of results
+            min_similarity: Minimum Jaccard similarity of the trigram sets
+
+        Returns:
+            (patient ID, similarity) pairs, most similar first
+        """
+        query_trigrams = _trigrams(f" {fold(name)} ")
+        if not query_trigrams:
+            return []
+
+        shared = Counter(chain.from_iterable(
+            self._name_trigrams.get(trigram, ()) for trigram in query_trigrams
+        ))
+        counts, ids = self._name_trigram_counts, self._ids
+        scored = []
+        for seq, common in shared.items():
+            similarity = common / (len(query_trigrams) + counts[seq] - common)
+            if similarity >= min_similarity and ids[seq] is not None:
+                scored.append((similarity, -seq))
+        scored.sort(reverse=True)
+        return [(ids[-neg_seq], similarity) for similarity, neg_seq in scored[:limit]]
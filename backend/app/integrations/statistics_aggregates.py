@@ -0,0 +1,289 @@
+"""
+Incremental Statistics Aggregates
+
+Dashboard statistics kept up to date as records are written, instead of
+recomputed per request:
+- Counters: totals, appointments per status and treatment, invoices per
+  status, patients per insurance provider, revenue sums
+- Per-month revenue buckets and revenue per treatment
+- Per-day counts of registrations, last visits and scheduled
+  appointments, so "last 30 days" style windows add up a few buckets
+- Revenue per patient, with the top patients kept in a bounded min-heap
+  (a patient's revenue only grows, so the top set stays exact)
+Built once from an AnalyticsStore, then updated by patient_added,
+appointment_added, appointment_status_changed and invoice_added. Reads
+and updates hold one lock, so a read never sees half of a write.
+differences() compares two aggregates, for periodic full-rebuild checks.
+"""
+
+import heapq
+import threading
+from collections import Counter
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.integrations.analytics_store import MISSING_DAY, AnalyticsStore, to_day
+
+
+def _money(value: float) -> float:
+    return round(float(value), 2)
+
+
+def _day_counts(days: np.ndarray) -> Counter:
+    days = days[days != MISSING_DAY]
+    values, counts = np.unique(days, return_counts=True)
+    return Counter(dict(zip(values.tolist(), counts.tolist())))
+
+
+def _since(days: Counter, first_day: int) -> int:
+    return sum(count for day, count in days.items() if day >= first_day)
+
+
+class StatisticsAggregates:
+    """Materialized dashboard statistics, updated per write."""
+
+    def __init__(self, top_capacity: int = 100):
+        """
+        Initialize empty aggregates.
+
+        Args:
+            top_capacity: Patients kept in the top-revenue heap (larger top_patients limits scan all patients)
+        """
+        self.top_capacity = top_capacity
+        self._lock = threading.Lock()
+
+        self.patient_count = 0
+        self.patients_with_balance = 0
+        self.insurance: Counter = Counter()
+        self.registered_by_day: Counter = Counter()
+        self.last_visit_by_day: Counter = Counter()
+
+        self.appointment_count = 0
+        self.appointment_status: Counter = Counter()
+        self.appointment_treatment: Counter = Counter()
+        self.scheduled_by_day: Counter = Counter()
+
+        self.invoice_count = 0
+        self.invoice_status: Counter = Counter()
+        self.total_revenue = 0.0
+        self.paid_amount = 0.0
+        self.outstanding_balance = 0.0
+        self.revenue_by_treatment: Dict[str, float] = {}
+        self.monthly_revenue: Dict[str, float] = {}
+        self.patient_revenue: Dict[int, float] = {}
+
+        # Top patients: min-heap of (revenue, -patient_id), worst first; members maps patient -> revenue
+        self._top_heap: List[Tuple[float, int]] = []
+        self._top_members: Dict[int, float] = {}
+
+    @classmethod
+    def from_store(cls, store: AnalyticsStore, top_capacity: int = 100) -> "StatisticsAggregates":
+        """Aggregates of a columnar snapshot (vectorized full build)."""
+        aggregates = cls(top_capacity)
+
+        aggregates.patient_count = store.patient_count
+        aggregates.patients_with_balance = int(np.count_nonzero(store.patient_outstanding > 0))
+        aggregates.insurance = Counter(store.patient_insurance.group_count())
+        aggregates.registered_by_day = _day_counts(store.patient_registered)
+        aggregates.last_visit_by_day = _day_counts(store.patient_last_visit)
+
+        aggregates.appointment_count = store.appointment_count
+        aggregates.appointment_status = Counter(store.appointment_status.group_count())
+        aggregates.appointment_treatment = Counter(store.appointment_treatment.group_count())
+        scheduled = store.appointment_status.codes == store.appointment_status.code("scheduled")
+        aggregates.scheduled_by_day = _day_counts(store.appointment_day[scheduled])
+
+        aggregates.invoice_count = store.invoice_count
+        aggregates.invoice_status = Counter(store.invoice_status.group_count())
+        aggregates.total_revenue = float(store.invoice_total.sum())
+        aggregates.paid_amount = float(store.invoice_paid.sum())
+        aggregates.outstanding_balance = float(store.invoice_outstanding.sum())
+        aggregates.revenue_by_treatment = store.invoice_treatment.group_sum(store.invoice_total)
+        by_month = np.bincount(store.invoice_month_codes, weights=store.invoice_total, minlength=len(store.invoice_months))
+        aggregates.monthly_revenue = dict(zip(store.invoice_months, by_month.tolist()))
+        aggregates.patient_revenue = dict(zip(store.invoice_patient_ids.tolist(), store.patient_revenue.tolist()))
+
+        for patient_id, _ in store.top_patients(top_capacity):
+            aggregates._top_members[patient_id] = aggregates.patient_revenue[patient_id]
+        aggregates._rebuild_heap()
+        return aggregates
+
+    # Updates
+
+    def patient_added(self, patient: Dict[str, Any]):
+        """Count a new patient."""
+        with self._lock:
+            self.patient_count += 1
+            if (patient.get("outstanding_balance") or 0) > 0:
+                self.patients_with_balance += 1
+            self.insurance[str(patient.get("insurance_provider"))] += 1
+            self.registered_by_day[to_day(patient["registration_date"])] += 1
+            if patient.get("last_visit"):
+                self.last_visit_by_day[to_day(patient["last_visit"])] += 1
+
+    def appointment_added(self, appointment: Dict[str, Any]):
+        """Count a new appointment."""
+        with self._lock:
+            self.appointment_count += 1
+            self.appointment_treatment[appointment["treatment_type"]] += 1
+            self._count_status(appointment, appointment["status"], 1)
+
+    def appointment_status_changed(self, appointment: Dict[str, Any], old_status: str):
+        """Move an appointment from old_status to its current status."""
+        if old_status == appointment["status"]:
+            return
+        with self._lock:
+            self._count_status(appointment, old_status, -1)
+            self._count_status(appointment, appointment["status"], 1)
+
+    def _count_status(self, appointment: Dict[str, Any], status: str, change: int):
+        self.appointment_status[status] += change
+        if status == "scheduled":
+            self.scheduled_by_day[to_day(appointment["date"])] += change
+
+    def invoice_added(self, invoice: Dict[str, Any]):
+        """Add a new invoice's amounts."""
+        total = float(invoice["total_amount"])
+        with self._lock:
+            self.invoice_count += 1
+            self.invoice_status[invoice["status"]] += 1
+            self.total_revenue += total
+            self.paid_amount += float(invoice["paid_amount"])
+            self.outstanding_balance += float(invoice["outstanding_amount"])
+            treatment = invoice["treatment"]
+            self.revenue_by_treatment[treatment] = self.revenue_by_treatment.get(treatment, 0.0) + total
+            month = invoice["issue_date"][:7]
+            self.monthly_revenue[month] = self.monthly_revenue.get(month, 0.0) + total
+
+            patient_id = invoice["patient_id"]
+            revenue = self.patient_revenue.get(patient_id, 0.0) + total
+            self.patient_revenue[patient_id] = revenue
+            self._offer_top(patient_id, revenue)
+
+    def _offer_top(self, patient_id: int, revenue: float):
+        """Update the top set after a patient's revenue grew."""
+        if patient_id in self._top_members:
+            self._top_members[patient_id] = revenue
+            self._rebuild_heap()
+        elif len(self._top_members) < self.top_capacity:
+            self._top_members[patient_id] = revenue
+            heapq.heappush(self._top_heap, (revenue, -patient_id))
+        elif self._top_heap and (revenue, -patient_id) > self._top_heap[0]:
+            _, worst = heapq.heapreplace(self._top_heap, (revenue, -patient_id))
+            del self._top_members[-worst]
+            self._top_members[patient_id] = revenue
+
+    def _rebuild_heap(self):
+        self._top_heap = [(revenue, -patient_id) for patient_id, revenue in self._top_members.items()]
+        heapq.heapify(self._top_heap)
+
+    # Dashboard queries (same results as AnalyticsStore)
+
+    def overview(self) -> Dict[str, Any]:
+        """Totals and status counts (RealisticMockOdooClient.get_statistics)."""
+        with self._lock:
+            return {
+                "total_patients": self.patient_count,
+                "total_appointments": self.appointment_count,
+                "completed_appointments": self.appointment_status["completed"],
+                "scheduled_appointments": self.appointment_status["scheduled"],
+                "total_revenue": _money(self.total_revenue),
+                "outstanding_balance": _money(self.outstanding_balance),
+                "total_invoices": self.invoice_count,
+                "paid_invoices": self.invoice_status["paid"],
+                "unpaid_invoices": self.invoice_status["unpaid"],
+            }
+
+    def patient_statistics(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """New, active and owing patients, and patients per insurance provider."""
+        today_day = to_day(today or date.today())
+        with self._lock:
+            return {
+                "total_patients": self.patient_count,
+                "new_patients_30d": _since(self.registered_by_day, today_day - 30),
+                "active_patients_90d": _since(self.last_visit_by_day, today_day - 90),
+                "patients_with_outstanding_balance": self.patients_with_balance,
+                "insurance_distribution": {k: v for k, v in self.insurance.items() if v},
+            }
+
+    def appointment_statistics(self, today: Optional[date] = None) -> Dict[str, Any]:
+        """Appointments per status and treatment, and scheduled appointments in the next 7 days."""
+        today_day = to_day(today or date.today())
+        with self._lock:
+            return {
+                "total_appointments": self.appointment_count,
+                "status_distribution": {k: v for k, v in self.appointment_status.items() if v},
+                "upcoming_appointments_7d": sum(self.scheduled_by_day[day] for day in range(today_day, today_day + 8)),
+                "treatment_type_distribution": dict(self.appointment_treatment.most_common()),
+            }
+
+    def revenue_statistics(self) -> Dict[str, Any]:
+        """Revenue totals, revenue per treatment (highest first) and per month."""
+        with self._lock:
+            total_revenue = _money(self.total_revenue)
+            paid_amount = _money(self.paid_amount)
+            by_treatment = sorted(self.revenue_by_treatment.items(), key=lambda item: item[1], reverse=True)
+            return {
+                "total_revenue": total_revenue,
+                "paid_amount": paid_amount,
+                "outstanding_balance": _money(self.outstanding_balance),
+                "collection_rate": round(paid_amount / total_revenue * 100, 1) if total_revenue > 0 else 0,
+                "revenue_by_treatment": {t: _money(v) for t, v in by_treatment},
+                "monthly_revenue": {month: _money(v) for month, v in sorted(self.monthly_revenue.items())},
+            }
+
+    def top_patients(self, limit: int = 10) -> List[Tuple[int, float]]:
+        """
+        Patients with the highest invoiced total.
+
+        Args:
+            limit: Number of patients
+
+        Returns:
+            (patient ID, revenue) pairs, highest first (ties by patient ID)
+        """
+        if limit <= 0:
+            return []
+        rank = lambda item: (-item[1], item[0])
+        with self._lock:
+            candidates = self._top_members if limit <= self.top_capacity else self.patient_revenue
+            top = heapq.nsmallest(limit, candidates.items(), key=rank)
+        return [(patient_id, _money(revenue)) for patient_id, revenue in top]
+
+    # Consistency
+
+    def differences(self, other: "StatisticsAggregates") -> List[str]:
+        """Names of the statistics on which two aggregates disagree (amounts within a cent agree)."""
+        today = date.today()
+        mine, theirs = self._comparable(today), other._comparable(today)
+        return [name for name in mine if not _same(mine[name], theirs[name])]
+
+    def _comparable(self, today: date) -> Dict[str, Any]:
+        with self._lock:
+            state = {
+                "registered_by_day": +self.registered_by_day,  # Unary + drops zero counts
+                "last_visit_by_day": +self.last_visit_by_day,
+                "scheduled_by_day": +self.scheduled_by_day,
+                "patient_revenue": {p: v for p, v in self.patient_revenue.items() if v},
+            }
+        return {
+            "overview": self.overview(),
+            "patients": self.patient_statistics(today),
+            "appointments": self.appointment_statistics(today),
+            "revenue": self.revenue_statistics(),
+            "top_patients": self.top_patients(self.top_capacity),
+            **state,
+        }
+
+
+def _same(a: Any, b: Any) -> bool:
+    """Equal, comparing numbers to within a cent."""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same(a[k], b[k]) for k in a)
+    if isinstance(a, (list, tuple)) and isinstance(b, (list, tuple)):
+        return len(a) == len(b) and all(_same(x, y) for x, y in zip(a, b))
+    if isinstance(a, (int, float)) and isinstance(b, (int, float)):
+        return abs(a - b) < 0.01
+    return a == b
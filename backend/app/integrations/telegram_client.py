@@ -15,15 +15,17 @@ logger = logging.getLogger(__name__)
 class TelegramClient:
     """Client for Telegram Bot API."""
     
-    def __init__(self, bot_token: Optional[str] = None):
+    def __init__(self, bot_token: Optional[str] = None, api_url: Optional[str] = None):
         """
         Initialize Telegram client.
         
         Args:
             bot_token: Telegram bot token (defaults to settings)
+            api_url: Bot API server (defaults to settings, e.g. a local Bot API server)
         """
         self.bot_token = bot_token or settings.TELEGRAM_BOT_TOKEN
-        self.base_url = f"https://api.telegram.org/bot{self.bot_token}"
+        self.api_url = (api_url or settings.TELEGRAM_API_URL).rstrip("/")
+        self.base_url = f"{self.api_url}/bot{self.bot_token}"
         self.client = httpx.AsyncClient(timeout=30.0)
     
     async def send_message(
@@ -138,6 +140,42 @@ class TelegramClient:
             logger.error(f"Failed to send location to chat {chat_id}: {e}")
             raise
     
+    async def get_updates(
+        self,
+        offset: Optional[int] = None,
+        limit: int = 100,
+        timeout: int = 30,
+        allowed_updates: Optional[List[str]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetch pending updates with long polling (not while a webhook is set).
+        
+        Args:
+            offset: First update_id to return; confirms every earlier update
+            limit: Maximum number of updates (1-100)
+            timeout: Seconds the server may hold the request waiting for updates
+            allowed_updates: Update types to receive (None keeps the previous setting)
+            
+        Returns:
+            Updates, oldest first (empty if none arrived within the timeout)
+        """
+        url = f"{self.base_url}/getUpdates"
+        payload: Dict[str, Any] = {"limit": limit, "timeout": timeout}
+        
+        if offset is not None:
+            payload["offset"] = offset
+        if allowed_updates is not None:
+            payload["allowed_updates"] = allowed_updates
+        
+        try:
+            # The server holds the request for up to `timeout` seconds
+            response = await self.client.post(url, json=payload, timeout=timeout + 10.0)
+            response.raise_for_status()
+            return response.json()["result"]
+        except httpx.HTTPError as e:
+            logger.error(f"Failed to get updates: {e}")
+            raise
+    
     async def set_webhook(self, webhook_url: str) -> Dict[str, Any]:
         """
         Set the webhook URL for receiving updates.
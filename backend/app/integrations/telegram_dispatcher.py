@@ -0,0 +1,234 @@
+"""
+Telegram Update Dispatcher
+
+Processes Telegram updates off the request path, in order per chat:
+- One FIFO queue per chat: a chat's updates are handled one at a time,
+  in arrival order, while different chats run in parallel
+- A fixed pool of worker tasks (max_workers): a burst of updates never
+  means more concurrent handlers (LLM calls) than workers; a chat with
+  more queued updates goes to the back of the line after each one, so a
+  busy chat cannot starve the others
+- A bound on pending updates across all chats: submit() waits for space
+  (backpressure) and gives up after enqueue_timeout
+- Updates are deduplicated on update_id over a sliding window, so
+  Telegram's redeliveries (webhook retries, a replayed getUpdates batch)
+  are handled once
+- Queue depth, queue wait / handling / end-to-end latency and outcomes
+  as Prometheus metrics
+"""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Tuple
+
+from prometheus_client import Counter, Gauge, Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+QUEUE_DEPTH = Gauge(
+    "telegram_dispatcher_queue_depth",
+    "Telegram updates waiting to be handled",
+)
+ACTIVE_CHATS = Gauge(
+    "telegram_dispatcher_active_chats",
+    "Chats with updates queued or being handled",
+)
+STAGE_LATENCY = Histogram(
+    "telegram_dispatcher_stage_seconds",
+    "Telegram update latency per stage",
+    ["stage"],  # queued (submit to handler start), handle (handler run), total (submit to done)
+    buckets=(0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0),
+)
+UPDATES_TOTAL = Counter(
+    "telegram_dispatcher_updates_total",
+    "Telegram updates submitted to the dispatcher",
+    ["result"],  # handled, failed, duplicate, dropped
+)
+
+
+def update_chat_id(update: Dict[str, Any]) -> Optional[int]:
+    """Chat an update belongs to (None for updates without one, e.g. inline queries)."""
+    for key in ("message", "edited_message", "channel_post", "edited_channel_post"):
+        if key in update:
+            return update[key].get("chat", {}).get("id")
+    callback_query = update.get("callback_query")
+    if callback_query is not None:
+        return callback_query.get("message", {}).get("chat", {}).get("id")
+    return None
+
+
+class TelegramDispatcher:
+    """Per-chat FIFO queues served by a bounded pool of worker tasks."""
+
+    def __init__(
+        self,
+        handle_update: Callable[[Dict[str, Any]], Awaitable[Any]],
+        max_workers: int = 8,
+        max_pending: int = 1000,
+        dedupe_window: int = 10000,
+        enqueue_timeout: float = 2.0,
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            handle_update: Coroutine function that processes one update
+            max_workers: Maximum number of updates handled concurrently
+            max_pending: Maximum number of queued and running updates
+            dedupe_window: Number of recent update_ids remembered for deduplication
+            enqueue_timeout: Seconds submit() waits for space before dropping an update
+        """
+        self.handle_update = handle_update
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.dedupe_window = dedupe_window
+        self.enqueue_timeout = enqueue_timeout
+
+        self._chats: Dict[Hashable, Deque[Tuple[float, Dict[str, Any]]]] = {}  # Active chats' queues
+        self._seen: "OrderedDict[int, None]" = OrderedDict()  # Recent update_ids, oldest first
+        self._pending = 0
+        self._ready: Optional[asyncio.Queue] = None  # Chats with an update to hand to a worker
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._idle: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of updates submitted and not yet handled."""
+        return self._pending
+
+    def _ensure_started(self):
+        """Start the workers on the running event loop (restarting them if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._workers:
+            return
+
+        if self._pending and self._loop is not loop:
+            logger.warning(f"Discarding {self._pending} Telegram updates queued on a closed event loop")
+        self._chats.clear()
+        self._pending = 0
+        self._ready = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._loop = loop
+        self._workers = [
+            loop.create_task(self._run(), name=f"telegram-dispatcher-{i}") for i in range(self.max_workers)
+        ]
+
+    def _remember(self, update_id: Any) -> bool:
+        """Record an update_id; False if it is already in the window."""
+        if update_id is None:
+            return True
+        if update_id in self._seen:
+            return False
+        self._seen[update_id] = None
+        if len(self._seen) > self.dedupe_window:
+            self._seen.popitem(last=False)
+        return True
+
+    async def submit(self, update: Dict[str, Any]) -> bool:
+        """
+        Queue an update behind its chat's earlier updates.
+
+        Args:
+            update: Telegram Update object
+
+        Returns:
+            True if queued or already seen (a duplicate), False if dropped
+            because the dispatcher stayed full for enqueue_timeout
+        """
+        self._ensure_started()
+        update_id = update.get("update_id")
+        if not self._remember(update_id):
+            UPDATES_TOTAL.labels(result="duplicate").inc()
+            logger.info(f"Skipping duplicate Telegram update {update_id}")
+            return True
+
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            self._seen.pop(update_id, None)  # Not handled: a redelivery must get through
+            UPDATES_TOTAL.labels(result="dropped").inc()
+            logger.error(f"Telegram dispatcher is full, dropping update {update_id}")
+            return False
+
+        chat_id = update_chat_id(update)
+        key = chat_id if chat_id is not None else ("update", update_id, id(update))
+        queue = self._chats.get(key)
+        if queue is None:
+            # Idle chat: a worker can start on it right away
+            queue = self._chats[key] = deque()
+            self._ready.put_nowait(key)
+        queue.append((time.monotonic(), update))
+
+        self._pending += 1
+        self._idle.clear()
+        QUEUE_DEPTH.set(self._pending)
+        ACTIVE_CHATS.set(len(self._chats))
+        return True
+
+    async def _run(self):
+        """Worker loop: take a ready chat, handle its oldest update, requeue the chat if it has more."""
+        while True:
+            key = await self._ready.get()
+            queue = self._chats[key]
+            enqueued_at, update = queue.popleft()
+
+            started_at = time.monotonic()
+            STAGE_LATENCY.labels(stage="queued").observe(started_at - enqueued_at)
+            try:
+                await self.handle_update(update)
+                UPDATES_TOTAL.labels(result="handled").inc()
+            except Exception as e:
+                UPDATES_TOTAL.labels(result="failed").inc()
+                logger.error(f"Failed to handle Telegram update {update.get('update_id')}: {e}", exc_info=True)
+            finally:
+                done_at = time.monotonic()
+                STAGE_LATENCY.labels(stage="handle").observe(done_at - started_at)
+                STAGE_LATENCY.labels(stage="total").observe(done_at - enqueued_at)
+
+                # The chat stays claimed by this worker until here, so its next update cannot overtake
+                if queue:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._chats[key]
+                self._pending -= 1
+                self._slots.release()
+                QUEUE_DEPTH.set(self._pending)
+                ACTIVE_CHATS.set(len(self._chats))
+                if not self._pending:
+                    self._idle.set()
+
+    async def join(self):
+        """Wait until every submitted update has been handled."""
+        if self._idle is not None and self._workers:
+            await self._idle.wait()
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Handle pending updates and stop the workers.
+
+        Args:
+            timeout: Maximum seconds to wait for pending updates
+        """
+        if not self._workers:
+            return
+
+        try:
+            await asyncio.wait_for(self.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Timed out draining the Telegram dispatcher, {self._pending} updates lost")
+
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._loop = None
+        QUEUE_DEPTH.set(0)
+        ACTIVE_CHATS.set(0)
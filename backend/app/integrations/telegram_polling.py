@@ -0,0 +1,165 @@
+"""
+Telegram Long-Polling Ingestion
+
+Alternative to the webhook, for deployments without public HTTPS and for
+replaying update batches against a local (fake) Bot API server:
+- getUpdates long polling: each request waits up to poll_timeout seconds
+  and returns up to batch_size updates
+- Offset tracking: the next request's offset (last handed-off update_id
+  + 1) confirms the batch to Telegram; stop() makes a final zero-timeout
+  call so a restart does not receive it again
+- Updates go to the same submit() as webhook updates (the
+  TelegramDispatcher). If it refuses one (full), the rest of the batch
+  waits: the offset stays before it, so the next request fetches it again
+- The webhook is removed first (Telegram refuses getUpdates while one is
+  set); request errors back off exponentially up to max_retry_delay
+- Batch size, request latency, handed-off updates and errors as
+  Prometheus metrics
+Only one process may poll a bot (Telegram answers 409 Conflict to a
+second), so run polling mode with a single worker.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Histogram
+
+from app.integrations.telegram_client import TelegramClient
+
+
+logger = logging.getLogger(__name__)
+
+
+BATCH_SIZE = Histogram(
+    "telegram_polling_batch_size",
+    "Updates returned per getUpdates call",
+    buckets=(0, 1, 2, 5, 10, 25, 50, 100),
+)
+REQUEST_LATENCY = Histogram(
+    "telegram_polling_request_seconds",
+    "getUpdates round trip, including the long-polling wait",
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0, 60.0),
+)
+UPDATES_TOTAL = Counter(
+    "telegram_polling_updates_total",
+    "Updates fetched with getUpdates",
+    ["result"],  # submitted, refused
+)
+ERRORS_TOTAL = Counter(
+    "telegram_polling_errors_total",
+    "Failed getUpdates and deleteWebhook calls",
+)
+
+
+class TelegramPoller:
+    """getUpdates loop that hands updates to submit() in order."""
+
+    def __init__(
+        self,
+        client: TelegramClient,
+        submit: Callable[[Dict[str, Any]], Awaitable[bool]],
+        poll_timeout: int = 30,
+        batch_size: int = 100,
+        allowed_updates: Optional[List[str]] = None,
+        retry_delay: float = 1.0,
+        max_retry_delay: float = 30.0,
+    ):
+        """
+        Initialize poller.
+
+        Args:
+            client: Telegram client to poll with
+            submit: Coroutine function taking one update; False means "not now, try again"
+            poll_timeout: Seconds each getUpdates call may wait for updates
+            batch_size: Maximum updates per getUpdates call (1-100)
+            allowed_updates: Update types to receive (None: Telegram's default)
+            retry_delay: Seconds before retrying after an error or a refused update
+            max_retry_delay: Upper bound for the exponential backoff on errors
+        """
+        self.client = client
+        self.submit = submit
+        self.poll_timeout = poll_timeout
+        self.batch_size = batch_size
+        self.allowed_updates = allowed_updates
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+
+        self.offset: Optional[int] = None  # Next update_id to fetch
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start polling on the running event loop."""
+        if not self.running:
+            self._task = asyncio.get_running_loop().create_task(self.run(), name="telegram-poller")
+
+    async def run(self):
+        """Poll until cancelled."""
+        delay = self.retry_delay
+        webhook_removed = False
+        while True:
+            try:
+                if not webhook_removed:
+                    await self.client.delete_webhook()
+                    webhook_removed = True
+                started_at = time.monotonic()
+                updates = await self.client.get_updates(
+                    offset=self.offset,
+                    limit=self.batch_size,
+                    timeout=self.poll_timeout,
+                    allowed_updates=self.allowed_updates,
+                )
+                REQUEST_LATENCY.observe(time.monotonic() - started_at)
+            except Exception as e:
+                ERRORS_TOTAL.inc()
+                logger.error(f"Telegram polling failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
+                continue
+
+            delay = self.retry_delay
+            BATCH_SIZE.observe(len(updates))
+            if await self.feed(updates) < len(updates):
+                await asyncio.sleep(self.retry_delay)
+
+    async def feed(self, updates: List[Dict[str, Any]]) -> int:
+        """
+        Hand a batch to submit() in order, advancing the offset past each accepted update.
+
+        Args:
+            updates: Updates from getUpdates, oldest first
+
+        Returns:
+            Number of updates accepted (stops at the first refused one)
+        """
+        for accepted, update in enumerate(updates):
+            if not await self.submit(update):
+                UPDATES_TOTAL.labels(result="refused").inc()
+                logger.warning(f"Telegram update {update['update_id']} refused, fetching it again later")
+                return accepted
+            UPDATES_TOTAL.labels(result="submitted").inc()
+            self.offset = update["update_id"] + 1
+        return len(updates)
+
+    async def stop(self):
+        """Stop polling and confirm the updates handed off so far."""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+        if self.offset is not None:
+            try:
+                await self.client.get_updates(offset=self.offset, limit=1, timeout=0)
+            except Exception as e:
+                logger.warning(f"Could not confirm Telegram updates before {self.offset}: {e}")
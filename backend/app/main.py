@@ -4,11 +4,64 @@ DentalAI Backend - FastAPI Application
 This is the main entry point for the DentalAI SaaS platform backend.
 """
 
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 from app.core.config import settings
+from app.api.v1.endpoints.telegram import telegram_dispatcher, telegram_poller
+from app.integrations.mock_odoo_realistic import realistic_mock_odoo
+from app.integrations.odoo_registry import odoo_client_registry
+from app.memory.causal_memory import causal_memory
+from app.memory.embeddings import embedding_service
+from app.memory.write_behind import interaction_writer
+
+
+logger = logging.getLogger(__name__)
+
+
+async def warm_up():
+    """Initialize heavy dependencies in parallel, off the event loop."""
+    start = time.perf_counter()
+    components = {
+        "embedding model": embedding_service.warm_up,
+        "causal memory": causal_memory.warm_up,
+        "mock Odoo data": realistic_mock_odoo.warm_up,
+    }
+    results = await asyncio.gather(
+        *[asyncio.to_thread(warm) for warm in components.values()],
+        return_exceptions=True,
+    )
+
+    # A failed component is initialized again on first use
+    for name, result in zip(components, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Warm-up of {name} failed: {result}")
+    logger.info(f"Warm-up finished in {time.perf_counter() - start:.2f}s")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown hooks."""
+    if settings.WARM_UP_ON_STARTUP:
+        await warm_up()
+    if settings.TELEGRAM_INGESTION_MODE == "polling":
+        telegram_poller.start()
+
+    yield
+
+    # Stop fetching, finish queued Telegram updates, then flush the causal memory writes they made
+    await telegram_poller.stop()
+    await telegram_dispatcher.stop()
+    await interaction_writer.stop()
+    await odoo_client_registry.aclose()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -17,6 +70,7 @@ app = FastAPI(
     version="14.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
+    lifespan=lifespan,
 )
 
 # CORS middleware
@@ -58,6 +112,12 @@ async def health_check():
     )
 
 
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
 @app.get("/api/v1/status")
 async def api_status():
     """API status endpoint."""
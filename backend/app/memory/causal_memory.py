@@ -8,36 +8,82 @@ This implements the causal memory graph that learns from agent interactions:
 - Implements Bayesian updating for confidence scores
 """
 
+import json
+import threading
+import time
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID, uuid4
 
+import numpy as np
 from neo4j import GraphDatabase
-from sentence_transformers import SentenceTransformer
 
 from app.core.config import settings
+from app.agents.keywords import keyword_engine
+from app.memory.embeddings import embedding_service
+from app.memory.vector_index import VectorIndex
 
 
 class CausalMemoryGraph:
     """Causal Memory Graph using Neo4j and Sentence-BERT."""
     
+    # Similarity thresholds
+    LINK_SIMILARITY_THRESHOLD = 0.8
+    RECALL_SIMILARITY_THRESHOLD = 0.7
+    
+    # Maximum number of SIMILAR_TO links created per interaction
+    MAX_SIMILAR_LINKS = 100
+    
+    # How often to pick up interactions written by other workers
+    INDEX_REFRESH_SECONDS = 30.0
+    
     def __init__(self):
-        """Initialize causal memory with Neo4j and embedding model."""
-        # Neo4j connection
-        self.driver = GraphDatabase.driver(
-            settings.NEO4J_URI,
-            auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
-        )
+        """
+        Initialize causal memory.
+        
+        Nothing is connected or loaded here: the Neo4j driver, schema and vector
+        index are set up on first use (or by warm_up()), so importing this
+        module stays cheap.
+        """
+        self._driver = None
+        self._init_lock = threading.Lock()
         
-        # Sentence-BERT for semantic similarity
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        # Sentence-BERT for semantic similarity (cached, shared with other callers)
+        self.embeddings = embedding_service
         
-        # Initialize schema
-        self._initialize_schema()
+        # In-process nearest-neighbour index over interaction embeddings
+        self.vector_index = VectorIndex(backend=settings.VECTOR_INDEX_BACKEND)
+        self.index_window_days = settings.VECTOR_INDEX_WINDOW_DAYS
+        self.index_max_per_org = settings.VECTOR_INDEX_MAX_PER_ORG
+        self._index_synced_at: Optional[float] = None
+        self._index_watermark_ms: Optional[int] = None  # Newest written_at seen (Neo4j clock)
+    
+    @property
+    def driver(self):
+        """Neo4j driver, connected (with schema and vector index ready) on first access."""
+        if self._driver is None:
+            with self._init_lock:
+                if self._driver is None:
+                    driver = GraphDatabase.driver(
+                        settings.NEO4J_URI,
+                        auth=(settings.NEO4J_USER, settings.NEO4J_PASSWORD)
+                    )
+                    try:
+                        self._initialize_schema(driver)
+                    except Exception:
+                        driver.close()
+                        raise
+                    self._driver = driver
+                    self._refresh_vector_index(force=True)
+        return self._driver
+    
+    def warm_up(self):
+        """Connect to Neo4j, create the schema and load the vector index now."""
+        self.driver
     
-    def _initialize_schema(self):
+    def _initialize_schema(self, driver):
         """Create indexes and constraints in Neo4j."""
-        with self.driver.session() as session:
+        with driver.session() as session:
             # Create constraints
             session.run("""
                 CREATE CONSTRAINT interaction_id IF NOT EXISTS
@@ -54,6 +100,74 @@ class CausalMemoryGraph:
                 CREATE INDEX interaction_timestamp IF NOT EXISTS
                 FOR (i:Interaction) ON (i.timestamp)
             """)
+            
+            session.run("""
+                CREATE INDEX interaction_written_at IF NOT EXISTS
+                FOR (i:Interaction) ON (i.written_at)
+            """)
+    
+    def _refresh_vector_index(self, force: bool = False):
+        """
+        Load interactions missing from the vector index.
+        
+        The first call loads the newest index_max_per_org interactions of each
+        organization from the last index_window_days. Later calls fetch what
+        was written since (e.g. by other workers), going by written_at - the
+        Neo4j clock when the write ran - so a write-behind batch committed
+        long after its interactions happened is still picked up.
+        
+        Args:
+            force: Refresh even if the last refresh is recent
+        """
+        now = time.time()
+        if not force and self._index_synced_at is not None:
+            if now - self._index_synced_at < self.INDEX_REFRESH_SECONDS:
+                return
+        
+        window_ms = int((now - self.index_window_days * 86400) * 1000)
+        
+        with self.driver.session() as session:
+            if self._index_watermark_ms is None:
+                results = session.run("""
+                    MATCH (i:Interaction)
+                    WHERE i.timestamp >= datetime({epochMillis: $window_ms})
+                    WITH i ORDER BY i.timestamp DESC
+                    WITH i.organization_id AS organization_id, collect(i)[..$per_org] AS recent
+                    UNWIND recent AS i
+                    RETURN i.id AS id, i.embedding AS embedding, organization_id,
+                           i.timestamp.epochMillis AS timestamp_ms,
+                           i.written_at.epochMillis AS written_ms
+                """, {"window_ms": window_ms, "per_org": self.index_max_per_org})
+                watermark_ms = 0
+            else:
+                # Overlap the previous refresh to cover transactions still running then
+                results = session.run("""
+                    MATCH (i:Interaction)
+                    WHERE i.written_at >= datetime({epochMillis: $since_ms})
+                      AND i.timestamp >= datetime({epochMillis: $window_ms})
+                    RETURN i.id AS id, i.embedding AS embedding,
+                           i.organization_id AS organization_id,
+                           i.timestamp.epochMillis AS timestamp_ms,
+                           i.written_at.epochMillis AS written_ms
+                """, {
+                    "since_ms": self._index_watermark_ms - int(self.INDEX_REFRESH_SECONDS * 1000),
+                    "window_ms": window_ms,
+                })
+                watermark_ms = self._index_watermark_ms
+            
+            for record in results:
+                watermark_ms = max(watermark_ms, record["written_ms"] or 0)
+                if record["id"] in self.vector_index or not record["embedding"]:
+                    continue
+                self.vector_index.add(
+                    record["id"],
+                    record["embedding"],
+                    organization_id=record["organization_id"],
+                    timestamp=record["timestamp_ms"] / 1000.0,
+                )
+        
+        self._index_watermark_ms = watermark_ms
+        self._index_synced_at = now
     
     def store_interaction(
         self,
@@ -80,166 +194,194 @@ class CausalMemoryGraph:
         Returns:
             Interaction ID
         """
-        # Generate embedding for user message
-        embedding = self.embedding_model.encode(user_message).tolist()
+        return self.store_interactions([{
+            "user_message": user_message,
+            "agent_response": agent_response,
+            "agent_name": agent_name,
+            "conversation_id": conversation_id,
+            "organization_id": organization_id,
+            "outcome": outcome,
+            "metadata": metadata,
+        }])[0]
+    
+    def store_interactions(self, interactions: List[Dict[str, Any]]) -> List[str]:
+        """
+        Store a batch of interactions in one transaction.
         
-        interaction_id = str(uuid4())
+        User messages are encoded together, and interactions, SIMILAR_TO links
+        and pattern updates are each written with a single UNWIND query.
         
-        # Convert metadata to JSON string (Neo4j doesn't support nested dicts)
-        import json
-        metadata_json = json.dumps(metadata or {})
+        Args:
+            interactions: Dicts with the keyword arguments of store_interaction()
+                (an optional "timestamp" datetime overrides the write time)
+            
+        Returns:
+            Interaction IDs, in input order
+        """
+        if not interactions:
+            return []
         
-        with self.driver.session() as session:
-            session.run("""
-                CREATE (i:Interaction {
-                    id: $interaction_id,
-                    user_message: $user_message,
-                    agent_response: $agent_response,
-                    agent_name: $agent_name,
-                    conversation_id: $conversation_id,
-                    organization_id: $organization_id,
-                    outcome: $outcome,
-                    embedding: $embedding,
-                    timestamp: datetime($timestamp),
-                    metadata_json: $metadata_json
-                })
-            """, {
+        # Connecting also loads the vector index, which linking below relies on
+        driver = self.driver
+        
+        # Generate embeddings for all user messages at once (cached messages are reused)
+        embeddings = self.embeddings.encode_batch(
+            [interaction["user_message"] for interaction in interactions]
+        ).tolist()
+        
+        now = datetime.now(timezone.utc)
+        rows = []
+        links = []
+        pattern_rows = []
+        
+        for interaction, embedding in zip(interactions, embeddings):
+            interaction_id = str(uuid4())
+            organization_id = str(interaction["organization_id"])
+            timestamp = interaction.get("timestamp") or now
+            
+            rows.append({
                 "interaction_id": interaction_id,
-                "user_message": user_message,
-                "agent_response": agent_response,
-                "agent_name": agent_name,
-                "conversation_id": str(conversation_id),
-                "organization_id": str(organization_id),
-                "outcome": outcome,
+                "user_message": interaction["user_message"],
+                "agent_response": interaction["agent_response"],
+                "agent_name": interaction["agent_name"],
+                "conversation_id": str(interaction["conversation_id"]),
+                "organization_id": organization_id,
+                "outcome": interaction.get("outcome", "success"),
                 "embedding": embedding,
-                "timestamp": datetime.now().isoformat(),
-                "metadata_json": metadata_json
+                "timestamp": timestamp.isoformat(),
+                # Neo4j doesn't support nested dicts
+                "metadata_json": json.dumps(interaction.get("metadata") or {}),
             })
+            
+            # Find similar interactions (before indexing, so we don't match ourselves);
+            # earlier interactions of the same batch are already indexed
+            links.extend(self._find_similar_links(interaction_id, embedding, organization_id))
+            
+            # Keep the vector index in sync with the graph
+            self.vector_index.add(
+                interaction_id,
+                embedding,
+                organization_id=organization_id,
+                timestamp=timestamp.timestamp(),
+            )
+            
+            success_rate = 1.0 if rows[-1]["outcome"] == "success" else 0.0
+            for pattern_name in self._extract_patterns(interaction["user_message"], organization_id):
+                pattern_rows.append({
+                    "interaction_id": interaction_id,
+                    "pattern_id": f"pattern_{pattern_name}",
+                    "pattern_name": pattern_name,
+                    "success_rate": success_rate,
+                })
         
-        # Find and link similar interactions
-        self._link_similar_interactions(interaction_id, embedding)
+        try:
+            with driver.session() as session:
+                session.execute_write(self._write_interactions, rows, links, pattern_rows)
+        except Exception:
+            # Nothing was stored - don't let the batch take top-k slots in later lookups
+            for row in rows:
+                self.vector_index.remove(row["interaction_id"])
+            raise
         
-        # Extract and store patterns
-        self._extract_patterns(interaction_id, user_message, agent_response, outcome)
+        return [row["interaction_id"] for row in rows]
+    
+    @staticmethod
+    def _write_interactions(
+        tx,
+        rows: List[Dict[str, Any]],
+        links: List[Dict[str, Any]],
+        pattern_rows: List[Dict[str, Any]],
+    ):
+        """Write interactions, similarity links and patterns in one transaction."""
+        tx.run("""
+            UNWIND $rows AS row
+            CREATE (i:Interaction {
+                id: row.interaction_id,
+                user_message: row.user_message,
+                agent_response: row.agent_response,
+                agent_name: row.agent_name,
+                conversation_id: row.conversation_id,
+                organization_id: row.organization_id,
+                outcome: row.outcome,
+                embedding: row.embedding,
+                timestamp: datetime(row.timestamp),
+                written_at: datetime.statement(),
+                metadata_json: row.metadata_json
+            })
+        """, {"rows": rows})
+        
+        if links:
+            tx.run("""
+                UNWIND $links AS link
+                MATCH (i1:Interaction {id: link.id1})
+                MATCH (i2:Interaction {id: link.id2})
+                MERGE (i1)-[r:SIMILAR_TO {similarity: link.similarity}]->(i2)
+            """, {"links": links})
         
-        return interaction_id
+        if pattern_rows:
+            # Rows are applied in order, so repeated patterns update counts incrementally
+            tx.run("""
+                UNWIND $pattern_rows AS row
+                MERGE (p:Pattern {id: row.pattern_id, name: row.pattern_name})
+                ON CREATE SET p.count = 1, p.success_rate = row.success_rate
+                ON MATCH SET p.count = p.count + 1,
+                             p.success_rate = (p.success_rate * (p.count - 1) + row.success_rate) / p.count
+                WITH p, row
+                MATCH (i:Interaction {id: row.interaction_id})
+                MERGE (i)-[:MATCHES_PATTERN]->(p)
+            """, {"pattern_rows": pattern_rows})
     
-    def _link_similar_interactions(self, interaction_id: str, embedding: List[float]):
+    def _find_similar_links(
+        self,
+        interaction_id: str,
+        embedding: List[float],
+        organization_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
         """
-        Find and link similar interactions using cosine similarity.
+        Find similar interactions to link using the vector index.
         
         Args:
             interaction_id: ID of the new interaction
             embedding: Embedding vector of the interaction
-        """
-        with self.driver.session() as session:
-            # Find similar interactions (cosine similarity > 0.8)
-            # Note: Neo4j doesn't have built-in vector similarity, so we fetch all and compute in Python
-            # For production, use a vector database like Pinecone or Milvus
-            
-            similar = session.run("""
-                MATCH (i:Interaction)
-                WHERE i.id <> $interaction_id
-                RETURN i.id AS id, i.embedding AS embedding
-                LIMIT 100
-            """, {"interaction_id": interaction_id})
+            organization_id: Only link interactions of this organization
             
-            for record in similar:
-                other_embedding = record["embedding"]
-                similarity = self._cosine_similarity(embedding, other_embedding)
-                
-                if similarity > 0.8:
-                    # Create SIMILAR_TO relationship
-                    session.run("""
-                        MATCH (i1:Interaction {id: $id1})
-                        MATCH (i2:Interaction {id: $id2})
-                        MERGE (i1)-[r:SIMILAR_TO {similarity: $similarity}]->(i2)
-                    """, {
-                        "id1": interaction_id,
-                        "id2": record["id"],
-                        "similarity": similarity
-                    })
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        import numpy as np
-        
-        vec1 = np.array(vec1)
-        vec2 = np.array(vec2)
-        
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
-        
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        Returns:
+            SIMILAR_TO link rows (id1, id2, similarity)
+        """
+        similar = self.vector_index.search(
+            embedding,
+            k=self.MAX_SIMILAR_LINKS,
+            organization_id=organization_id,
+            threshold=self.LINK_SIMILARITY_THRESHOLD,
+            exclude_ids={interaction_id},
+        )
         
-        return dot_product / (norm1 * norm2)
+        return [
+            {"id1": interaction_id, "id2": other_id, "similarity": similarity}
+            for other_id, similarity in similar
+        ]
     
-    def _extract_patterns(
-        self,
-        interaction_id: str,
-        user_message: str,
-        agent_response: str,
-        outcome: str
-    ):
+    def _extract_patterns(self, user_message: str, organization_id: Optional[str] = None) -> List[str]:
         """
-        Extract and store patterns from the interaction.
+        Extract patterns from the interaction.
         
         Args:
-            interaction_id: ID of the interaction
             user_message: User's message
-            agent_response: Agent's response
-            outcome: Outcome of the interaction
+            organization_id: Organization whose keywords apply
+            
+        Returns:
+            Names of the matched patterns
         """
-        # Simple pattern extraction (can be enhanced with NLP)
-        # For MVP, we identify patterns based on keywords
-        
-        patterns = []
-        
-        # Appointment scheduling pattern
-        if any(word in user_message.lower() for word in ["appointment", "schedule", "book", "תור"]):
-            patterns.append("appointment_scheduling")
-        
-        # Medical question pattern
-        if any(word in user_message.lower() for word in ["pain", "hurt", "tooth", "dental", "כאב"]):
-            patterns.append("medical_question")
-        
-        # Billing pattern
-        if any(word in user_message.lower() for word in ["payment", "invoice", "bill", "cost", "תשלום"]):
-            patterns.append("billing_inquiry")
-        
-        # Store patterns
-        with self.driver.session() as session:
-            for pattern_name in patterns:
-                pattern_id = f"pattern_{pattern_name}"
-                
-                # Create or update pattern node
-                session.run("""
-                    MERGE (p:Pattern {id: $pattern_id, name: $pattern_name})
-                    ON CREATE SET p.count = 1, p.success_rate = $success_rate
-                    ON MATCH SET p.count = p.count + 1,
-                                 p.success_rate = (p.success_rate * (p.count - 1) + $success_rate) / p.count
-                """, {
-                    "pattern_id": pattern_id,
-                    "pattern_name": pattern_name,
-                    "success_rate": 1.0 if outcome == "success" else 0.0
-                })
-                
-                # Link interaction to pattern
-                session.run("""
-                    MATCH (i:Interaction {id: $interaction_id})
-                    MATCH (p:Pattern {id: $pattern_id})
-                    MERGE (i)-[:MATCHES_PATTERN]->(p)
-                """, {
-                    "interaction_id": interaction_id,
-                    "pattern_id": pattern_id
-                })
+        # Keyword-based patterns (can be enhanced with NLP)
+        return list(keyword_engine.scan(user_message, organization_id).patterns)
     
     def get_similar_interactions(
         self,
         user_message: str,
-        limit: int = 5
+        limit: int = 5,
+        organization_id: Optional[UUID] = None,
+        window_days: int = 7,
+        embedding: Optional[np.ndarray] = None,
     ) -> List[Dict[str, Any]]:
         """
         Get similar past interactions for a given user message.
@@ -247,44 +389,57 @@ class CausalMemoryGraph:
         Args:
             user_message: User's message
             limit: Maximum number of similar interactions to return
+            organization_id: Only return interactions of this organization
+            window_days: Only consider interactions from the last N days
+            embedding: Precomputed embedding of user_message
             
         Returns:
             List of similar interactions with their responses and outcomes
         """
         # Generate embedding
-        embedding = self.embedding_model.encode(user_message).tolist()
+        if embedding is None:
+            embedding = self.embeddings.encode(user_message)
         
+        self._refresh_vector_index()
+        
+        similar = self.vector_index.search(
+            embedding,
+            k=limit,
+            organization_id=str(organization_id) if organization_id else None,
+            since=time.time() - window_days * 86400,
+            threshold=self.RECALL_SIMILARITY_THRESHOLD,
+        )
+        
+        if not similar:
+            return []
+        
+        # Fetch interaction details for the matches in one query
         with self.driver.session() as session:
-            # Fetch recent interactions
             results = session.run("""
                 MATCH (i:Interaction)
-                WHERE i.timestamp > datetime() - duration('P7D')
+                WHERE i.id IN $ids
                 RETURN i.id AS id, i.user_message AS user_message,
                        i.agent_response AS agent_response, i.outcome AS outcome,
-                       i.embedding AS embedding, i.agent_name AS agent_name
-                ORDER BY i.timestamp DESC
-                LIMIT 100
-            """)
-            
-            similar_interactions = []
+                       i.agent_name AS agent_name
+            """, {"ids": [interaction_id for interaction_id, _ in similar]})
             
-            for record in results:
-                other_embedding = record["embedding"]
-                similarity = self._cosine_similarity(embedding, other_embedding)
-                
-                if similarity > 0.7:
-                    similar_interactions.append({
-                        "id": record["id"],
-                        "user_message": record["user_message"],
-                        "agent_response": record["agent_response"],
-                        "outcome": record["outcome"],
-                        "agent_name": record["agent_name"],
-                        "similarity": similarity
-                    })
-            
-            # Sort by similarity and return top results
-            similar_interactions.sort(key=lambda x: x["similarity"], reverse=True)
-            return similar_interactions[:limit]
+            records = {record["id"]: record for record in results}
+        
+        similar_interactions = []
+        for interaction_id, similarity in similar:
+            record = records.get(interaction_id)
+            if record is None:
+                continue
+            similar_interactions.append({
+                "id": record["id"],
+                "user_message": record["user_message"],
+                "agent_response": record["agent_response"],
+                "outcome": record["outcome"],
+                "agent_name": record["agent_name"],
+                "similarity": similarity
+            })
+        
+        return similar_interactions
     
     def get_pattern_statistics(self, pattern_name: str) -> Optional[Dict[str, Any]]:
         """
@@ -313,7 +468,9 @@ class CausalMemoryGraph:
     
     def close(self):
         """Close Neo4j connection."""
-        self.driver.close()
+        if self._driver is not None:
+            self._driver.close()
+            self._driver = None
 
 
 # Global causal memory instance
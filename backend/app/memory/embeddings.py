@@ -0,0 +1,271 @@
+"""
+Embedding Service
+
+Wraps the Sentence-BERT model used by causal memory:
+- Content-hash LRU cache, so repeated texts are encoded once
+- Micro-batching: concurrent aencode() calls are merged into one encode() call
+- Encoding runs in a worker pool, off the event loop
+- Prometheus counters for cache hits/misses and a per-batch latency histogram
+"""
+
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+from prometheus_client import Counter, Histogram
+
+
+logger = logging.getLogger(__name__)
+
+
+CACHE_REQUESTS = Counter(
+    "embedding_cache_requests_total",
+    "Embedding cache lookups",
+    ["result"],  # hit, miss
+)
+BATCH_LATENCY = Histogram(
+    "embedding_batch_latency_seconds",
+    "Time spent in one SentenceTransformer.encode() call",
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5),
+)
+BATCH_SIZE = Histogram(
+    "embedding_batch_size",
+    "Texts encoded per SentenceTransformer.encode() call",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+
+
+def _load_sentence_transformer(model_name: str):
+    """Import sentence-transformers (and torch) and load the model weights."""
+    from sentence_transformers import SentenceTransformer
+
+    return SentenceTransformer(model_name)
+
+
+def _content_key(text: str) -> bytes:
+    """Cache key for a text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class EmbeddingService:
+    """Cached, micro-batched SentenceTransformer encoder."""
+
+    def __init__(
+        self,
+        model_name: str = "all-MiniLM-L6-v2",
+        cache_size: int = 10000,
+        max_batch_size: int = 64,
+        max_batch_delay: float = 0.005,
+        max_workers: int = 1,
+    ):
+        """
+        Initialize embedding service.
+
+        Args:
+            model_name: SentenceTransformer model name
+            cache_size: Maximum number of cached embeddings
+            max_batch_size: Maximum texts per encode() call
+            max_batch_delay: Seconds aencode() waits to collect a batch
+            max_workers: Threads running encode() calls
+        """
+        self.model_name = model_name
+        self.cache_size = cache_size
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+
+        # Loaded on first use (or by warm_up()) - importing torch and reading
+        # the weights dominates backend start-up time
+        self._model = None
+        self._model_lock = threading.Lock()
+
+        self._cache: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="embedding")
+
+        # Pending aencode() requests, coalesced by content key
+        self._pending: Dict[bytes, asyncio.Future] = {}
+        self._pending_texts: Dict[bytes, str] = {}
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def model(self):
+        """SentenceTransformer model, loaded on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    start = time.perf_counter()
+                    self._model = _load_sentence_transformer(self.model_name)
+                    logger.info(f"Loaded embedding model {self.model_name} in {time.perf_counter() - start:.2f}s")
+        return self._model
+
+    def warm_up(self):
+        """Load the model now instead of on the first request."""
+        self.model
+
+    # Cache
+
+    def _cache_get(self, key: bytes) -> Optional[np.ndarray]:
+        with self._cache_lock:
+            embedding = self._cache.get(key)
+            if embedding is not None:
+                self._cache.move_to_end(key)
+        CACHE_REQUESTS.labels(result="hit" if embedding is not None else "miss").inc()
+        return embedding
+
+    def _cache_put(self, key: bytes, embedding: np.ndarray):
+        embedding.setflags(write=False)  # Shared between callers
+        with self._cache_lock:
+            self._cache[key] = embedding
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def cache_info(self) -> Dict[str, int]:
+        """Current cache size and bound."""
+        with self._cache_lock:
+            return {"size": len(self._cache), "max_size": self.cache_size}
+
+    # Encoding
+
+    def _encode_uncached(self, texts: List[str]) -> np.ndarray:
+        """Run one model.encode() call and cache the results."""
+        start = time.perf_counter()
+        embeddings = np.asarray(self.model.encode(texts), dtype=np.float32)
+        BATCH_LATENCY.observe(time.perf_counter() - start)
+        BATCH_SIZE.observe(len(texts))
+
+        for text, embedding in zip(texts, embeddings):
+            self._cache_put(_content_key(text), embedding.copy())
+        return embeddings
+
+    def encode(self, text: str) -> np.ndarray:
+        """
+        Encode a single text (blocking).
+
+        Args:
+            text: Text to encode
+
+        Returns:
+            Embedding vector
+        """
+        return self.encode_batch([text])[0]
+
+    def encode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Encode several texts with at most one encode() call (blocking).
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            Embedding matrix, one row per text
+        """
+        results: List[Optional[np.ndarray]] = []
+        missing: Dict[bytes, str] = {}
+
+        for text in texts:
+            key = _content_key(text)
+            embedding = self._cache_get(key)
+            results.append(embedding)
+            if embedding is None:
+                missing[key] = text
+
+        if missing:
+            encoded = dict(zip(missing, self._encode_uncached(list(missing.values()))))
+            results = [
+                embedding if embedding is not None else encoded[_content_key(text)]
+                for text, embedding in zip(texts, results)
+            ]
+
+        if not results:
+            return np.zeros((0, 0), dtype=np.float32)
+        return np.vstack(results)
+
+    async def aencode(self, text: str) -> np.ndarray:
+        """
+        Encode a single text without blocking the event loop.
+
+        Concurrent calls within max_batch_delay are merged into one
+        encode() call; identical in-flight texts share one result.
+
+        Args:
+            text: Text to encode
+
+        Returns:
+            Embedding vector
+        """
+        key = _content_key(text)
+        embedding = self._cache_get(key)
+        if embedding is not None:
+            return embedding
+
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._pending[key] = future
+            self._pending_texts[key] = text
+
+            if len(self._pending) >= self.max_batch_size:
+                self._flush(loop)
+            elif self._flush_handle is None:
+                self._flush_handle = loop.call_later(self.max_batch_delay, self._flush, loop)
+
+        return await asyncio.shield(future)
+
+    async def aencode_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Encode several texts without blocking the event loop.
+
+        Args:
+            texts: Texts to encode
+
+        Returns:
+            Embedding matrix, one row per text
+        """
+        embeddings = await asyncio.gather(*[self.aencode(text) for text in texts])
+        return np.vstack(embeddings) if embeddings else np.zeros((0, 0), dtype=np.float32)
+
+    def _flush(self, loop: asyncio.AbstractEventLoop):
+        """Send the pending requests to the worker pool as one batch."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        futures, self._pending = self._pending, {}
+        texts, self._pending_texts = self._pending_texts, {}
+        keys = list(futures)
+
+        encode_future = loop.run_in_executor(
+            self._executor, self._encode_uncached, [texts[key] for key in keys]
+        )
+
+        def _resolve(done: asyncio.Future):
+            error = done.exception()
+            for position, key in enumerate(keys):
+                future = futures[key]
+                if future.done():
+                    continue
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(done.result()[position])
+
+        encode_future.add_done_callback(_resolve)
+
+    def close(self):
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=False)
+
+
+# Global embedding service (all-MiniLM-L6-v2)
+embedding_service = EmbeddingService()
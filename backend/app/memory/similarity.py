@@ -0,0 +1,105 @@
+"""
+Vectorized Cosine Similarity
+
+Helpers for scoring a query embedding against a whole candidate matrix:
+- Candidate embeddings are stored pre-normalized (unit length, float32)
+- One matrix-vector product scores every candidate
+- Top-k selection uses argpartition instead of a full sort
+"""
+
+from typing import Iterable, Tuple
+
+import numpy as np
+
+
+def normalize(vector: Iterable[float]) -> np.ndarray:
+    """
+    Convert a vector to unit length float32.
+
+    Args:
+        vector: Embedding vector
+
+    Returns:
+        Normalized vector (zero vectors are returned unchanged)
+    """
+    vector = np.asarray(vector, dtype=np.float32).ravel()
+    norm = np.linalg.norm(vector)
+    if norm == 0:
+        return vector
+    return vector / norm
+
+
+def normalize_rows(matrix: Iterable[Iterable[float]]) -> np.ndarray:
+    """
+    Convert every row of a matrix to unit length float32.
+
+    Args:
+        matrix: Candidate embeddings, one per row
+
+    Returns:
+        Row-normalized matrix (zero rows are returned unchanged)
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix.reshape(1, -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def cosine_similarities(query: Iterable[float], normalized_matrix: np.ndarray) -> np.ndarray:
+    """
+    Score a query against pre-normalized candidates.
+
+    Args:
+        query: Query embedding (normalized here)
+        normalized_matrix: Candidate embeddings from normalize_rows()
+
+    Returns:
+        Cosine similarity per candidate row
+    """
+    if normalized_matrix.shape[0] == 0:
+        return np.zeros(0, dtype=np.float32)
+    return normalized_matrix @ normalize(query)
+
+
+def top_k(
+    scores: np.ndarray,
+    k: int,
+    threshold: float = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Select the best scores.
+
+    Matches the semantics of filtering with ``score > threshold``, sorting by
+    score descending (ties keep candidate order) and truncating to k.
+
+    Args:
+        scores: Similarity per candidate
+        k: Maximum number of results
+        threshold: Only keep scores strictly above this value
+
+    Returns:
+        Tuple of (candidate positions, scores), best first
+    """
+    if k <= 0 or scores.size == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=scores.dtype)
+
+    if threshold is not None:
+        positions = np.flatnonzero(scores > threshold)
+    else:
+        positions = np.arange(scores.size)
+
+    if positions.size > k:
+        # Partial selection of the k largest, then order only those.
+        # Ties on the k-th score are resolved in favour of earlier candidates.
+        candidate_scores = scores[positions]
+        kth_score = candidate_scores[np.argpartition(-candidate_scores, k - 1)[k - 1]]
+        better = positions[candidate_scores > kth_score]
+        ties = positions[candidate_scores == kth_score][: k - better.size]
+        positions = np.sort(np.concatenate([better, ties]))
+
+    # Stable ordering: score descending, then candidate position
+    order = np.lexsort((positions, -scores[positions]))
+    positions = positions[order]
+    return positions, scores[positions]
@@ -0,0 +1,384 @@
+"""
+Vector Index for Causal Memory
+
+In-process approximate-nearest-neighbour index over interaction embeddings:
+- Embeddings are kept as float32 matrices, partitioned per organization
+- Lookups can be restricted to a time window (e.g. the last 7 days)
+  and to a given set of IDs
+- A partition is dropped as soon as its last embedding is removed
+- HNSW (hnswlib) is used when installed, with a brute-force NumPy fallback
+- The index is kept in sync with writes by CausalMemoryGraph
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.memory.similarity import normalize, top_k
+
+try:  # Optional dependency - falls back to brute force when missing
+    import hnswlib
+except ImportError:  # pragma: no cover - depends on the environment
+    hnswlib = None
+
+
+logger = logging.getLogger(__name__)
+
+
+class IndexPartition(ABC):
+    """Embeddings of a single organization."""
+
+    def __init__(self, dim: int):
+        """
+        Initialize partition.
+
+        Args:
+            dim: Embedding dimension
+        """
+        self.dim = dim
+        self.ids: List[str] = []
+        self.row_by_id: Dict[str, int] = {}
+        self.timestamps = np.zeros(0, dtype=np.float64)
+        self.alive = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.row_by_id)
+
+    def _append_row(self, item_id: str, timestamp: float) -> int:
+        """Register a new row and return its position."""
+        row = len(self.ids)
+        if row >= len(self.timestamps):
+            capacity = max(1024, 2 * len(self.timestamps))
+            self.timestamps = np.resize(self.timestamps, capacity)
+            alive = np.zeros(capacity, dtype=bool)
+            alive[:row] = self.alive[:row]
+            self.alive = alive
+        self.ids.append(item_id)
+        self.row_by_id[item_id] = row
+        self.timestamps[row] = timestamp
+        self.alive[row] = True
+        return row
+
+    def remove(self, item_id: str) -> bool:
+        """Mark an item as deleted."""
+        row = self.row_by_id.pop(item_id, None)
+        if row is None:
+            return False
+        self.alive[row] = False
+        return True
+
+    @property
+    def dead_rows(self) -> int:
+        """Rows of removed items still held by the partition."""
+        return len(self.ids) - len(self.row_by_id)
+
+    def live_rows(self) -> np.ndarray:
+        """Positions of the items that were not removed."""
+        return np.flatnonzero(self.alive[:len(self.ids)])
+
+    def _mask(self, since: Optional[float], include_ids: Optional[Set[str]]) -> np.ndarray:
+        """Rows eligible for a search."""
+        size = len(self.ids)
+        mask = self.alive[:size]
+        if since is not None:
+            mask = mask & (self.timestamps[:size] >= since)
+        if include_ids is not None:
+            included = np.zeros(size, dtype=bool)
+            included[[self.row_by_id[i] for i in include_ids if i in self.row_by_id]] = True
+            mask = mask & included
+        return mask
+
+    @abstractmethod
+    def add(self, item_id: str, vector: np.ndarray, timestamp: float) -> None:
+        """Add a unit-length vector to the partition."""
+
+    @abstractmethod
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        """Stored vectors of the given rows."""
+
+    @abstractmethod
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        since: Optional[float] = None,
+        threshold: Optional[float] = None,
+        include_ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """Return up to k (id, cosine similarity) pairs above threshold, best first."""
+
+
+class BruteForcePartition(IndexPartition):
+    """Exact search with a single matrix-vector product."""
+
+    def __init__(self, dim: int):
+        super().__init__(dim)
+        self.matrix = np.zeros((0, dim), dtype=np.float32)
+
+    def add(self, item_id: str, vector: np.ndarray, timestamp: float) -> None:
+        row = self._append_row(item_id, timestamp)
+        if row >= self.matrix.shape[0]:
+            matrix = np.zeros((len(self.timestamps), self.dim), dtype=np.float32)
+            matrix[:row] = self.matrix[:row]
+            self.matrix = matrix
+        self.matrix[row] = vector
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        return self.matrix[rows]
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        since: Optional[float] = None,
+        threshold: Optional[float] = None,
+        include_ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        size = len(self.ids)
+        mask = self._mask(since, include_ids)
+
+        if mask.all():
+            # Score the live prefix in place instead of gathering rows
+            rows = None
+            scores = self.matrix[:size] @ vector
+        else:
+            rows = np.flatnonzero(mask)
+            if rows.size == 0:
+                return []
+            scores = self.matrix[rows] @ vector
+
+        positions, best = top_k(scores, k, threshold)
+        if rows is not None:
+            positions = rows[positions]
+        return [(self.ids[row], float(score)) for row, score in zip(positions, best)]
+
+
+class HNSWPartition(IndexPartition):
+    """Approximate search with an hnswlib graph."""
+
+    def __init__(
+        self,
+        dim: int,
+        max_elements: int = 256,
+        ef_construction: int = 200,
+        m: int = 16,
+        ef_search: int = 64,
+    ):
+        super().__init__(dim)
+        self.ef_search = ef_search
+        self.graph = hnswlib.Index(space="ip", dim=dim)
+        self.graph.init_index(max_elements=max_elements, ef_construction=ef_construction, M=m)
+        self.graph.set_ef(ef_search)
+
+    def add(self, item_id: str, vector: np.ndarray, timestamp: float) -> None:
+        row = self._append_row(item_id, timestamp)
+        if row >= self.graph.get_max_elements():
+            self.graph.resize_index(2 * self.graph.get_max_elements())
+        self.graph.add_items(vector.reshape(1, -1), np.array([row]))
+
+    def remove(self, item_id: str) -> bool:
+        row = self.row_by_id.get(item_id)
+        if not super().remove(item_id):
+            return False
+        self.graph.mark_deleted(row)
+        return True
+
+    def vectors(self, rows: np.ndarray) -> np.ndarray:
+        return np.asarray(self.graph.get_items(rows), dtype=np.float32).reshape(len(rows), self.dim)
+
+    def _exact_search(
+        self,
+        mask: np.ndarray,
+        vector: np.ndarray,
+        k: int,
+        threshold: Optional[float],
+    ) -> List[Tuple[str, float]]:
+        """Score the eligible rows directly."""
+        rows = np.flatnonzero(mask)
+        scores = self.vectors(rows) @ vector
+        positions, best = top_k(scores, k, threshold)
+        return [(self.ids[rows[i]], float(score)) for i, score in zip(positions, best)]
+
+    def search(
+        self,
+        vector: np.ndarray,
+        k: int,
+        since: Optional[float] = None,
+        threshold: Optional[float] = None,
+        include_ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        mask = self._mask(since, include_ids)
+        eligible = int(mask.sum())
+        if eligible == 0:
+            return []
+
+        k = min(k, eligible)
+        if eligible <= self.ef_search and eligible < len(self):
+            # Few eligible rows (e.g. an include_ids whitelist): scoring them beats walking the graph
+            return self._exact_search(mask, vector, k, threshold)
+
+        self.graph.set_ef(max(self.ef_search, k))
+        try:
+            if since is None and include_ids is None:
+                labels, distances = self.graph.knn_query(vector, k=k)
+            else:
+                labels, distances = self.graph.knn_query(
+                    vector, k=k, filter=lambda label: bool(mask[label])
+                )
+        except RuntimeError:
+            # Heavily filtered queries can exhaust the graph - scan exactly instead
+            return self._exact_search(mask, vector, k, threshold)
+
+        # Inner-product space returns 1 - similarity as the distance
+        return [
+            (self.ids[label], float(1.0 - distance))
+            for label, distance in zip(labels[0], distances[0])
+            if threshold is None or 1.0 - distance > threshold
+        ]
+
+
+class VectorIndex:
+    """Organization-partitioned nearest-neighbour index over embeddings."""
+
+    def __init__(self, backend: str = "auto"):
+        """
+        Initialize vector index.
+
+        Args:
+            backend: "hnsw", "brute_force" or "auto" (HNSW when hnswlib is installed)
+        """
+        if backend == "auto":
+            backend = "hnsw" if hnswlib is not None else "brute_force"
+        if backend == "hnsw" and hnswlib is None:
+            logger.warning("hnswlib is not installed, falling back to brute-force vector index")
+            backend = "brute_force"
+        if backend not in ("hnsw", "brute_force"):
+            raise ValueError(f"Unknown vector index backend: {backend}")
+
+        self.backend = backend
+        self.dim: Optional[int] = None
+        self._partitions: Dict[str, IndexPartition] = {}
+        self._org_by_id: Dict[str, str] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._org_by_id)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._org_by_id
+
+    def _new_partition(self, dim: int) -> IndexPartition:
+        if self.backend == "hnsw":
+            return HNSWPartition(dim)
+        return BruteForcePartition(dim)
+
+    def add(
+        self,
+        item_id: str,
+        embedding: Iterable[float],
+        organization_id: str,
+        timestamp: float,
+    ) -> None:
+        """
+        Add (or replace) an embedding.
+
+        Args:
+            item_id: Interaction ID
+            embedding: Embedding vector
+            organization_id: Owning organization
+            timestamp: POSIX timestamp of the interaction
+        """
+        vector = normalize(embedding)
+        organization_id = str(organization_id)
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = vector.shape[0]
+            elif vector.shape[0] != self.dim:
+                raise ValueError(
+                    f"Embedding dimension {vector.shape[0]} does not match index dimension {self.dim}"
+                )
+
+            if item_id in self._org_by_id:
+                self.remove(item_id)
+
+            partition = self._partitions.get(organization_id)
+            if partition is None:
+                partition = self._new_partition(self.dim)
+                self._partitions[organization_id] = partition
+
+            partition.add(item_id, vector, timestamp)
+            self._org_by_id[item_id] = organization_id
+
+    def remove(self, item_id: str) -> bool:
+        """Remove an embedding from the index."""
+        with self._lock:
+            organization_id = self._org_by_id.pop(item_id, None)
+            if organization_id is None:
+                return False
+            partition = self._partitions[organization_id]
+            removed = partition.remove(item_id)
+            if len(partition) == 0:
+                del self._partitions[organization_id]
+            elif partition.dead_rows > max(1024, len(partition)):
+                self._compact(organization_id)
+            return removed
+
+    def _compact(self, organization_id: str):
+        """Rebuild a partition without the rows of removed items."""
+        old = self._partitions[organization_id]
+        rows = old.live_rows()
+        partition = self._new_partition(old.dim)
+        for row, vector in zip(rows, old.vectors(rows)):
+            partition.add(old.ids[row], vector, float(old.timestamps[row]))
+        self._partitions[organization_id] = partition
+
+    def search(
+        self,
+        embedding: Iterable[float],
+        k: int,
+        organization_id: Optional[str] = None,
+        since: Optional[float] = None,
+        threshold: Optional[float] = None,
+        exclude_ids: Optional[Set[str]] = None,
+        include_ids: Optional[Set[str]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Find the most similar embeddings.
+
+        Args:
+            embedding: Query embedding
+            k: Maximum number of results
+            organization_id: Restrict search to one organization (all when None)
+            since: Only consider items with timestamp >= since
+            threshold: Only return items with similarity strictly above this value
+            exclude_ids: IDs to leave out of the results
+            include_ids: Only consider these IDs (all when None)
+
+        Returns:
+            List of (item_id, cosine similarity) pairs sorted by similarity
+        """
+        if k <= 0:
+            return []
+
+        vector = normalize(embedding)
+        exclude_ids = exclude_ids or set()
+
+        with self._lock:
+            if organization_id is not None:
+                partition = self._partitions.get(str(organization_id))
+                partitions = [partition] if partition is not None else []
+            else:
+                partitions = list(self._partitions.values())
+
+            results: List[Tuple[str, float]] = []
+            for partition in partitions:
+                results.extend(partition.search(vector, k + len(exclude_ids), since, threshold, include_ids))
+
+        results = [(item_id, score) for item_id, score in results if item_id not in exclude_ids]
+        if len(partitions) > 1:
+            results.sort(key=lambda x: x[1], reverse=True)
+        return results[:k]
@@ -0,0 +1,196 @@
+"""
+Write-Behind Pipeline for Causal Memory
+
+Moves CausalMemoryGraph writes off the request path:
+- Interactions are pushed onto a bounded in-process queue
+- A background worker drains the queue in batches and stores each batch
+  with CausalMemoryGraph.store_interactions (one encode call, one transaction)
+- A full queue applies backpressure to callers instead of growing unbounded
+- flush()/stop() drain pending writes, e.g. on application shutdown
+"""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from prometheus_client import Counter, Gauge, Histogram
+
+from app.memory.causal_memory import causal_memory
+
+
+logger = logging.getLogger(__name__)
+
+
+QUEUE_DEPTH = Gauge(
+    "causal_memory_write_queue_depth",
+    "Interactions waiting to be written to causal memory",
+)
+WRITE_LAG = Histogram(
+    "causal_memory_write_lag_seconds",
+    "Time from enqueue until an interaction is written to causal memory",
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+BATCH_SIZE = Histogram(
+    "causal_memory_write_batch_size",
+    "Interactions written per causal memory transaction",
+    buckets=(1, 2, 4, 8, 16, 32, 64, 128),
+)
+INTERACTIONS_TOTAL = Counter(
+    "causal_memory_interactions_total",
+    "Interactions handled by the write-behind pipeline",
+    ["result"],  # written, failed, dropped
+)
+
+
+class InteractionWriteBehind:
+    """Bounded queue + background worker that batches causal memory writes."""
+
+    def __init__(
+        self,
+        store_batch: Callable[[List[Dict[str, Any]]], Any],
+        max_queue_size: int = 1000,
+        max_batch_size: int = 32,
+        max_batch_delay: float = 0.05,
+        enqueue_timeout: float = 2.0,
+    ):
+        """
+        Initialize write-behind pipeline.
+
+        Args:
+            store_batch: Blocking function that stores a list of interactions
+            max_queue_size: Maximum number of pending interactions
+            max_batch_size: Maximum number of interactions per write
+            max_batch_delay: Seconds to wait for more interactions before writing
+            enqueue_timeout: Seconds submit() waits for queue space before dropping
+        """
+        self.store_batch = store_batch
+        self.max_queue_size = max_queue_size
+        self.max_batch_size = max_batch_size
+        self.max_batch_delay = max_batch_delay
+        self.enqueue_timeout = enqueue_timeout
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of interactions waiting to be written."""
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def _ensure_started(self):
+        """Start the worker on the running event loop (restarting it if the loop changed)."""
+        loop = asyncio.get_running_loop()
+        if self._worker is not None and not self._worker.done() and self._loop is loop:
+            return
+
+        if self._queue is not None and self._loop is not loop and self._queue.qsize():
+            logger.warning(
+                f"Discarding {self._queue.qsize()} causal memory writes queued on a closed event loop"
+            )
+
+        if self._queue is None or self._loop is not loop:
+            self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._loop = loop
+        self._worker = loop.create_task(self._run(), name="causal-memory-write-behind")
+
+    async def submit(self, **interaction: Any) -> bool:
+        """
+        Queue an interaction for writing.
+
+        Waits for queue space when the queue is full (backpressure). If no
+        space frees up within enqueue_timeout the interaction is dropped.
+
+        Args:
+            **interaction: Keyword arguments of CausalMemoryGraph.store_interaction()
+
+        Returns:
+            True if queued, False if dropped
+        """
+        self._ensure_started()
+
+        # Record the interaction time now, not when the worker gets to it
+        interaction.setdefault("timestamp", datetime.now(timezone.utc))
+        item = (time.monotonic(), interaction)
+
+        try:
+            await asyncio.wait_for(self._queue.put(item), timeout=self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            INTERACTIONS_TOTAL.labels(result="dropped").inc()
+            logger.error("Causal memory write queue is full, dropping interaction")
+            return False
+
+        QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    async def _next_batch(self) -> List[Any]:
+        """Wait for the first item, then collect more until the batch is full or the delay expires."""
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_batch_delay
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        """Worker loop: drain the queue in batches."""
+        while True:
+            batch = await self._next_batch()
+            QUEUE_DEPTH.set(self._queue.qsize())
+
+            interactions = [interaction for _, interaction in batch]
+            try:
+                await asyncio.to_thread(self.store_batch, interactions)
+                INTERACTIONS_TOTAL.labels(result="written").inc(len(batch))
+            except Exception as e:
+                INTERACTIONS_TOTAL.labels(result="failed").inc(len(batch))
+                logger.error(f"Failed to write {len(batch)} interactions to causal memory: {e}", exc_info=True)
+            finally:
+                done_at = time.monotonic()
+                BATCH_SIZE.observe(len(batch))
+                for enqueued_at, _ in batch:
+                    WRITE_LAG.observe(done_at - enqueued_at)
+                    self._queue.task_done()
+
+    async def flush(self):
+        """Wait until every queued interaction has been written."""
+        if self._queue is not None and self._worker is not None and not self._worker.done():
+            await self._queue.join()
+
+    async def stop(self, timeout: float = 10.0):
+        """
+        Flush pending writes and stop the worker.
+
+        Args:
+            timeout: Maximum seconds to wait for the flush
+        """
+        if self._worker is None:
+            return
+
+        try:
+            await asyncio.wait_for(self.flush(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(
+                f"Timed out flushing causal memory writes, {self.queue_depth} interactions lost"
+            )
+
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        QUEUE_DEPTH.set(self.queue_depth)
+
+
+# Global write-behind pipeline for causal memory
+interaction_writer = InteractionWriteBehind(store_batch=causal_memory.store_interactions)
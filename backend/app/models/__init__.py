@@ -8,6 +8,7 @@ from app.models.user import User, UserRole
 from app.models.organization import Organization, SubscriptionTier
 from app.models.conversation import Conversation, ConversationStatus, ConversationChannel
 from app.models.message import Message, MessageRole
+from app.models.checkpoint import GraphCheckpoint
 
 __all__ = [
     "User",
@@ -19,4 +20,5 @@ __all__ = [
     "ConversationChannel",
     "Message",
     "MessageRole",
+    "GraphCheckpoint",
 ]
@@ -0,0 +1,36 @@
+"""
+Graph checkpoint model for persisting LangGraph state per conversation thread.
+
+Each thread stores a keyframe (all channel values) followed by deltas
+(only the channels that changed). Older rows are compacted away when a
+new keyframe is written.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, JSON
+
+from app.core.database import Base
+
+
+class GraphCheckpoint(Base):
+    """LangGraph checkpoint row (keyframe or delta)."""
+
+    __tablename__ = "graph_checkpoints"
+
+    # Primary key: latest checkpoint of a thread is one index range scan
+    thread_id = Column(String(255), primary_key=True)  # Conversation.langgraph_thread_id
+    seq = Column(Integer, primary_key=True, autoincrement=False)
+
+    # Keyframes hold every channel value, deltas only the changed ones
+    is_keyframe = Column(Boolean, nullable=False, default=False)
+    channel_values = Column(JSON, nullable=False)
+    channel_versions = Column(JSON, nullable=False)
+    versions_seen = Column(JSON, nullable=False)
+
+    # Timestamps
+    ts = Column(String(64), nullable=False)  # Checkpoint timestamp from LangGraph
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<GraphCheckpoint {self.thread_id}#{self.seq}{' keyframe' if self.is_keyframe else ''}>"
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark Week Availability Lookups
+
+Times one week of free 30-minute slots for growing appointment histories:
+
+- legacy: every slot compared with every appointment (the old
+          RealisticMockOdooClient.get_available_slots)
+- index:  AvailabilityIndex bitmaps per day and dentist
+
+The index time should stay flat as the history grows.
+
+Usage:
+    python scripts/benchmark_availability.py
+    python scripts/benchmark_availability.py --appointments 1000 10000 100000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.availability import AvailabilityIndex
+
+
+DENTISTS = ["Dr. Smith", "Dr. Cohen", "Dr. Levi"]
+WEEK_START = date(2030, 1, 7)
+
+
+def build_appointments(count: int, seed: int = 1):
+    """Appointments spread over two years around the benchmarked week."""
+    rng = random.Random(seed)
+    appointments = []
+    for i in range(count):
+        day = WEEK_START + timedelta(days=rng.randint(-365, 365))
+        start = datetime(day.year, day.month, day.day, rng.randint(8, 17), rng.choice([0, 15, 30, 45]))
+        appointments.append({
+            "id": i,
+            "date": start.strftime("%Y-%m-%d"),
+            "time": start.strftime("%H:%M"),
+            "datetime": start.isoformat(),
+            "duration_minutes": rng.choice([15, 30, 45, 60, 90, 120]),
+            "dentist": rng.choice(DENTISTS),
+            "status": rng.choice(["scheduled", "completed", "cancelled"]),
+        })
+    return appointments
+
+
+def legacy_available_slots(appointments, date_from: str, date_to: str):
+    slots = []
+    current_date = datetime.strptime(date_from, "%Y-%m-%d")
+    end_date = datetime.strptime(date_to, "%Y-%m-%d")
+    while current_date <= end_date:
+        if current_date.weekday() < 5:
+            for hour in range(8, 18):
+                for minute in [0, 30]:
+                    slot_time = current_date.replace(hour=hour, minute=minute)
+                    is_booked = any(
+                        appt["datetime"] == slot_time.isoformat()
+                        for appt in appointments
+                        if appt["status"] == "scheduled"
+                    )
+                    if not is_booked:
+                        slots.append(slot_time)
+        current_date += timedelta(days=1)
+    return slots
+
+
+def best_of(repeats: int, function) -> float:
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(counts: List[int]):
+    week_end = WEEK_START + timedelta(days=6)
+    print("🚀 One week of 30-minute slots (3 dentists)\n")
+    print(f"{'appointments':>13} {'legacy':>12} {'index':>12}")
+    for count in counts:
+        appointments = build_appointments(count)
+        index = AvailabilityIndex(DENTISTS)
+        for appointment in appointments:
+            index.add(appointment)
+
+        legacy = best_of(1, lambda: legacy_available_slots(appointments, WEEK_START.isoformat(), week_end.isoformat()))
+        indexed = best_of(20, lambda: index.free_slots(WEEK_START, week_end))
+        print(f"{count:>13} {legacy * 1000:>10.1f}ms {indexed * 1e6:>10.0f}µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark week availability lookups")
+    parser.add_argument("--appointments", type=int, nargs="+", default=[1000, 10000, 100000])
+    main(parser.parse_args().appointments)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark Concurrent Chats Through the Alex Graph
+
+Runs N simultaneous chats through a one-node LangGraph, like AgentGraphV2,
+with an LLM stand-in that takes a fixed latency per call (no network):
+
+- sync:  the old node, AlexAgent.process() with llm.invoke (time.sleep). LangGraph
+         runs it in the default thread pool, so chats queue behind the pool size
+- async: AlexAgent.aprocess() with llm.ainvoke (asyncio.sleep)
+
+With the async node, N chats should finish in about the time of one.
+
+Usage:
+    python scripts/benchmark_concurrency.py
+    python scripts/benchmark_concurrency.py --chats 1 10 50 --latency 0.5
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, StateGraph
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.agents import alex as alex_module
+from app.agents.alex import AlexAgent
+from app.agents.graph_state import AgentState
+from app.core.rate_limiter import DistributedRateLimiter
+
+
+class FixedLatencyLLM:
+    """LLM stand-in that answers after `latency` seconds."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def invoke(self, conversation):
+        time.sleep(self.latency)
+        return AIMessage(content="Our clinic is open Sunday to Thursday, 8:00 AM to 7:00 PM.")
+
+    async def ainvoke(self, conversation):
+        await asyncio.sleep(self.latency)
+        return AIMessage(content="Our clinic is open Sunday to Thursday, 8:00 AM to 7:00 PM.")
+
+
+def build_graph(node):
+    """One-node graph, as in AgentGraphV2._build_graph()."""
+    workflow = StateGraph(AgentState)
+    workflow.add_node("alex", node)
+    workflow.set_entry_point("alex")
+    workflow.add_edge("alex", END)
+    return workflow.compile()
+
+
+def initial_state(i: int) -> AgentState:
+    return {
+        "messages": [HumanMessage(content="What are your hours?")],
+        "current_agent": "alex",
+        "user_id": f"user-{i}",
+        "organization_id": "org",
+        "conversation_id": f"conversation-{i}",
+        "patient_id": None,
+        "appointment_id": None,
+        "invoice_id": None,
+        "intent": None,
+        "next_agent": None,
+        "tool_results": {},
+        "errors": [],
+        "requires_human": False,
+        "escalation_level": None,
+    }
+
+
+async def run_chats(graph, chats: int) -> float:
+    """Run `chats` graph invocations concurrently and return the wall time."""
+    start = time.perf_counter()
+    states = await asyncio.gather(*[graph.ainvoke(initial_state(i)) for i in range(chats)])
+    elapsed = time.perf_counter() - start
+
+    errors = [error for state in states for error in state.get("errors", [])]
+    if errors:
+        raise RuntimeError(f"{len(errors)} chats failed: {errors[0]}")
+    return elapsed
+
+
+async def main_async(chat_counts: List[int], latency: float):
+    alex = AlexAgent()
+    alex.llm = FixedLatencyLLM(latency)
+    alex_module.rate_limiter = DistributedRateLimiter(redis_url=None)  # benchmark load, not rate limiting
+
+    async def async_node(state):
+        return await alex.aprocess(state)
+
+    graphs = {
+        "sync": build_graph(lambda state: alex.process(state)),
+        "async": build_graph(async_node),
+    }
+
+    print(f"🚀 Concurrent chats, simulated LLM latency {latency:.2f}s\n")
+    print(f"{'chats':>6} {'sync node':>12} {'async node':>12} {'speedup':>9}")
+    for chats in chat_counts:
+        sync_time = await run_chats(graphs["sync"], chats)
+        async_time = await run_chats(graphs["async"], chats)
+        print(f"{chats:>6} {sync_time:>11.2f}s {async_time:>11.2f}s {sync_time / async_time:>8.1f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent chats through Alex")
+    parser.add_argument("--chats", type=int, nargs="+", default=[1, 10, 50])
+    parser.add_argument("--latency", type=float, default=0.5, help="Seconds per LLM call")
+    args = parser.parse_args()
+
+    asyncio.run(main_async(args.chats, args.latency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark the Keyword Engine Against the Per-Call-Site Scans
+
+Runs every keyword rule on a synthetic corpus of Hebrew and English messages:
+
+- legacy: the scans the keyword engine replaced (escalation check, tool
+          triggers, intent classification, pattern extraction), each with
+          its own lower() and substring passes
+- engine: one KeywordMatcher.scan() per message
+
+Both must give identical results on every message.
+
+Usage:
+    python scripts/benchmark_keywords.py
+    python scripts/benchmark_keywords.py --messages 100000 --seed 7
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.agents.keywords import DEFAULT_KEYWORDS, KeywordMatcher
+
+
+TEMPLATES = [
+    "What are your hours on {day}?",
+    "Can I book an appointment for {day} {time}?",
+    "Is {day} available for a cleaning?",
+    "How much does {treatment} cost?",
+    "I want to pay my bill",
+    "Do I still owe anything on my invoice?",
+    "My tooth hurts, pain is {level}/10",
+    "I have severe pain after {treatment}",
+    "Should I take a painkiller before {treatment}?",
+    "Is this normal after {treatment}? There is some bleeding",
+    "Thanks, see you {day}!",
+    "Where is the clinic? Is there parking?",
+    "מה שעות הפתיחה ביום {day_he}?",
+    "אני רוצה לקבוע תור ל{treatment_he}",
+    "כמה עולה {treatment_he}?",
+    "יש לי כאב חזק בשן",
+    "יש לי דימום חזק אחרי {treatment_he}",
+    "איזו תרופה לקחת אחרי {treatment_he}?",
+    "שילמתי את החשבונית, תודה",
+    "האם יש משהו פנוי מחר?",
+]
+FIELDS = {
+    "day": ["Sunday", "Monday", "Tuesday", "Wednesday", "Thursday", "tomorrow"],
+    "time": ["9:00", "11:30", "14:00", "17:45"],
+    "treatment": ["a cleaning", "a root canal", "an extraction", "whitening", "a filling"],
+    "level": ["3", "5", "7", "9"],
+    "day_he": ["ראשון", "שני", "שלישי", "רביעי", "חמישי"],
+    "treatment_he": ["ניקוי אבנית", "טיפול שורש", "עקירה", "הלבנה", "סתימה"],
+}
+
+
+def build_corpus(size: int, seed: int) -> List[str]:
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        template = rng.choice(TEMPLATES)
+        corpus.append(template.format(**{name: rng.choice(values) for name, values in FIELDS.items()}))
+    return corpus
+
+
+# Baseline: the keyword scans as they were before the engine
+
+EMERGENCY_KEYWORDS = [
+    "severe pain", "can't breathe", "facial swelling", "high fever",
+    "severe bleeding", "trauma", "injury", "accident", "emergency",
+    "חירום", "דימום חזק", "נפיחות בפנים", "חום גבוה"
+]
+DOCTOR_REQUIRED_KEYWORDS = [
+    "diagnose", "diagnosis", "prescription", "medication", "drug",
+    "antibiotic", "painkiller", "treatment plan", "medical advice",
+    "should i take", "what medication", "is this normal",
+    "אבחנה", "תרופה", "מרשם", "תרופות", "אנטיביוטיקה"
+]
+
+
+def legacy_check_escalation(message: str) -> Optional[str]:
+    message_lower = message.lower()
+    for keyword in EMERGENCY_KEYWORDS:
+        if keyword in message_lower:
+            return "EMERGENCY"
+    for keyword in DOCTOR_REQUIRED_KEYWORDS:
+        if keyword in message_lower:
+            return "DOCTOR_REQUIRED"
+    if "pain" in message_lower:
+        pain_match = re.search(r'(\d+)\s*/\s*10|pain.*?(\d+)', message_lower)
+        if pain_match:
+            pain_level = int(pain_match.group(1) or pain_match.group(2))
+            if pain_level >= 8:
+                return "EMERGENCY"
+            elif pain_level >= 5:
+                return "DOCTOR_REQUIRED"
+    return None
+
+
+def legacy_tool_triggers(last_message: str) -> frozenset:
+    triggers = set()
+    if any(word in last_message.lower() for word in ["available", "availability", "when", "schedule", "book", "appointment", "פנוי", "תור"]):
+        triggers.add("scheduling")
+    if any(word in last_message.lower() for word in ["invoice", "bill", "payment", "owe", "balance", "חשבונית", "תשלום"]):
+        triggers.add("billing")
+        if "my invoice" in last_message.lower() or "my bill" in last_message.lower():
+            triggers.add("own_invoices")
+    return frozenset(triggers)
+
+
+def legacy_classify_intent(message: str) -> str:
+    message_lower = message.lower()
+    if any(word in message_lower for word in ["pain", "hurt", "ache", "swelling", "bleeding", "כאב"]):
+        return "medical_question"
+    elif any(word in message_lower for word in ["invoice", "bill", "payment", "cost", "price", "חשבונית"]):
+        return "billing_inquiry"
+    elif any(word in message_lower for word in ["appointment", "schedule", "book", "available", "תור"]):
+        return "appointment_scheduling"
+    else:
+        return "general_inquiry"
+
+
+def legacy_extract_patterns(user_message: str) -> tuple:
+    patterns = []
+    if any(word in user_message.lower() for word in ["appointment", "schedule", "book", "תור"]):
+        patterns.append("appointment_scheduling")
+    if any(word in user_message.lower() for word in ["pain", "hurt", "tooth", "dental", "כאב"]):
+        patterns.append("medical_question")
+    if any(word in user_message.lower() for word in ["payment", "invoice", "bill", "cost", "תשלום"]):
+        patterns.append("billing_inquiry")
+    return tuple(patterns)
+
+
+def legacy_scan(message: str):
+    return (
+        legacy_check_escalation(message),
+        legacy_classify_intent(message),
+        legacy_tool_triggers(message),
+        legacy_extract_patterns(message),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the keyword engine")
+    parser.add_argument("--messages", type=int, default=100000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    corpus = build_corpus(args.messages, args.seed)
+
+    start = time.perf_counter()
+    matcher = KeywordMatcher(DEFAULT_KEYWORDS)
+    compile_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    legacy = [legacy_scan(message) for message in corpus]
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matches = [matcher.scan(message) for message in corpus]
+    engine_time = time.perf_counter() - start
+
+    mismatches = sum(
+        1 for expected, match in zip(legacy, matches)
+        if expected != (match.escalation_level, match.intent, match.tool_triggers, match.patterns)
+    )
+
+    print(f"🚀 Keyword rules on {len(corpus)} messages (automaton compiled in {compile_time * 1000:.1f}ms)\n")
+    print(f"{'':>8} {'total':>9} {'per message':>13}")
+    for name, elapsed in [("legacy", legacy_time), ("engine", engine_time)]:
+        print(f"{name:>8} {elapsed:>8.2f}s {elapsed / len(corpus) * 1e6:>11.2f}µs")
+    print(f"\n⚡ Speedup: {legacy_time / engine_time:.1f}x")
+    print(f"{'✅' if mismatches == 0 else '❌'} Mismatches: {mismatches}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
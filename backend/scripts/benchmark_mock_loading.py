@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark Mock Dataset Loading
+
+Load time and peak RSS of RealisticMockOdooClient.warm_up() (read the
+data and build the indexes) plus a few lookups, per format:
+
+- json:     mock_*.json parsed into lists of dicts, dict indexes
+- snapshot: the binary snapshot memory-mapped, records decoded on
+            access, sorted-key indexes
+
+Each measurement runs in a fresh process. Datasets are the fixture
+files repeated with shifted IDs (patients x copies, and their invoices
+and treatment records); the fixtures have no appointments, so one
+appointment is derived from each treatment record. Mapped snapshot
+pages count toward each process's RSS but are shared between
+processes through the page cache.
+
+Usage:
+    python scripts/benchmark_mock_loading.py
+    python scripts/benchmark_mock_loading.py --patients 1500 1000000
+    python scripts/benchmark_mock_loading.py --patients 1000000 --formats snapshot
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+DATA_DIR = Path(__file__).parent.parent / "data"
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # KiB on Linux
+
+
+class Repeated(Sequence):
+    """Records repeated `copies` times, shifting ID fields by a per-field step each copy."""
+
+    def __init__(self, records: List[Dict[str, Any]], copies: int, steps: Dict[str, int]):
+        self.records = records
+        self.copies = copies
+        self.steps = steps
+
+    def __len__(self) -> int:
+        return len(self.records) * self.copies
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if not 0 <= position < len(self):
+            raise IndexError(position)
+        copy, offset = divmod(position, len(self.records))
+        record = dict(self.records[offset])
+        for field, step in self.steps.items():
+            if record.get(field) is not None:
+                record[field] += copy * step
+        return record
+
+
+def fixture_tables(copies: int) -> Dict[str, Sequence]:
+    tables = {}
+    for table in ("patients", "invoices", "treatment_records"):
+        with open(DATA_DIR / f"mock_{table}.json", "r", encoding="utf-8") as f:
+            tables[table] = json.load(f)
+    names = {patient["id"]: patient["name"] for patient in tables["patients"]}
+    tables["appointments"] = [
+        {
+            "id": record["appointment_id"],
+            "patient_id": record["patient_id"],
+            "patient_name": names.get(record["patient_id"], "Unknown"),
+            "date": record["date"],
+            "time": "10:00",
+            "datetime": f"{record['date']}T10:00:00",
+            "treatment_type": record["treatment_type"],
+            "duration_minutes": 60,
+            "dentist": record["dentist"],
+            "status": "completed",
+            "notes": record["procedure_notes"],
+            "created_at": f"{record['date']}T09:12:00",
+        }
+        for record in tables["treatment_records"]
+    ]
+
+    patient_step = max(p["id"] for p in tables["patients"])
+    appointment_step = max(a["id"] for a in tables["appointments"])
+    steps = {
+        "patients": {"id": patient_step},
+        "appointments": {"id": appointment_step, "patient_id": patient_step},
+        "invoices": {"id": len(tables["invoices"]), "patient_id": patient_step, "appointment_id": appointment_step},
+        "treatment_records": {
+            "id": len(tables["treatment_records"]), "patient_id": patient_step, "appointment_id": appointment_step,
+        },
+    }
+    return {table: Repeated(records, copies, steps[table]) for table, records in tables.items()}
+
+
+def write_json(path: Path, records: Sequence):
+    """Stream records to a JSON array (no full list in memory)."""
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[\n")
+        for position, record in enumerate(records):
+            f.write(",\n" if position else "")
+            f.write(json.dumps(record, ensure_ascii=False))
+        f.write("\n]\n")
+
+
+def build_dataset(directory: Path, copies: int, formats: List[str]) -> Dict[str, int]:
+    from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+    from app.integrations.mock_snapshot import write_snapshot
+
+    tables = fixture_tables(copies)
+    json_dir, snapshot_dir = directory / "json", directory / "snapshot"
+    json_dir.mkdir()
+    if "json" in formats:
+        for table, records in tables.items():
+            write_json(json_dir / RealisticMockOdooClient._DATA_FILES[table], records)
+    if "snapshot" in formats:
+        write_snapshot(snapshot_dir / "snapshot", tables)
+    return {table: len(records) for table, records in tables.items()}
+
+
+def measure(data_dir: Path) -> Dict[str, float]:
+    """Runs in the child process: load, look up one patient's records, report."""
+    from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+
+    baseline = peak_rss_mb()
+    client = RealisticMockOdooClient()
+    client.data_dir = data_dir
+    start = time.perf_counter()
+    client.warm_up()
+    loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for patient_id in range(1, 1001):
+        client.get_patient(patient_id)
+        client.get_patient_invoices(patient_id)
+        client.get_treatment_history(patient_id)
+    lookups = time.perf_counter() - start
+    return {"load": loaded, "lookups": lookups, "baseline": baseline, "peak": peak_rss_mb()}
+
+
+def run_child(data_dir: Path) -> Dict[str, float]:
+    result = subprocess.run(
+        [sys.executable, __file__, "--child", str(data_dir)], capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return {"error": result.returncode}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main(patient_counts: List[int], formats: List[str]):
+    print("🚀 Mock dataset loading: warm_up() and 1000 patient lookups, fresh process per run\n")
+    print(f"{'patients':>9} {'records':>9} {'format':>9} {'on disk':>9} {'load':>8} {'lookups':>9} {'peak RSS':>10} {'data RSS':>10}")
+    fixture_patients = len(json.loads((DATA_DIR / "mock_patients.json").read_text(encoding="utf-8")))
+
+    for count in patient_counts:
+        copies = max(1, round(count / fixture_patients))
+        with tempfile.TemporaryDirectory() as tmp:
+            sizes = build_dataset(Path(tmp), copies, formats)
+            records = sum(sizes.values())
+            for name in formats:
+                data_dir = Path(tmp) / name
+                on_disk = sum(p.stat().st_size for p in data_dir.rglob("*") if p.is_file()) / 1e6
+                result = run_child(data_dir)
+                if "error" in result:
+                    print(f"{sizes['patients']:>9} {records:>9} {name:>9} {on_disk:>7.0f}MB   failed (exit code {result['error']})")
+                    continue
+                print(
+                    f"{sizes['patients']:>9} {records:>9} {name:>9} {on_disk:>7.0f}MB {result['load']:>7.2f}s "
+                    f"{result['lookups'] * 1000:>7.1f}ms {result['peak']:>8.0f}MB {result['peak'] - result['baseline']:>8.0f}MB"
+                )
+
+    print("\n✅ Done (data RSS: peak RSS minus the RSS after imports)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark loading the realistic mock dataset")
+    parser.add_argument("--patients", type=int, nargs="+", default=[1500, 1000000])
+    parser.add_argument("--formats", nargs="+", choices=["json", "snapshot"], default=["json", "snapshot"])
+    parser.add_argument("--child", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        print(json.dumps(measure(args.child)))
+    else:
+        main(args.patients, args.formats)
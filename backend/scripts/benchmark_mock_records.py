@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark Mock Records
+
+Memory per record and date-range filtering for the realistic mock's
+patients, appointments and invoices:
+
+- dicts:   the records as json.load returns them (the old storage)
+- records: mock_records slot classes (enum statuses and treatments,
+           day ordinals, interned text, shared amounts)
+
+Memory is what tracemalloc attributes to the records after parsing
+(json.load for dicts, json.load then conversion for records). The
+filter selects scheduled appointments in a 30-day window, comparing ISO
+strings (dicts) or ordinals (records).
+
+Usage:
+    python scripts/benchmark_mock_records.py
+    python scripts/benchmark_mock_records.py --copies 1 20 100
+"""
+
+import argparse
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent))
+
+from app.integrations.mock_records import Appointment, Invoice, Patient, to_ordinal
+from benchmark_mock_loading import fixture_tables
+
+
+RECORD_TYPES = {"patients": Patient, "appointments": Appointment, "invoices": Invoice}
+
+
+def traced(build):
+    """Result of build() and the bytes it still holds."""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def best_of(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(copies_list: List[int], repeat: int):
+    print("🚀 Mock records: memory per record and a date-range filter\n")
+    print(f"{'table':>13} {'records':>9} {'dicts':>10} {'records':>10} {'ratio':>7}")
+    for copies in copies_list:
+        tables = fixture_tables(copies)
+        total_dicts = total_records = 0
+        for table, record_type in RECORD_TYPES.items():
+            text = json.dumps(list(tables[table]), ensure_ascii=False)
+            dicts, dict_bytes = traced(lambda: json.loads(text))
+            records, record_bytes = traced(lambda: [record_type.from_dict(r) for r in json.loads(text)])
+            if [r.to_dict() for r in records] != dicts:
+                print(f"❌ {table} records do not read back as the dicts")
+                sys.exit(1)
+            total_dicts += dict_bytes
+            total_records += record_bytes
+            print(
+                f"{table:>13} {len(dicts):>9} {dict_bytes / len(dicts):>8.0f} B {record_bytes / len(dicts):>8.0f} B "
+                f"{dict_bytes / record_bytes:>6.2f}x"
+            )
+            if table == "appointments":
+                appointment_dicts, appointment_records = dicts, records
+            del dicts, records
+        print(f"{'total':>13} {'':>9} {total_dicts / 1e6:>8.1f}MB {total_records / 1e6:>8.1f}MB {total_dicts / total_records:>6.2f}x")
+
+        days = sorted({a["date"] for a in appointment_dicts})
+        date_from, date_to = days[len(days) // 2], days[min(len(days) - 1, len(days) // 2 + 30)]
+
+        def filter_dicts():
+            return [
+                a["id"] for a in appointment_dicts
+                if date_from <= a["date"] <= date_to and a["status"] == "scheduled"
+            ]
+
+        def filter_records():
+            first_day, last_day = to_ordinal(date_from), to_ordinal(date_to)
+            return [
+                a.id for a in appointment_records
+                if first_day <= a.date <= last_day and a.status == "scheduled"
+            ]
+
+        if filter_dicts() != filter_records():
+            print("❌ Date-range filters disagree")
+            sys.exit(1)
+        strings = best_of(filter_dicts, repeat)
+        ordinals = best_of(filter_records, repeat)
+        print(
+            f"\n   30-day filter over {len(appointment_records)} appointments: "
+            f"ISO strings {strings * 1000:.1f}ms, ordinals {ordinals * 1000:.1f}ms\n"
+        )
+
+    print("✅ Records read back as the original dicts")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the mock's compact records")
+    parser.add_argument("--copies", type=int, nargs="+", default=[1, 20], help="Fixture repetitions (1 = 1500 patients)")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+    main(args.copies, args.repeat)
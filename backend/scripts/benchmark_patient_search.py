@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark Patient Search
+
+Times name and phone lookups for growing patient lists:
+
+- legacy: every patient compared with the query (the old
+          RealisticMockOdooClient.search_patients)
+- index:  PatientSearchIndex (E.164 phone dict, name trigrams, word prefixes)
+
+Both must return the same patients for full phone numbers and name
+queries of three letters or more.
+
+Usage:
+    python scripts/benchmark_patient_search.py
+    python scripts/benchmark_patient_search.py --patients 1500 100000 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.patient_index import PatientSearchIndex
+
+
+FIRST_NAMES = [
+    "Tamar", "Shane", "Eli", "Maya", "Noa", "Brandon", "Leah", "Lauren", "Yosef", "Dinah",
+    "דנה", "יוסי", "שרה", "משה", "נועה", "אביגיל", "איתי", "רונית", "חיים", "מיכל",
+]
+LAST_NAMES = [
+    "Amar", "Cohen", "Levi", "Ben-David", "Azoulay", "Stevens", "Benaim", "Malka", "Peretz", "Friedman",
+    "כהן", "לוי", "גבע", "אזולאי", "רוזנפלד", "ג'בארין", "מזרחי", "ביטון", "אברהם", "שפירא",
+]
+
+
+def build_patients(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    return [
+        {
+            "id": i,
+            # A numeric suffix keeps surnames diverse, as in a real patient list
+            "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}{rng.randrange(count // 10 + 1) or ''}",
+            "phone": f"+9725{rng.choice('023458')}{rng.randrange(10**7):07d}",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def legacy_search(patients, name=None, phone=None) -> List[int]:
+    results = []
+    for patient in patients:
+        if name and name.lower() in patient["name"].lower():
+            results.append(patient["id"])
+        elif phone and phone in patient["phone"]:
+            results.append(patient["id"])
+    return results
+
+
+def build_queries(patients, size: int, seed: int = 2):
+    rng = random.Random(seed)
+    queries = []
+    for patient in rng.sample(patients, size):
+        queries.append({"phone": patient["phone"]})
+        queries.append({"name": patient["name"]})
+        queries.append({"name": patient["name"].split()[-1][:6]})
+    return queries
+
+
+def per_query(function, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        function(**query)
+    return (time.perf_counter() - start) / len(queries)
+
+
+def main(counts: List[int], queries_per_size: int):
+    print("🚀 Patient search: full phone, full name and surname prefix queries\n")
+    print(f"{'patients':>9} {'build':>9} {'legacy':>11} {'index':>10} {'speedup':>9}")
+    for count in counts:
+        patients = build_patients(count)
+        queries = build_queries(patients, queries_per_size)
+
+        start = time.perf_counter()
+        index = PatientSearchIndex()
+        for patient in patients:
+            index.add(patient)
+        build = time.perf_counter() - start
+
+        # The legacy scan is slow at large sizes - time a sample of the queries
+        legacy_queries = queries[:max(3, len(queries) * 1500 // count)]
+        mismatches = sum(1 for q in legacy_queries if legacy_search(patients, **q) != index.search(**q))
+        legacy = per_query(lambda **q: legacy_search(patients, **q), legacy_queries)
+        indexed = per_query(index.search, queries)
+
+        print(
+            f"{count:>9} {build:>8.2f}s {legacy * 1000:>9.2f}ms {indexed * 1e6:>8.1f}µs "
+            f"{legacy / indexed:>8.0f}x"
+        )
+        if mismatches:
+            print(f"❌ {mismatches} queries differ from the full scan")
+            sys.exit(1)
+
+    print("\n✅ Indexed results match the full scan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark patient search")
+    parser.add_argument("--patients", type=int, nargs="+", default=[1500, 100000, 1000000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    main(args.patients, args.queries)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Benchmark Dashboard Statistics
+
+Times the /statistics endpoints' computations for growing invoice counts
+(3 appointments and 1 patient per 3 invoices):
+
+- legacy: list comprehensions and dict accumulation over the records
+          (the old statistics endpoints)
+- store:  AnalyticsStore columns (NumPy bincounts, masks and argpartition);
+          "first" is the first call on a new snapshot, "warm" later calls
+          (date-independent aggregates are kept per snapshot)
+- aggregates: StatisticsAggregates maintained per write (reads add up
+          counters and a few day buckets); "write" is the cost of
+          applying one new invoice
+
+Both must give the same numbers.
+
+Usage:
+    python scripts/benchmark_statistics.py
+    python scripts/benchmark_statistics.py --invoices 5000 100000 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.analytics_store import AnalyticsStore
+from app.integrations.statistics_aggregates import StatisticsAggregates
+
+
+TREATMENTS = [
+    "Cleaning", "Filling", "Root Canal", "Crown", "Extraction",
+    "Whitening", "X-Ray", "Implant", "Braces Consultation", "Emergency Visit",
+]
+TODAY = date(2025, 6, 1)
+
+
+def build_data(invoices: int, seed: int = 1):
+    rng = random.Random(seed)
+    days = [(TODAY + timedelta(days=offset)).isoformat() for offset in range(-730, 61)]
+    patient_count = max(1, invoices // 3)
+    patients = [
+        {
+            "id": i,
+            "registration_date": rng.choice(days[:731]),
+            "last_visit": rng.choice(days[:731]),
+            "insurance_provider": rng.choice(["Maccabi", "Clalit", "Meuhedet", "Leumit", "None"]),
+            "outstanding_balance": rng.choice([0, 0, 0, 150]),
+        }
+        for i in range(1, patient_count + 1)
+    ]
+    appointments = [
+        {
+            "date": rng.choice(days),
+            "status": rng.choice(["completed", "completed", "scheduled", "cancelled"]),
+            "treatment_type": rng.choice(TREATMENTS),
+        }
+        for _ in range(invoices)
+    ]
+    invoice_rows = []
+    for _ in range(invoices):
+        total = rng.randrange(100, 5000)
+        paid = rng.choice([0, total // 2, total, total])
+        invoice_rows.append({
+            "patient_id": rng.randint(1, patient_count),
+            "issue_date": rng.choice(days[:731]),
+            "treatment": rng.choice(TREATMENTS),
+            "status": "paid" if paid == total else "partial" if paid else "unpaid",
+            "total_amount": total,
+            "paid_amount": paid,
+            "outstanding_amount": total - paid,
+        })
+    return patients, appointments, invoice_rows
+
+
+def legacy_dashboard(patients, appointments, invoices) -> Dict[str, object]:
+    """All five endpoints, computed as the old endpoint code did."""
+    iso = lambda offset: (TODAY + timedelta(days=offset)).isoformat()
+    result = {
+        "completed": len([a for a in appointments if a["status"] == "completed"]),
+        "paid_invoices": len([i for i in invoices if i["status"] == "paid"]),
+        "new_patients_30d": len([p for p in patients if p["registration_date"] >= iso(-30)]),
+        "active_patients_90d": len([p for p in patients if p["last_visit"] and p["last_visit"] >= iso(-90)]),
+        "upcoming": len([a for a in appointments if a["status"] == "scheduled" and iso(0) <= a["date"] <= iso(7)]),
+        "total_revenue": sum(i["total_amount"] for i in invoices),
+    }
+    status, by_treatment, monthly, per_patient = {}, {}, {}, {}
+    for appointment in appointments:
+        status[appointment["status"]] = status.get(appointment["status"], 0) + 1
+    for invoice in invoices:
+        by_treatment[invoice["treatment"]] = by_treatment.get(invoice["treatment"], 0) + invoice["total_amount"]
+        month = invoice["issue_date"][:7]
+        monthly[month] = monthly.get(month, 0) + invoice["total_amount"]
+        per_patient[invoice["patient_id"]] = per_patient.get(invoice["patient_id"], 0) + invoice["total_amount"]
+    result["status"] = status
+    result["revenue_by_treatment"] = by_treatment
+    result["monthly_revenue"] = dict(sorted(monthly.items()))
+    result["top_patients"] = [p for p, _ in sorted(per_patient.items(), key=lambda x: (-x[1], x[0]))[:10]]
+    return result
+
+
+def store_dashboard(store) -> Dict[str, object]:
+    """The same numbers from the columnar store (or the aggregates, which answer the same queries)."""
+    overview = store.overview()
+    patients = store.patient_statistics(TODAY)
+    appointments = store.appointment_statistics(TODAY)
+    revenue = store.revenue_statistics()
+    return {
+        "completed": overview["completed_appointments"],
+        "paid_invoices": overview["paid_invoices"],
+        "new_patients_30d": patients["new_patients_30d"],
+        "active_patients_90d": patients["active_patients_90d"],
+        "upcoming": appointments["upcoming_appointments_7d"],
+        "total_revenue": revenue["total_revenue"],
+        "status": appointments["status_distribution"],
+        "revenue_by_treatment": revenue["revenue_by_treatment"],
+        "monthly_revenue": revenue["monthly_revenue"],
+        "top_patients": [p for p, _ in store.top_patients(10)],
+    }
+
+
+def best_of(function, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main(counts: List[int], repeat: int):
+    print("🚀 Dashboard statistics: overview, patients, appointments, revenue and top patients\n")
+    print(
+        f"{'invoices':>9} {'build':>8} {'legacy':>11} {'first':>9} {'warm':>9} "
+        f"{'aggregates':>11} {'write':>9}"
+    )
+    for count in counts:
+        patients, appointments, invoices = build_data(count)
+
+        start = time.perf_counter()
+        store = AnalyticsStore(patients, appointments, invoices)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = store_dashboard(store)
+        first = time.perf_counter() - start
+
+        expected = legacy_dashboard(patients, appointments, invoices)
+        by_treatment = actual.pop("revenue_by_treatment")
+        if {**actual, "revenue_by_treatment": expected["revenue_by_treatment"]} != expected or any(
+            abs(expected["revenue_by_treatment"][t] - v) > 0.01 for t, v in by_treatment.items()
+        ):
+            print(f"❌ Store results differ from the record scan at {count} invoices")
+            sys.exit(1)
+
+        aggregates = StatisticsAggregates.from_store(store)
+        if aggregates.differences(StatisticsAggregates.from_store(AnalyticsStore(patients, appointments, invoices))):
+            print(f"❌ Aggregates differ from a rebuild at {count} invoices")
+            sys.exit(1)
+
+        legacy = best_of(lambda: legacy_dashboard(patients, appointments, invoices), max(1, repeat // 10))
+        warm = best_of(lambda: store_dashboard(store), repeat)
+        maintained = best_of(lambda: store_dashboard(aggregates), repeat)
+        invoice = dict(invoices[0], patient_id=1)
+        write = best_of(lambda: aggregates.invoice_added(invoice), repeat)
+        print(
+            f"{count:>9} {build:>7.2f}s {legacy * 1000:>9.1f}ms {first * 1000:>7.2f}ms {warm * 1000:>7.2f}ms "
+            f"{maintained * 1000:>9.3f}ms {write * 1e6:>7.1f}µs"
+        )
+
+    print("\n✅ Store and aggregate results match the record scan")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark dashboard statistics")
+    parser.add_argument("--invoices", type=int, nargs="+", default=[5000, 100000, 1000000])
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    main(args.invoices, args.repeat)
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark Telegram Update Dispatch
+
+Feeds a burst of updates (several quick messages per chat) to a handler
+that stands in for Alex (sleeps a jittered LLM latency, no network):
+
+- tasks:      the old webhook path, one fire-and-forget task per update
+              (what BackgroundTasks amounts to)
+- dispatcher: TelegramDispatcher, per-chat FIFO, bounded worker pool
+
+Reported: wall time, peak concurrent handlers (LLM calls in flight),
+chats whose replies came out of order, and p50/p95 update latency.
+
+Usage:
+    python scripts/benchmark_telegram_dispatcher.py
+    python scripts/benchmark_telegram_dispatcher.py --chats 500 --messages 3 --workers 16 32
+"""
+
+import argparse
+import asyncio
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.telegram_dispatcher import TelegramDispatcher
+
+
+class StandInHandler:
+    """Sleeps a random latency per update, recording concurrency, order and latency."""
+
+    def __init__(self, latency: float, seed: int = 7):
+        self.latency = latency
+        self.rng = random.Random(seed)
+        self.running = 0
+        self.peak = 0
+        self.order: Dict[int, List[int]] = {}
+        self.latencies: List[float] = []
+
+    async def __call__(self, update):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.latency * self.rng.uniform(0.5, 1.5))
+        finally:
+            self.running -= 1
+        message = update["message"]
+        self.order.setdefault(message["chat"]["id"], []).append(update["update_id"])
+        self.latencies.append(time.perf_counter() - update["submitted_at"])
+
+
+def burst(chats: int, messages: int) -> List[dict]:
+    updates = []
+    for n in range(messages):
+        for chat_id in range(chats):
+            update_id = len(updates) + 1
+            updates.append({"update_id": update_id, "message": {"chat": {"id": chat_id}, "text": f"message {n}"}})
+    return updates
+
+
+async def run_tasks(updates: List[dict], handler: StandInHandler):
+    tasks = []
+    for update in updates:
+        update["submitted_at"] = time.perf_counter()
+        tasks.append(asyncio.create_task(handler(update)))
+    await asyncio.gather(*tasks)
+
+
+async def run_dispatcher(updates: List[dict], handler: StandInHandler, workers: int):
+    dispatcher = TelegramDispatcher(handler, max_workers=workers, max_pending=len(updates))
+    for update in updates:
+        update["submitted_at"] = time.perf_counter()
+        await dispatcher.submit(update)
+    await dispatcher.stop(timeout=600)
+
+
+def report(name: str, handler: StandInHandler, elapsed: float):
+    out_of_order = sum(order != sorted(order) for order in handler.order.values())
+    latencies = sorted(handler.latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(
+        f"{name:>14} {elapsed:>7.2f}s {handler.peak:>6} {out_of_order:>13} "
+        f"{statistics.median(latencies) * 1000:>9.0f}ms {p95 * 1000:>9.0f}ms"
+    )
+
+
+async def main(chats: int, messages: int, latency: float, worker_counts: List[int]):
+    print(f"🚀 {chats} chats x {messages} quick messages, handler latency ~{latency * 1000:.0f}ms\n")
+    print(f"{'mode':>14} {'wall':>8} {'peak':>6} {'chats out of':>13} {'p50':>11} {'p95':>11}")
+    print(f"{'':>14} {'':>8} {'LLM':>6} {'order':>13}")
+
+    handler = StandInHandler(latency)
+    start = time.perf_counter()
+    await run_tasks(burst(chats, messages), handler)
+    report("tasks", handler, time.perf_counter() - start)
+
+    for workers in worker_counts:
+        handler = StandInHandler(latency)
+        start = time.perf_counter()
+        await run_dispatcher(burst(chats, messages), handler, workers)
+        report(f"dispatcher/{workers}", handler, time.perf_counter() - start)
+
+    print("\n✅ Done (the dispatcher never runs more handlers than workers, nor a chat out of order)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Telegram update dispatch")
+    parser.add_argument("--chats", type=int, default=200)
+    parser.add_argument("--messages", type=int, default=3, help="Quick messages per chat")
+    parser.add_argument("--latency", type=float, default=0.2, help="Mean handler seconds")
+    parser.add_argument("--workers", type=int, nargs="+", default=[8, 32, 128])
+    args = parser.parse_args()
+    asyncio.run(main(args.chats, args.messages, args.latency, args.workers))
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark Telegram Long-Polling Ingestion
+
+Replays a batch of updates through a local fake Bot API server
+(tests/fake_telegram.py): TelegramPoller fetches them with getUpdates
+and hands them to a TelegramDispatcher whose handler stands in for Alex
+(sleeps a fixed latency, then replies with sendMessage to the fake).
+
+Reported per getUpdates batch size: wall time until every update is
+answered, updates per second, and getUpdates calls made.
+
+Usage:
+    python scripts/benchmark_telegram_polling.py
+    python scripts/benchmark_telegram_polling.py --updates 5000 --batch-sizes 1 100 --workers 64 --api-latency 0.02
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import List
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.telegram_client import TelegramClient
+from app.integrations.telegram_dispatcher import TelegramDispatcher
+from app.integrations.telegram_polling import TelegramPoller
+from tests.fake_telegram import FakeTelegram
+
+
+async def replay(updates: int, chats: int, batch_size: int, workers: int, latency: float, api_latency: float):
+    with FakeTelegram(latency=api_latency) as fake:
+        for i in range(updates):
+            fake.push_message(chat_id=1000 + i % chats, text=f"message {i}")
+        client = TelegramClient(bot_token=fake.token, api_url=fake.url)
+
+        async def handle(update):
+            await asyncio.sleep(latency)
+            await client.send_message(update["message"]["chat"]["id"], f"re: {update['message']['text']}")
+
+        dispatcher = TelegramDispatcher(handle, max_workers=workers, max_pending=updates)
+        poller = TelegramPoller(client, dispatcher.submit, poll_timeout=1, batch_size=batch_size)
+
+        start = time.perf_counter()
+        poller.start()
+        while len(fake.sent) < updates:
+            await asyncio.sleep(0.01)
+        elapsed = time.perf_counter() - start
+
+        await poller.stop()
+        await dispatcher.stop()
+        await client.close()
+        polls = sum(method == "getUpdates" for method, _ in fake.calls)
+    return elapsed, polls
+
+
+async def main(updates: int, chats: int, batch_sizes: List[int], workers: int, latency: float, api_latency: float):
+    print(
+        f"🚀 Replaying {updates} updates from {chats} chats through getUpdates "
+        f"({workers} workers, handler {latency * 1000:.0f}ms, Bot API {api_latency * 1000:.0f}ms per call)\n"
+    )
+    print(f"{'batch size':>10} {'wall':>8} {'updates/s':>10} {'getUpdates':>11}")
+    for batch_size in batch_sizes:
+        elapsed, polls = await replay(updates, chats, batch_size, workers, latency, api_latency)
+        print(f"{batch_size:>10} {elapsed:>7.2f}s {updates / elapsed:>10.0f} {polls:>11}")
+    print("\n✅ Done")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Telegram long-polling ingestion against a fake Bot API")
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--workers", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.05, help="Stand-in handler seconds")
+    parser.add_argument("--api-latency", type=float, default=0.01, help="Fake Bot API seconds per call")
+    args = parser.parse_args()
+    asyncio.run(main(args.updates, args.chats, args.batch_sizes, args.workers, args.latency, args.api_latency))
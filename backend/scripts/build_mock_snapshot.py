@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Build the Mock Dataset Snapshot
+
+Converts data/mock_*.json into data/snapshot, the memory-mapped binary
+format RealisticMockOdooClient loads instead of the JSON files (see
+app/integrations/mock_snapshot.py). Re-run it after regenerating the
+JSON files: a snapshot older than any of them is ignored.
+
+Usage:
+    python scripts/build_mock_snapshot.py
+    python scripts/build_mock_snapshot.py --data-dir data --output data/snapshot
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+from app.integrations.mock_snapshot import write_snapshot
+
+
+def directory_size(directory: Path) -> int:
+    return sum(path.stat().st_size for path in directory.iterdir() if path.is_file())
+
+
+def main(data_dir: Path, output: Path):
+    print(f"📦 Building mock snapshot from {data_dir}\n")
+    start = time.perf_counter()
+    tables = {}
+    json_size = 0
+    for table, filename in RealisticMockOdooClient._DATA_FILES.items():
+        filepath = data_dir / filename
+        if not filepath.exists():
+            print(f"⚠️  {filename} not found, writing an empty {table} table")
+            tables[table] = []
+            continue
+        with open(filepath, "r", encoding="utf-8") as f:
+            tables[table] = json.load(f)
+        json_size += filepath.stat().st_size
+        print(f"   - {table}: {len(tables[table])} records")
+
+    write_snapshot(output, tables)
+    elapsed = time.perf_counter() - start
+    print(
+        f"\n✅ Wrote {output} in {elapsed:.2f}s "
+        f"({directory_size(output) / 1e6:.1f} MB, JSON {json_size / 1e6:.1f} MB)"
+    )
+
+
+if __name__ == "__main__":
+    default_data = Path(__file__).parent.parent / "data"
+    parser = argparse.ArgumentParser(description="Convert the mock JSON fixtures to a binary snapshot")
+    parser.add_argument("--data-dir", type=Path, default=default_data)
+    parser.add_argument("--output", type=Path, default=None, help="Snapshot directory (default: <data-dir>/snapshot)")
+    args = parser.parse_args()
+    main(args.data_dir, args.output or args.data_dir / "snapshot")
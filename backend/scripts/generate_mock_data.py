@@ -2,22 +2,58 @@
 """
 Generate Realistic Mock Data for Dental Clinic
 
-Creates 1500+ patients with realistic:
+Creates patients (1500 by default, millions if asked) with realistic:
 - Patient profiles
 - Appointment history
 - Treatment records
 - Invoices
 - Medical notes
+
+Records are streamed as they are generated, never collected per table:
+- Patients are split into shards of --shard-size; each shard is one
+  task for a process pool (--workers) with its own Random seeded from
+  (--seed, clinic, shard), so the output does not depend on the worker
+  count or on scheduling
+- Dates are relative to --today (default: today): the same seed and
+  day give the same files
+- A shard is written as NDJSON (one record per line, nothing kept) or as
+  a binary snapshot (app/integrations/mock_snapshot.py, the shard kept
+  in memory until written); memory is bounded by the shard size
+- Patient IDs are contiguous; appointment, invoice and treatment record
+  IDs come from a fixed block per shard (shard size x
+  APPOINTMENTS_PER_PATIENT max), so shards never coordinate
+- --clinics N writes one dataset per clinic (clinic-01, clinic-02, ...),
+  each with its own IDs from 1, as separate tenants would have
+- Each clinic's shards are then merged, still streaming, into what
+  RealisticMockOdooClient loads: mock_*.json arrays (ndjson) or a
+  snapshot/ directory (snapshot); --no-merge keeps the shards instead
+
+Usage:
+    python scripts/generate_mock_data.py
+    python scripts/generate_mock_data.py --patients 1000000 --format snapshot --output /tmp/mock --workers 4
+    python scripts/generate_mock_data.py --clinics 3 --patients 200000 --output /tmp/mock --no-merge
 """
 
-import random
+import argparse
 import json
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+import os
+import random
+import resource
+import shutil
+import sys
+import time
+from datetime import date, datetime, timedelta
+from multiprocessing import Pool
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, NamedTuple, Tuple
+
 from faker import Faker
 
-# Initialize Faker for realistic data
-fake = Faker(['en_US', 'he_IL'])
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+from app.integrations.mock_snapshot import merge_snapshots, write_snapshot
 
 
 # Israeli first names and last names
@@ -60,225 +96,354 @@ DENTAL_NOTES = [
     "Previous root canal on tooth #14",
 ]
 
+DENTISTS = ["Dr. Smith", "Dr. Cohen", "Dr. Levi"]
 
-def generate_patient(patient_id: int) -> Dict[str, Any]:
-    """Generate a realistic patient profile."""
-    is_israeli = random.random() < 0.7  # 70% Israeli names
-    
-    if is_israeli:
-        first_name = random.choice(ISRAELI_FIRST_NAMES)
-        last_name = random.choice(ISRAELI_LAST_NAMES)
-    else:
-        first_name = fake.first_name()
-        last_name = fake.last_name()
-    
-    # Generate realistic phone number
-    phone_prefix = random.choice(["+97250", "+97252", "+97254", "+97258"])
-    phone = f"{phone_prefix}{random.randint(1000000, 9999999)}"
-    
-    # Email
-    email = f"{first_name.lower()}.{last_name.lower()}@{random.choice(['gmail.com', 'yahoo.com', 'walla.co.il', 'hotmail.com'])}"
-    
-    # Birth date (18-80 years old)
-    age = random.randint(18, 80)
-    birth_date = datetime.now() - timedelta(days=age*365)
-    
-    # Registration date (within last 5 years)
-    registration_date = datetime.now() - timedelta(days=random.randint(0, 1825))
-    
-    return {
-        "id": patient_id,
-        "name": f"{first_name} {last_name}",
-        "email": email,
-        "phone": phone,
-        "birth_date": birth_date.strftime("%Y-%m-%d"),
-        "registration_date": registration_date.strftime("%Y-%m-%d"),
-        "address": fake.address().replace("\n", ", "),
-        "insurance_provider": random.choice(["Clalit", "Maccabi", "Meuhedet", "Leumit", "None"]),
-        "insurance_number": f"IL{random.randint(100000000, 999999999)}" if random.random() < 0.8 else None,
-        "emergency_contact": phone_prefix.replace("50", "52") + str(random.randint(1000000, 9999999)),
-        "allergies": random.choice(["None", "Penicillin", "Latex", "Lidocaine", "None", "None"]),
-        "medical_conditions": random.choice(["None", "Diabetes", "Hypertension", "None", "None", "None"]),
-        "last_visit": (datetime.now() - timedelta(days=random.randint(30, 365))).strftime("%Y-%m-%d"),
-        "total_visits": random.randint(1, 50),
-        "outstanding_balance": random.choice([0, 0, 0, 0, random.randint(100, 2000)]),  # 80% have no balance
-    }
-
-
-def generate_appointment(appointment_id: int, patient_id: int, patient_name: str) -> Dict[str, Any]:
-    """Generate a realistic appointment."""
-    treatment = random.choice(TREATMENT_TYPES)
-    
-    # Mix of past and future appointments
-    is_past = random.random() < 0.7  # 70% past, 30% future
-    
-    if is_past:
-        # Past appointment (within last year)
-        days_ago = random.randint(1, 365)
-        appointment_date = datetime.now() - timedelta(days=days_ago)
-        status = random.choice(["completed", "completed", "completed", "cancelled", "no-show"])
+APPOINTMENTS_PER_PATIENT = (1, 15)  # Range of appointments per patient
+
+# Faker names and addresses are drawn into per-shard pools and picked from:
+# Faker calls cost about as much as the rest of a patient, and one seeded
+# instance per locale is what makes them reproducible
+FAKER_LOCALES = ["en_US", "he_IL"]
+FAKER_POOL_SIZE = 500
+
+TABLES = list(RealisticMockOdooClient._DATA_FILES)  # patients, appointments, invoices, treatment_records
+
+
+class Shard(NamedTuple):
+    """One unit of work: a block of one clinic's patients."""
+    clinic: int
+    index: int
+    first_patient_id: int
+    patients: int
+    shard_size: int
+    seed: int
+    today: str
+    format: str
+    directory: str
+
+
+class ShardGenerator:
+    """Generates one shard's records from its own seeded Random."""
+
+    def __init__(self, shard: Shard):
+        self.shard = shard
+        self.rng = random.Random(f"{shard.seed}:{shard.clinic}:{shard.index}")
+        self.now = datetime.combine(date.fromisoformat(shard.today), datetime.min.time())
+
+        self.first_names: List[str] = []
+        self.last_names: List[str] = []
+        self.addresses: List[str] = []
+        for locale in FAKER_LOCALES:
+            fake = Faker(locale)
+            fake.seed_instance(self.rng.getrandbits(32))
+            self.first_names += [fake.first_name() for _ in range(FAKER_POOL_SIZE)]
+            self.last_names += [fake.last_name() for _ in range(FAKER_POOL_SIZE)]
+            self.addresses += [fake.address().replace("\n", ", ") for _ in range(FAKER_POOL_SIZE)]
+
+    def generate_patient(self, patient_id: int) -> Dict[str, Any]:
+        """Generate a realistic patient profile."""
+        rng = self.rng
+        is_israeli = rng.random() < 0.7  # 70% Israeli names
+
+        if is_israeli:
+            first_name = rng.choice(ISRAELI_FIRST_NAMES)
+            last_name = rng.choice(ISRAELI_LAST_NAMES)
+        else:
+            first_name = rng.choice(self.first_names)
+            last_name = rng.choice(self.last_names)
+
+        # Generate realistic phone number
+        phone_prefix = rng.choice(["+97250", "+97252", "+97254", "+97258"])
+        phone = f"{phone_prefix}{rng.randint(1000000, 9999999)}"
+
+        # Email
+        email = f"{first_name.lower()}.{last_name.lower()}@{rng.choice(['gmail.com', 'yahoo.com', 'walla.co.il', 'hotmail.com'])}"
+
+        # Birth date (18-80 years old)
+        age = rng.randint(18, 80)
+        birth_date = self.now - timedelta(days=age*365)
+
+        # Registration date (within last 5 years)
+        registration_date = self.now - timedelta(days=rng.randint(0, 1825))
+
+        return {
+            "id": patient_id,
+            "name": f"{first_name} {last_name}",
+            "email": email,
+            "phone": phone,
+            "birth_date": birth_date.strftime("%Y-%m-%d"),
+            "registration_date": registration_date.strftime("%Y-%m-%d"),
+            "address": rng.choice(self.addresses),
+            "insurance_provider": rng.choice(["Clalit", "Maccabi", "Meuhedet", "Leumit", "None"]),
+            "insurance_number": f"IL{rng.randint(100000000, 999999999)}" if rng.random() < 0.8 else None,
+            "emergency_contact": phone_prefix.replace("50", "52") + str(rng.randint(1000000, 9999999)),
+            "allergies": rng.choice(["None", "Penicillin", "Latex", "Lidocaine", "None", "None"]),
+            "medical_conditions": rng.choice(["None", "Diabetes", "Hypertension", "None", "None", "None"]),
+            "last_visit": (self.now - timedelta(days=rng.randint(30, 365))).strftime("%Y-%m-%d"),
+            "total_visits": rng.randint(1, 50),
+            "outstanding_balance": rng.choice([0, 0, 0, 0, rng.randint(100, 2000)]),  # 80% have no balance
+        }
+
+    def generate_appointment(self, appointment_id: int, patient_id: int, patient_name: str) -> Dict[str, Any]:
+        """Generate a realistic appointment."""
+        rng = self.rng
+        treatment = rng.choice(TREATMENT_TYPES)
+
+        # Mix of past and future appointments
+        is_past = rng.random() < 0.7  # 70% past, 30% future
+
+        if is_past:
+            # Past appointment (within last year)
+            days_ago = rng.randint(1, 365)
+            appointment_date = self.now - timedelta(days=days_ago)
+            status = rng.choice(["completed", "completed", "completed", "cancelled", "no-show"])
+        else:
+            # Future appointment (within next 60 days)
+            days_ahead = rng.randint(1, 60)
+            appointment_date = self.now + timedelta(days=days_ahead)
+            status = "scheduled"
+
+        # Appointment time (8 AM - 6 PM)
+        hour = rng.randint(8, 17)
+        minute = rng.choice([0, 15, 30, 45])
+        appointment_datetime = appointment_date.replace(hour=hour, minute=minute)
+
+        return {
+            "id": appointment_id,
+            "patient_id": patient_id,
+            "patient_name": patient_name,
+            "date": appointment_datetime.strftime("%Y-%m-%d"),
+            "time": appointment_datetime.strftime("%H:%M"),
+            "datetime": appointment_datetime.isoformat(),
+            "treatment_type": treatment["name"],
+            "duration_minutes": treatment["duration"],
+            "dentist": rng.choice(DENTISTS),
+            "status": status,
+            "notes": rng.choice(DENTAL_NOTES) if status == "completed" else "",
+            "created_at": (appointment_datetime - timedelta(days=rng.randint(1, 30))).isoformat(),
+        }
+
+    def generate_invoice(self, invoice_id: int, patient_id: int, patient_name: str, appointment_id: int) -> Dict[str, Any]:
+        """Generate a realistic invoice."""
+        rng = self.rng
+        treatment = rng.choice(TREATMENT_TYPES)
+        base_price = rng.randint(*treatment["price_range"])
+
+        # Insurance coverage (0-80%)
+        insurance_coverage = rng.choice([0, 0, 0.5, 0.6, 0.7, 0.8])
+        insurance_amount = int(base_price * insurance_coverage)
+        patient_amount = base_price - insurance_amount
+
+        # Payment status
+        is_paid = rng.random() < 0.85  # 85% paid
+        paid_amount = patient_amount if is_paid else rng.randint(0, patient_amount)
+
+        issue_date = self.now - timedelta(days=rng.randint(1, 365))
+        due_date = issue_date + timedelta(days=30)
+
+        return {
+            "id": invoice_id,
+            "patient_id": patient_id,
+            "patient_name": patient_name,
+            "appointment_id": appointment_id,
+            "issue_date": issue_date.strftime("%Y-%m-%d"),
+            "due_date": due_date.strftime("%Y-%m-%d"),
+            "treatment": treatment["name"],
+            "total_amount": base_price,
+            "insurance_amount": insurance_amount,
+            "patient_amount": patient_amount,
+            "paid_amount": paid_amount,
+            "outstanding_amount": patient_amount - paid_amount,
+            "status": "paid" if paid_amount >= patient_amount else "partial" if paid_amount > 0 else "unpaid",
+            "payment_method": rng.choice(["Credit Card", "Cash", "Bank Transfer", "Check"]) if paid_amount > 0 else None,
+            "invoice_number": f"INV-{issue_date.year}-{invoice_id:05d}",
+        }
+
+    def generate_treatment_record(self, record_id: int, patient_id: int, appointment_id: int) -> Dict[str, Any]:
+        """Generate a treatment record."""
+        rng = self.rng
+        treatment = rng.choice(TREATMENT_TYPES)
+        treatment_date = self.now - timedelta(days=rng.randint(1, 730))
+
+        return {
+            "id": record_id,
+            "patient_id": patient_id,
+            "appointment_id": appointment_id,
+            "date": treatment_date.strftime("%Y-%m-%d"),
+            "treatment_type": treatment["name"],
+            "tooth_number": rng.choice([None, f"#{rng.randint(1, 32)}"]),
+            "diagnosis": rng.choice([
+                "Dental caries", "Gingivitis", "Periodontitis", "Tooth sensitivity",
+                "Tooth fracture", "Tooth abscess", "Routine checkup", "Preventive care"
+            ]),
+            "procedure_notes": rng.choice(DENTAL_NOTES),
+            "dentist": rng.choice(DENTISTS),
+            "follow_up_required": rng.choice([True, False, False, False]),
+            "follow_up_date": (treatment_date + timedelta(days=rng.randint(30, 180))).strftime("%Y-%m-%d") if rng.random() < 0.3 else None,
+        }
+
+    def records(self) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """(table, record) pairs of the shard, one patient's at a time."""
+        shard = self.shard
+        # First ID of this shard's block (at most one invoice and treatment record per appointment)
+        first_id = shard.index * shard.shard_size * APPOINTMENTS_PER_PATIENT[1] + 1
+        appointment_id = invoice_id = record_id = first_id
+
+        for patient_id in range(shard.first_patient_id, shard.first_patient_id + shard.patients):
+            patient = self.generate_patient(patient_id)
+            yield "patients", patient
+
+            # Generate appointments for this patient
+            num_appointments = self.rng.randint(*APPOINTMENTS_PER_PATIENT)
+            for _ in range(num_appointments):
+                appointment = self.generate_appointment(appointment_id, patient_id, patient["name"])
+                yield "appointments", appointment
+
+                # Generate invoice and treatment record for completed appointments
+                if appointment["status"] == "completed":
+                    yield "invoices", self.generate_invoice(invoice_id, patient_id, patient["name"], appointment_id)
+                    invoice_id += 1
+                    yield "treatment_records", self.generate_treatment_record(record_id, patient_id, appointment_id)
+                    record_id += 1
+
+                appointment_id += 1
+
+
+def generate_shard(shard: Shard) -> Dict[str, Any]:
+    """Write one shard (runs in a pool worker) and return its counts and totals."""
+    directory = Path(shard.directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    counts = dict.fromkeys(TABLES, 0)
+    totals = {"revenue": 0, "outstanding": 0, "completed": 0}
+
+    def tally(table: str, record: Dict[str, Any]):
+        counts[table] += 1
+        if table == "invoices":
+            totals["revenue"] += record["total_amount"]
+            totals["outstanding"] += record["outstanding_amount"]
+        elif table == "appointments" and record["status"] == "completed":
+            totals["completed"] += 1
+
+    records = ShardGenerator(shard).records()
+    if shard.format == "ndjson":
+        files = {table: open(directory / f"{table}.ndjson", "w", encoding="utf-8") for table in TABLES}
+        try:
+            for table, record in records:
+                files[table].write(json.dumps(record, ensure_ascii=False) + "\n")
+                tally(table, record)
+        finally:
+            for f in files.values():
+                f.close()
     else:
-        # Future appointment (within next 60 days)
-        days_ahead = random.randint(1, 60)
-        appointment_date = datetime.now() + timedelta(days=days_ahead)
-        status = "scheduled"
-    
-    # Appointment time (8 AM - 6 PM)
-    hour = random.randint(8, 17)
-    minute = random.choice([0, 15, 30, 45])
-    appointment_datetime = appointment_date.replace(hour=hour, minute=minute)
-    
-    return {
-        "id": appointment_id,
-        "patient_id": patient_id,
-        "patient_name": patient_name,
-        "date": appointment_datetime.strftime("%Y-%m-%d"),
-        "time": appointment_datetime.strftime("%H:%M"),
-        "datetime": appointment_datetime.isoformat(),
-        "treatment_type": treatment["name"],
-        "duration_minutes": treatment["duration"],
-        "dentist": random.choice(["Dr. Smith", "Dr. Cohen", "Dr. Levi"]),
-        "status": status,
-        "notes": random.choice(DENTAL_NOTES) if status == "completed" else "",
-        "created_at": (appointment_datetime - timedelta(days=random.randint(1, 30))).isoformat(),
-    }
-
-
-def generate_invoice(invoice_id: int, patient_id: int, patient_name: str, appointment_id: int) -> Dict[str, Any]:
-    """Generate a realistic invoice."""
-    treatment = random.choice(TREATMENT_TYPES)
-    base_price = random.randint(*treatment["price_range"])
-    
-    # Insurance coverage (0-80%)
-    insurance_coverage = random.choice([0, 0, 0.5, 0.6, 0.7, 0.8])
-    insurance_amount = int(base_price * insurance_coverage)
-    patient_amount = base_price - insurance_amount
-    
-    # Payment status
-    is_paid = random.random() < 0.85  # 85% paid
-    paid_amount = patient_amount if is_paid else random.randint(0, patient_amount)
-    
-    issue_date = datetime.now() - timedelta(days=random.randint(1, 365))
-    due_date = issue_date + timedelta(days=30)
-    
-    return {
-        "id": invoice_id,
-        "patient_id": patient_id,
-        "patient_name": patient_name,
-        "appointment_id": appointment_id,
-        "issue_date": issue_date.strftime("%Y-%m-%d"),
-        "due_date": due_date.strftime("%Y-%m-%d"),
-        "treatment": treatment["name"],
-        "total_amount": base_price,
-        "insurance_amount": insurance_amount,
-        "patient_amount": patient_amount,
-        "paid_amount": paid_amount,
-        "outstanding_amount": patient_amount - paid_amount,
-        "status": "paid" if paid_amount >= patient_amount else "partial" if paid_amount > 0 else "unpaid",
-        "payment_method": random.choice(["Credit Card", "Cash", "Bank Transfer", "Check"]) if paid_amount > 0 else None,
-        "invoice_number": f"INV-{issue_date.year}-{invoice_id:05d}",
-    }
-
-
-def generate_treatment_record(record_id: int, patient_id: int, appointment_id: int) -> Dict[str, Any]:
-    """Generate a treatment record."""
-    treatment = random.choice(TREATMENT_TYPES)
-    treatment_date = datetime.now() - timedelta(days=random.randint(1, 730))
-    
-    return {
-        "id": record_id,
-        "patient_id": patient_id,
-        "appointment_id": appointment_id,
-        "date": treatment_date.strftime("%Y-%m-%d"),
-        "treatment_type": treatment["name"],
-        "tooth_number": random.choice([None, f"#{random.randint(1, 32)}"]),
-        "diagnosis": random.choice([
-            "Dental caries", "Gingivitis", "Periodontitis", "Tooth sensitivity",
-            "Tooth fracture", "Tooth abscess", "Routine checkup", "Preventive care"
-        ]),
-        "procedure_notes": random.choice(DENTAL_NOTES),
-        "dentist": random.choice(["Dr. Smith", "Dr. Cohen", "Dr. Levi"]),
-        "follow_up_required": random.choice([True, False, False, False]),
-        "follow_up_date": (treatment_date + timedelta(days=random.randint(30, 180))).strftime("%Y-%m-%d") if random.random() < 0.3 else None,
-    }
-
-
-def main():
+        tables: Dict[str, List[Dict[str, Any]]] = {table: [] for table in TABLES}
+        for table, record in records:
+            tables[table].append(record)
+            tally(table, record)
+        write_snapshot(directory, tables)
+
+    return {"clinic": shard.clinic, "counts": counts, **totals}
+
+
+def merge_ndjson(clinic_dir: Path, shard_dirs: List[Path]):
+    """Concatenate the shards' NDJSON into the mock's JSON arrays, a line at a time."""
+    for table, filename in RealisticMockOdooClient._DATA_FILES.items():
+        with open(clinic_dir / filename, "w", encoding="utf-8") as out:
+            out.write("[\n")
+            first = True
+            for shard_dir in shard_dirs:
+                with open(shard_dir / f"{table}.ndjson", "r", encoding="utf-8") as f:
+                    for line in f:
+                        out.write(line.rstrip("\n") if first else ",\n" + line.rstrip("\n"))
+                        first = False
+            out.write("\n]\n")
+
+
+def clinic_directory(output: Path, clinic: int, clinics: int) -> Path:
+    return output if clinics == 1 else output / f"clinic-{clinic:02d}"
+
+
+def plan_shards(args) -> List[Shard]:
+    shards = []
+    for clinic in range(1, args.clinics + 1):
+        shard_root = clinic_directory(args.output, clinic, args.clinics) / "shards"
+        for index, first in enumerate(range(0, args.patients, args.shard_size)):
+            shards.append(Shard(
+                clinic=clinic,
+                index=index,
+                first_patient_id=first + 1,
+                patients=min(args.shard_size, args.patients - first),
+                shard_size=args.shard_size,
+                seed=args.seed,
+                today=args.today,
+                format=args.format,
+                directory=str(shard_root / f"{index:05d}"),
+            ))
+    return shards
+
+
+def main(args):
     """Generate all mock data."""
     print("🏥 Generating Mock Data for Dental Clinic AI")
     print("=" * 60)
-    
-    NUM_PATIENTS = 1500
-    APPOINTMENTS_PER_PATIENT = (1, 15)  # Range of appointments per patient
-    
-    patients = []
-    appointments = []
-    invoices = []
-    treatment_records = []
-    
-    appointment_id = 1
-    invoice_id = 1
-    record_id = 1
-    
-    print(f"\n📊 Generating {NUM_PATIENTS} patients...")
-    for patient_id in range(1, NUM_PATIENTS + 1):
-        if patient_id % 100 == 0:
-            print(f"   Generated {patient_id}/{NUM_PATIENTS} patients...")
-        
-        # Generate patient
-        patient = generate_patient(patient_id)
-        patients.append(patient)
-        
-        # Generate appointments for this patient
-        num_appointments = random.randint(*APPOINTMENTS_PER_PATIENT)
-        for _ in range(num_appointments):
-            appointment = generate_appointment(appointment_id, patient_id, patient["name"])
-            appointments.append(appointment)
-            
-            # Generate invoice for completed appointments
-            if appointment["status"] == "completed":
-                invoice = generate_invoice(invoice_id, patient_id, patient["name"], appointment_id)
-                invoices.append(invoice)
-                invoice_id += 1
-                
-                # Generate treatment record
-                record = generate_treatment_record(record_id, patient_id, appointment_id)
-                treatment_records.append(record)
-                record_id += 1
-            
-            appointment_id += 1
-    
-    print(f"\n✅ Generated:")
-    print(f"   - {len(patients)} patients")
-    print(f"   - {len(appointments)} appointments")
-    print(f"   - {len(invoices)} invoices")
-    print(f"   - {len(treatment_records)} treatment records")
-    
-    # Save to JSON files
-    print(f"\n💾 Saving data to files...")
-    
-    with open('/home/ubuntu/dental-clinic-ai-repo/backend/data/mock_patients.json', 'w', encoding='utf-8') as f:
-        json.dump(patients, f, indent=2, ensure_ascii=False)
-    
-    with open('/home/ubuntu/dental-clinic-ai-repo/backend/data/mock_appointments.json', 'w', encoding='utf-8') as f:
-        json.dump(appointments, f, indent=2, ensure_ascii=False)
-    
-    with open('/home/ubuntu/dental-clinic-ai-repo/backend/data/mock_invoices.json', 'w', encoding='utf-8') as f:
-        json.dump(invoices, f, indent=2, ensure_ascii=False)
-    
-    with open('/home/ubuntu/dental-clinic-ai-repo/backend/data/mock_treatment_records.json', 'w', encoding='utf-8') as f:
-        json.dump(treatment_records, f, indent=2, ensure_ascii=False)
-    
+
+    shards = plan_shards(args)
+    print(
+        f"\n📊 Generating {args.clinics} x {args.patients} patients as {len(shards)} {args.format} shards "
+        f"(seed {args.seed}, today {args.today}, {args.workers} workers)..."
+    )
+    start = time.perf_counter()
+    results = []
+    with Pool(args.workers) as pool:
+        for result in pool.imap_unordered(generate_shard, shards):
+            results.append(result)
+            print(
+                f"   Generated {len(results)}/{len(shards)} shards "
+                f"({sum(r['counts']['patients'] for r in results)} patients)..."
+            )
+    generated = time.perf_counter() - start
+
+    if not args.no_merge:
+        print(f"\n💾 Merging shards...")
+        for clinic in range(1, args.clinics + 1):
+            clinic_dir = clinic_directory(args.output, clinic, args.clinics)
+            shard_dirs = [Path(shard.directory) for shard in shards if shard.clinic == clinic]
+            if args.format == "ndjson":
+                merge_ndjson(clinic_dir, shard_dirs)
+            else:
+                merge_snapshots(clinic_dir / "snapshot", shard_dirs)
+            shutil.rmtree(clinic_dir / "shards")
+            print(f"   - {clinic_dir}")
+
+    counts = {table: sum(r["counts"][table] for r in results) for table in TABLES}
+    worker_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024  # KiB on Linux
+    print(
+        f"\n✅ Generated in {generated:.1f}s (total {time.perf_counter() - start:.1f}s, "
+        f"peak worker RSS {worker_rss:.0f} MB, merge RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB):"
+    )
+    for table in TABLES:
+        print(f"   - {counts[table]} {table.replace('_', ' ')}")
+
     # Generate statistics
     print(f"\n📈 Statistics:")
-    print(f"   - Total revenue: ₪{sum(inv['total_amount'] for inv in invoices):,}")
-    print(f"   - Outstanding balance: ₪{sum(inv['outstanding_amount'] for inv in invoices):,}")
-    print(f"   - Average visits per patient: {len(appointments) / len(patients):.1f}")
-    print(f"   - Completion rate: {len([a for a in appointments if a['status'] == 'completed']) / len(appointments) * 100:.1f}%")
-    
+    print(f"   - Total revenue: ₪{sum(r['revenue'] for r in results):,}")
+    print(f"   - Outstanding balance: ₪{sum(r['outstanding'] for r in results):,}")
+    print(f"   - Average visits per patient: {counts['appointments'] / max(counts['patients'], 1):.1f}")
+    print(f"   - Completion rate: {sum(r['completed'] for r in results) / max(counts['appointments'], 1) * 100:.1f}%")
+
     print(f"\n🎉 Mock data generation complete!")
-    print(f"   Files saved to: backend/data/")
+    print(f"   Files saved to: {args.output}")
 
 
 if __name__ == "__main__":
-    main()
+    default_output = Path(__file__).parent.parent / "data"
+    parser = argparse.ArgumentParser(description="Generate the realistic mock dataset")
+    parser.add_argument("--patients", type=int, default=1500, help="Patients per clinic")
+    parser.add_argument("--clinics", type=int, default=1)
+    parser.add_argument("--format", choices=["ndjson", "snapshot"], default="ndjson")
+    parser.add_argument("--output", type=Path, default=default_output)
+    parser.add_argument("--shard-size", type=int, default=10000, help="Patients per shard (bounds memory per worker)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--today", default=date.today().isoformat(), help="Anchor date for relative dates (YYYY-MM-DD)")
+    parser.add_argument("--no-merge", action="store_true", help="Keep the per-shard files instead of merging them")
+    main(parser.parse_args())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Profile Backend Cold Start
+
+Measures how long `import app.main` takes in a fresh interpreter and which
+modules dominate it (using `python -X importtime`). With --baseline, the same
+measurement is taken on another git revision (checked out into a temporary
+worktree) for a before/after comparison.
+
+Warm-up time (model load, Neo4j connect) is logged separately by the
+application lifespan: "Warm-up finished in ...".
+
+Usage:
+    python scripts/profile_startup.py
+    python scripts/profile_startup.py --baseline HEAD~1 --repeat 5 --top 15
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent.resolve()
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|\s+(.*)$")
+
+
+def run_import(backend_dir: Path) -> Tuple[float, Dict[str, int], Optional[str]]:
+    """
+    Import app.main in a fresh interpreter.
+
+    Returns:
+        Wall time in seconds, cumulative import time (us) per module, error output
+    """
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=backend_dir,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(backend_dir)},
+    )
+    elapsed = time.perf_counter() - start
+
+    modules = {}
+    other_lines = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(3).strip()] = int(match.group(2))
+        elif not line.startswith("import time:"):
+            other_lines.append(line)
+
+    error = "\n".join(other_lines[-5:]) if result.returncode != 0 else None
+    return elapsed, modules, error
+
+
+def profile(backend_dir: Path, repeat: int, label: str, top: int) -> Optional[float]:
+    """Run the import `repeat` times and print the median wall time and slowest modules."""
+    timings: List[float] = []
+    modules: Dict[str, int] = {}
+
+    for _ in range(repeat):
+        elapsed, modules, error = run_import(backend_dir)
+        if error:
+            print(f"❌ {label}: import app.main failed:\n{error}")
+            return None
+        timings.append(elapsed)
+
+    median = statistics.median(timings)
+    print(f"\n📊 {label}: import app.main in {median:.2f}s (median of {repeat})")
+
+    top_level = {name: us for name, us in modules.items() if not name.startswith(" ")}
+    for name, us in sorted(top_level.items(), key=lambda item: item[1], reverse=True)[:top]:
+        print(f"   {us / 1e6:7.3f}s  {name}")
+    return median
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile backend cold start")
+    parser.add_argument("--baseline", help="Git revision to compare against, e.g. HEAD~1")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to show")
+    args = parser.parse_args()
+
+    print("🚀 Profiling backend cold start")
+    current = profile(BACKEND_DIR, args.repeat, "current", args.top)
+
+    if not args.baseline:
+        return
+
+    repo_root = Path(subprocess.check_output(
+        ["git", "rev-parse", "--show-toplevel"], cwd=BACKEND_DIR, text=True
+    ).strip())
+
+    with tempfile.TemporaryDirectory() as tmp:
+        worktree = Path(tmp) / "baseline"
+        subprocess.run(
+            ["git", "worktree", "add", "--detach", str(worktree), args.baseline],
+            cwd=repo_root, check=True, capture_output=True,
+        )
+        try:
+            baseline_dir = worktree / BACKEND_DIR.relative_to(repo_root)
+            baseline = profile(baseline_dir, args.repeat, f"baseline ({args.baseline})", args.top)
+        finally:
+            subprocess.run(
+                ["git", "worktree", "remove", "--force", str(worktree)],
+                cwd=repo_root, capture_output=True,
+            )
+
+    if current and baseline:
+        print(f"\n✅ Cold start: {baseline:.2f}s -> {current:.2f}s ({baseline / current:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
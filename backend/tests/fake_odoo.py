@@ -0,0 +1,245 @@
+"""
+Stand-in Odoo server for integration tests
+
+Serves Odoo's external API over HTTP/1.1 keep-alive on a local port:
+- XML-RPC at /xmlrpc/2/common and /xmlrpc/2/object
+- JSON-RPC at /jsonrpc
+Records live in memory. search, search_count, read, search_read, create
+and write are supported, with the usual domain operators. Calls,
+connections and peak concurrency are recorded so tests can check how a
+client talks to Odoo.
+"""
+
+import json
+import socket
+import threading
+import time
+import xmlrpc.client
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class FakeOdooError(Exception):
+    pass
+
+
+def _compare(value: Any, operator: str, expected: Any) -> bool:
+    if operator == "=":
+        return value == expected
+    if operator == "!=":
+        return value != expected
+    if operator == "in":
+        return value in expected
+    if operator == "not in":
+        return value not in expected
+    if operator == "ilike":
+        return value is not None and str(expected).lower() in str(value).lower()
+    if value is None:
+        return False
+    if operator == ">=":
+        return value >= expected
+    if operator == "<=":
+        return value <= expected
+    if operator == ">":
+        return value > expected
+    if operator == "<":
+        return value < expected
+    raise FakeOdooError(f"Unsupported operator {operator!r}")
+
+
+def _matches(record: Dict[str, Any], domain: List[Any]) -> bool:
+    """Evaluate a domain (Polish notation, implicit AND)."""
+
+    def term(position: int) -> Tuple[bool, int]:
+        item = domain[position]
+        if item == "!":
+            value, position = term(position + 1)
+            return not value, position
+        if item in ("|", "&"):
+            left, position = term(position + 1)
+            right, position = term(position)
+            return (left or right) if item == "|" else (left and right), position
+        field, operator, expected = item
+        value = record.get(field)
+        if isinstance(value, list) and field.endswith("_id"):
+            value = value[0]  # many2one read as [id, name]
+        return _compare(value, operator, expected), position + 1
+
+    position = 0
+    while position < len(domain):
+        value, position = term(position)
+        if not value:
+            return False
+    return True
+
+
+class FakeOdoo:
+    """In-memory Odoo database behind a local HTTP server."""
+
+    def __init__(
+        self,
+        db: str = "clinic",
+        login: str = "admin",
+        password: str = "admin",
+        latency: float = 0.0,
+        extra_dbs: Tuple[str, ...] = (),
+    ):
+        self.db = db
+        self.dbs = {db, *extra_dbs}  # Databases share records
+        self.login = login
+        self.password = password
+        self.uid = 2
+        self.latency = latency
+        self.models: Dict[str, Dict[int, Dict[str, Any]]] = {}
+        self.calls: List[Tuple[str, str, str]] = []  # (service, model or method, method)
+        self.logins: List[str] = []  # Databases of successful logins
+        self.connections = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # Server
+
+    def start(self) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                # Headers and body are written separately; don't wait for delayed ACKs
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                fake.connections.add(self.client_address)
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.path == "/jsonrpc":
+                    payload = fake._handle_json(body)
+                    content_type = "application/json"
+                elif self.path.startswith("/xmlrpc/2/"):
+                    payload = fake._handle_xml(self.path.rsplit("/", 1)[1], body)
+                    content_type = "text/xml"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeOdoo":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def _handle_xml(self, service: str, body: bytes) -> bytes:
+        args, method = xmlrpc.client.loads(body, use_builtin_types=True)
+        try:
+            result = self.dispatch(service, method, list(args))
+            return xmlrpc.client.dumps((result,), methodresponse=True, allow_none=True).encode("utf-8")
+        except FakeOdooError as e:
+            return xmlrpc.client.dumps(xmlrpc.client.Fault(1, str(e)), allow_none=True).encode("utf-8")
+
+    def _handle_json(self, body: bytes) -> bytes:
+        request = json.loads(body)
+        params = request["params"]
+        try:
+            response = {"result": self.dispatch(params["service"], params["method"], params["args"])}
+        except FakeOdooError as e:
+            response = {"error": {"code": 200, "message": "Odoo Server Error", "data": {"message": str(e)}}}
+        return json.dumps({"jsonrpc": "2.0", "id": request["id"], **response}).encode("utf-8")
+
+    # Odoo
+
+    def dispatch(self, service: str, method: str, args: List[Any]) -> Any:
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if service == "common" and method == "authenticate":
+                db, login, password = args[:3]
+                self.calls.append(("common", "authenticate", ""))
+                ok = db in self.dbs and login == self.login and password == self.password
+                if ok:
+                    self.logins.append(db)
+                return self.uid if ok else False
+            if service == "common" and method == "version":
+                return {"server_version": "17.0"}
+            if service == "object" and method == "execute_kw":
+                db, uid, password, model, model_method, model_args = args[:6]
+                kwargs = args[6] if len(args) > 6 else {}
+                if db not in self.dbs or (uid, password) != (self.uid, self.password):
+                    raise FakeOdooError("Access Denied")
+                self.calls.append(("object", model, model_method))
+                return self.execute(model, model_method, model_args, kwargs)
+            raise FakeOdooError(f"Unknown method {service}.{method}")
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def execute(self, model: str, method: str, args: List[Any], kwargs: Dict[str, Any]) -> Any:
+        records = self.models.setdefault(model, {})
+        with self._lock:
+            if method == "create":
+                values = args[0]
+                record_id = max(records, default=0) + 1
+                records[record_id] = {"id": record_id, **values}
+                return record_id
+            if method == "write":
+                ids, values = args
+                for record_id in ids:
+                    records[record_id].update(values)
+                return True
+            if method in ("search", "search_count", "search_read"):
+                domain = args[0] if args else kwargs.get("domain", [])
+                found = [r for _, r in sorted(records.items()) if _matches(r, domain)]
+                if kwargs.get("order"):
+                    field, _, direction = kwargs["order"].partition(" ")
+                    found.sort(key=lambda r: r.get(field) or "", reverse=direction.lower() == "desc")
+                offset = kwargs.get("offset", 0)
+                limit = kwargs.get("limit")
+                found = found[offset:offset + limit if limit else None]
+                if method == "search":
+                    return [r["id"] for r in found]
+                if method == "search_count":
+                    return len(found)
+                fields = args[1] if len(args) > 1 else kwargs.get("fields")
+                return [self._project(r, fields) for r in found]
+            if method == "read":
+                ids = args[0]
+                fields = args[1] if len(args) > 1 else kwargs.get("fields")
+                return [self._project(records[i], fields) for i in ids if i in records]
+        raise FakeOdooError(f"Unknown method {model}.{method}")
+
+    @staticmethod
+    def _project(record: Dict[str, Any], fields: Optional[List[str]]) -> Dict[str, Any]:
+        if not fields:
+            return dict(record)
+        return {"id": record["id"], **{f: record.get(f, False) for f in fields}}
+
+    def add(self, model: str, **values) -> int:
+        """Insert a record directly (test setup)."""
+        return self.execute(model, "create", [values], {})
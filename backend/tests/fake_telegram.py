@@ -0,0 +1,186 @@
+"""
+Stand-in Telegram Bot API server for integration tests and benchmarks
+
+Serves /bot<token>/<method> on a local port, like api.telegram.org:
+- getUpdates with offset confirmation, limit and long polling (the
+  request waits up to `timeout` seconds for an update), and 409
+  Conflict while a webhook is set, as Telegram does
+- setWebhook, deleteWebhook, getWebhookInfo
+- sendMessage, sendChatAction, answerCallbackQuery, sendLocation,
+  sendPhoto: recorded in `sent`, answered with a message id
+Updates are queued with push() or push_message(). Requests and peak
+concurrency are recorded so tests can check how a client talks to it.
+"""
+
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+
+SEND_METHODS = {"sendMessage", "sendChatAction", "answerCallbackQuery", "sendLocation", "sendPhoto"}
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass  # A client that cancels a long poll closes the connection before the answer
+
+
+class FakeTelegram:
+    """In-memory Bot API behind a local HTTP server."""
+
+    def __init__(self, token: str = "123:test", latency: float = 0.0):
+        self.token = token
+        self.latency = latency
+        self.updates: List[Dict[str, Any]] = []  # Not yet confirmed, oldest first
+        self.next_update_id = 1
+        self.webhook_url = ""
+        self.sent: List[Tuple[str, Dict[str, Any]]] = []  # (method, params)
+        self.calls: List[Tuple[str, Dict[str, Any]]] = []
+        self.fail_next = 0  # Answer this many upcoming getUpdates calls with 500
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._changed = threading.Condition()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    # Server
+
+    def start(self) -> str:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+            def log_message(self, *args):
+                pass
+
+            def _serve(self, params: Dict[str, Any]):
+                prefix = f"/bot{fake.token}/"
+                path = urlsplit(self.path).path
+                if not path.startswith(prefix):
+                    status, payload = 404, {"ok": False, "error_code": 404, "description": "Not Found"}
+                else:
+                    params.update(parse_qsl(urlsplit(self.path).query))
+                    status, payload = fake.dispatch(path[len(prefix):], params)
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                self._serve({})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                self._serve(json.loads(body) if body else {})
+
+        self._server = _Server(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    def stop(self):
+        if self._server is not None:
+            with self._changed:
+                self._changed.notify_all()
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "FakeTelegram":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    # Bot API
+
+    def dispatch(self, method: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        with self._changed:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.calls.append((method, dict(params)))
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            if method == "getUpdates":
+                return self._get_updates(params)
+            if method == "setWebhook":
+                self.webhook_url = params.get("url", "")
+                return 200, {"ok": True, "result": True, "description": "Webhook was set"}
+            if method == "deleteWebhook":
+                self.webhook_url = ""
+                return 200, {"ok": True, "result": True, "description": "Webhook was deleted"}
+            if method == "getWebhookInfo":
+                return 200, {"ok": True, "result": {"url": self.webhook_url, "pending_update_count": len(self.updates)}}
+            if method in SEND_METHODS:
+                with self._changed:
+                    self.sent.append((method, dict(params)))
+                    message_id = len(self.sent)
+                return 200, {"ok": True, "result": {"message_id": message_id, "chat": {"id": params.get("chat_id")}}}
+            return 404, {"ok": False, "error_code": 404, "description": "Not Found: method not found"}
+        finally:
+            with self._changed:
+                self.in_flight -= 1
+
+    def _get_updates(self, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        if self.webhook_url:
+            return 409, {
+                "ok": False, "error_code": 409,
+                "description": "Conflict: can't use getUpdates method while webhook is active",
+            }
+        with self._changed:
+            if self.fail_next:
+                self.fail_next -= 1
+                return 500, {"ok": False, "error_code": 500, "description": "Internal Server Error"}
+            offset = params.get("offset")
+            if offset is not None:
+                # An offset confirms every update before it
+                self.updates = [u for u in self.updates if u["update_id"] >= int(offset)]
+            limit = int(params.get("limit", 100))
+            deadline = time.monotonic() + float(params.get("timeout", 0))
+            while not self.updates and self._server is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+            return 200, {"ok": True, "result": self.updates[:limit]}
+
+    # Test setup
+
+    def push(self, **update: Any) -> int:
+        """Queue an update (e.g. message={...} or callback_query={...}); returns its update_id."""
+        with self._changed:
+            update_id = self.next_update_id
+            self.next_update_id += 1
+            self.updates.append({"update_id": update_id, **update})
+            self._changed.notify_all()
+        return update_id
+
+    def push_message(self, chat_id: int, text: str) -> int:
+        """Queue a text message from a private chat."""
+        return self.push(message={
+            "message_id": self.next_update_id,
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Patient", "username": f"patient{chat_id}"},
+            "chat": {"id": chat_id, "type": "private"},
+            "date": int(time.time()),
+            "text": text,
+        })
+
+    def sent_texts(self, chat_id: int) -> List[str]:
+        """Texts sent to a chat with sendMessage, in order."""
+        return [params["text"] for method, params in self.sent if method == "sendMessage" and params["chat_id"] == chat_id]
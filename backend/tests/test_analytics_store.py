@@ -0,0 +1,134 @@
+"""
+Test Analytics Store - columnar dashboard statistics match the per-record computations
+"""
+
+import random
+from datetime import date, timedelta
+
+import pytest
+
+from app.integrations.analytics_store import AnalyticsStore, Categorical
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+
+
+TODAY = date(2025, 3, 15)
+TREATMENTS = ["Cleaning", "Filling", "Crown", "Root Canal", "X-Ray"]
+
+
+def _dataset(patients=300, seed=7):
+    rng = random.Random(seed)
+    day = lambda offset: (TODAY + timedelta(days=offset)).isoformat()
+    patient_rows = [
+        {
+            "id": i,
+            "registration_date": day(-rng.randint(0, 400)),
+            "last_visit": rng.choice([None, day(-rng.randint(0, 200))]),
+            "insurance_provider": rng.choice(["Maccabi", "Clalit", "None", None]),
+            "outstanding_balance": rng.choice([0, 0, 120.5]),
+        }
+        for i in range(1, patients + 1)
+    ]
+    appointments = [
+        {
+            "date": day(rng.randint(-60, 30)),
+            "status": rng.choice(["completed", "scheduled", "cancelled"]),
+            "treatment_type": rng.choice(TREATMENTS),
+        }
+        for _ in range(patients * 3)
+    ]
+    invoices = []
+    for _ in range(patients * 4):
+        total = rng.choice([100, 250, 1999.9])
+        paid = rng.choice([0, total / 2, total])
+        invoices.append({
+            "patient_id": rng.randint(1, patients),
+            "issue_date": day(-rng.randint(0, 365)),
+            "treatment": rng.choice(TREATMENTS),
+            "status": "paid" if paid == total else "partial" if paid else "unpaid",
+            "total_amount": total,
+            "paid_amount": paid,
+            "outstanding_amount": total - paid,
+        })
+    return patient_rows, appointments, invoices
+
+
+def _group(rows, key, value=lambda row: 1):
+    groups = {}
+    for row in rows:
+        groups[key(row)] = groups.get(key(row), 0) + value(row)
+    return groups
+
+
+def test_statistics_match_record_scan():
+    """Every dashboard number equals the straightforward computation over the records."""
+    patients, appointments, invoices = _dataset()
+    store = AnalyticsStore(patients, appointments, invoices)
+    iso = lambda offset: (TODAY + timedelta(days=offset)).isoformat()
+
+    stats = store.patient_statistics(TODAY)
+    assert stats["new_patients_30d"] == sum(p["registration_date"] >= iso(-30) for p in patients)
+    assert stats["active_patients_90d"] == sum(bool(p["last_visit"]) and p["last_visit"] >= iso(-90) for p in patients)
+    assert stats["patients_with_outstanding_balance"] == sum(p["outstanding_balance"] > 0 for p in patients)
+    assert stats["insurance_distribution"] == _group(patients, lambda p: str(p["insurance_provider"]))
+
+    stats = store.appointment_statistics(TODAY)
+    assert stats["status_distribution"] == _group(appointments, lambda a: a["status"])
+    assert stats["upcoming_appointments_7d"] == sum(
+        a["status"] == "scheduled" and iso(0) <= a["date"] <= iso(7) for a in appointments
+    )
+    treatments = stats["treatment_type_distribution"]
+    assert treatments == _group(appointments, lambda a: a["treatment_type"])
+    assert list(treatments.values()) == sorted(treatments.values(), reverse=True)
+
+    stats = store.revenue_statistics()
+    assert stats["total_revenue"] == pytest.approx(sum(i["total_amount"] for i in invoices))
+    assert stats["paid_amount"] == pytest.approx(sum(i["paid_amount"] for i in invoices))
+    monthly = _group(invoices, lambda i: i["issue_date"][:7], lambda i: i["total_amount"])
+    assert list(stats["monthly_revenue"]) == sorted(monthly)
+    assert stats["monthly_revenue"] == pytest.approx(monthly)
+    assert stats["revenue_by_treatment"] == pytest.approx(_group(invoices, lambda i: i["treatment"], lambda i: i["total_amount"]))
+
+    overview = store.overview()
+    assert overview["completed_appointments"] == sum(a["status"] == "completed" for a in appointments)
+    assert overview["paid_invoices"] == sum(i["status"] == "paid" for i in invoices)
+    assert overview["unpaid_invoices"] == sum(i["status"] == "unpaid" for i in invoices)
+
+
+def test_top_patients_and_edge_cases():
+    """Top-k matches a full sort (ties by patient ID); empty data and unknown values give zeros."""
+    patients, appointments, invoices = _dataset()
+    store = AnalyticsStore(patients, appointments, invoices)
+    revenue = _group(invoices, lambda i: i["patient_id"], lambda i: i["total_amount"])
+    expected = sorted(revenue.items(), key=lambda item: (-round(item[1], 2), item[0]))
+
+    for limit in (1, 10, len(revenue), len(revenue) + 5):
+        top = store.top_patients(limit)
+        assert [patient_id for patient_id, _ in top] == [patient_id for patient_id, _ in expected[:limit]]
+    assert store.top_patients(0) == []
+
+    empty = AnalyticsStore([], [], [])
+    assert empty.overview()["total_revenue"] == 0
+    assert empty.revenue_statistics()["monthly_revenue"] == {}
+    assert empty.top_patients(5) == []
+
+    column = Categorical(["paid", "unpaid", "paid"])
+    assert column.categories == ["paid", "unpaid"] and column.count("refunded") == 0
+
+
+def test_mock_client_rebuilds_after_writes(tmp_path):
+    """The realistic mock answers statistics from a snapshot that follows its writes."""
+    client = RealisticMockOdooClient()
+    client.data_dir = tmp_path  # No fixture files: start empty
+    patient_id = client.create_patient("Tamar Amar", phone="0501234567")
+    first = client.analytics()
+    assert client.analytics() is first
+    assert client.get_statistics()["total_patients"] == 1
+
+    appointment_id = client.create_appointment(patient_id, TODAY.isoformat(), "10:00", "Cleaning")
+    client.create_invoice(patient_id, appointment_id, "Cleaning", 350)
+    assert client.get_statistics()["scheduled_appointments"] == 1
+    assert client.analytics().top_patients(1) == [(patient_id, 350.0)]
+
+    client.cancel_appointment(appointment_id)
+    stats = client.get_statistics()
+    assert stats["scheduled_appointments"] == 0 and stats["total_revenue"] == 350
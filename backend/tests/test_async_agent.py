@@ -0,0 +1,98 @@
+"""
+Test Async Agent Pipeline - non-blocking LLM calls and retries
+"""
+
+import asyncio
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agents import alex as alex_module
+from app.agents.alex import AlexAgent
+from app.agents.error_handler import RetryHandler
+from app.core.rate_limiter import DistributedRateLimiter
+
+
+class SlowLLM:
+    """Stand-in for ChatOpenAI whose ainvoke() takes `latency` seconds."""
+
+    def __init__(self, latency: float = 0.2, failures: int = 0):
+        self.latency = latency
+        self.failures = failures
+        self.calls = 0
+
+    async def ainvoke(self, conversation):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.calls <= self.failures:
+            raise ConnectionError("upstream timeout")
+        return AIMessage(content="Sure, I can help with that!")
+
+
+def _state(message: str) -> dict:
+    return {"messages": [HumanMessage(content=message)], "user_id": "u1", "errors": []}
+
+
+@pytest.mark.asyncio
+async def test_aexecute_retries_without_blocking_loop():
+    """Backoff sleeps on the event loop, so other tasks keep running meanwhile."""
+    handler = RetryHandler(max_retries=3, initial_delay=0.1, jitter=0.5)
+    llm = SlowLLM(latency=0, failures=2)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    task = asyncio.create_task(ticker())
+    result = await handler.aexecute(llm.ainvoke, [])
+    task.cancel()
+
+    assert result.content == "Sure, I can help with that!"
+    assert llm.calls == 3
+    assert ticks >= 5  # at least 0.05 + 0.1 s of jittered backoff elapsed
+
+
+def test_jittered_delay_stays_within_bounds():
+    """Jitter only shortens the exponential delay, never beyond max_delay."""
+    handler = RetryHandler(initial_delay=1.0, max_delay=4.0, jitter=0.5)
+
+    for attempt, upper in [(0, 1.0), (1, 2.0), (5, 4.0)]:
+        delays = [handler._get_delay(attempt) for _ in range(200)]
+        assert all(upper * 0.5 <= delay <= upper for delay in delays)
+        assert len(set(delays)) > 1
+
+
+@pytest.mark.asyncio
+async def test_concurrent_chats_overlap(monkeypatch):
+    """N simultaneous chats finish in about the time of one LLM call."""
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    alex = AlexAgent()
+    alex.llm = SlowLLM(latency=0.2)
+
+    start = time.perf_counter()
+    states = await asyncio.gather(*[
+        alex.aprocess(_state(f"What are your hours? ({i})")) for i in range(20)
+    ])
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert all(state["messages"][-1].content == "Sure, I can help with that!" for state in states)
+
+
+@pytest.mark.asyncio
+async def test_aprocess_turns_llm_failure_into_apology(monkeypatch):
+    """Exhausted retries are handled by the async error decorator."""
+    monkeypatch.setattr(alex_module, "retry_handler", RetryHandler(max_retries=2, initial_delay=0.01))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    alex = AlexAgent()
+    alex.llm = SlowLLM(latency=0, failures=10)
+
+    state = await alex.aprocess(_state("What are your hours?"))
+
+    assert state["errors"][-1]["type"] == "llm_error"
+    assert "trouble processing" in state["messages"][-1].content
@@ -0,0 +1,149 @@
+"""
+Test Appointment Availability Index - overlaps, clinic hours and incremental updates
+"""
+
+import random
+from datetime import date, datetime, timedelta
+
+from app.integrations.availability import AvailabilityIndex, ClinicHours
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+
+
+MONDAY = date(2030, 1, 7)
+
+
+def _appointment(appointment_id, time, duration, dentist="Dr. Smith", day=MONDAY, status="scheduled"):
+    return {
+        "id": appointment_id,
+        "date": day.isoformat(),
+        "time": time,
+        "duration_minutes": duration,
+        "dentist": dentist,
+        "status": status,
+    }
+
+
+def _times(slots):
+    return [slot["time"] for slot in slots]
+
+
+def test_duration_overlaps_block_slots():
+    """An appointment blocks every slot its time range overlaps, for the requested length."""
+    index = AvailabilityIndex(["Dr. Smith"])
+    index.add(_appointment(1, "10:15", 45))
+    index.add(_appointment(2, "09:00", 30, status="cancelled"))  # Does not block
+
+    slots = _times(index.free_slots(MONDAY, MONDAY))
+    assert "09:00" in slots and "09:30" in slots and "11:00" in slots
+    assert "10:00" not in slots and "10:30" not in slots
+
+    hour_slots = _times(index.free_slots(MONDAY, MONDAY, duration_minutes=60))
+    assert "09:00" in hour_slots and "09:30" not in hour_slots
+    assert hour_slots[-1] == "17:00"  # Must end by closing time
+
+
+def test_any_free_dentist_and_incremental_cancel():
+    """A slot is open while any dentist is free; cancelling frees only that appointment's time."""
+    index = AvailabilityIndex(["Dr. Smith", "Dr. Cohen"])
+    index.add(_appointment(1, "10:00", 60, "Dr. Smith"))
+    index.add(_appointment(2, "10:30", 30, "Dr. Smith"))
+    index.add(_appointment(3, "10:00", 30, "Dr. Cohen"))
+
+    slots = {slot["time"]: slot["dentists"] for slot in index.free_slots(MONDAY, MONDAY)}
+    assert "10:00" not in slots
+    assert slots["10:30"] == ["Dr. Cohen"]
+
+    index.remove(1)
+    slots = {slot["time"]: slot["dentists"] for slot in index.free_slots(MONDAY, MONDAY, dentist="Dr. Smith")}
+    assert slots["10:00"] == ["Dr. Smith"]
+    assert "10:30" not in slots  # Appointment 2 still overlaps
+
+
+def test_weekends_and_not_before():
+    """Closed days are skipped and slots before `not_before` are left out."""
+    index = AvailabilityIndex(["Dr. Smith"], ClinicHours(workdays=frozenset({0})))
+    slots = index.free_slots(MONDAY, MONDAY + timedelta(days=7), not_before=datetime(2030, 1, 7, 16, 10))
+
+    assert [slot["datetime"] for slot in slots[:4]] == [
+        "2030-01-07T16:30:00", "2030-01-07T17:00:00", "2030-01-07T17:30:00", "2030-01-14T08:00:00",
+    ]
+    assert len(slots) == 3 + 20
+
+
+def test_matches_brute_force_on_random_calendars():
+    """Bitmap results equal a direct overlap check of every slot against every appointment."""
+    rng = random.Random(3)
+    dentists = ["Dr. Smith", "Dr. Cohen", "Dr. Levi"]
+    index = AvailabilityIndex(dentists)
+    appointments = []
+    for i in range(400):
+        day = MONDAY + timedelta(days=rng.randrange(14))
+        appt = _appointment(
+            i, f"{rng.randint(8, 17):02d}:{rng.choice([0, 15, 30, 45]):02d}",
+            rng.choice([15, 30, 45, 60, 90, 180]), rng.choice(dentists), day,
+            rng.choice(["scheduled", "scheduled", "cancelled"]),
+        )
+        appointments.append(appt)
+        index.add(appt)
+    for appt in rng.sample(appointments, 100):
+        appt["status"] = "cancelled"
+        index.remove(appt["id"])
+
+    def brute_force(day, duration):
+        free = []
+        for minute in range(8 * 60, 18 * 60 - duration + 1, 30):
+            open_dentists = [
+                dentist for dentist in dentists
+                if not any(
+                    a["status"] == "scheduled" and a["dentist"] == dentist and a["date"] == day.isoformat()
+                    and int(a["time"][:2]) * 60 + int(a["time"][3:]) < minute + duration
+                    and minute < int(a["time"][:2]) * 60 + int(a["time"][3:]) + a["duration_minutes"]
+                    for a in appointments
+                )
+            ]
+            if open_dentists:
+                free.append((f"{minute // 60:02d}:{minute % 60:02d}", open_dentists))
+        return free
+
+    for duration in (30, 60, 90):
+        for offset in range(14):
+            day = MONDAY + timedelta(days=offset)
+            expected = brute_force(day, duration) if day.weekday() < 5 else []
+            got = [(slot["time"], slot["dentists"]) for slot in index.free_slots(day, day, duration)]
+            assert got == expected
+
+
+def test_mock_client_updates_on_create_and_cancel():
+    """create_appointment/cancel_appointment keep get_available_slots current."""
+    client = RealisticMockOdooClient()
+    client.warm_up()
+    client.availability.dentists[:] = ["Dr. Smith"]
+    day = MONDAY.isoformat()
+
+    assert "11:00" in _times(client.get_available_slots(day, day))
+    appointment_id = client.create_appointment(1, day, "11:00", "Cleaning", duration_minutes=60)
+    assert {"11:00", "11:30"}.isdisjoint(_times(client.get_available_slots(day, day)))
+
+    client.cancel_appointment(appointment_id)
+    assert {"11:00", "11:30"} <= set(_times(client.get_available_slots(day, day)))
+
+
+def test_mock_client_rejects_overlapping_bookings(tmp_path):
+    """A dentist is booked at most once at a time; without a dentist the first free one is taken."""
+    client = RealisticMockOdooClient()
+    client.data_dir = tmp_path
+    client.availability.dentists[:] = ["Dr. Smith", "Dr. Levi"]
+    day = MONDAY.isoformat()
+
+    first = client.create_appointment(1, day, "10:00", "Cleaning")
+    second = client.create_appointment(2, day, "10:00", "Cleaning")
+    assert [client.get_appointment(i)["dentist"] for i in (first, second)] == ["Dr. Smith", "Dr. Levi"]
+
+    assert client.create_appointment(3, day, "10:30", "Filling", duration_minutes=30) is None
+    assert client.create_appointment(3, day, "09:30", "Filling", dentist="Dr. Smith") is None
+    assert client.create_appointment(3, day, "11:00", "Filling", dentist="Dr. Smith") is not None
+    assert len(client.appointments) == 3
+
+    client.cancel_appointment(first)
+    third = client.create_appointment(3, day, "10:30", "Filling", duration_minutes=30)
+    assert client.get_appointment(third)["dentist"] == "Dr. Smith"
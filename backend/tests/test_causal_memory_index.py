@@ -0,0 +1,115 @@
+"""
+Test Causal Memory Vector Index Sync - failed writes and refreshes, against a fake Neo4j driver
+"""
+
+import numpy as np
+import pytest
+
+from app.memory.causal_memory import CausalMemoryGraph
+from app.memory.vector_index import VectorIndex
+
+
+class FakeEmbeddings:
+    """Stand-in for EmbeddingService: one fixed direction per message."""
+
+    def encode(self, text):
+        return np.random.default_rng(abs(hash(text)) % 2**32).normal(size=16).astype(np.float32)
+
+    def encode_batch(self, texts):
+        return np.stack([self.encode(text) for text in texts])
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def execute_write(self, work, *args):
+        if self.driver.fail_writes:
+            raise ConnectionError("Neo4j unavailable")
+        self.driver.writes.append(args)
+
+    def run(self, query, parameters=None):
+        self.driver.queries.append((query, parameters))
+        return list(self.driver.records)
+
+
+class FakeDriver:
+    """Neo4j driver that records writes and queries and answers reads with `records`."""
+
+    def __init__(self, fail_writes=False):
+        self.fail_writes = fail_writes
+        self.writes = []
+        self.queries = []
+        self.records = []
+
+    def session(self):
+        return FakeSession(self)
+
+
+def _memory(driver) -> CausalMemoryGraph:
+    memory = CausalMemoryGraph()
+    memory._driver = driver
+    memory.embeddings = FakeEmbeddings()
+    memory.vector_index = VectorIndex(backend="brute_force")
+    return memory
+
+
+def _interaction(message):
+    return {
+        "user_message": message,
+        "agent_response": "ok",
+        "agent_name": "alex",
+        "conversation_id": "c1",
+        "organization_id": "org-1",
+    }
+
+
+def test_failed_write_leaves_no_phantom_ids():
+    """Interactions whose transaction failed are taken out of the vector index again."""
+    memory = _memory(FakeDriver())
+    stored = memory.store_interactions([_interaction("What are your hours?")])
+
+    memory._driver.fail_writes = True
+    with pytest.raises(ConnectionError):
+        memory.store_interactions([_interaction("What are your hours?"), _interaction("Do you have parking?")])
+
+    assert len(memory.vector_index) == 1 and stored[0] in memory.vector_index
+    embedding = memory.embeddings.encode("Do you have parking?")
+    assert [item_id for item_id, _ in memory.vector_index.search(embedding, k=5)] == stored
+
+
+def _record(item_id, written_ms, organization_id="org-1"):
+    return {
+        "id": item_id,
+        "embedding": FakeEmbeddings().encode(item_id).tolist(),
+        "organization_id": organization_id,
+        "timestamp_ms": written_ms - 60_000,
+        "written_ms": written_ms,
+    }
+
+
+def test_refresh_is_bounded_and_follows_write_time():
+    """The first load is capped per organization; later ones start from the newest written_at seen."""
+    memory = _memory(FakeDriver())
+    memory.index_max_per_org = 500
+    memory._driver.records = [_record("a", 1_000_000), _record("b", 2_000_000, "org-2")]
+
+    memory._refresh_vector_index(force=True)
+    query, parameters = memory._driver.queries[-1]
+    assert "collect(i)[..$per_org]" in query and parameters["per_org"] == 500
+    assert {"a", "b"} <= set(memory.vector_index._org_by_id)
+
+    # "c" committed while the previous refresh ran: inside the overlap, so it is picked up now
+    memory._driver.records = [_record("b", 2_000_000, "org-2"), _record("c", 1_950_000)]
+    memory._refresh_vector_index(force=True)
+    query, parameters = memory._driver.queries[-1]
+    assert "i.written_at >= " in query
+    assert parameters["since_ms"] == 2_000_000 - int(memory.INDEX_REFRESH_SECONDS * 1000)
+    assert len(memory.vector_index) == 3
+    assert memory._index_watermark_ms == 2_000_000
@@ -0,0 +1,166 @@
+"""
+Test Postgres Checkpointer - keyframes, deltas, compaction and single-query resume
+
+Runs against an in-memory SQLite database (the table uses portable column types).
+"""
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.agents import agent_graph as agent_graph_module
+from app.agents import alex as alex_module
+from app.agents.agent_graph import AgentGraphV2
+from app.agents.checkpointer import PostgresCheckpointSaver
+from app.agents.graph_state import PERSISTED_STATE_KEYS
+from app.agents.tools.agent_tools import identify_patient
+from app.core.rate_limiter import DistributedRateLimiter
+from app.models.checkpoint import GraphCheckpoint
+
+
+class EchoLLM:
+    """Stand-in for ChatOpenAI."""
+
+    async def ainvoke(self, conversation):
+        return AIMessage(content=f"reply to: {conversation[-1].content}")
+
+
+class RecordingLLM(EchoLLM):
+    """EchoLLM that keeps every prompt it was sent."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, conversation):
+        self.prompts.append(conversation)
+        return await super().ainvoke(conversation)
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    GraphCheckpoint.__table__.create(engine)
+    return engine
+
+
+@pytest.fixture
+def saver(engine):
+    return PostgresCheckpointSaver(
+        session_factory=sessionmaker(bind=engine),
+        keyframe_interval=10,
+        channels=PERSISTED_STATE_KEYS,
+    )
+
+
+def _turn_input(i: int) -> dict:
+    turn = {
+        "messages": [HumanMessage(content=f"message {i}")],
+        "current_agent": "alex",
+        "user_id": "user-1",
+        "organization_id": "org-1",
+        "conversation_id": "conversation-1",
+        "errors": [],
+        "requires_human": False,
+        "escalation_level": None,
+    }
+    if i == 0:
+        turn["patient_id"] = "patient-7"  # Only the first turn knows the patient
+    return turn
+
+
+async def _run_turns(graph, turns: int, thread_id: str = "thread-1"):
+    state = None
+    for i in range(turns):
+        state = await graph.graph.ainvoke(_turn_input(i), graph._config(thread_id))
+    return state
+
+
+@pytest.mark.asyncio
+async def test_state_survives_turns_and_old_rows_are_compacted(saver, engine, monkeypatch):
+    """Persisted keys carry over between turns; rows never exceed one keyframe chain."""
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    graph = AgentGraphV2(checkpointer=saver)
+    graph.alex.llm = EchoLLM()
+
+    state = await _run_turns(graph, 50)
+
+    # The patient found in the first turn was restored in every later turn
+    assert state["patient_id"] == "patient-7"
+
+    with sessionmaker(bind=engine)() as db:
+        rows = db.query(GraphCheckpoint).order_by(GraphCheckpoint.seq).all()
+    assert [row.seq for row in rows] == list(range(40, 50))
+    assert rows[0].is_keyframe and not any(row.is_keyframe for row in rows[1:])
+    # Messages are not persisted, deltas only hold changed state channels
+    assert all(set(row.channel_values) <= set(PERSISTED_STATE_KEYS) for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_resume_is_one_query(saver, engine, monkeypatch):
+    """Loading a long thread's checkpoint is a single SELECT."""
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    graph = AgentGraphV2(checkpointer=saver)
+    graph.alex.llm = EchoLLM()
+    state = await _run_turns(graph, 50)
+
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    checkpoint = saver.get(graph._config("thread-1"))
+
+    assert len(statements) == 1
+    assert checkpoint["channel_values"]["patient_id"] == state["patient_id"] == "patient-7"
+    assert "messages" not in checkpoint["channel_values"]
+
+
+@pytest.mark.asyncio
+async def test_patient_identified_in_one_turn_is_known_in_the_next(saver, monkeypatch):
+    """Alex remembers the patient across process_message() calls on one thread, even after a restart."""
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    monkeypatch.setattr(agent_graph_module.causal_memory, "get_similar_interactions", lambda **kwargs: [])
+
+    async def aencode(text):
+        return np.zeros(384, dtype=np.float32)
+
+    async def submit(**interaction):
+        return True
+
+    monkeypatch.setattr(agent_graph_module.embedding_service, "aencode", aencode)
+    monkeypatch.setattr(agent_graph_module.interaction_writer, "submit", submit)
+    patient = identify_patient("+972583291570")
+
+    first = AgentGraphV2(checkpointer=saver)
+    first.alex.llm = RecordingLLM()
+    await first.process_message("u1", "o1", "c1", "Hi, my number is 058-329-1570", thread_id="thread-9")
+
+    assert saver.get(first._config("thread-9"))["channel_values"]["patient_id"] == str(patient["id"])
+
+    second = AgentGraphV2(checkpointer=saver)
+    second.alex.llm = RecordingLLM()
+    await second.process_message("u1", "o1", "c1", "Can I see my invoices?", thread_id="thread-9")
+
+    tool_results = [m.content for m in second.alex.llm.prompts[0] if isinstance(m, SystemMessage)]
+    assert any(f"Invoices for {patient['name']}" in content for content in tool_results)
+
+    # Another conversation does not know the patient
+    await second.process_message("u2", "o1", "c2", "Can I see my invoices?", thread_id="thread-10")
+    tool_results = [m.content for m in second.alex.llm.prompts[1] if isinstance(m, SystemMessage)]
+    assert any("Patient not identified yet" in content for content in tool_results)
+
+
+def test_unknown_thread_and_failing_database(saver):
+    """A new thread has no checkpoint; storage errors do not break the chat."""
+    assert saver.get({"configurable": {"thread_id": "new"}}) is None
+
+    def broken_session():
+        raise ConnectionError("database is down")
+
+    broken = PostgresCheckpointSaver(session_factory=broken_session)
+    assert broken.get({"configurable": {"thread_id": "t"}}) is None
+    broken.put({"configurable": {"thread_id": "t"}}, {"channel_values": {}, "channel_versions": {},
+                                                     "versions_seen": {}, "ts": "", "v": 1})
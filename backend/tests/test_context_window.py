@@ -0,0 +1,170 @@
+"""
+Test Conversation Context Window - token budget and rolling summary
+"""
+
+from datetime import datetime, timedelta
+from uuid import uuid4
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.agents.context_window import STATE_KEY, ConversationContextManager
+from app.models import Conversation, Message, MessageRole
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    # The models use the Postgres UUID type; SQLite stores it as hex text
+    return "CHAR(32)"
+
+
+def _word_count(text: str) -> int:
+    return len(text.split())
+
+
+def _history(turns: int):
+    messages = []
+    for i in range(turns):
+        messages.append(Message(role=MessageRole.USER, content=f"question {i} about my appointment"))
+        messages.append(Message(role=MessageRole.ASSISTANT, content=f"answer {i} with some details here"))
+    return messages
+
+
+class SummaryLLM:
+    """Stand-in for ChatOpenAI that records the summary prompts."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        return AIMessage(content=f"summary {len(self.prompts)}")
+
+
+@pytest.fixture
+def session_factory():
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    for model in (Conversation, Message):
+        model.__table__.create(engine)
+    return sessionmaker(bind=engine, expire_on_commit=False)
+
+
+def _conversation(session_factory, turns: int):
+    """Conversation with `turns` stored user/assistant turns, one second apart."""
+    organization_id = uuid4()
+    conversation = Conversation(
+        organization_id=organization_id,
+        primary_agent="alex",
+        langgraph_thread_id=str(uuid4()),
+    )
+    start = datetime(2026, 1, 1, 9, 0)
+    with session_factory() as db:
+        db.add(conversation)
+        db.flush()
+        for i, message in enumerate(_history(turns)):
+            message.conversation_id = conversation.id
+            message.organization_id = organization_id
+            message.created_at = start + timedelta(seconds=i)
+            db.add(message)
+        db.commit()
+    return conversation.id
+
+
+def test_short_history_is_sent_verbatim():
+    """Everything fits: all turns are sent and nothing is saved."""
+    manager = ConversationContextManager(max_history_tokens=1000, token_counter=_word_count)
+
+    window = manager.fit(None, _history(2))
+
+    assert [type(m) for m in window.messages] == [HumanMessage, AIMessage, HumanMessage, AIMessage]
+    assert window.messages[-1].content == "answer 1 with some details here"
+    assert window.tokens_saved == 0
+
+
+def test_budget_keeps_newest_turns_and_summary():
+    """Over budget: summary first, then the newest turns that fit, in order."""
+    manager = ConversationContextManager(max_history_tokens=25, token_counter=_word_count)
+    summary = "Patient booked a cleaning."
+
+    window = manager.fit(summary, _history(10), summarized_tokens=300)
+
+    assert isinstance(window.messages[0], SystemMessage)
+    assert summary in window.messages[0].content
+    assert [m.content for m in window.messages[1:]] == [
+        "question 9 about my appointment",
+        "answer 9 with some details here",
+    ]
+    assert window.history_tokens <= 25
+    assert window.full_history_tokens == 300 + 10 * (5 + 6)
+    assert window.tokens_saved == window.full_history_tokens - window.history_tokens
+
+
+def test_prompt_size_stays_bounded_as_conversation_grows():
+    """History tokens never exceed the budget, however long the conversation."""
+    manager = ConversationContextManager(max_history_tokens=200, token_counter=_word_count)
+
+    sizes = [manager.fit("summary " * 50, _history(turns)).history_tokens for turns in (5, 50, 500)]
+
+    assert all(size <= 200 for size in sizes)
+
+
+def test_summary_updates_only_every_n_turns():
+    """Turns are folded only once N turns have aged out of the recent window."""
+    manager = ConversationContextManager(keep_recent_messages=4, summarize_every_turns=3)
+
+    assert manager._messages_to_fold(_history(4)) == []  # 4 messages aged out, 6 needed
+    history = _history(5)
+    folded = manager._messages_to_fold(history)
+    assert folded == history[:6]
+
+
+def test_build_loads_history_from_the_database(session_factory):
+    """build() reads stored turns and puts the summary before the newest ones."""
+    conversation_id = _conversation(session_factory, 3)
+    manager = ConversationContextManager(max_history_tokens=1000, token_counter=_word_count)
+
+    with session_factory() as db:
+        conversation = db.get(Conversation, conversation_id)
+        conversation.summary = "Patient asked about fillings."
+        window = manager.build(db, conversation)
+
+    assert isinstance(window.messages[0], SystemMessage)
+    assert [m.content for m in window.messages[1:]] == [m.content for m in _history(3)]
+
+
+@pytest.mark.asyncio
+async def test_summary_folds_a_long_backlog_oldest_first(session_factory):
+    """A backlog longer than one page is folded page by page, from the oldest turn."""
+    conversation_id = _conversation(session_factory, 30)  # 60 messages
+    llm = SummaryLLM()
+    manager = ConversationContextManager(
+        llm=llm,
+        keep_recent_messages=4,
+        summarize_every_turns=3,
+        max_loaded_messages=20,
+        token_counter=_word_count,
+    )
+
+    assert await manager.aupdate_summary(conversation_id, session_factory)
+
+    assert len(llm.prompts) == 3  # 56 aged-out messages: pages of 20, 20 and 16
+    assert "question 0 about" in llm.prompts[0]
+    assert "question 10 about" not in llm.prompts[0]
+    assert "summary 1" in llm.prompts[1] and "question 10 about" in llm.prompts[1]
+    assert "question 27 about" in llm.prompts[2] and "question 28 about" not in llm.prompts[2]
+
+    with session_factory() as db:
+        conversation = db.get(Conversation, conversation_id)
+        assert conversation.summary == "summary 3"
+        assert conversation.langgraph_state[STATE_KEY]["summarized_messages"] == 56
+        window = manager.build(db, conversation)
+    assert [m.content for m in window.messages[1:]] == [m.content for m in _history(30)[-4:]]
+
+    # Nothing new aged out: no further LLM call
+    assert not await manager.aupdate_summary(conversation_id, session_factory)
+    assert len(llm.prompts) == 3
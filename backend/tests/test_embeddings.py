@@ -0,0 +1,82 @@
+"""
+Test Embedding Service - caching and micro-batching
+"""
+
+import asyncio
+
+import numpy as np
+import pytest
+
+from app.memory import embeddings as embeddings_module
+from app.memory.embeddings import EmbeddingService
+
+
+class FakeModel:
+    """Deterministic stand-in for SentenceTransformer that records encode() calls."""
+
+    def __init__(self, *args, **kwargs):
+        self.calls = []
+
+    def encode(self, texts):
+        self.calls.append(list(texts))
+        return np.array([[len(text), sum(map(ord, text)) % 101, 1.0] for text in texts])
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.setattr(embeddings_module, "_load_sentence_transformer", FakeModel)
+    service = EmbeddingService(cache_size=3, max_batch_delay=0.01)
+    yield service
+    service.close()
+
+
+def test_encode_batch_uses_cache(service):
+    """Repeated texts are encoded once and served from the cache."""
+    first = service.encode_batch(["hello", "world", "hello"])
+    second = service.encode("hello")
+
+    assert service.model.calls == [["hello", "world"]]
+    assert np.array_equal(first[0], second)
+    assert np.array_equal(first[0], first[2])
+
+
+def test_cache_is_bounded_lru(service):
+    """The least recently used entry is evicted when the cache is full."""
+    service.encode_batch(["a", "b", "c"])
+    service.encode("a")  # "b" is now least recently used
+    service.encode("d")
+
+    assert service.cache_info() == {"size": 3, "max_size": 3}
+    service.encode("b")
+    assert service.model.calls[-1] == ["b"]
+    service.encode("a")
+    assert service.model.calls[-1] == ["b"]
+
+
+@pytest.mark.asyncio
+async def test_concurrent_aencode_is_micro_batched(service):
+    """Concurrent requests share one encode() call; duplicates are coalesced."""
+    texts = ["book appointment", "my invoice", "book appointment", "hours?"]
+
+    results = await asyncio.gather(*[service.aencode(text) for text in texts])
+
+    assert len(service.model.calls) == 1
+    assert sorted(service.model.calls[0]) == sorted(set(texts))
+    assert np.array_equal(results[0], results[2])
+
+    # Served from cache afterwards
+    await service.aencode("my invoice")
+    assert len(service.model.calls) == 1
+
+
+def test_model_is_loaded_lazily(monkeypatch):
+    """Constructing the service does not load the model; first use does, once."""
+    loads = []
+    monkeypatch.setattr(embeddings_module, "_load_sentence_transformer", lambda name: loads.append(name) or FakeModel())
+    service = EmbeddingService(model_name="test-model")
+    assert loads == []
+
+    service.warm_up()
+    service.encode("hello")
+    assert loads == ["test-model"]
+    service.close()
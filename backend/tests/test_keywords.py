@@ -0,0 +1,94 @@
+"""
+Test Keyword Engine - one-pass escalation, intent, tool and pattern matching
+"""
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.agents import agent_graph as agent_graph_module
+from app.agents import alex as alex_module
+from app.agents.agent_graph import AgentGraphV2
+from app.agents.keywords import DEFAULT_KEYWORDS, KeywordEngine, KeywordMatcher
+from app.core.rate_limiter import DistributedRateLimiter
+
+
+@pytest.mark.parametrize("message, escalation_level, intent", [
+    ("What are your hours?", None, "general_inquiry"),
+    ("I have SEVERE PAIN and facial swelling", "EMERGENCY", "medical_question"),
+    ("Should I take a painkiller?", "DOCTOR_REQUIRED", "medical_question"),
+    ("My pain is 9/10", "EMERGENCY", "medical_question"),
+    ("pain level 6 since yesterday", "DOCTOR_REQUIRED", "medical_question"),
+    ("pain 2, nothing serious", None, "medical_question"),
+    ("יש לי דימום חזק אחרי עקירה", "EMERGENCY", "general_inquiry"),
+    ("איזו תרופה לקחת?", "DOCTOR_REQUIRED", "general_inquiry"),
+    ("כמה עולה ניקוי אבנית? אני רוצה תור", None, "appointment_scheduling"),
+    ("How much does the bill cost for my appointment?", None, "billing_inquiry"),
+])
+def test_escalation_and_intent(message, escalation_level, intent):
+    """Priorities match the original rules: EMERGENCY > DOCTOR_REQUIRED > pain level; medical > billing > scheduling."""
+    match = KeywordMatcher(DEFAULT_KEYWORDS).scan(message)
+
+    assert match.escalation_level == escalation_level
+    assert match.intent == intent
+
+
+def test_overlapping_keywords_all_match():
+    """Keywords inside other keywords are all reported (e.g. "bill" within "my bill")."""
+    match = KeywordMatcher(DEFAULT_KEYWORDS).scan("When can I pay my bill? Toothache since the appointment")
+
+    assert match.tool_triggers == {"scheduling", "billing", "own_invoices"}
+    assert match.patterns == ("appointment_scheduling", "medical_question", "billing_inquiry")
+
+
+def test_organization_keywords_extend_defaults():
+    """Organizations add keywords (and labels) without affecting others."""
+    engine = KeywordEngine()
+    engine.configure_organization("org-1", {
+        "escalation": {"EMERGENCY": ["abscess", "אבצס"]},
+        "pattern": {"whitening": ["whitening", "הלבנה"]},
+    })
+
+    assert engine.scan("I think I have an abscess", "org-1").escalation_level == "EMERGENCY"
+    assert engine.scan("I think I have an abscess", "org-2").escalation_level is None
+    assert engine.scan("מחיר הלבנה?", "org-1").patterns == ("whitening",)
+    assert engine.scan("emergency!", "org-1").escalation_level == "EMERGENCY"
+
+    with pytest.raises(ValueError):
+        engine.configure_organization("org-1", {"unknown": {"x": ["y"]}})
+
+
+@pytest.mark.asyncio
+async def test_graph_scans_the_message_not_its_memory_context(monkeypatch):
+    """Past interactions appended for the LLM don't change the intent stored with the turn."""
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    monkeypatch.setattr(
+        agent_graph_module.causal_memory,
+        "get_similar_interactions",
+        lambda **kwargs: [{"user_message": "I want to book an appointment", "agent_response": "Booked for Tuesday"}],
+    )
+    submitted, prompts = [], []
+
+    async def aencode(text):
+        return np.zeros(384, dtype=np.float32)
+
+    async def submit(**interaction):
+        submitted.append(interaction)
+        return True
+
+    class RecordingLLM:
+        async def ainvoke(self, conversation):
+            prompts.append(conversation[-1].content)
+            return AIMessage(content="We are open 8:00-19:00.")
+
+    monkeypatch.setattr(agent_graph_module.embedding_service, "aencode", aencode)
+    monkeypatch.setattr(agent_graph_module.interaction_writer, "submit", submit)
+    graph = AgentGraphV2(checkpointer=None)
+    graph.alex.llm = RecordingLLM()
+
+    result = await graph.process_message("u1", "o1", "c1", "Thanks, what are your opening hours?")
+
+    assert "[Context from past interactions]" in prompts[0]
+    assert result["intent"] == "general_inquiry"
+    assert submitted[0]["metadata"]["intent"] == "general_inquiry"
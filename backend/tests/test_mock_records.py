@@ -0,0 +1,94 @@
+"""
+Test Mock Records - slot records read, compare and encode like the dicts they replace
+"""
+
+import json
+
+import pytest
+from fastapi.encoders import jsonable_encoder
+
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+from app.integrations.mock_records import (
+    Appointment, AppointmentStatus, Invoice, Patient, Treatment, to_ordinal,
+)
+from app.integrations.odoo_cache import _json_default
+
+
+APPOINTMENT = {
+    "id": 7,
+    "patient_id": 2,
+    "patient_name": "Tamar Amar",
+    "date": "2025-03-11",
+    "time": "10:30",
+    "datetime": "2025-03-11T10:30:27.123456",
+    "treatment_type": "Root Canal",
+    "duration_minutes": 90,
+    "dentist": "Dr. Cohen",
+    "status": "completed",
+    "notes": "",
+    "created_at": "2025-03-01T09:00:00",
+}
+
+
+def test_dict_view_round_trip():
+    """A record has the dict's keys, values and equality; attributes hold the compact values."""
+    appointment = Appointment.from_dict(APPOINTMENT)
+    assert appointment == APPOINTMENT and APPOINTMENT == appointment
+    assert list(appointment) == list(APPOINTMENT) and len(appointment) == len(APPOINTMENT)
+    assert dict(appointment) == APPOINTMENT and json.loads(json.dumps(appointment.to_dict())) == APPOINTMENT
+    assert type(appointment["status"]) is str and type(appointment["date"]) is str
+
+    assert appointment.status is AppointmentStatus.COMPLETED and appointment.treatment_type is Treatment.ROOT_CANAL
+    assert appointment.date == to_ordinal("2025-03-11") and appointment.date is to_ordinal("2025-03-11")
+    assert not hasattr(appointment, "__dict__")
+
+    appointment["status"] = "cancelled"
+    assert appointment["status"] == "cancelled" and appointment.status is AppointmentStatus.CANCELLED
+    appointment["room"] = 3  # Keys outside the fields are kept
+    assert appointment.get("room") == 3 and "room" in appointment and appointment.get("floor") is None
+
+    other = Appointment.from_dict({**APPOINTMENT, "treatment_type": "Sealant", "status": "rescheduled"})
+    assert other["treatment_type"] == "Sealant" and other.status == "rescheduled"
+
+
+def test_json_encoding_goes_through_the_dict_view():
+    """Records are not dicts: json.dumps() needs to_dict() or a default hook, jsonable_encoder copes."""
+    appointment = Appointment.from_dict(APPOINTMENT)
+
+    with pytest.raises(TypeError):
+        json.dumps(appointment)
+    assert json.loads(json.dumps(appointment, default=_json_default)) == APPOINTMENT
+    assert jsonable_encoder({"appointment": appointment}) == {"appointment": APPOINTMENT}
+
+
+def test_compact_values_are_shared():
+    """Equal dates, amounts, phone numbers and repeated text come back equal, and are stored once."""
+    first = Invoice.from_dict({"id": 1, "issue_date": "2025-01-05", "total_amount": 350, "paid_amount": 350.0,
+                               "status": "paid", "payment_method": "Credit Card"})
+    second = Invoice.from_dict({"id": 2, "issue_date": "2025-01-05", "total_amount": 350, "paid_amount": 0,
+                                "status": "unpaid", "payment_method": "Credit Card"})
+    assert first.issue_date is second.issue_date and first.total_amount is second.total_amount
+    assert type(first["paid_amount"]) is float and first["due_date"] is None
+    assert json.loads(json.dumps({"v": first}, default=_json_default))["v"] == first.to_dict()
+
+    patient = Patient.from_dict({"id": 1, "name": "Eli", "phone": "+972521481915", "emergency_contact": "050-1234567"})
+    assert isinstance(patient.phone, int) and patient["phone"] == "+972521481915"
+    assert patient["emergency_contact"] == "050-1234567" and patient["last_visit"] is None
+
+
+def test_mock_client_uses_records(tmp_path):
+    """The mock stores records, and its date-range search compares ordinals."""
+    client = RealisticMockOdooClient()
+    client.data_dir = tmp_path
+    patient_id = client.create_patient("Tamar Amar", phone="+972506340584")
+    first = client.create_appointment(patient_id, "2025-03-10", "09:00", "Cleaning")
+    second = client.create_appointment(patient_id, "2025-03-20", "09:00", "Filling")
+    client.cancel_appointment(second)
+    client.create_invoice(patient_id, first, "Cleaning", 350)
+
+    assert isinstance(client.get_patient(patient_id), Patient)
+    assert client.get_patient(patient_id)["registration_date"] == client.get_patient_invoices(patient_id)[0]["issue_date"]
+    assert client.search_appointments(date_from="2025-03-01", date_to="2025-03-15") == [first]
+    assert client.search_appointments(patient_id=patient_id, status="cancelled") == [second]
+    assert client.search_invoices(status="unpaid") == [1]
+    assert client.get_statistics()["scheduled_appointments"] == 1
@@ -0,0 +1,146 @@
+"""
+Test Mock Snapshot - binary snapshots round-trip the records and serve the realistic mock
+"""
+
+import json
+import os
+
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+from app.integrations.mock_snapshot import GroupIndex, RecordIndex, merge_snapshots, open_snapshot, write_snapshot
+
+
+def _records():
+    statuses = ["completed", "scheduled", "cancelled"]
+    return [
+        {
+            "id": 10 - i,  # Descending: the indexes must sort
+            "patient_id": i % 3 + 1,
+            "name": f"{['Tamar Amar', 'שרה כהן'][i % 2]} {i}" if i else "",
+            "status": statuses[i % 3],
+            "amount": [120, 99.5, None][i % 3],
+            "paid": i % 2 == 0,
+            "tooth": None if i % 4 else "14",
+            "tags": ["x-ray", {"side": "left"}] if i == 5 else None,
+            "follow_up_date": None,
+        }
+        for i in range(10)
+    ]
+
+
+def test_round_trip_and_lazy_records(tmp_path):
+    """Every value comes back as written; rows are decoded on access and keep their changes."""
+    records = _records()
+    records[7]["late_field"] = "only here"
+    write_snapshot(tmp_path, {"rows": records, "empty": []})
+    tables = open_snapshot(tmp_path)
+    table = tables["rows"]
+
+    expected = [{**record, "late_field": record.get("late_field")} for record in records]
+    assert list(table) == expected
+    assert table[-1] == expected[-1] and table[2:4] == expected[2:4]
+    assert table.values("amount") == [r["amount"] for r in records]
+    assert table.columns["status"].kind == "category" and table.columns["name"].kind == "str"
+    assert len(tables["empty"]) == 0 and list(tables["empty"]) == []
+
+    table[1]["status"] = "cancelled"  # Kept once read by position
+    table.append({"id": 11, "patient_id": 2, "status": "scheduled"})
+    assert table[1]["status"] == "cancelled"
+    assert [r["status"] for r in table][1] == "cancelled"
+    assert table.values("status")[1] == "cancelled" and table.values("status")[-1] == "scheduled"
+    assert len(table) == 11
+
+
+def test_indexes(tmp_path):
+    """RecordIndex and GroupIndex answer like the dicts they replace, including added keys."""
+    records = _records()
+    table = open_snapshot(write_snapshot(tmp_path, {"rows": records}))["rows"]
+
+    by_id = RecordIndex(table)
+    assert by_id[7] == next(r for r in records if r["id"] == 7)
+    assert by_id.get(99) is None and 0 not in by_id and "7" not in by_id and True not in by_id
+    assert sorted(by_id) == list(range(1, 11)) and len(by_id) == 10
+    by_id[42] = {"id": 42}
+    assert by_id[42] == {"id": 42} and len(by_id) == 11
+
+    by_patient = GroupIndex(table, "patient_id")
+    for patient_id in (1, 2, 3):
+        assert by_patient[patient_id] == [r for r in records if r["patient_id"] == patient_id]
+    assert by_patient.get(4, []) == [] and 4 not in by_patient
+    by_patient[2].append({"id": 11})
+    assert by_patient[2][-1] == {"id": 11}
+    assert by_patient[1][-1] is table[9]  # The same dict as positional access
+    assert set(by_patient) == {1, 2, 3}
+
+
+def test_merge_snapshots(tmp_path):
+    """Merged shards read back as one snapshot of all their records, whatever kinds each shard chose."""
+    records = _records()
+    shards = [records[:4], records[4:], [{**records[0], "id": 99, "amount": 5, "tags": None, "name": "x" * 3}]]
+    sources = [write_snapshot(tmp_path / f"shard-{i}", {"rows": rows}) for i, rows in enumerate(shards)]
+    write_snapshot(tmp_path / "shard-extra", {"rows": [], "other": [{"id": 1}]})
+
+    merged = open_snapshot(merge_snapshots(tmp_path / "merged", sources + [tmp_path / "shard-extra"]))
+    expected = [record for shard in shards for record in shard]
+    assert list(merged["rows"]) == expected and list(merged["other"]) == [{"id": 1}]
+    assert merged["rows"].columns["status"].kind == "category"  # Concatenated codes, not re-encoded
+    assert RecordIndex(merged["rows"])[99]["name"] == "xxx"
+
+
+def _fixtures(directory):
+    patients = [
+        {"id": i, "name": name, "phone": f"+97250000000{i}", "registration_date": "2025-01-0%d" % i,
+         "last_visit": None, "insurance_provider": "Clalit", "outstanding_balance": 0}
+        for i, name in enumerate(["Tamar Amar", "Eli Cohen", "Noa Levi"], start=1)
+    ]
+    appointments = [
+        {"id": i, "patient_id": i % 3 + 1, "patient_name": "", "date": "2025-03-1%d" % i, "time": "10:00",
+         "treatment_type": "Cleaning", "duration_minutes": 60, "dentist": "Dr. Cohen",
+         "status": "scheduled" if i % 2 else "completed", "notes": ""}
+        for i in range(1, 7)
+    ]
+    invoices = [
+        {"id": i, "patient_id": i % 3 + 1, "appointment_id": i, "issue_date": "2025-03-1%d" % i,
+         "treatment": "Cleaning", "total_amount": 300, "paid_amount": 100 * (i % 2),
+         "outstanding_amount": 300 - 100 * (i % 2), "status": "partial" if i % 2 else "unpaid"}
+        for i in range(1, 7)
+    ]
+    tables = {"patients": patients, "appointments": appointments, "invoices": invoices, "treatment_records": []}
+    for table, filename in RealisticMockOdooClient._DATA_FILES.items():
+        (directory / filename).write_text(json.dumps(tables[table]), encoding="utf-8")
+    return tables
+
+
+def test_mock_client_loads_snapshot(tmp_path):
+    """The mock reads an up-to-date snapshot and behaves as with the JSON files, writes included."""
+    tables = _fixtures(tmp_path)
+    from_json = RealisticMockOdooClient()
+    from_json.data_dir = tmp_path
+    from_json.warm_up()
+
+    write_snapshot(tmp_path / "snapshot", tables)
+    from_snapshot = RealisticMockOdooClient()
+    from_snapshot.data_dir = tmp_path
+    from_snapshot.warm_up()
+    assert isinstance(from_snapshot.patients_by_id, RecordIndex)
+
+    for client in (from_json, from_snapshot):
+        appointment_id = client.create_appointment(2, "2025-03-20", "11:00", "Filling")
+        client.cancel_appointment(1)
+        client.create_invoice(2, appointment_id, "Filling", 450)
+
+    assert from_snapshot.search_patients(name="Levi") == from_json.search_patients(name="Levi")
+    for patient_id in (1, 2, 3, 4):
+        assert from_snapshot.get_patient(patient_id) == from_json.get_patient(patient_id)
+        assert from_snapshot.get_patient_invoices(patient_id) == from_json.get_patient_invoices(patient_id)
+        assert from_snapshot.search_appointments(patient_id=patient_id) == from_json.search_appointments(patient_id=patient_id)
+    assert from_snapshot.search_appointments(status="scheduled") == from_json.search_appointments(status="scheduled")
+    assert from_snapshot.get_appointment(1)["status"] == "cancelled"
+    assert from_snapshot.get_statistics() == from_json.get_statistics()
+    assert from_snapshot.check_statistics() == []
+
+    # A JSON file newer than the snapshot wins
+    newer = (tmp_path / "snapshot" / "meta.json").stat().st_mtime + 10
+    os.utime(tmp_path / "mock_patients.json", (newer, newer))
+    stale = RealisticMockOdooClient()
+    stale.data_dir = tmp_path
+    assert isinstance(stale.patients, list)
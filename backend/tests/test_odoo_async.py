@@ -0,0 +1,195 @@
+"""
+Test Async Odoo Client - transports, pooling, login reuse, concurrency caps and batched reads
+"""
+
+import asyncio
+import time
+from datetime import datetime
+
+import pytest
+
+from app.agents.tools import odoo_tools
+from app.integrations.odoo_async import AsyncOdooClient, OdooAuthenticationError, OdooConnectionPool, OdooError
+from app.integrations.odoo_client import OdooClient
+from tests.fake_odoo import FakeOdoo
+
+
+def _client(fake, pool, protocol="xmlrpc", password="admin", db=None):
+    return AsyncOdooClient(fake.url, db or fake.db, "admin", password, protocol=protocol, pool=pool)
+
+
+def _sync_client(fake):
+    client = OdooClient()
+    client.url, client.db, client.username, client.password = fake.url, fake.db, "admin", "admin"
+    return client
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+async def test_patient_and_appointment_round_trip(protocol):
+    """Both transports create, search, read and update records."""
+    pool = OdooConnectionPool()
+    with FakeOdoo() as fake:
+        client = _client(fake, pool, protocol)
+        patient_id = await client.create_patient("Tamar Amar", phone="+972506340584")
+
+        assert await client.search_patients(phone="050-634-0584") == [patient_id]
+        assert await client.search_patients(name="amar") == [patient_id]
+        patient = await client.get_patient(patient_id)
+        assert patient["name"] == "Tamar Amar" and "street" in patient
+
+        appointment_id = await client.create_appointment(patient_id, datetime(2030, 1, 7, 10, 0), notes="Cleaning")
+        assert await client.search_appointments(patient_id=patient_id) == [appointment_id]
+        assert await client.cancel_appointment(appointment_id)
+        assert (await client.get_appointment(appointment_id))["state"] == "cancelled"
+        assert await client.get_patient(999) is None
+        await pool.aclose()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("protocol", ["xmlrpc", "jsonrpc"])
+async def test_errors_are_raised_as_odoo_errors(protocol):
+    """A rejected login and a server-side fault raise OdooError subclasses."""
+    pool = OdooConnectionPool()
+    with FakeOdoo() as fake:
+        with pytest.raises(OdooAuthenticationError):
+            await _client(fake, pool, protocol, password="wrong").search_patients(name="x")
+        with pytest.raises(OdooError, match="Unknown method"):
+            await _client(fake, pool, protocol).execute_kw("res.partner", "unlink", [[1]])
+        await pool.aclose()
+
+    with pytest.raises(OdooError, match="failed"):
+        await _client(fake, OdooConnectionPool()).call("common", "version")  # Server stopped
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_session_and_respect_cap():
+    """Concurrent calls log in once, reuse keep-alive connections and stay under the per-database cap."""
+    pool = OdooConnectionPool(max_connections=4, max_concurrent_calls=4)
+    with FakeOdoo(latency=0.05) as fake:
+        patient_id = fake.add("res.partner", name="Shane")
+        clients = [_client(fake, pool) for _ in range(3)]  # Same database -> one session
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(
+            clients[i % 3].execute_kw("res.partner", "read", [[patient_id]], {"fields": ["name"]})
+            for i in range(32)
+        ))
+        elapsed = time.perf_counter() - start
+
+        assert all(result[0]["name"] == "Shane" for result in results)
+        assert fake.calls.count(("common", "authenticate", "")) == 1
+        assert fake.max_in_flight <= 4
+        assert len(fake.connections) <= 4
+        assert elapsed < 32 * 0.05 / 2  # Calls overlapped
+        assert len(pool.sessions()) == 1
+
+        # Another database gets its own session and login
+        other = _client(fake, pool, db="other")
+        with pytest.raises(OdooAuthenticationError):
+            await other.authenticate()
+        assert len(pool.sessions()) == 2
+        await pool.aclose()
+        assert pool.sessions() == []
+
+
+def test_sync_client_reads_with_field_list_and_phone_variants():
+    """The blocking client passes fields by keyword and matches stored phone formats."""
+    with FakeOdoo() as fake:
+        patient_id = fake.add("res.partner", name="Eli Benaim", phone="0541234567", city="Haifa")
+        client = _sync_client(fake)
+
+        assert client.search_patients(phone="+972541234567") == [patient_id]
+        assert client.search_patients(name="Nobody", phone="054-1234567") == [patient_id]
+        assert client.get_patient(patient_id)["city"] == "Haifa"
+
+
+def _seed(fake, patients=3):
+    for i in range(1, patients + 1):
+        patient_id = fake.add("res.partner", name=f"Patient {i}", phone=f"05000000{i:02d}", city="Haifa")
+        for day in (3, 1, 2):
+            fake.add("dental.appointment", partner_id=patient_id, appointment_date=f"2030-01-0{day} 10:00:00", state="draft")
+        fake.add("account.move", partner_id=patient_id, move_type="out_invoice", name=f"INV/{i}", invoice_date="2030-01-01", amount_total=100.0)
+    fake.calls.clear()
+
+
+@pytest.mark.asyncio
+async def test_search_read_and_read_many():
+    """search_read projects fields; read_many keeps the requested order and skips missing IDs."""
+    pool = OdooConnectionPool()
+    with FakeOdoo() as fake:
+        _seed(fake)
+        client = _client(fake, pool)
+
+        patients = await client.find_patients(name="patient", limit=2)
+        assert [p["name"] for p in patients] == ["Patient 1", "Patient 2"]
+        assert set(patients[0]) == {"id", "name", "email", "phone", "mobile", "street", "city"}
+
+        records = await client.read_many("res.partner", [3, 99, 1], ["name"])
+        assert records == [{"id": 3, "name": "Patient 3"}, {"id": 1, "name": "Patient 1"}]
+
+        appointments = await client.get_patient_appointments(1)
+        assert [a["appointment_date"][:10] for a in appointments] == ["2030-01-01", "2030-01-02", "2030-01-03"]
+        assert (await client.get_patient_invoices(2))[0]["name"] == "INV/2"
+        assert fake.calls.count(("object", "dental.appointment", "search_read")) == 1
+        await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_loader_merges_concurrent_single_reads():
+    """Concurrent get_patient calls in one tick become one call; separate ticks do not merge."""
+    pool = OdooConnectionPool()
+    with FakeOdoo() as fake:
+        _seed(fake, patients=5)
+        client = _client(fake, pool)
+        await client.authenticate()
+
+        ids = [1, 2, 3, 3, 99, 5, 4, 1]
+        patients = await asyncio.gather(*(client.get_patient(i) for i in ids))
+        assert [p and p["id"] for p in patients] == [1, 2, 3, 3, None, 5, 4, 1]
+        assert fake.calls.count(("object", "res.partner", "search_read")) == 1
+
+        # Different models are batched separately; batches are split at max_batch_size
+        client.loader.max_batch_size = 2
+        await asyncio.gather(
+            *(client.get_patient(i) for i in range(1, 6)),
+            client.get_appointment(1),
+        )
+        assert fake.calls.count(("object", "res.partner", "search_read")) == 1 + 3
+        assert fake.calls.count(("object", "dental.appointment", "search_read")) == 1
+
+        assert (await client.get_patient(1))["name"] == "Patient 1"
+        assert (await client.get_patient(2))["name"] == "Patient 2"
+        assert fake.calls.count(("object", "res.partner", "search_read")) == 4 + 2
+        await pool.aclose()
+
+
+@pytest.mark.asyncio
+async def test_loader_failure_reaches_every_waiter():
+    """A failed batched read raises in every caller that was waiting on it."""
+    pool = OdooConnectionPool()
+    with FakeOdoo() as fake:
+        client = _client(fake, pool, password="wrong")
+        results = await asyncio.gather(*(client.get_patient(i) for i in range(3)), return_exceptions=True)
+        assert all(isinstance(result, OdooAuthenticationError) for result in results)
+        await pool.aclose()
+
+
+def test_sync_tools_use_batched_reads(monkeypatch):
+    """The appointment list tool needs two calls however many appointments the patient has."""
+    with FakeOdoo() as fake:
+        _seed(fake)
+        client = _sync_client(fake)
+        monkeypatch.setattr(odoo_tools, "odoo_client", client)
+        client.authenticate()
+        fake.calls.clear()
+
+        result = odoo_tools.get_patient_appointments.invoke({"patient_name": "Patient 2"})
+        assert result.count("- 2030-01-0") == 3
+        assert fake.calls == [("object", "res.partner", "search"), ("object", "dental.appointment", "search_read")]
+
+        assert "Patient 1" in odoo_tools.search_patient.invoke({"name": "Patient 1"})
+        assert client.read_many("res.partner", [2, 1], ["name"]) == [
+            {"id": 2, "name": "Patient 2"}, {"id": 1, "name": "Patient 1"},
+        ]
+        assert client.get_patient_invoices(3)[0]["amount_total"] == 100.0
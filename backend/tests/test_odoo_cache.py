@@ -0,0 +1,169 @@
+"""
+Test Odoo Read Cache - two levels, tenant scoping, write invalidation and stampede protection
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.agents.tools import agent_tools
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+from app.integrations.odoo_cache import CachedOdooClient, OdooReadCache
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+class CountingOdoo:
+    """Odoo-like client that counts reads."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.reads = 0
+        self.patients = {1: {"id": 1, "name": "Tamar Amar"}}
+        self.appointments = {10: {"id": 10, "patient_id": 1, "status": "scheduled"}}
+
+    def get_patient(self, patient_id):
+        self.reads += 1
+        time.sleep(self.delay)
+        return self.patients.get(patient_id)
+
+    def get_appointment(self, appointment_id):
+        self.reads += 1
+        return dict(self.appointments[appointment_id])
+
+    def search_appointments(self, patient_id=None):
+        self.reads += 1
+        return [a["id"] for a in self.appointments.values() if a["patient_id"] == patient_id]
+
+    def get_patient_appointments(self, patient_id, limit=None):
+        self.reads += 1
+        return [dict(a) for a in self.appointments.values() if a["patient_id"] == patient_id][:limit]
+
+    def create_patient(self, name, phone=None):
+        patient_id = max(self.patients) + 1
+        self.patients[patient_id] = {"id": patient_id, "name": name}
+        return patient_id
+
+    def create_appointment(self, patient_id, date, time, treatment_type):
+        appointment_id = max(self.appointments) + 1
+        self.appointments[appointment_id] = {"id": appointment_id, "patient_id": patient_id, "status": "scheduled"}
+        return appointment_id
+
+    def cancel_appointment(self, appointment_id):
+        self.appointments[appointment_id]["status"] = "cancelled"
+        return True
+
+
+def _cache(server=None, **kwargs) -> OdooReadCache:
+    """Cache whose Redis level is a fake server (in-process only when server is None)."""
+    cache = OdooReadCache(redis_url="redis://fake" if server else None, **kwargs)
+    if server:
+        cache._client = fakeredis.FakeRedis(server=server)
+    return cache
+
+
+def test_l1_then_l2_hits_and_tenant_scoping():
+    """A second worker is served from Redis; another tenant's identical key is separate."""
+    server = fakeredis.FakeServer()
+    odoo = CountingOdoo()
+    worker_a = CachedOdooClient(odoo, _cache(server), tenant="clinic-a")
+    worker_b = CachedOdooClient(odoo, _cache(server), tenant="clinic-a")
+
+    assert worker_a.get_patient(1)["name"] == "Tamar Amar"
+    assert worker_a.get_patient(1)["name"] == "Tamar Amar"
+    assert worker_b.get_patient(1)["name"] == "Tamar Amar"
+    assert odoo.reads == 1
+
+    assert worker_a.cache.stats()["res.partner"]["l1_hits"] == 1
+    stats = worker_b.cache.stats()["res.partner"]
+    assert stats["l2_hits"] == 1 and stats["hit_ratio"] == 1.0
+
+    CachedOdooClient(odoo, worker_a.cache, tenant="clinic-b").get_patient(1)
+    assert odoo.reads == 2
+
+    # Missing records and calls with extra arguments are not cached
+    worker_a.get_patient(99)
+    worker_a.get_patient(99)
+    worker_a.get_patient_appointments(1, limit=5)
+    worker_a.search_appointments(patient_id=1)
+    assert odoo.reads == 2 + 4
+
+
+def test_writes_invalidate_across_workers():
+    """Creating or cancelling an appointment refreshes the patient's list in every worker."""
+    server = fakeredis.FakeServer()
+    odoo = CountingOdoo()
+    worker_a = CachedOdooClient(odoo, _cache(server), tenant="clinic-a")
+    worker_b = CachedOdooClient(odoo, _cache(server, l1_ttl_seconds=0.05), tenant="clinic-a")
+
+    assert len(worker_b.get_patient_appointments(1)) == 1
+    worker_a.create_appointment(1, "2030-01-07", "10:00", "Cleaning")
+    time.sleep(0.06)  # worker_b's in-process copy expires; Redis was invalidated
+    assert len(worker_b.get_patient_appointments(1)) == 2
+
+    assert worker_a.get_appointment(10)["status"] == "scheduled"
+    worker_a.cancel_appointment(10)
+    assert worker_a.get_appointment(10)["status"] == "cancelled"
+    assert worker_a.get_patient_appointments(1)[0]["status"] == "cancelled"
+
+    patient_id = worker_a.create_patient("Eli Benaim")
+    assert worker_a.get_patient(patient_id)["name"] == "Eli Benaim"
+
+
+def test_concurrent_misses_load_once():
+    """Threads in several workers missing the same key cause a single Odoo read."""
+    server = fakeredis.FakeServer()
+    odoo = CountingOdoo(delay=0.1)
+    workers = [CachedOdooClient(odoo, _cache(server), tenant="clinic-a") for _ in range(2)]
+    results = []
+
+    threads = [
+        threading.Thread(target=lambda w=workers[i % 2]: results.append(w.get_patient(1)))
+        for i in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert odoo.reads == 1
+    assert len(results) == 20 and all(r["name"] == "Tamar Amar" for r in results)
+
+
+def test_ttl_lru_and_redis_outage():
+    """Entries expire per model TTL, the LRU is bounded, and Redis errors fall back to L1."""
+    odoo = CountingOdoo()
+    cache = _cache(model_ttls={"res.partner": 1}, l1_max_entries=2)
+    client = CachedOdooClient(odoo, cache, tenant="t")
+    client.get_patient(1)
+    cache._l1[cache.key("t", "res.partner", "patient:1")] = (odoo.patients[1], 0.0, 0.0)  # Expired
+    client.get_patient(1)
+    assert odoo.reads == 2
+
+    for tenant in ("x", "y", "z"):
+        CachedOdooClient(odoo, cache, tenant=tenant).get_patient(1)
+    assert len(cache._l1) == 2
+
+    down = OdooReadCache(redis_url="redis://127.0.0.1:1/0")
+    client = CachedOdooClient(odoo, down, tenant="t")
+    assert client.get_patient(1)["name"] == "Tamar Amar"
+    assert client.get_patient(1)["name"] == "Tamar Amar"
+    assert down.stats()["res.partner"]["l1_hits"] == 1
+
+
+def test_create_appointment_tool_books_treatment_and_keeps_notes(tmp_path, monkeypatch):
+    """The patient's notes are stored as notes, not as the treatment type."""
+    mock = RealisticMockOdooClient()
+    mock.data_dir = tmp_path
+    monkeypatch.setattr(agent_tools, "mock_odoo", CachedOdooClient(mock, _cache(), tenant="clinic_a"))
+
+    result = agent_tools.create_appointment_tool(
+        "Tamar Amar", "+972501234567", "2030-01-07 10:00", notes="Sensitive upper left molar", treatment_type="Filling"
+    )
+    agent_tools.create_appointment_tool("Tamar Amar", "+972501234567", "2030-01-08 10:00")
+
+    assert "✅" in result and "Treatment: Filling" in result
+    filling, consultation = mock.appointments
+    assert (filling["treatment_type"], filling["notes"]) == ("Filling", "Sensitive upper left molar")
+    assert (consultation["treatment_type"], consultation["notes"]) == ("Consultation", "")
@@ -0,0 +1,166 @@
+"""
+Test Odoo Client Registry - per-organization clients, shared lookups, eviction and idle reaping
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from app.agents import alex as alex_module
+from app.agents.alex import AlexAgent
+from app.agents.tools import agent_tools
+from app.core.rate_limiter import DistributedRateLimiter
+from app.integrations.odoo_async import AsyncOdooClient, OdooConnectionPool
+from app.integrations.odoo_registry import OdooClientRegistry, OdooTenant
+from tests.fake_odoo import FakeOdoo
+
+
+ORGANIZATIONS = {
+    "org-a": OdooTenant("clinic_a", "admin", "admin"),
+    "org-b": OdooTenant("clinic_b", "admin", "admin"),
+    "org-c": OdooTenant("clinic_c", "admin", "admin"),
+    "org-a-copy": OdooTenant("clinic_a", "admin", "admin"),
+    "org-no-odoo": None,
+}
+
+
+def _registry(fake, lookups=None, **kwargs):
+    pool = OdooConnectionPool(max_connections=2)
+
+    def resolve(organization_id):
+        if lookups is not None:
+            lookups.append(organization_id)
+        time.sleep(0.02)
+        return ORGANIZATIONS.get(organization_id)
+
+    default = AsyncOdooClient(fake.url, fake.db, "admin", "admin", pool=pool)
+    return OdooClientRegistry(resolve, default_client=default, pool=pool, url=fake.url, **kwargs)
+
+
+def _fake():
+    return FakeOdoo(extra_dbs=("clinic_a", "clinic_b", "clinic_c"))
+
+
+@pytest.mark.asyncio
+async def test_one_client_per_organization():
+    """Organizations get their own database; unknown ones and those without Odoo share the default."""
+    lookups = []
+    with _fake() as fake:
+        patient_id = fake.add("res.partner", name="Tamar Amar")
+        registry = _registry(fake, lookups)
+
+        clients = await asyncio.gather(*(registry.get("org-a") for _ in range(10)))
+        assert all(client is clients[0] for client in clients)
+        assert clients[0].db == "clinic_a"
+        assert lookups == ["org-a"]
+
+        assert (await registry.get("org-a-copy")) is clients[0]
+        assert (await registry.get("org-no-odoo")) is registry.default_client
+        assert (await registry.get("telegram")) is registry.default_client
+
+        client_b = await registry.get("org-b")
+        assert (await client_b.get_patient(patient_id))["name"] == "Tamar Amar"
+        assert (await registry.get("org-a")).db == "clinic_a"
+        assert fake.logins == ["clinic_b"]
+        assert registry.stats() == {"organizations": 5, "clients": 2, "sessions": 1}
+        await registry.aclose()
+
+
+@pytest.mark.asyncio
+async def test_max_clients_evicts_least_recently_used():
+    """Beyond max_clients the least recently used idle client is dropped and its connections closed."""
+    with _fake() as fake:
+        fake.add("res.partner", name="Shane")
+        registry = _registry(fake, max_clients=2)
+        client_a = await registry.get("org-a")
+        client_b = await registry.get("org-b")
+        await client_a.get_patient(1)
+        await client_b.get_patient(1)
+        await registry.get("org-a")  # org-b is now least recently used
+
+        await registry.get("org-c")
+        assert registry.stats() == {"organizations": 2, "clients": 2, "sessions": 1}
+        assert [session.db for session in registry.pool.sessions()] == ["clinic_a"]
+
+        # A client with a call in flight is not evicted
+        fake.latency = 0.2
+        slow = asyncio.ensure_future((await registry.get("org-c")).get_patient(1))
+        await asyncio.sleep(0.05)
+        await registry.get("org-b")
+        assert "org-c" in registry._clients and "org-a" not in registry._clients
+        assert (await slow)["name"] == "Shane"
+        await registry.aclose()
+        assert registry.pool.sessions() == []
+
+
+@pytest.mark.asyncio
+async def test_idle_sessions_are_reaped_and_reopened():
+    """The reaper closes connections idle for idle_seconds; the next call reconnects."""
+    with _fake() as fake:
+        fake.add("res.partner", name="Shane")
+        registry = _registry(fake, idle_seconds=0.1, reap_interval=0.05)
+        client_a = await registry.get("org-a")
+        client_b = await registry.get("org-b")
+        await client_a.get_patient(1)
+        await client_b.get_patient(1)
+        assert len(registry.pool.sessions()) == 2
+
+        for _ in range(4):  # Keep org-a busy while org-b sits idle
+            await asyncio.sleep(0.05)
+            await client_a.get_patient(1)
+        assert [session.db for session in registry.pool.sessions()] == ["clinic_a"]
+
+        assert (await client_b.get_patient(1))["name"] == "Shane"
+        assert fake.logins.count("clinic_b") == 2
+        await registry.aclose()
+
+
+class RecordingLLM:
+    """Stand-in for ChatOpenAI that keeps the tool results it was shown."""
+
+    def __init__(self):
+        self.tool_results = []
+
+    async def ainvoke(self, conversation):
+        self.tool_results.append([m.content for m in conversation[1:] if isinstance(m, SystemMessage)])
+        return AIMessage(content="Here you go.")
+
+
+@pytest.mark.asyncio
+async def test_alex_reads_patients_from_the_organizations_own_odoo(monkeypatch):
+    """Patient identification and invoices go through the registry to the organization's database."""
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    with _fake() as fake:
+        patient_id = fake.add("res.partner", name="Noa Levi", phone="+972541112233")
+        fake.add("account.move", partner_id=patient_id, move_type="out_invoice", name="INV/2026/0001",
+                 amount_total=350.0, state="posted", invoice_date="2026-09-01")
+        registry = _registry(fake)
+        monkeypatch.setattr(agent_tools, "odoo_client_registry", registry)
+        alex = AlexAgent()
+        alex.llm = RecordingLLM()
+
+        state = await alex.aprocess({
+            "user_id": "u1",
+            "organization_id": "org-a",
+            "messages": [HumanMessage(content="Hi, I'm on 054-111-2233")],
+        })
+        assert state["patient_id"] == str(patient_id)
+
+        state["messages"].append(HumanMessage(content="Can I see my invoices?"))
+        await alex.aprocess(state)
+        invoices = alex.llm.tool_results[-1][-1]
+        assert "Invoices for Noa Levi" in invoices and "₪350.00 - posted (Date: 2026-09-01)" in invoices
+        assert ("object", "account.move", "search_read") in fake.calls
+        assert registry.pool.sessions()[0].db == "clinic_a"
+
+        # Organizations without their own database keep the clinic-wide dataset
+        calls = len(fake.calls)
+        other = await alex.aprocess({"user_id": "u2", "organization_id": "org-no-odoo",
+                                     "messages": [HumanMessage(content="Hi, I'm on 054-111-2233")]})
+        assert other.get("patient_id") is None
+        assert len(fake.calls) == calls
+        await registry.aclose()
@@ -0,0 +1,113 @@
+"""
+Test Patient Search Index - phone normalization, name matching and fuzzy search
+"""
+
+import random
+
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+from app.integrations.patient_index import PatientSearchIndex, normalize_phone, phone_variants
+
+
+PATIENTS = [
+    {"id": 1, "name": "Shane גבע", "phone": "+972521481915"},
+    {"id": 2, "name": "Tamar Amar", "phone": "+972506340584"},
+    {"id": 3, "name": "Shlomo Ben-David", "phone": "054-744-6687"},
+    {"id": 4, "name": "דנה כהן", "phone": "+972502147521"},
+    {"id": 5, "name": "Sara ג'בארין", "phone": None},
+    {"id": 6, "name": "Amaranta Shaw", "phone": "555-1234"},
+]
+
+
+def _index(patients=PATIENTS):
+    index = PatientSearchIndex()
+    for patient in patients:
+        index.add(patient)
+    return index
+
+
+def test_phone_formats_normalize_to_e164():
+    """National, international and spaced forms of one number are the same patient."""
+    for typed in ["052-148-1915", "0521481915", "+972 52 148 1915", "00972521481915", "972521481915"]:
+        assert normalize_phone(typed) == "+972521481915"
+    assert normalize_phone("1481915") is None  # Fragment, not a number
+    assert "0521481915" in phone_variants("+972521481915")
+
+    index = _index()
+    assert index.search(phone="0521481915") == [1]
+    assert index.search(phone="+972547446687") == [3]  # Stored in national format
+    assert index.search(phone="1481915") == [1]  # Run of digits
+    assert index.search(phone="555-1234") == [6]  # Not normalizable, matched as digits
+
+
+def test_truncated_number_falls_back_to_digit_search():
+    """A number that looks complete but is not on file is searched as a run of digits."""
+    index = _index()
+
+    assert index.search(phone="+97252148191") == [1]  # Last digit missing
+    assert index.search(phone="052-148-191") == [1]  # Same, in national format
+    assert index.search(phone="05214") == [1]  # National prefix of a number stored in E.164
+    assert index.search(phone="+972525555555") == []
+
+
+def test_name_substring_matches_a_full_scan():
+    """Queries of three letters or more return what a case-insensitive scan returns, in order."""
+    rng = random.Random(5)
+    first = ["Tamar", "Shane", "Eli", "Maya", "Noa", "דנה", "יוסי", "שרה"]
+    last = ["Amar", "Cohen", "Levi", "Ben-David", "כהן", "לוי", "גבע", "אזולאי"]
+    patients = [
+        {"id": i, "name": f"{rng.choice(first)} {rng.choice(last)}", "phone": f"+97250{rng.randrange(10**7):07d}"}
+        for i in range(1, 801)
+    ]
+    index = _index(patients)
+
+    for patient in rng.sample(patients, 60):
+        name = patient["name"]
+        start = rng.randrange(len(name) - 3)
+        query = name[start:start + rng.randint(3, 8)]
+        expected = [p["id"] for p in patients if query.lower() in p["name"].lower()]
+        assert index.search(name=query) == expected
+        assert index.search(name=query.upper()) == expected
+
+
+def test_hebrew_folding_and_short_prefixes():
+    """Final letters and niqqud are ignored; one or two letters match word starts."""
+    index = _index()
+    assert index.search(name="כהנ") == [4]  # Final nun typed as a regular nun
+    assert index.search(name="דָּנָה") == [4]  # With niqqud
+    assert index.search(name="sh") == [1, 3, 6]  # Shane, Shlomo, Shaw
+    assert index.search(name="am") == [2, 6]  # Word starts only, not "tAMar"
+    assert index.search(name="Tamar", phone="0502147521") == [2, 4]  # Name or phone
+
+
+def test_fuzzy_search_ranks_near_misses():
+    """Misspelled and reordered names find the patient; unrelated names do not."""
+    index = _index()
+    assert index.fuzzy_search("Tamar Amr")[0][0] == 2
+    assert index.fuzzy_search("Ben David Shlomo")[0][0] == 3
+    assert index.fuzzy_search("כהן דנה")[0][0] == 4
+    assert index.fuzzy_search("Xavier Quinn") == []
+
+
+def test_add_replace_and_remove():
+    """Re-adding a patient replaces the old entry and removed patients stop matching."""
+    index = _index()
+    index.add({"id": 2, "name": "Tamar Peretz", "phone": "+972506340584"})
+    assert index.search(name="Tamar Amar") == []
+    assert index.search(name="Peretz") == [2]
+
+    assert index.remove(1)
+    assert not index.remove(1)
+    assert index.search(phone="0521481915") == []
+    assert len(index) == len(PATIENTS) - 1
+
+
+def test_mock_client_indexes_new_patients():
+    """create_patient makes the patient findable by name, any phone format and fuzzy name."""
+    client = RealisticMockOdooClient()
+    client.warm_up()
+
+    patient_id = client.create_patient("Yonatan Zilberstein", phone="+972529998877")
+    assert client.search_patients(name="zilberst") == [patient_id]
+    assert client.search_patients(phone="052-999-8877") == [patient_id]
+    assert client.search_patients(name="Yonatan Zilbershtein") == []
+    assert client.search_patients(name="Yonatan Zilbershtein", fuzzy=True)[0] == patient_id
@@ -0,0 +1,103 @@
+"""
+Test Distributed Rate Limiter - GCRA Lua script, spend budgets and in-process fallback
+"""
+
+import asyncio
+
+import pytest
+
+from app.core.rate_limiter import GCRA_SCRIPT, DistributedRateLimiter, Limit
+
+fakeredis = pytest.importorskip("fakeredis")
+
+
+LIMITS = dict(
+    user_limit=Limit(rate=60, period=60, burst=3),
+    organization_limit=Limit(rate=600, period=60, burst=5),
+    organization_token_limit=Limit(rate=1000, period=3600, burst=1000),
+)
+
+
+def _limiter(server, **limits) -> DistributedRateLimiter:
+    """Limiter whose Redis connections go to a fake server."""
+    limiter = DistributedRateLimiter(redis_url="redis://fake", **(limits or LIMITS))
+    limiter._script = fakeredis.FakeRedis(server=server).register_script(GCRA_SCRIPT)
+    return limiter
+
+
+def test_burst_then_reject_with_retry_after():
+    """A user gets `burst` requests at once, then must wait one emission interval."""
+    limiter = _limiter(fakeredis.FakeServer())
+
+    assert all(limiter.check("u1", "org-1").allowed for _ in range(3))
+    result = limiter.check("u1", "org-1")
+
+    assert not result.allowed
+    assert result.limited_by == "user"
+    assert 0 < result.retry_after <= 1.0
+    assert limiter.check("u2", "org-1").allowed  # Other users are unaffected
+
+
+def test_workers_share_limits_through_redis():
+    """Two limiter instances (two workers) count against the same keys."""
+    server = fakeredis.FakeServer()
+    worker_a, worker_b = _limiter(server), _limiter(server)
+
+    results = [worker.check("u1", "org-1").allowed for worker in (worker_a, worker_b, worker_a, worker_b)]
+
+    assert results == [True, True, True, False]
+
+
+def test_rejected_check_charges_nothing():
+    """Limits are applied all-or-nothing: a request rejected by the org limit uses no user budget."""
+    server = fakeredis.FakeServer()
+    limiter = _limiter(server)
+
+    for i in range(5):
+        assert limiter.check(f"u{i}", "org-1").allowed
+    result = limiter.check("u9", "org-1")
+
+    assert result.limited_by == "organization"
+    assert fakeredis.FakeRedis(server=server).get("ratelimit:user:u9") is None
+
+
+def test_token_budget_blocks_organization_after_spend():
+    """Charged LLM tokens beyond the budget block that organization's next request."""
+    limiter = _limiter(fakeredis.FakeServer())
+
+    limiter.charge_tokens("org-1", 600)
+    assert limiter.check("u1", "org-1").allowed
+    limiter.charge_tokens("org-1", 600)
+    result = limiter.check("u2", "org-1")
+
+    assert not result.allowed
+    assert result.limited_by == "organization_tokens"
+    assert result.retry_after == pytest.approx(200 * 3.6, rel=0.01)
+    assert limiter.check("u1", "org-2").allowed
+
+
+@pytest.mark.asyncio
+async def test_async_check_uses_same_script():
+    """acheck() and acharge_tokens() share state with the sync API."""
+    server = fakeredis.FakeServer()
+    limiter = _limiter(server)
+    client = fakeredis.FakeAsyncRedis(server=server)
+    limiter._async_clients[asyncio.get_running_loop()] = (client, client.register_script(GCRA_SCRIPT))
+
+    assert limiter.check("u1", "org-1").allowed
+    results = await asyncio.gather(*[limiter.acheck("u1", "org-1") for _ in range(3)])
+
+    assert [result.allowed for result in results].count(True) == 2
+    await limiter.acharge_tokens("org-1", 5000)
+    assert (await limiter.acheck("u2", "org-1")).limited_by == "organization_tokens"
+
+
+def test_falls_back_to_in_process_limits_when_redis_is_down():
+    """Unreachable Redis: the same limits are enforced in-process until the retry interval passes."""
+    limiter = DistributedRateLimiter(redis_url="redis://127.0.0.1:1/0", **LIMITS)
+
+    results = [limiter.check("u1", "org-1") for _ in range(4)]
+
+    assert [result.allowed for result in results] == [True, True, True, False]
+    assert results[-1].limited_by == "user"
+    assert not limiter._redis_available()
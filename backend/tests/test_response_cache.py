@@ -0,0 +1,182 @@
+"""
+Test Semantic Response Cache - similarity hits, TTL, eviction and escalation bypass
+"""
+
+import re
+import zlib
+
+import numpy as np
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from app.agents import alex as alex_module
+from app.agents.alex import AlexAgent
+from app.agents.response_cache import SemanticResponseCache
+from app.core.rate_limiter import DistributedRateLimiter
+
+
+class BagOfWordsEmbedder:
+    """Stand-in for EmbeddingService: hashed bag-of-words vectors."""
+
+    def encode(self, text: str) -> np.ndarray:
+        vector = np.zeros(256, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % 256] += 1.0
+        return vector
+
+    async def aencode(self, text: str) -> np.ndarray:
+        return self.encode(text)
+
+
+def _cache(**kwargs) -> SemanticResponseCache:
+    kwargs.setdefault("similarity_threshold", 0.85)
+    return SemanticResponseCache(embedder=BagOfWordsEmbedder(), cost_per_1k_tokens=0.5, **kwargs)
+
+
+def test_similar_question_hits_only_in_same_org_and_tool_context():
+    """Near-identical wording hits; other orgs, tool results, conversations and questions miss."""
+    cache = _cache()
+    cache.store("What are your hours?", "org-1", [], "We are open 8:00-19:00.")
+
+    assert cache.lookup("what are your opening hours", "org-1") == "We are open 8:00-19:00."
+    assert cache.lookup("What are your hours?", "org-2") is None
+    assert cache.lookup("What are your hours?", "org-1", ["📅 Slots: Monday 10:00"]) is None
+    assert cache.lookup("How much is a cleaning?", "org-1") is None
+    assert cache.lookup("What are your hours?", "org-1", [], ["human: Hi", "ai: Hello!"]) is None
+
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 4
+    assert stats["hit_rate"] == 0.2
+
+
+def test_expired_entries_miss(monkeypatch):
+    """Answers older than the TTL are not reused."""
+    cache = _cache(ttl_seconds=60)
+    cache.store("What are your hours?", "org-1", [], "We are open 8:00-19:00.")
+
+    monkeypatch.setattr("app.agents.response_cache.time.time", lambda: 10**10)
+    assert cache.lookup("What are your hours?", "org-1") is None
+
+
+def test_per_org_lru_eviction():
+    """Each organization keeps its newest/most used answers; other orgs are untouched."""
+    cache = _cache(max_entries_per_org=2, similarity_threshold=0.99)
+    cache.store("What are your hours?", "org-1", [], "hours")
+    cache.store("Where is the clinic?", "org-1", [], "address")
+    cache.store("Do you have parking?", "org-2", [], "parking")
+    assert cache.lookup("What are your hours?", "org-1") == "hours"  # Now most recently used
+
+    cache.store("Do you accept insurance?", "org-1", [], "insurance")
+
+    assert cache.lookup("Where is the clinic?", "org-1") is None
+    assert cache.lookup("What are your hours?", "org-1") == "hours"
+    assert cache.lookup("Do you have parking?", "org-2") == "parking"
+    assert cache.stats()["entries"] == 3
+
+
+def test_one_partition_per_organization_freed_on_eviction():
+    """Conversations share their organization's index partition; evicted organizations free it."""
+    cache = _cache(max_entries_per_org=3, max_organizations=2)
+    for i in range(10):
+        cache.store("What are your hours?", "org-1", [], f"hours {i}", [f"human: turn {i}"])
+
+    assert len(cache._index._partitions) == 1
+    assert cache.lookup("What are your hours?", "org-1", [], ["human: turn 9"]) == "hours 9"
+    assert cache.lookup("What are your hours?", "org-1", [], ["human: turn 0"]) is None  # Evicted
+
+    cache.store("Where is the clinic?", "org-2", [], "address")
+    cache.store("Do you have parking?", "org-3", [], "parking")  # Evicts org-1, least recently used
+
+    assert sorted(cache._index._partitions) == ["org-2", "org-3"]
+    assert cache.lookup("What are your hours?", "org-1", [], ["human: turn 9"]) is None
+
+    cache.invalidate("org-2")
+    assert list(cache._index._partitions) == ["org-3"]
+    assert len(cache._context_entries) == 1
+    assert cache.stats()["entries"] == 1
+
+
+class CountingLLM:
+    """Stand-in for ChatOpenAI counting ainvoke() calls."""
+
+    def __init__(self, content: str):
+        self.content = content
+        self.calls = 0
+
+    async def ainvoke(self, conversation):
+        self.calls += 1
+        return AIMessage(content=self.content)
+
+
+def _state(message: str, history=(), enriched: str = "") -> dict:
+    return {
+        "messages": list(history) + [HumanMessage(content=message + enriched)],
+        "user_message": message,
+        "user_id": "u1",
+        "organization_id": "org-1",
+        "errors": [],
+    }
+
+
+@pytest.fixture
+def alex(monkeypatch):
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module, "response_cache", _cache())
+    return AlexAgent()
+
+
+@pytest.mark.asyncio
+async def test_repeated_question_skips_llm(alex):
+    """The second asker of an FAQ gets the cached answer without an LLM call."""
+    alex.llm = CountingLLM("We are open Sunday-Thursday 8:00-19:00.")
+
+    first = await alex.aprocess(_state("What are your hours?"))
+    second = await alex.aprocess(_state("what are your hours"))
+
+    assert alex.llm.calls == 1
+    assert second["messages"][-1].content == first["messages"][-1].content
+    stats = alex_module.response_cache.stats()
+    assert stats["tokens_saved"] > 0 and stats["cost_saved"] > 0
+
+
+@pytest.mark.asyncio
+async def test_escalations_always_reach_the_llm(alex):
+    """Emergency messages bypass the cache, and escalated answers are never stored."""
+    alex.llm = CountingLLM("Please come in immediately. [ESCALATE: EMERGENCY]")
+
+    for _ in range(2):
+        state = await alex.aprocess(_state("I have severe bleeding after extraction"))
+        assert state["requires_human"] is True
+
+    assert alex.llm.calls == 2
+    stats = alex_module.response_cache.stats()
+    assert stats["bypassed"] == 2 and stats["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_follow_up_in_another_conversation_reaches_the_llm(alex):
+    """A short follow-up is answered from the cache only after the same earlier turns."""
+    alex.llm = CountingLLM("Great, you're booked for Tuesday at 10:00.")
+    booking = [HumanMessage(content="Can I book a cleaning?"), AIMessage(content="Sure! Tuesday at 10:00?")]
+    whitening = [HumanMessage(content="Do you do whitening?"), AIMessage(content="We do! Shall I book you in?")]
+
+    await alex.aprocess(_state("yes", booking))
+    await alex.aprocess(_state("yes", whitening))
+    await alex.aprocess(_state("yes"))
+
+    assert alex.llm.calls == 3
+    assert alex_module.response_cache.stats()["hits"] == 0
+
+
+@pytest.mark.asyncio
+async def test_key_is_the_message_without_memory_context(alex):
+    """Memory context appended to the message neither prevents a hit nor becomes part of the key."""
+    alex.llm = CountingLLM("We are open Sunday-Thursday 8:00-19:00.")
+    context = "\n\n[Context from past interactions]:\n- {} → ...\n"
+
+    await alex.aprocess(_state("What are your hours?", enriched=context.format("Is parking free? → Yes")))
+    await alex.aprocess(_state("What are your hours?", enriched=context.format("I need a root canal → Dr. Smith")))
+    await alex.aprocess(_state("Is parking free?"))
+
+    assert alex.llm.calls == 2
+    assert alex_module.response_cache.stats()["hits"] == 1
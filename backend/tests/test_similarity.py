@@ -0,0 +1,53 @@
+"""
+Test Vectorized Cosine Similarity
+"""
+
+import numpy as np
+
+from app.memory.similarity import cosine_similarities, normalize_rows, top_k
+
+
+def _legacy_top_k(query, candidates, threshold, limit):
+    """Reference implementation: the original per-candidate loop."""
+    similar = []
+    for position, other in enumerate(candidates):
+        norm = np.linalg.norm(query) * np.linalg.norm(other)
+        similarity = 0.0 if norm == 0 else float(np.dot(query, other) / norm)
+        if similarity > threshold:
+            similar.append((position, similarity))
+    similar.sort(key=lambda x: x[1], reverse=True)
+    return [position for position, _ in similar[:limit]]
+
+
+def test_matches_legacy_threshold_and_limit():
+    """Vectorized top-k selects the same candidates in the same order."""
+    rng = np.random.default_rng(7)
+    candidates = rng.normal(size=(500, 16))
+    candidates[1:40] = candidates[0] + rng.normal(scale=0.4, size=(39, 16))
+    query = candidates[0]
+
+    scores = cosine_similarities(query, normalize_rows(candidates))
+
+    for threshold, limit in [(0.7, 5), (0.8, 100), (0.0, 3), (0.99, 10)]:
+        positions, _ = top_k(scores, limit, threshold)
+        assert positions.tolist() == _legacy_top_k(query, candidates, threshold, limit)
+
+
+def test_ties_keep_candidate_order():
+    """Equal scores keep their original order, including at the cut-off."""
+    scores = np.array([0.5, 0.9, 0.9, 0.9, 0.1], dtype=np.float32)
+
+    positions, best = top_k(scores, 2)
+
+    assert positions.tolist() == [1, 2]
+    assert best.tolist() == [np.float32(0.9), np.float32(0.9)]
+
+
+def test_zero_vectors_and_empty_input():
+    """Zero vectors score 0 and empty candidate sets return nothing."""
+    normalized = normalize_rows([[0.0, 0.0], [1.0, 0.0]])
+    scores = cosine_similarities([1.0, 0.0], normalized)
+    assert scores.tolist() == [0.0, 1.0]
+
+    positions, best = top_k(np.zeros(0, dtype=np.float32), 5, 0.5)
+    assert positions.size == 0 and best.size == 0
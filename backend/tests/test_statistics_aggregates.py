@@ -0,0 +1,136 @@
+"""
+Test Statistics Aggregates - incremental updates match a full rebuild, also under concurrent writes
+"""
+
+import random
+import threading
+from datetime import timedelta
+
+from app.integrations.analytics_store import AnalyticsStore
+from app.integrations.mock_odoo_realistic import RealisticMockOdooClient
+from app.integrations.statistics_aggregates import StatisticsAggregates
+from tests.test_analytics_store import TODAY, TREATMENTS, _dataset
+
+
+QUERIES = [
+    lambda s: s.overview(),
+    lambda s: s.patient_statistics(TODAY),
+    lambda s: s.appointment_statistics(TODAY),
+    lambda s: s.revenue_statistics(),
+    lambda s: s.top_patients(10),
+]
+
+
+def test_updates_match_rebuild():
+    """Aggregates built from a snapshot and then updated per write equal a rebuild with the writes."""
+    patients, appointments, invoices = _dataset()
+    aggregates = StatisticsAggregates.from_store(AnalyticsStore(patients, appointments, invoices), top_capacity=5)
+    store = AnalyticsStore(patients, appointments, invoices)
+    assert [query(aggregates) for query in QUERIES] == [query(store) for query in QUERIES]
+
+    rng = random.Random(3)
+    for _ in range(300):
+        action = rng.random()
+        if action < 0.2:
+            patient = {
+                "id": len(patients) + 1,
+                "registration_date": (TODAY - timedelta(days=rng.randint(0, 60))).isoformat(),
+                "last_visit": None,
+                "insurance_provider": rng.choice(["Leumit", None]),
+                "outstanding_balance": 0,
+            }
+            patients.append(patient)
+            aggregates.patient_added(patient)
+        elif action < 0.5:
+            appointment = {
+                "date": (TODAY + timedelta(days=rng.randint(0, 10))).isoformat(),
+                "status": "scheduled",
+                "treatment_type": rng.choice(TREATMENTS + ["Implant"]),
+            }
+            appointments.append(appointment)
+            aggregates.appointment_added(appointment)
+        elif action < 0.7:
+            appointment = rng.choice(appointments)
+            old_status, appointment["status"] = appointment["status"], "cancelled"
+            aggregates.appointment_status_changed(appointment, old_status)
+        else:
+            total = rng.choice([80, 4000])  # Large invoices reshuffle the top patients
+            invoice = {
+                "patient_id": rng.randint(1, len(patients)),
+                "issue_date": TODAY.isoformat(),
+                "treatment": rng.choice(TREATMENTS),
+                "status": "unpaid",
+                "total_amount": total,
+                "paid_amount": 0,
+                "outstanding_amount": total,
+            }
+            invoices.append(invoice)
+            aggregates.invoice_added(invoice)
+
+    rebuilt = StatisticsAggregates.from_store(AnalyticsStore(patients, appointments, invoices), top_capacity=5)
+    assert aggregates.differences(rebuilt) == []
+    store = AnalyticsStore(patients, appointments, invoices)
+    assert aggregates.top_patients(5) == store.top_patients(5)
+    assert aggregates.top_patients(50) == store.top_patients(50)  # Beyond the heap: full scan
+    assert aggregates.appointment_statistics(TODAY) == store.appointment_statistics(TODAY)
+    assert aggregates.patient_statistics(TODAY) == store.patient_statistics(TODAY)
+
+
+def test_concurrent_writes_and_reads(tmp_path):
+    """Writers and readers in parallel: IDs stay unique and the aggregates equal a rebuild."""
+    client = RealisticMockOdooClient()
+    client.data_dir = tmp_path
+    patient_ids = [client.create_patient(f"Patient {i}") for i in range(20)]
+    client.statistics()
+    errors = []
+
+    def write(seed):
+        rng = random.Random(seed)
+        for offset in range(50):
+            patient_id = rng.choice(patient_ids)
+            day = (TODAY + timedelta(days=offset)).isoformat()
+            time = f"{9 + seed:02d}:00"  # Each writer its own hour, so no booking overlaps
+            appointment_id = client.create_appointment(patient_id, day, time, rng.choice(TREATMENTS))
+            client.create_invoice(patient_id, appointment_id, "Cleaning", rng.choice([100, 250]))
+            if rng.random() < 0.3:
+                client.cancel_appointment(appointment_id)
+
+    def read():
+        for _ in range(200):
+            overview = client.get_statistics()
+            if overview["total_invoices"] > overview["total_appointments"]:
+                errors.append(overview)  # An invoice is always created after its appointment
+
+    threads = [threading.Thread(target=write, args=(seed,)) for seed in range(4)] + [threading.Thread(target=read)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len({a["id"] for a in client.appointments}) == len(client.appointments) == 200
+    rebuilt = StatisticsAggregates.from_store(AnalyticsStore.from_client(client))
+    assert client.statistics().differences(rebuilt) == []
+    assert client.get_statistics()["total_revenue"] == sum(i["total_amount"] for i in client.invoices)
+
+
+def test_periodic_check_replaces_drifted_aggregates(tmp_path):
+    """The full-rebuild check finds and repairs aggregates that no longer match the records."""
+    client = RealisticMockOdooClient(statistics_check_interval=3600)
+    client.data_dir = tmp_path
+    patient_id = client.create_patient("Tamar Amar")
+    client.create_invoice(patient_id, 1, "Crown", 1200)
+    assert client.check_statistics() == []
+
+    client.statistics().total_revenue += 500  # Simulate a missed update
+    assert client.get_statistics()["total_revenue"] == 1700
+    assert client.check_statistics() == ["overview", "revenue"]
+    assert client.get_statistics()["total_revenue"] == 1200
+
+    client.statistics().invoice_count += 1
+    client.statistics_check_interval = 0  # The next read starts a background check
+    client.statistics()
+    for thread in threading.enumerate():
+        if thread.name == "statistics-check":
+            thread.join()
+    assert client.get_statistics()["total_invoices"] == 1
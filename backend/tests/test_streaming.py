@@ -0,0 +1,112 @@
+"""
+Test Streaming Responses - escalation tag filtering and token streaming
+"""
+
+import random
+
+import pytest
+from langchain_core.messages import AIMessageChunk, HumanMessage
+
+from app.agents import agent_graph as agent_graph_module
+from app.agents import alex as alex_module
+from app.agents.agent_graph import AgentGraphV2
+from app.agents.streaming import EscalationTagFilter
+from app.core.rate_limiter import DistributedRateLimiter
+
+
+RESPONSES = [
+    "🚨 This sounds like an emergency! I need to connect you with Dr. Smith RIGHT NOW.\n\n[ESCALATE: EMERGENCY]",
+    "I can't recommend medication.\n[ESCALATE: DOCTOR_REQUIRED]\n",
+    "  Our hours are 8:00-19:00 [Sun-Thu]. Book now? [ESCALATE: ROUTINE]",
+    "Prices [see list] vary. [ESCALATE",
+    "Array [1, 2] and [ESCALATE: ROUTINE] more text [",
+    "No tags here at all.",
+]
+
+
+def _legacy_cleanup(text: str) -> str:
+    """Non-streaming cleanup from AgentGraphV2.process_message."""
+    for tag in ["[ESCALATE: EMERGENCY]", "[ESCALATE: DOCTOR_REQUIRED]", "[ESCALATE: ROUTINE]"]:
+        text = text.replace(tag, "").strip()
+    return text
+
+
+def _stream(text: str, tag_filter: EscalationTagFilter, rng: random.Random) -> str:
+    output = []
+    position = 0
+    while position < len(text):
+        size = rng.randint(1, 6)
+        output.append(tag_filter.feed(text[position:position + size]))
+        position += size
+    output.append(tag_filter.flush())
+    return "".join(output)
+
+
+@pytest.mark.parametrize("response", RESPONSES)
+def test_filter_matches_non_streaming_cleanup(response):
+    """Any chunking produces the same text as the non-streaming cleanup."""
+    rng = random.Random(42)
+    for _ in range(50):
+        tag_filter = EscalationTagFilter()
+        streamed = _stream(response, tag_filter, rng)
+        assert streamed == _legacy_cleanup(response)
+        assert tag_filter.text == streamed
+        assert "[ESCALATE:" not in streamed or response.endswith("[ESCALATE")
+
+
+def test_filter_records_levels_and_never_leaks_partial_tag():
+    """Tag text is held back until it is known to be a tag, then dropped."""
+    tag_filter = EscalationTagFilter()
+
+    assert tag_filter.feed("Call Dr. Smith now. [ESC") == "Call Dr. Smith now."
+    assert tag_filter.feed("ALATE: EMERG") == ""
+    assert tag_filter.feed("ENCY]") == ""
+    assert tag_filter.flush() == ""
+    assert tag_filter.levels == ["EMERGENCY"]
+
+
+class StreamingLLM:
+    """Stand-in for ChatOpenAI.astream() that yields fixed chunks."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def astream(self, conversation):
+        for chunk in self.chunks:
+            yield AIMessageChunk(content=chunk)
+
+
+@pytest.mark.asyncio
+async def test_stream_message_yields_tokens_then_result(monkeypatch):
+    """Tokens arrive before the final result, which matches process_message's fields."""
+    monkeypatch.setattr(alex_module, "rate_limiter", DistributedRateLimiter(redis_url=None))
+    monkeypatch.setattr(alex_module.response_cache, "enabled", False)
+    graph = AgentGraphV2(checkpointer=None)
+    graph.alex.llm = StreamingLLM(["I need to ", "connect you with Dr. Smith.", " [ESCALATE", ": DOCTOR_REQUIRED]"])
+    submitted = []
+
+    async def build_state(user_id, organization_id, conversation_id, message, history=None):
+        return {"messages": [HumanMessage(content=message)], "user_id": user_id, "errors": []}
+
+    async def submit(**interaction):
+        submitted.append(interaction)
+        return True
+
+    monkeypatch.setattr(graph, "_build_initial_state", build_state)
+    monkeypatch.setattr(agent_graph_module.interaction_writer, "submit", submit)
+
+    events = [
+        event async for event in graph.stream_message("u1", "o1", "c1", "What medication should I take?")
+    ]
+
+    tokens = [event["content"] for event in events if event["type"] == "token"]
+    assert len(tokens) >= 2
+    assert "".join(tokens) == "I need to connect you with Dr. Smith."
+
+    done = events[-1]
+    assert done["type"] == "done"
+    assert done["response"] == "I need to connect you with Dr. Smith."
+    assert done["escalation_level"] == "DOCTOR_REQUIRED"
+    assert done["requires_human"] is True
+    assert done["outcome"] == "escalated"
+    assert submitted[0]["agent_response"] == done["response"]
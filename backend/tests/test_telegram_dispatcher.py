@@ -0,0 +1,92 @@
+"""
+Test Telegram Dispatcher - per-chat order, bounded concurrency, deduplication
+"""
+
+import asyncio
+
+import pytest
+
+from app.integrations.telegram_dispatcher import TelegramDispatcher, update_chat_id
+
+
+def _update(update_id, chat_id, text="hi"):
+    return {"update_id": update_id, "message": {"chat": {"id": chat_id}, "from": {"id": chat_id}, "text": text}}
+
+
+class RecordingHandler:
+    """Fake handle_update that records (chat, update_id) and tracks concurrency."""
+
+    def __init__(self, delay=0.01):
+        self.delay = delay
+        self.handled = []
+        self.running = 0
+        self.max_running = 0
+        self.running_chats = set()
+        self.overlapping_chat = False
+
+    async def __call__(self, update):
+        chat_id = update_chat_id(update)
+        self.overlapping_chat |= chat_id in self.running_chats
+        self.running_chats.add(chat_id)
+        self.running += 1
+        self.max_running = max(self.max_running, self.running)
+        try:
+            await asyncio.sleep(self.delay)
+            if update["message"]["text"] == "boom":
+                raise RuntimeError("handler failed")
+            self.handled.append((chat_id, update["update_id"]))
+        finally:
+            self.running -= 1
+            self.running_chats.discard(chat_id)
+
+
+@pytest.mark.asyncio
+async def test_per_chat_order_and_bounded_workers():
+    """Each chat's updates run one at a time in order; chats run in parallel up to max_workers."""
+    handler = RecordingHandler()
+    dispatcher = TelegramDispatcher(handler, max_workers=3)
+
+    updates = [_update(i, chat_id=i % 5) for i in range(40)]
+    updates[7]["message"]["text"] = "boom"  # A failure does not stall the chat
+    for update in updates:
+        assert await dispatcher.submit(update)
+    await dispatcher.join()
+
+    for chat_id in range(5):
+        expected = [u["update_id"] for u in updates if u["message"]["chat"]["id"] == chat_id and u["update_id"] != 7]
+        assert [update_id for chat, update_id in handler.handled if chat == chat_id] == expected
+    assert handler.max_running == 3 and not handler.overlapping_chat
+    assert dispatcher.queue_depth == 0
+    await dispatcher.stop()
+
+
+@pytest.mark.asyncio
+async def test_duplicate_update_ids_are_handled_once():
+    """Telegram redeliveries (same update_id) are skipped, within the window."""
+    handler = RecordingHandler(delay=0)
+    dispatcher = TelegramDispatcher(handler, dedupe_window=2)
+
+    for update_id in (1, 2, 1, 2, 3):
+        assert await dispatcher.submit(_update(update_id, chat_id=9))
+    await dispatcher.join()
+    assert handler.handled == [(9, 1), (9, 2), (9, 3)]
+
+    await dispatcher.submit(_update(1, chat_id=9))  # Fell out of the window
+    await dispatcher.stop()
+    assert handler.handled[-1] == (9, 1)
+
+
+@pytest.mark.asyncio
+async def test_full_dispatcher_drops_and_accepts_the_retry():
+    """Past max_pending, submit() gives up after enqueue_timeout; the retried update is not a duplicate."""
+    handler = RecordingHandler(delay=0.2)
+    dispatcher = TelegramDispatcher(handler, max_workers=1, max_pending=2, enqueue_timeout=0.05)
+
+    assert await dispatcher.submit(_update(1, chat_id=1))
+    assert await dispatcher.submit(_update(2, chat_id=2))
+    assert not await dispatcher.submit(_update(3, chat_id=3))
+
+    await dispatcher.join()
+    assert await dispatcher.submit(_update(3, chat_id=3))
+    await dispatcher.stop()
+    assert [update_id for _, update_id in handler.handled] == [1, 2, 3]
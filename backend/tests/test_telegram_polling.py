@@ -0,0 +1,110 @@
+"""
+Test Telegram Polling - getUpdates batches, offsets and the webhook handlers, against a fake Bot API
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.api.v1.endpoints.telegram import handle_update
+from app.integrations.telegram_client import TelegramClient
+from app.integrations.telegram_dispatcher import TelegramDispatcher
+from app.integrations.telegram_polling import TelegramPoller
+from tests.fake_telegram import FakeTelegram
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+@pytest.mark.asyncio
+async def test_batches_offsets_and_confirmation():
+    """Updates arrive in batches of batch_size, in order, and are confirmed to the server on stop."""
+    with FakeTelegram() as fake:
+        fake.webhook_url = "https://clinic.example/api/v1/telegram/webhook"  # Removed by the poller
+        for i in range(25):
+            fake.push_message(chat_id=i % 4, text=f"message {i}")
+        client = TelegramClient(bot_token=fake.token, api_url=fake.url)
+        received = []
+
+        async def submit(update):
+            received.append(update["update_id"])
+            return True
+
+        poller = TelegramPoller(client, submit, poll_timeout=1, batch_size=10)
+        poller.start()
+        await _wait_for(lambda: len(received) == 25)
+        late = fake.push_message(chat_id=1, text="one more")  # Wakes the waiting long poll
+        await _wait_for(lambda: len(received) == 26)
+        await poller.stop()
+        await client.close()
+
+    assert received == list(range(1, 26)) + [late]
+    polls = [params for method, params in fake.calls if method == "getUpdates"]
+    assert [p.get("offset") for p in polls[:3]] == [None, 11, 21] and polls[0]["limit"] == 10
+    assert fake.webhook_url == "" and fake.updates == []  # Everything confirmed
+
+
+@pytest.mark.asyncio
+async def test_refusals_and_errors_lose_nothing():
+    """A refused update is fetched again; server errors back off and recover."""
+    with FakeTelegram() as fake:
+        for i in range(6):
+            fake.push_message(chat_id=7, text=f"message {i}")
+        fake.fail_next = 2
+        client = TelegramClient(bot_token=fake.token, api_url=fake.url)
+        received, refusals = [], {4: 1}
+
+        async def submit(update):
+            if refusals.get(update["update_id"]):
+                refusals[update["update_id"]] -= 1
+                return False
+            received.append(update["update_id"])
+            return True
+
+        poller = TelegramPoller(client, submit, poll_timeout=0, retry_delay=0.01)
+        poller.start()
+        await _wait_for(lambda: len(received) == 6)
+        await poller.stop()
+        await client.close()
+
+    assert received == [1, 2, 3, 4, 5, 6]
+    assert [p.get("offset") for m, p in fake.calls if m == "getUpdates"][2:4] == [None, 4]
+
+
+@pytest.mark.asyncio
+async def test_polling_feeds_the_webhook_handlers():
+    """Polled updates go through the dispatcher to the same handlers; replies come back per chat, in order."""
+    with FakeTelegram() as fake:
+        client = TelegramClient(bot_token=fake.token, api_url=fake.url)
+        replies = iter(range(100))
+
+        async def process_message(**kwargs):
+            await asyncio.sleep(0.01)
+            return {"response": f"reply {next(replies)} to {kwargs['message']}", "requires_human": False}
+
+        with patch("app.api.v1.endpoints.telegram.telegram_client", client), \
+             patch("app.api.v1.endpoints.telegram.agent_graph_v2") as agent:
+            agent.process_message = AsyncMock(side_effect=process_message)
+            dispatcher = TelegramDispatcher(handle_update, max_workers=4)
+            poller = TelegramPoller(client, dispatcher.submit, poll_timeout=1)
+            for i in range(3):
+                for chat_id in (101, 102, 103):
+                    fake.push_message(chat_id=chat_id, text=f"question {i}")
+            fake.push_message(chat_id=104, text="/help")
+
+            poller.start()
+            await _wait_for(lambda: len(fake.sent_texts(103)) == 3)
+            await _wait_for(lambda: len(fake.sent_texts(104)) == 1)
+            await poller.stop()
+            await dispatcher.stop()
+        await client.close()
+
+    for chat_id in (101, 102, 103):
+        assert [text.split(" to ")[1] for text in fake.sent_texts(chat_id)] == ["question 0", "question 1", "question 2"]
+    assert "How to Use" in fake.sent_texts(104)[0]
+    assert sum(method == "sendChatAction" for method, _ in fake.sent) == 9
@@ -0,0 +1,194 @@
+"""
+Test Vector Index for Causal Memory
+"""
+
+import numpy as np
+import pytest
+
+from app.memory.vector_index import VectorIndex
+
+
+def _random_embeddings(count: int, dim: int = 32, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.normal(size=(count, dim)).astype(np.float32)
+
+
+def test_search_returns_exact_neighbours():
+    """Brute-force search ranks by cosine similarity."""
+    index = VectorIndex(backend="brute_force")
+    embeddings = _random_embeddings(200)
+
+    for i, embedding in enumerate(embeddings):
+        index.add(f"i{i}", embedding, organization_id="org", timestamp=1000.0 + i)
+
+    query = embeddings[42]
+    results = index.search(query, k=5)
+
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    expected = np.argsort(-(normalized @ (query / np.linalg.norm(query))))[:5]
+
+    assert [item_id for item_id, _ in results] == [f"i{i}" for i in expected]
+    assert results[0][0] == "i42"
+    assert results[0][1] == pytest.approx(1.0, abs=1e-5)
+
+
+def test_search_filters_by_organization_and_time():
+    """Searches are scoped to one organization and a time window."""
+    index = VectorIndex(backend="brute_force")
+    embedding = np.ones(8, dtype=np.float32)
+
+    index.add("old", embedding, organization_id="org-a", timestamp=100.0)
+    index.add("recent", embedding, organization_id="org-a", timestamp=500.0)
+    index.add("other-org", embedding, organization_id="org-b", timestamp=500.0)
+
+    results = index.search(embedding, k=10, organization_id="org-a", since=200.0)
+    assert [item_id for item_id, _ in results] == ["recent"]
+
+    results = index.search(embedding, k=10, since=200.0)
+    assert {item_id for item_id, _ in results} == {"recent", "other-org"}
+
+    assert index.search(embedding, k=10, organization_id="org-c") == []
+
+
+def test_threshold_exclusion_and_removal():
+    """Threshold, exclusions and removals are honoured."""
+    index = VectorIndex(backend="brute_force")
+    index.add("same", [1.0, 0.0], organization_id="org", timestamp=1.0)
+    index.add("close", [0.9, 0.1], organization_id="org", timestamp=1.0)
+    index.add("orthogonal", [0.0, 1.0], organization_id="org", timestamp=1.0)
+
+    results = index.search([1.0, 0.0], k=10, threshold=0.8)
+    assert [item_id for item_id, _ in results] == ["same", "close"]
+
+    results = index.search([1.0, 0.0], k=10, threshold=0.8, exclude_ids={"same"})
+    assert [item_id for item_id, _ in results] == ["close"]
+
+    assert index.remove("close")
+    assert "close" not in index
+    assert len(index) == 2
+    results = index.search([1.0, 0.0], k=10, threshold=0.8)
+    assert [item_id for item_id, _ in results] == ["same"]
+
+
+@pytest.mark.parametrize("backend", ["brute_force", "hnsw"])
+def test_include_ids_and_empty_partitions(backend):
+    """Searches can be limited to given IDs; a partition goes away with its last item."""
+    if backend == "hnsw":
+        pytest.importorskip("hnswlib")
+    index = VectorIndex(backend=backend)
+    embeddings = _random_embeddings(300)
+    for i, embedding in enumerate(embeddings):
+        index.add(f"i{i}", embedding, organization_id="org-a", timestamp=float(i))
+    index.add("b", embeddings[0], organization_id="org-b", timestamp=0.0)
+
+    results = index.search(embeddings[0], k=2, organization_id="org-a", include_ids={"i7", "i250", "gone"})
+    assert sorted(item_id for item_id, _ in results) == ["i250", "i7"]
+    assert index.search(embeddings[0], k=1, organization_id="org-a", include_ids=set()) == []
+
+    assert index.remove("b")
+    assert list(index._partitions) == ["org-a"]
+    index.add("b", embeddings[0], organization_id="org-b", timestamp=0.0)
+    assert index.search(embeddings[0], k=1, organization_id="org-b")[0][0] == "b"
+
+
+def test_removed_rows_are_compacted():
+    """Churn (add + remove) does not grow a partition without bound."""
+    index = VectorIndex(backend="brute_force")
+    embeddings = _random_embeddings(5000)
+
+    for i, embedding in enumerate(embeddings):
+        index.add(f"i{i}", embedding, organization_id="org", timestamp=float(i))
+        if i >= 10:
+            index.remove(f"i{i - 10}")
+
+    partition = index._partitions["org"]
+    assert len(partition) == 10
+    assert len(partition.ids) <= 10 + 1025
+    assert index.search(embeddings[4995], k=1)[0][0] == "i4995"
+
+
+def test_rejects_mismatched_dimensions():
+    """All embeddings in an index share one dimension."""
+    index = VectorIndex(backend="brute_force")
+    index.add("a", [1.0, 0.0, 0.0], organization_id="org", timestamp=1.0)
+
+    with pytest.raises(ValueError):
+        index.add("b", [1.0, 0.0], organization_id="org", timestamp=1.0)
+
+
+def _filled_pair(embeddings: np.ndarray, organizations: int = 3):
+    """An HNSW and a brute-force index holding the same items (every 7th one removed)."""
+    pytest.importorskip("hnswlib")
+    indexes = VectorIndex(backend="hnsw"), VectorIndex(backend="brute_force")
+    for index in indexes:
+        for i, embedding in enumerate(embeddings):
+            index.add(f"i{i}", embedding, organization_id=f"org-{i % organizations}", timestamp=float(i))
+        for i in range(0, len(embeddings), 7):
+            index.remove(f"i{i}")
+    return indexes
+
+
+def test_hnsw_matches_brute_force():
+    """Organization, time window, threshold, exclusions and removals give the exact results."""
+    embeddings = _random_embeddings(600)
+    hnsw, brute_force = _filled_pair(embeddings)
+    assert hnsw.backend == "hnsw"
+
+    queries = _random_embeddings(10, seed=1).tolist() + [embeddings[i] for i in (3, 50, 301)]
+    for query in queries:
+        for kwargs in (
+            {},
+            {"organization_id": "org-1"},
+            {"organization_id": "org-2", "since": 450.0},
+            {"since": 590.0},
+            {"threshold": 0.2},
+            {"organization_id": "org-0", "exclude_ids": {"i3", "i6"}},
+        ):
+            expected = brute_force.search(query, k=5, **kwargs)
+            results = hnsw.search(query, k=5, **kwargs)
+            assert [item_id for item_id, _ in results] == [item_id for item_id, _ in expected]
+            assert [score for _, score in results] == pytest.approx([score for _, score in expected], abs=1e-5)
+
+    assert hnsw.search(embeddings[7], k=3, organization_id="org-1", threshold=0.99) == []  # i7 was removed
+
+
+class _ExhaustedGraph:
+    """hnswlib index whose filtered queries fail, as they can on a heavily filtered graph."""
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getattr__(self, name):
+        return getattr(self.graph, name)
+
+    def knn_query(self, *args, **kwargs):
+        raise RuntimeError("Cannot return the results in a contiguous 2D array")
+
+
+def test_hnsw_falls_back_to_exact_scan():
+    """A query hnswlib cannot answer is scored exactly over the eligible rows."""
+    embeddings = _random_embeddings(300)
+    hnsw, brute_force = _filled_pair(embeddings, organizations=1)
+    partition = hnsw._partitions["org-0"]
+    partition.graph = _ExhaustedGraph(partition.graph)
+
+    for since, threshold in ((None, None), (250.0, None), (100.0, 0.1)):
+        expected = brute_force.search(embeddings[280], k=5, since=since, threshold=threshold)
+        results = hnsw.search(embeddings[280], k=5, since=since, threshold=threshold)
+        assert [item_id for item_id, _ in results] == [item_id for item_id, _ in expected]
+
+
+def test_hnsw_removed_rows_are_compacted():
+    """Compaction rebuilds an HNSW partition from the stored vectors of the live items."""
+    pytest.importorskip("hnswlib")
+    index = VectorIndex(backend="hnsw")
+    embeddings = _random_embeddings(3000)
+
+    for i, embedding in enumerate(embeddings):
+        index.add(f"i{i}", embedding, organization_id="org", timestamp=float(i))
+        if i >= 10:
+            index.remove(f"i{i - 10}")
+
+    assert len(index._partitions["org"].ids) <= 10 + 1025
+    assert [item_id for item_id, _ in index.search(embeddings[2995], k=1)] == ["i2995"]
+    assert {item_id for item_id, _ in index.search(embeddings[2995], k=20)} == {f"i{i}" for i in range(2990, 3000)}
@@ -0,0 +1,81 @@
+"""
+Test Causal Memory Write-Behind Pipeline
+"""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.memory.write_behind import InteractionWriteBehind
+
+
+class RecordingStore:
+    """Fake store_batch that records batches and can be paused."""
+
+    def __init__(self):
+        self.batches = []
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, interactions):
+        self.release.wait(timeout=5)
+        self.batches.append([i["user_message"] for i in interactions])
+        return [f"id-{i}" for i in range(len(interactions))]
+
+
+@pytest.mark.asyncio
+async def test_batches_concurrent_submissions():
+    """Interactions submitted together are written in one batch."""
+    store = RecordingStore()
+    writer = InteractionWriteBehind(store, max_batch_size=10, max_batch_delay=0.05)
+
+    await asyncio.gather(*[
+        writer.submit(user_message=f"message {i}", agent_response="ok", agent_name="alex",
+                      conversation_id="c", organization_id="o")
+        for i in range(5)
+    ])
+    await writer.flush()
+
+    assert store.batches == [[f"message {i}" for i in range(5)]]
+    assert writer.queue_depth == 0
+    await writer.stop()
+
+
+@pytest.mark.asyncio
+async def test_full_queue_applies_backpressure_then_drops():
+    """A full queue blocks submit() and drops once enqueue_timeout expires."""
+    store = RecordingStore()
+    store.release.clear()
+    writer = InteractionWriteBehind(
+        store, max_queue_size=1, max_batch_size=1, max_batch_delay=0, enqueue_timeout=0.1
+    )
+
+    # First item is picked up by the (paused) worker, second fills the queue
+    assert await writer.submit(user_message="a", agent_response="", agent_name="alex",
+                               conversation_id="c", organization_id="o")
+    await asyncio.sleep(0.05)
+    assert await writer.submit(user_message="b", agent_response="", agent_name="alex",
+                               conversation_id="c", organization_id="o")
+    assert not await writer.submit(user_message="c", agent_response="", agent_name="alex",
+                                   conversation_id="c", organization_id="o")
+
+    store.release.set()
+    await writer.stop()
+
+    assert store.batches == [["a"], ["b"]]
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_pending_writes():
+    """stop() writes everything that was queued before shutting down."""
+    store = RecordingStore()
+    writer = InteractionWriteBehind(store, max_batch_size=2, max_batch_delay=0.01)
+
+    for i in range(5):
+        await writer.submit(user_message=str(i), agent_response="", agent_name="alex",
+                            conversation_id="c", organization_id="o")
+    await writer.stop()
+
+    assert [m for batch in store.batches for m in batch] == ["0", "1", "2", "3", "4"]
+    assert all(len(batch) <= 2 for batch in store.batches)